@@ -0,0 +1,124 @@
+"""Deterministic synthetic memory corpora for the benchmark suite.
+
+Everything here is a pure function of ``seed``: the same seed yields the
+same records, queries and embeddings on every machine, so timings from two
+runs are measured over identical data.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+from clawlite.core.memory_stream import STREAM_FORMAT, STREAM_VERSION
+
+EMBEDDING_DIM = 64
+CORPUS_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+_TOPICS = (
+    "budget", "deploy", "invoice", "garden", "recipe", "marathon", "guitar", "kubernetes",
+    "vacation", "dentist", "mortgage", "birthday", "podcast", "sourdough", "python", "chess",
+    "insurance", "printer", "wedding", "camera", "backup", "newsletter", "roadmap", "hiring",
+    "allergy", "bicycle", "concert", "thesis", "aquarium", "passport", "database", "painting",
+    "meditation", "vaccine", "telescope", "warranty", "migration", "translation", "pottery", "sailing",
+)
+_PROJECTS = (
+    "atlas", "borealis", "cinder", "delta", "ember", "fjord", "granite", "harbor", "iris", "juniper",
+    "kestrel", "lumen", "meridian", "nimbus", "onyx", "pioneer", "quartz", "rivet", "summit", "tundra",
+)
+_VERBS = ("reviewed", "planned", "fixed", "asked about", "prefers", "scheduled", "cancelled", "compared", "finished", "started")
+_CATEGORIES = ("context", "preferences", "project", "events", "health", "finance")
+_MEMORY_TYPES = ("knowledge", "event", "preference", "skill")
+
+
+def _filler_words(count: int) -> tuple[str, ...]:
+    rng = random.Random("filler")
+    return tuple("".join(rng.choice("bcdfghjklmnprstvz") + rng.choice("aeiou") for _ in range(3)) for _ in range(count))
+
+
+_FILLER = _filler_words(400)
+
+
+def corpus_record(index: int, *, seed: int, scope: str = "") -> dict[str, object]:
+    """The ``index``-th history record of a corpus's default (or named) scope.
+
+    Each ``scope`` (a user id, or ``"shared"``) draws its own records and ids,
+    so per-scope slices never collide with the default one.
+    """
+    rng = random.Random(f"{seed}:{scope}:{index}" if scope else f"{seed}:{index}")
+    topic = rng.choice(_TOPICS)
+    project = rng.choice(_PROJECTS)
+    filler = " ".join(rng.choice(_FILLER) for _ in range(rng.randint(4, 16)))
+    created = CORPUS_EPOCH - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+    return {
+        "id": f"bench-{scope}-{index:07d}" if scope else f"bench-{index:07d}",
+        "text": f"user {rng.choice(_VERBS)} the {topic} notes for {project} {filler}",
+        "source": f"session:bench-{index % 97}",
+        "created_at": created.isoformat(),
+        "category": rng.choice(_CATEGORIES),
+        "memory_type": rng.choice(_MEMORY_TYPES),
+        "confidence": round(rng.uniform(0.5, 1.0), 3),
+    }
+
+
+def iter_corpus(size: int, *, seed: int, scope: str = "") -> Iterator[dict[str, object]]:
+    for index in range(max(0, int(size))):
+        yield corpus_record(index, seed=seed, scope=scope)
+
+
+def scoped_record(index: int, *, seed: int, users: int) -> dict[str, object]:
+    """A record for a non-default user; every fifth one is shared."""
+    row = corpus_record(1_000_000 + index, seed=seed)
+    return {
+        "text": str(row["text"]),
+        "source": str(row["source"]),
+        "user_id": f"user-{index % max(1, users):02d}",
+        "shared": index % 5 == 0,
+    }
+
+
+def corpus_queries(count: int, *, seed: int) -> list[str]:
+    rng = random.Random(f"{seed}:queries")
+    return [f"{rng.choice(_TOPICS)} {rng.choice(_PROJECTS)}" for _ in range(max(0, int(count)))]
+
+
+def fake_embedding(text: str, *, dim: int = EMBEDDING_DIM) -> list[float]:
+    """Feature-hashed unit vector: texts sharing words land close together."""
+    vector = [0.0] * dim
+    for token in str(text or "").lower().split():
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "big") % dim
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm <= 0.0:
+        vector[0] = 1.0
+        return vector
+    return [value / norm for value in vector]
+
+
+def write_corpus_stream(path: Path, size: int, *, seed: int, scope: str = "") -> int:
+    """Write a corpus (or one scope's slice) as a ``clawlite memory export --format ndjson`` stream."""
+    count = 0
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write(json.dumps({"kind": "header", "format": STREAM_FORMAT, "version": STREAM_VERSION}) + "\n")
+        for record in iter_corpus(size, seed=seed, scope=scope):
+            fh.write(json.dumps({"kind": "history", "record": record}) + "\n")
+            count += 1
+        fh.write(json.dumps({"kind": "end", "counts": {"history": count, "curated": 0}}) + "\n")
+    return count
+
+
+__all__ = [
+    "CORPUS_EPOCH",
+    "EMBEDDING_DIM",
+    "corpus_queries",
+    "corpus_record",
+    "fake_embedding",
+    "iter_corpus",
+    "scoped_record",
+    "write_corpus_stream",
+]
@@ -0,0 +1,313 @@
+"""Memory subsystem benchmarks.
+
+Usage:
+    python -m benchmarks.memory_bench
+    python -m benchmarks.memory_bench --sizes 1000,10000,100000 --out bench.json
+    python -m benchmarks.memory_bench --baseline bench.json --threshold 0.25
+
+Each (backend, size) case runs in a fresh process over a deterministic
+synthetic corpus (see :mod:`benchmarks.corpus`). The default scope, every
+scoped user and the shared scope each get a ``size``-record slice, bulk-loaded
+through ``MemoryStore.import_stream``; the default history is then mirrored
+into the backend index with ``MemoryStore.index_history``. After that add /
+search / retrieve / consolidate / prune / snapshot are timed one operation
+at a time. The result is JSON with p50/p95 latencies and
+peak RSS per case. Given ``--baseline``, ops whose p95 (or whose case's
+peak RSS) grew by more than ``--threshold`` are reported as regressions,
+and the exit status is 1.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.corpus import corpus_queries, fake_embedding, scoped_record, write_corpus_stream
+from clawlite.core.memory import MemoryStore
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+RESULT_SCHEMA = 1
+BENCH_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_SIZES = (1_000, 10_000)
+BENCH_BACKENDS = ("sqlite", "sqlite-vec")
+DEFAULT_SAMPLES = 50
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 1.0
+SCOPED_USERS = 8
+MIRROR_BATCH = 1000
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linear-interpolated percentile of ``values`` (``q`` in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * max(0.0, min(100.0, q)) / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples_ms: list[float]) -> dict[str, float | int]:
+    return {
+        "count": len(samples_ms),
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 3) if samples_ms else 0.0,
+    }
+
+
+def peak_rss_kib() -> int:
+    if resource is None:
+        return 0
+    peak = int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _time_each(calls: list[Callable[[], Any]]) -> list[float]:
+    samples: list[float] = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return samples
+
+
+def _fake_embeddings(texts: list[str]) -> list[list[float] | None]:
+    return [fake_embedding(text) for text in texts]
+
+
+def _scoped_user(index: int) -> str:
+    return f"user-{index % SCOPED_USERS:02d}"
+
+
+def _import_scoped_slices(store: MemoryStore, stream_path: Path, size: int, *, seed: int) -> int:
+    """Give every scoped user and the shared scope a ``size``-record history of its own."""
+    imported = 0
+    for index in range(SCOPED_USERS):
+        user_id = _scoped_user(index)
+        imported += write_corpus_stream(stream_path, size, seed=seed, scope=user_id)
+        store.import_stream(stream_path, resume=False, user_id=user_id)
+        store.set_shared_opt_in(user_id, True)
+    imported += write_corpus_stream(stream_path, size, seed=seed, scope="shared")
+    store.import_stream(stream_path, resume=False, shared=True)
+    return imported
+
+
+def run_case(backend: str, size: int, *, seed: int = 7, samples: int = DEFAULT_SAMPLES) -> dict[str, Any]:
+    """Load a ``size``-record corpus into a fresh store on ``backend`` and time each operation."""
+    samples = max(1, int(samples))
+    with tempfile.TemporaryDirectory(prefix="clawlite-bench-") as tmp:
+        root = Path(tmp)
+        store = MemoryStore(
+            root / "memory" / "memory.jsonl",
+            semantic_enabled=True,
+            memory_backend_name=backend,
+            embedding_provider=_fake_embeddings,
+        )
+        stream_path = root / "corpus.ndjson"
+        write_corpus_stream(stream_path, size, seed=seed)
+
+        throughput: dict[str, float] = {}
+        started = time.perf_counter()
+        store.import_stream(stream_path, resume=False)
+        throughput["import_records_per_s"] = round(size / max(1e-9, time.perf_counter() - started), 1)
+        started = time.perf_counter()
+        scoped_size = _import_scoped_slices(store, stream_path, size, seed=seed)
+        throughput["import_scoped_records_per_s"] = round(scoped_size / max(1e-9, time.perf_counter() - started), 1)
+        started = time.perf_counter()
+        store.index_history(batch_size=MIRROR_BATCH)
+        throughput["index_records_per_s"] = round(size / max(1e-9, time.perf_counter() - started), 1)
+        started = time.perf_counter()
+        backfill = store.backfill_embeddings()
+        created = int(backfill.get("created", 0) or 0)
+        throughput["backfill_records_per_s"] = round(created / max(1e-9, time.perf_counter() - started), 1)
+
+        queries = corpus_queries(samples, seed=seed)
+        scoped = [scoped_record(idx, seed=seed, users=SCOPED_USERS) for idx in range(samples)]
+        loop = asyncio.new_event_loop()
+        try:
+            ops = {
+                "add": _time_each(
+                    [lambda row=row: store.add(str(row["text"]), source=str(row["source"])) for row in scoped]
+                ),
+                "add_scoped": _time_each(
+                    [
+                        lambda row=row: store.add(
+                            str(row["text"]), source=str(row["source"]), user_id=str(row["user_id"]), shared=bool(row["shared"])
+                        )
+                        for row in scoped
+                    ]
+                ),
+                "search": _time_each([lambda query=query: store.search(query, limit=5) for query in queries]),
+                "search_scoped": _time_each(
+                    [
+                        lambda idx=idx, query=query: store.search(query, limit=5, user_id=_scoped_user(idx), include_shared=True)
+                        for idx, query in enumerate(queries)
+                    ]
+                ),
+                "retrieve": _time_each(
+                    [lambda query=query: loop.run_until_complete(store.retrieve(query, limit=5)) for query in queries]
+                ),
+                "consolidate": _time_each(
+                    [
+                        lambda idx=idx, query=query: store.consolidate(
+                            [{"role": "user", "content": f"remember that the {query} review moved to week {idx}"}],
+                            source=f"session:bench-consolidate-{idx}",
+                        )
+                        for idx, query in enumerate(queries[: max(1, samples // 2)])
+                    ]
+                ),
+            }
+            # Each call deletes one exact corpus id, so the store keeps its size for the ops after it.
+            prune_ids = [f"bench-{idx:07d}" for idx in range(min(max(1, samples // 5), max(1, size // 100)))]
+            records_before = len(store.all())
+            ops["prune"] = _time_each(
+                [lambda record_id=record_id: store.delete_by_prefixes([record_id]) for record_id in prune_ids]
+            )
+            records_after = len(store.all())
+            if records_after != records_before - len(prune_ids):
+                raise RuntimeError(
+                    f"prune removed {records_before - records_after} records, expected {len(prune_ids)}"
+                )
+            ops["snapshot"] = _time_each(
+                [lambda idx=idx: (store.add(f"snapshot churn {idx}", source="session:bench-snapshot"), store.snapshot())
+                 for idx in range(3)]
+            )
+        finally:
+            loop.close()
+        diagnostics = store.diagnostics()
+        return {
+            "backend": backend,
+            "size": int(size),
+            "seed": int(seed),
+            "vector_extension": bool(diagnostics.get("backend_vector_extension", False)),
+            "peak_rss_kib": peak_rss_kib(),
+            "throughput": throughput,
+            "ops": {name: summarize(values) for name, values in ops.items()},
+        }
+
+
+def run_suite(
+    sizes: list[int],
+    backends: list[str],
+    *,
+    seed: int = 7,
+    samples: int = DEFAULT_SAMPLES,
+    isolate: bool = True,
+    log: Callable[[str], None] | None = None,
+) -> dict[str, Any]:
+    """Run every (backend, size) case; ``isolate`` gives each its own process so peak RSS is per case."""
+    cases: list[dict[str, Any]] = []
+    for backend in backends:
+        for size in sizes:
+            if log is not None:
+                log(f"memory bench: {backend} x {size}")
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                    cases.append(pool.submit(run_case, backend, size, seed=seed, samples=samples).result())
+            else:
+                cases.append(run_case(backend, size, seed=seed, samples=samples))
+    return {
+        "schema": RESULT_SCHEMA,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": int(seed),
+        "samples": int(samples),
+        "cases": cases,
+    }
+
+
+def compare_results(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    *,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> list[dict[str, Any]]:
+    """Ops (matched by backend, size and name) whose p95 or peak RSS grew past ``threshold``.
+
+    Latency deltas under ``min_delta_ms`` are ignored as timer noise. Cases
+    missing from either side are skipped.
+    """
+    limit = 1.0 + max(0.0, float(threshold))
+    previous = {(case.get("backend"), case.get("size")): case for case in baseline.get("cases", [])}
+    regressions: list[dict[str, Any]] = []
+    for case in current.get("cases", []):
+        key = (case.get("backend"), case.get("size"))
+        before = previous.get(key)
+        if before is None:
+            continue
+        for name, stats in case.get("ops", {}).items():
+            old = before.get("ops", {}).get(name)
+            if not old:
+                continue
+            new_p95 = float(stats.get("p95_ms", 0.0))
+            old_p95 = float(old.get("p95_ms", 0.0))
+            if new_p95 > old_p95 * limit and new_p95 - old_p95 >= min_delta_ms:
+                regressions.append(
+                    {"backend": key[0], "size": key[1], "metric": f"{name}.p95_ms", "baseline": old_p95, "current": new_p95}
+                )
+        old_rss = int(before.get("peak_rss_kib", 0) or 0)
+        new_rss = int(case.get("peak_rss_kib", 0) or 0)
+        if old_rss and new_rss > old_rss * limit:
+            regressions.append({"backend": key[0], "size": key[1], "metric": "peak_rss_kib", "baseline": old_rss, "current": new_rss})
+    return regressions
+
+
+def _int_list(raw: str) -> list[int]:
+    return [int(item.replace("_", "")) for item in str(raw or "").split(",") if item.strip()]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory_bench", description="Benchmark the memory subsystem.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), help=f"Corpus sizes (choose from {BENCH_SIZES})")
+    parser.add_argument("--backends", default=",".join(BENCH_BACKENDS), help="Comma-separated memory backends")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="Timed operations per op and case")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="", help="Write the JSON result here (default: stdout)")
+    parser.add_argument("--baseline", default="", help="Compare against a previous JSON result")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative p95/RSS growth")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS, dest="min_delta_ms")
+    parser.add_argument("--in-process", action="store_true", dest="in_process", help="Run cases in this process (RSS is cumulative)")
+    args = parser.parse_args(argv)
+
+    result = run_suite(
+        _int_list(args.sizes),
+        [item.strip() for item in str(args.backends).split(",") if item.strip()],
+        seed=args.seed,
+        samples=args.samples,
+        isolate=not args.in_process,
+        log=lambda text: sys.stderr.write(f"{text}\n"),
+    )
+    status = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_results(result, baseline, threshold=args.threshold, min_delta_ms=args.min_delta_ms)
+        result["baseline"] = {"path": str(args.baseline), "threshold": args.threshold, "regressions": regressions}
+        status = 1 if regressions else 0
+    encoded = json.dumps(result, indent=2, sort_keys=True)
+    if args.out:
+        Path(args.out).write_text(encoded + "\n", encoding="utf-8")
+    else:
+        sys.stdout.write(encoded + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
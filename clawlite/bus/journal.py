@@ -3,7 +3,9 @@ from __future__ import annotations
 import json
 import logging
 import sqlite3
-from datetime import datetime, timezone
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
@@ -11,6 +13,12 @@ from clawlite.bus.events import InboundEvent, OutboundEvent
 
 logger = logging.getLogger(__name__)
 
+JOURNAL_FLUSH_INTERVAL_S = 0.05
+JOURNAL_MAX_BATCH = 512
+JOURNAL_PRUNE_INTERVAL_S = 300.0
+JOURNAL_ACKED_RETENTION_S = 3600.0
+JOURNAL_MAX_WRITE_ATTEMPTS = 3
+
 _SCHEMA = """
 CREATE TABLE IF NOT EXISTS bus_inbound (
     id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -41,8 +49,24 @@ CREATE TABLE IF NOT EXISTS bus_outbound (
     created_at  TEXT NOT NULL,
     acked_at    TEXT
 );
+
+CREATE INDEX IF NOT EXISTS idx_bus_inbound_acked ON bus_inbound(acked_at);
+CREATE INDEX IF NOT EXISTS idx_bus_outbound_acked ON bus_outbound(acked_at);
 """
 
+_INSERT_SQL = {
+    "bus_inbound": """INSERT INTO bus_inbound
+        (id, correlation_id, channel, session_id, user_id, text,
+         metadata, created_at, acked_at)
+        VALUES (?,?,?,?,?,?,?,?,?)""",
+    "bus_outbound": """INSERT INTO bus_outbound
+        (id, correlation_id, channel, session_id, target, text,
+         metadata, attempt, max_attempts, retryable,
+         dead_lettered, dead_letter_reason, last_error, created_at, acked_at)
+        VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+}
+_TABLES = tuple(_INSERT_SQL)
+
 
 class BusJournal:
     """Optional SQLite persistence layer for the message bus.
@@ -51,23 +75,93 @@ class BusJournal:
     On startup, unacked events (without ``acked_at``) are replayed.
     On successful consumption the event is acked (``acked_at`` filled in).
 
-    Journal write failures are logged and swallowed — the bus continues
-    in degraded (no-persistence) mode rather than crashing.
+    Appends and acks never touch SQLite on the caller's thread: row ids
+    are assigned in memory and the write is queued for a writer thread,
+    which commits everything queued within ``flush_interval_s`` of the
+    first pending write (or ``max_batch`` writes) as one transaction. An
+    ack that reaches the writer with its row's insert is folded into it.
+    The database runs in WAL mode, and rows acked more than
+    ``acked_retention_s`` ago are pruned every ``prune_interval_s``.
+    Reads (``unacked_*``) flush pending writes first.
+
+    A batch whose transaction fails is put back in front of the pending
+    writes and retried, up to ``max_write_attempts`` consecutive attempts,
+    after which it is dropped and counted in ``dropped``. Failures are
+    logged and swallowed — the bus continues in degraded (no-persistence)
+    mode rather than crashing — and ``flush()`` reports ``False`` once any
+    write has been dropped.
     """
 
-    def __init__(self, path: str | Path) -> None:
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        flush_interval_s: float = JOURNAL_FLUSH_INTERVAL_S,
+        max_batch: int = JOURNAL_MAX_BATCH,
+        prune_interval_s: float = JOURNAL_PRUNE_INTERVAL_S,
+        acked_retention_s: float = JOURNAL_ACKED_RETENTION_S,
+        max_write_attempts: int = JOURNAL_MAX_WRITE_ATTEMPTS,
+    ) -> None:
         self._path = Path(path)
         self._conn: sqlite3.Connection | None = None
+        self._flush_interval_s = max(0.0, float(flush_interval_s))
+        self._max_batch = max(1, int(max_batch))
+        self._prune_interval_s = max(0.0, float(prune_interval_s))
+        self._acked_retention_s = max(0.0, float(acked_retention_s))
+        self._max_write_attempts = max(1, int(max_write_attempts))
+        # Guards the pending writes and counters; ``_db_lock`` serializes use of the connection.
+        self._cond = threading.Condition()
+        self._db_lock = threading.Lock()
+        self._next_ids: dict[str, int] = {}
+        self._inserts: dict[str, dict[int, list[Any]]] = {table: {} for table in _TABLES}
+        self._acks: dict[str, dict[int, str]] = {table: {} for table in _TABLES}
+        self._pending = 0
+        self._first_pending_at = 0.0
+        self._submitted = 0
+        self._committed = 0
+        self._write_attempts = 0
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._last_prune = 0.0
+        self.batches = 0
+        self.rows_written = 0
+        self.max_batch_rows = 0
+        self.acks_folded = 0
+        self.pruned = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_error = ""
 
     def open(self) -> None:
         self._path.parent.mkdir(parents=True, exist_ok=True)
         self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
         self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
         self._conn.executescript(_SCHEMA)
         self._conn.commit()
+        for table in _TABLES:
+            self._next_ids[table] = self._max_row_id(table) + 1
+        self._stopping = False
+        self._last_prune = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="clawlite-bus-journal", daemon=True)
+        self._thread.start()
         logger.info("BusJournal: opened %s", self._path)
 
+    def _max_row_id(self, table: str) -> int:
+        assert self._conn is not None
+        # AUTOINCREMENT keeps the highest id ever used, even after pruning.
+        row = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name=?", (table,)).fetchone()
+        top = self._conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()
+        return max(int(row[0]) if row else 0, int(top[0] or 0))
+
     def close(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
         if self._conn is not None:
             try:
                 self._conn.close()
@@ -76,53 +170,201 @@ class BusJournal:
             self._conn = None
 
     # ------------------------------------------------------------------
-    # Inbound
+    # Writer
     # ------------------------------------------------------------------
 
-    def append_inbound(self, event: InboundEvent) -> int | None:
-        if self._conn is None:
-            return None
+    def _enqueue_insert(self, table: str, values: list[Any]) -> int | None:
+        with self._cond:
+            if self._conn is None or self._thread is None:
+                return None
+            row_id = self._next_ids[table]
+            self._next_ids[table] = row_id + 1
+            self._inserts[table][row_id] = [row_id, *values, None]
+            self._note_pending()
+            return row_id
+
+    def _enqueue_ack(self, table: str, row_id: int) -> None:
+        with self._cond:
+            if self._conn is None or self._thread is None:
+                return
+            self._acks[table][int(row_id)] = _utc_now()
+            self._note_pending()
+
+    def _note_pending(self) -> None:
+        if not self._pending:
+            self._first_pending_at = time.monotonic()
+        self._pending += 1
+        self._submitted += 1
+        self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping or self._pending >= self._max_batch:
+                        break
+                    now = time.monotonic()
+                    if self._pending:
+                        wait = self._first_pending_at + self._flush_interval_s - now
+                    elif self._prune_interval_s:
+                        wait = self._last_prune + self._prune_interval_s - now
+                    else:
+                        wait = None
+                    if wait is not None and wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                inserts, acks, target = self._take_pending()
+                stopping = self._stopping
+            if target:
+                ok = self._write_batch(inserts, acks)
+                with self._cond:
+                    if ok:
+                        self._write_attempts = 0
+                    else:
+                        self._write_attempts += 1
+                        if self._write_attempts < self._max_write_attempts:
+                            self._requeue(inserts, acks)
+                            continue
+                        self._write_attempts = 0
+                        self.dropped += sum(len(inserts[table]) + len(acks[table]) for table in _TABLES)
+                        logger.error("BusJournal: dropping batch after %d failed attempts", self._max_write_attempts)
+                    self._committed = max(self._committed, target)
+                    self._cond.notify_all()
+            if self._prune_interval_s and time.monotonic() - self._last_prune >= self._prune_interval_s:
+                self.prune_acked()
+            if stopping and not target:
+                return
+
+    def _take_pending(self) -> tuple[dict[str, dict[int, list[Any]]], dict[str, dict[int, str]], int]:
+        inserts, acks = self._inserts, self._acks
+        self._inserts = {table: {} for table in _TABLES}
+        self._acks = {table: {} for table in _TABLES}
+        self._pending = 0
+        return inserts, acks, self._submitted if any(inserts.values()) or any(acks.values()) else 0
+
+    def _requeue(self, inserts: dict[str, dict[int, list[Any]]], acks: dict[str, dict[int, str]]) -> None:
+        # The failed batch goes back ahead of anything queued since; newer acks win.
+        for table in _TABLES:
+            self._inserts[table] = {**inserts[table], **self._inserts[table]}
+            self._acks[table] = {**acks[table], **self._acks[table]}
+            self._pending += len(inserts[table]) + len(acks[table])
+        self._first_pending_at = time.monotonic()
+
+    def _write_batch(self, inserts: dict[str, dict[int, list[Any]]], acks: dict[str, dict[int, str]]) -> bool:
+        rows = 0
+        for table in _TABLES:
+            table_inserts = inserts[table]
+            for row_id in [row_id for row_id in acks[table] if row_id in table_inserts]:
+                table_inserts[row_id][-1] = acks[table].pop(row_id)
+                self.acks_folded += 1
+            rows += len(table_inserts) + len(acks[table])
         try:
-            cur = self._conn.execute(
-                """INSERT INTO bus_inbound
-                   (correlation_id, channel, session_id, user_id, text,
-                    metadata, created_at)
-                   VALUES (?,?,?,?,?,?,?)""",
-                (
-                    event.correlation_id,
-                    event.channel,
-                    event.session_id,
-                    event.user_id,
-                    event.text,
-                    json.dumps(event.metadata),
-                    event.created_at,
-                ),
-            )
-            self._conn.commit()
-            return cur.lastrowid
+            with self._db_lock:
+                assert self._conn is not None
+                with self._conn:
+                    for table in _TABLES:
+                        if inserts[table]:
+                            self._conn.executemany(_INSERT_SQL[table], list(inserts[table].values()))
+                        if acks[table]:
+                            self._conn.executemany(
+                                f"UPDATE {table} SET acked_at=? WHERE id=?",
+                                [(acked_at, row_id) for row_id, acked_at in acks[table].items()],
+                            )
         except Exception as exc:
-            logger.error("BusJournal.append_inbound failed: %s", exc)
-            return None
+            self.failures += 1
+            self.last_error = str(exc)
+            logger.error("BusJournal: batch write failed: %s", exc)
+            return False
+        self.batches += 1
+        self.rows_written += rows
+        self.max_batch_rows = max(self.max_batch_rows, rows)
+        return True
 
-    def ack_inbound(self, row_id: int) -> None:
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every write queued so far is settled.
+
+        Returns ``False`` on timeout, or when any write has been dropped
+        after exhausting its attempts.
+        """
+        with self._cond:
+            target = self._submitted
+            if self._thread is None or threading.current_thread() is self._thread:
+                return self._committed >= target and not self.dropped
+            self._first_pending_at = 0.0
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._committed >= target, timeout) and not self.dropped
+
+    def prune_acked(self, *, now: datetime | None = None) -> int:
+        """Delete rows acked more than ``acked_retention_s`` ago; returns how many."""
+        self._last_prune = time.monotonic()
         if self._conn is None:
-            return
+            return 0
+        cutoff = ((now or datetime.now(timezone.utc)) - timedelta(seconds=self._acked_retention_s)).isoformat()
+        removed = 0
         try:
-            self._conn.execute(
-                "UPDATE bus_inbound SET acked_at=? WHERE id=?",
-                (_utc_now(), row_id),
-            )
-            self._conn.commit()
+            with self._db_lock:
+                with self._conn:
+                    for table in _TABLES:
+                        cur = self._conn.execute(
+                            f"DELETE FROM {table} WHERE acked_at IS NOT NULL AND acked_at < ?",
+                            (cutoff,),
+                        )
+                        removed += max(0, cur.rowcount)
         except Exception as exc:
-            logger.error("BusJournal.ack_inbound failed: %s", exc)
+            self.failures += 1
+            self.last_error = str(exc)
+            logger.error("BusJournal.prune_acked failed: %s", exc)
+            return 0
+        self.pruned += removed
+        return removed
+
+    def snapshot(self) -> dict[str, int | str]:
+        with self._cond:
+            pending = self._pending
+        return {
+            "pending": pending,
+            "batches": self.batches,
+            "rows_written": self.rows_written,
+            "max_batch_rows": self.max_batch_rows,
+            "acks_folded": self.acks_folded,
+            "pruned": self.pruned,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_error": self.last_error,
+        }
+
+    def _select_unacked(self, table: str) -> list[sqlite3.Row]:
+        self.flush()
+        with self._db_lock:
+            assert self._conn is not None
+            return self._conn.execute(f"SELECT * FROM {table} WHERE acked_at IS NULL ORDER BY id ASC").fetchall()
+
+    # ------------------------------------------------------------------
+    # Inbound
+    # ------------------------------------------------------------------
+
+    def append_inbound(self, event: InboundEvent) -> int | None:
+        return self._enqueue_insert(
+            "bus_inbound",
+            [
+                event.correlation_id,
+                event.channel,
+                event.session_id,
+                event.user_id,
+                event.text,
+                json.dumps(event.metadata),
+                event.created_at,
+            ],
+        )
+
+    def ack_inbound(self, row_id: int) -> None:
+        self._enqueue_ack("bus_inbound", row_id)
 
     def unacked_inbound(self) -> list[tuple[int, InboundEvent]]:
         if self._conn is None:
             return []
         try:
-            rows = self._conn.execute(
-                "SELECT * FROM bus_inbound WHERE acked_at IS NULL ORDER BY id ASC"
-            ).fetchall()
+            rows = self._select_unacked("bus_inbound")
             return [(row["id"], _row_to_inbound(row)) for row in rows]
         except Exception as exc:
             logger.error("BusJournal.unacked_inbound failed: %s", exc)
@@ -133,56 +375,33 @@ class BusJournal:
     # ------------------------------------------------------------------
 
     def append_outbound(self, event: OutboundEvent) -> int | None:
-        if self._conn is None:
-            return None
-        try:
-            cur = self._conn.execute(
-                """INSERT INTO bus_outbound
-                   (correlation_id, channel, session_id, target, text,
-                    metadata, attempt, max_attempts, retryable,
-                    dead_lettered, dead_letter_reason, last_error, created_at)
-                   VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                (
-                    event.correlation_id,
-                    event.channel,
-                    event.session_id,
-                    event.target,
-                    event.text,
-                    json.dumps(event.metadata),
-                    event.attempt,
-                    event.max_attempts,
-                    int(event.retryable),
-                    int(event.dead_lettered),
-                    event.dead_letter_reason,
-                    event.last_error,
-                    event.created_at,
-                ),
-            )
-            self._conn.commit()
-            return cur.lastrowid
-        except Exception as exc:
-            logger.error("BusJournal.append_outbound failed: %s", exc)
-            return None
+        return self._enqueue_insert(
+            "bus_outbound",
+            [
+                event.correlation_id,
+                event.channel,
+                event.session_id,
+                event.target,
+                event.text,
+                json.dumps(event.metadata),
+                event.attempt,
+                event.max_attempts,
+                int(event.retryable),
+                int(event.dead_lettered),
+                event.dead_letter_reason,
+                event.last_error,
+                event.created_at,
+            ],
+        )
 
     def ack_outbound(self, row_id: int) -> None:
-        if self._conn is None:
-            return
-        try:
-            self._conn.execute(
-                "UPDATE bus_outbound SET acked_at=? WHERE id=?",
-                (_utc_now(), row_id),
-            )
-            self._conn.commit()
-        except Exception as exc:
-            logger.error("BusJournal.ack_outbound failed: %s", exc)
+        self._enqueue_ack("bus_outbound", row_id)
 
     def unacked_outbound(self) -> list[tuple[int, OutboundEvent]]:
         if self._conn is None:
             return []
         try:
-            rows = self._conn.execute(
-                "SELECT * FROM bus_outbound WHERE acked_at IS NULL ORDER BY id ASC"
-            ).fetchall()
+            rows = self._select_unacked("bus_outbound")
             return [(row["id"], _row_to_outbound(row)) for row in rows]
         except Exception as exc:
             logger.error("BusJournal.unacked_outbound failed: %s", exc)
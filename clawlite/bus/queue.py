@@ -179,7 +179,8 @@ class MessageQueue:
         if self._journal is not None:
             close_fn = getattr(self._journal, "close", None)
             if callable(close_fn):
-                close_fn()
+                # Closing flushes the journal's pending writes; keep that off the loop.
+                await asyncio.to_thread(close_fn)
 
     async def publish_dead_letter(self, event: OutboundEvent) -> None:
         await self._enqueue_dead_letter(event)
@@ -435,6 +436,9 @@ class MessageQueue:
             "topics": sum(len(v) for v in self._topics.values()),
             "stop_sessions": len(self._stop_events),
         }
+        journal_snapshot = getattr(self._journal, "snapshot", None)
+        if callable(journal_snapshot):
+            out["journal"] = journal_snapshot()
         outbound_oldest_age_s = self._oldest_age_seconds(list(self._outbound_created_at))
         if outbound_oldest_age_s is not None:
             out["outbound_oldest_age_s"] = outbound_oldest_age_s
@@ -24,9 +24,12 @@ from clawlite.cli.ops import memory_eval_snapshot
 from clawlite.cli.ops import memory_branch_checkout
 from clawlite.cli.ops import memory_branch_create
 from clawlite.cli.ops import memory_branches_snapshot
+from clawlite.cli.ops import memory_compact_history
+from clawlite.cli.ops import sessions_migrate_sqlite
 from clawlite.cli.ops import memory_export_snapshot
 from clawlite.cli.ops import memory_import_snapshot
 from clawlite.cli.ops import memory_merge_branches
+from clawlite.cli.ops import memory_migrate_embeddings
 from clawlite.cli.ops import memory_overview_snapshot
 from clawlite.cli.ops import memory_quality_snapshot
 from clawlite.cli.ops import memory_privacy_snapshot
@@ -35,6 +38,7 @@ from clawlite.cli.ops import memory_shared_opt_in
 from clawlite.cli.ops import memory_snapshot_create
 from clawlite.cli.ops import memory_snapshot_rollback
 from clawlite.cli.ops import memory_suggest_snapshot
+from clawlite.cli.ops import memory_vector_index_snapshot
 from clawlite.cli.ops import memory_version_snapshot
 from clawlite.cli.ops import memory_doctor_snapshot
 from clawlite.cli.ops import onboarding_validation
@@ -1949,16 +1953,32 @@ def cmd_memory_privacy(args: argparse.Namespace) -> int:
     return 0 if payload.get("ok", False) else 2
 
 
+def _print_memory_stream_progress(event: dict[str, Any]) -> None:
+    if event.get("done"):
+        return
+    _print_stderr(f"memory {event.get('phase', 'stream')}: {int(event.get('history', 0) or 0)} history records")
+
+
 def cmd_memory_export(args: argparse.Namespace) -> int:
     cfg = load_config(args.config)
-    payload = memory_export_snapshot(cfg, out_path=str(args.out or ""))
+    payload = memory_export_snapshot(
+        cfg,
+        out_path=str(args.out or ""),
+        fmt=str(getattr(args, "format", "json") or "json"),
+        progress=_print_memory_stream_progress,
+    )
     _print_json(payload)
     return 0 if payload.get("ok", False) else 2
 
 
 def cmd_memory_import(args: argparse.Namespace) -> int:
     cfg = load_config(args.config)
-    payload = memory_import_snapshot(cfg, file_path=str(args.file or ""))
+    payload = memory_import_snapshot(
+        cfg,
+        file_path=str(args.file or ""),
+        resume=not bool(getattr(args, "no_resume", False)),
+        progress=_print_memory_stream_progress,
+    )
     _print_json(payload)
     return 0 if payload.get("ok", False) else 2
 
@@ -2012,6 +2032,38 @@ def cmd_memory_share_optin(args: argparse.Namespace) -> int:
     return 0 if payload.get("ok", False) else 2
 
 
+def cmd_memory_vector_index(args: argparse.Namespace) -> int:
+    cfg = load_config(args.config)
+    payload = memory_vector_index_snapshot(
+        cfg,
+        rebuild=bool(args.rebuild),
+        nlist=int(args.lists) if args.lists else None,
+    )
+    _print_json(payload)
+    return 0 if payload.get("ok", False) else 2
+
+
+def cmd_memory_migrate_embeddings(args: argparse.Namespace) -> int:
+    cfg = load_config(args.config)
+    payload = memory_migrate_embeddings(cfg, embedding_format=str(args.format or ""))
+    _print_json(payload)
+    return 0 if payload.get("ok", False) else 2
+
+
+def cmd_memory_compact(args: argparse.Namespace) -> int:
+    cfg = load_config(args.config)
+    payload = memory_compact_history(cfg)
+    _print_json(payload)
+    return 0 if payload.get("ok", False) else 2
+
+
+def cmd_sessions_migrate(args: argparse.Namespace) -> int:
+    cfg = load_config(args.config)
+    payload = sessions_migrate_sqlite(cfg)
+    _print_json(payload)
+    return 0 if payload.get("ok", False) else 2
+
+
 def cmd_cron_add(args: argparse.Namespace) -> int:
     cfg = load_config(args.config)
     runtime = _build_runtime_for_args(args, cfg)
@@ -3089,10 +3141,22 @@ def build_parser() -> argparse.ArgumentParser:
 
     p_memory_export = memory_sub.add_parser("export", help="Export memory snapshot payload")
     p_memory_export.add_argument("--out", default="", help="Write export payload to file path")
+    p_memory_export.add_argument(
+        "--format",
+        choices=["json", "ndjson"],
+        default="json",
+        help="json: one document; ndjson: streamed record per line (gzip'd when --out ends in .gz)",
+    )
     p_memory_export.set_defaults(handler=cmd_memory_export)
 
-    p_memory_import = memory_sub.add_parser("import", help="Import memory payload from file path")
+    p_memory_import = memory_sub.add_parser("import", help="Import memory payload from file path (json or ndjson export)")
     p_memory_import.add_argument("file")
+    p_memory_import.add_argument(
+        "--no-resume",
+        action="store_true",
+        dest="no_resume",
+        help="Restart an interrupted ndjson import from the beginning",
+    )
     p_memory_import.set_defaults(handler=cmd_memory_import)
 
     p_memory_branches = memory_sub.add_parser("branches", help="Show memory branch metadata")
@@ -3119,6 +3183,34 @@ def build_parser() -> argparse.ArgumentParser:
     p_memory_share_optin.add_argument("--enabled", type=_parse_bool_flag, required=True)
     p_memory_share_optin.set_defaults(handler=cmd_memory_share_optin)
 
+    p_memory_vector_index = memory_sub.add_parser("vector-index", help="Show or rebuild the approximate vector index")
+    p_memory_vector_index.add_argument("--rebuild", action="store_true", help="Retrain index centroids from all stored embeddings")
+    p_memory_vector_index.add_argument("--lists", type=int, default=0, help="Inverted list count for --rebuild (0 = automatic)")
+    p_memory_vector_index.set_defaults(handler=cmd_memory_vector_index)
+
+    p_memory_migrate_embeddings = memory_sub.add_parser(
+        "migrate-embeddings",
+        help="Rewrite stored embeddings in the binary storage format",
+    )
+    p_memory_migrate_embeddings.add_argument(
+        "--format",
+        choices=["float32", "float16", "int8", "json"],
+        default="",
+        help="Target format (defaults to agents.defaults.memory.embedding_format)",
+    )
+    p_memory_migrate_embeddings.set_defaults(handler=cmd_memory_migrate_embeddings)
+
+    p_memory_compact = memory_sub.add_parser("compact", help="Reclaim tombstoned space in the history logs")
+    p_memory_compact.set_defaults(handler=cmd_memory_compact)
+
+    p_sessions = sub.add_parser("sessions", help="Session log maintenance")
+    sessions_sub = p_sessions.add_subparsers(dest="sessions_command", required=True)
+    p_sessions_migrate = sessions_sub.add_parser(
+        "migrate",
+        help="Import JSONL session logs into the SQLite session database",
+    )
+    p_sessions_migrate.set_defaults(handler=cmd_sessions_migrate)
+
     p_cron = sub.add_parser("cron", help="Manage scheduled jobs")
     cron_sub = p_cron.add_subparsers(dest="cron_command", required=True)
 
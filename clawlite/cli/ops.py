@@ -6,7 +6,7 @@ import asyncio
 import tempfile
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable
 
 import httpx
 
@@ -15,6 +15,8 @@ from clawlite.config.loader import save_config
 from clawlite.config.schema import AppConfig
 from clawlite.core.memory import MemoryStore
 from clawlite.core.memory_monitor import MemoryMonitor
+from clawlite.core.memory_stream import is_memory_stream
+from clawlite.core.memory_versions import list_memory_versions, version_path_for
 from clawlite.providers.catalog import default_provider_model, provider_profile
 from clawlite.providers.codex import CODEX_DEFAULT_BASE_URL
 from clawlite.providers.codex_auth import load_codex_auth_file
@@ -30,6 +32,7 @@ from clawlite.providers.probe_cache import save_provider_probe_snapshot
 from clawlite.providers.qwen_auth import load_qwen_auth_file
 from clawlite.providers.registry import SPECS, _configured_provider_hint, detect_provider_name
 from clawlite.providers.reliability import classify_provider_error
+from clawlite.session.sqlite_store import SQLiteSessionStore, migrate_jsonl_sessions
 from clawlite.workspace.loader import TEMPLATE_FILES
 from clawlite.workspace.loader import WorkspaceLoader
 
@@ -3257,10 +3260,7 @@ def memory_overview_snapshot(config: AppConfig) -> dict[str, Any]:
 def memory_version_snapshot(config: AppConfig) -> dict[str, Any]:
     try:
         store = _build_memory_store(config)
-        version_ids = sorted(
-            [path.stem.replace(".json", "") for path in store.versions_path.glob("*.json.gz") if path.is_file()],
-            reverse=True,
-        )
+        version_ids = list_memory_versions(store.versions_path)
         return {
             "ok": True,
             "count": len(version_ids),
@@ -3392,6 +3392,12 @@ def _build_memory_store(config: AppConfig) -> MemoryStore:
         memory_auto_categorize=auto_categorize,
         memory_backend_name=str(config.agents.defaults.memory.backend or "sqlite"),
         memory_backend_url=str(config.agents.defaults.memory.pgvector_url or ""),
+        memory_ann_probes=int(config.agents.defaults.memory.ann_probes),
+        memory_embedding_format=str(config.agents.defaults.memory.embedding_format or "float32"),
+        memory_embedding_batch_size=int(config.agents.defaults.memory.embedding_batch_size),
+        memory_embedding_concurrency=int(config.agents.defaults.memory.embedding_concurrency),
+        memory_search_candidates=int(config.agents.defaults.memory.search_candidates),
+        memory_search_cache_size=int(config.agents.defaults.memory.search_cache_size),
     )
 
 
@@ -3412,6 +3418,71 @@ def memory_profile_snapshot(config: AppConfig) -> dict[str, Any]:
         }
 
 
+def memory_vector_index_snapshot(config: AppConfig, rebuild: bool = False, nlist: int | None = None) -> dict[str, Any]:
+    try:
+        store = _build_memory_store(config)
+        payload = store.vector_index_status(rebuild=rebuild, nlist=nlist)
+        if not payload.get("supported", False):
+            return {
+                "ok": False,
+                "error": {
+                    "type": "UnsupportedBackend",
+                    "message": f"memory backend '{payload.get('backend', '')}' does not maintain a local vector index",
+                },
+            }
+        return payload
+    except Exception as exc:
+        return {
+            "ok": False,
+            "error": {"type": exc.__class__.__name__, "message": str(exc)},
+        }
+
+
+def memory_migrate_embeddings(config: AppConfig, embedding_format: str = "") -> dict[str, Any]:
+    try:
+        store = _build_memory_store(config)
+        return store.migrate_embedding_storage(embedding_format=embedding_format or None)
+    except Exception as exc:
+        return {
+            "ok": False,
+            "error": {"type": exc.__class__.__name__, "message": str(exc)},
+        }
+
+
+def memory_compact_history(config: AppConfig) -> dict[str, Any]:
+    try:
+        store = _build_memory_store(config)
+        return store.compact_history()
+    except Exception as exc:
+        return {
+            "ok": False,
+            "error": {"type": exc.__class__.__name__, "message": str(exc)},
+        }
+
+
+def sessions_migrate_sqlite(config: AppConfig) -> dict[str, Any]:
+    store: SQLiteSessionStore | None = None
+    try:
+        root = Path(config.state_path).expanduser() / "sessions"
+        store = SQLiteSessionStore(
+            root=root,
+            max_messages_per_session=config.agents.defaults.session_retention_messages,
+            session_retention_ttl_s=config.agents.defaults.session_retention_ttl_s,
+            durability=config.agents.defaults.session_durability,
+        )
+        payload = migrate_jsonl_sessions(root, store)
+        payload["session_backend"] = config.agents.defaults.session_backend
+        return payload
+    except Exception as exc:
+        return {
+            "ok": False,
+            "error": {"type": exc.__class__.__name__, "message": str(exc)},
+        }
+    finally:
+        if store is not None:
+            store.close()
+
+
 def memory_suggest_snapshot(config: AppConfig, refresh: bool = True) -> dict[str, Any]:
     try:
         store = _build_memory_store(config)
@@ -3447,7 +3518,7 @@ def memory_snapshot_create(config: AppConfig, tag: str = "") -> dict[str, Any]:
     try:
         store = _build_memory_store(config)
         version_id = store.snapshot(tag=tag)
-        version_path = store.versions_path / f"{version_id}.json.gz"
+        version_path = version_path_for(store.versions_path, version_id)
         return {
             "ok": True,
             "version_id": version_id,
@@ -3501,11 +3572,30 @@ def memory_privacy_snapshot(config: AppConfig) -> dict[str, Any]:
         }
 
 
-def memory_export_snapshot(config: AppConfig, out_path: str = "") -> dict[str, Any]:
+def memory_export_snapshot(
+    config: AppConfig,
+    out_path: str = "",
+    *,
+    fmt: str = "json",
+    progress: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
     try:
         store = _build_memory_store(config)
-        payload = store.export_payload()
         output_path = str(out_path or "").strip()
+        if str(fmt or "json").strip().lower() == "ndjson":
+            if not output_path:
+                return {"ok": False, "error": {"type": "ValueError", "message": "out_path_required_for_ndjson"}}
+            target = Path(output_path).expanduser()
+            result = store.export_stream(target, progress=progress)
+            return {
+                "ok": True,
+                "out_path": str(target),
+                "written": True,
+                "format": "ndjson",
+                "version": result.get("version"),
+                "counts": result.get("counts", {}),
+            }
+        payload = store.export_payload()
         if output_path:
             target = Path(output_path).expanduser()
             target.parent.mkdir(parents=True, exist_ok=True)
@@ -3532,7 +3622,13 @@ def memory_export_snapshot(config: AppConfig, out_path: str = "") -> dict[str, A
         }
 
 
-def memory_import_snapshot(config: AppConfig, file_path: str) -> dict[str, Any]:
+def memory_import_snapshot(
+    config: AppConfig,
+    file_path: str,
+    *,
+    resume: bool = True,
+    progress: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
     source_path = Path(str(file_path or "").strip()).expanduser()
     if not str(file_path or "").strip():
         return {"ok": False, "error": {"type": "ValueError", "message": "file_path_required"}}
@@ -3542,9 +3638,20 @@ def memory_import_snapshot(config: AppConfig, file_path: str) -> dict[str, Any]:
             "error": {"type": "FileNotFoundError", "message": str(source_path)},
         }
     try:
+        store = _build_memory_store(config)
+        if is_memory_stream(source_path):
+            result = store.import_stream(source_path, resume=resume, progress=progress)
+            return {
+                "ok": True,
+                "file_path": str(source_path),
+                "imported": True,
+                "format": "ndjson",
+                "counts": result.get("counts", {}),
+                "resumed_from": result.get("resumed_from", 0),
+                "skipped": result.get("skipped", 0),
+            }
         raw = json.loads(source_path.read_text(encoding="utf-8"))
         payload = raw if isinstance(raw, dict) else {}
-        store = _build_memory_store(config)
         before = len(store.all()) + len(store.curated())
         store.import_payload(payload)
         after = len(store.all()) + len(store.curated())
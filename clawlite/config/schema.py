@@ -673,6 +673,14 @@ class AgentMemoryConfig(Base):
     emotional_tracking: bool = False
     backend: str = "sqlite"
     pgvector_url: str = ""
+    ann_probes: int = 8
+    embedding_format: str = "float32"
+    embedding_batch_size: int = 64
+    embedding_concurrency: int = 4
+    search_candidates: int = 200
+    search_cache_size: int = 512
+    consolidation_workers: int = 2
+    consolidation_max_pending: int = 256
 
     @field_validator("backend", mode="before")
     @classmethod
@@ -698,6 +706,56 @@ class AgentMemoryConfig(Base):
         v = v if v not in (None, "") else 3
         return max(1, int(v))
 
+    @field_validator("ann_probes", mode="before")
+    @classmethod
+    def _min_ann_probes(cls, v: Any) -> int:
+        v = v if v not in (None, "") else 8
+        return max(0, int(v))
+
+    @field_validator("embedding_batch_size", mode="before")
+    @classmethod
+    def _min_embedding_batch_size(cls, v: Any) -> int:
+        v = v if v not in (None, "") else 64
+        return max(1, int(v))
+
+    @field_validator("embedding_concurrency", mode="before")
+    @classmethod
+    def _min_embedding_concurrency(cls, v: Any) -> int:
+        v = v if v not in (None, "") else 4
+        return max(1, int(v))
+
+    @field_validator("search_candidates", mode="before")
+    @classmethod
+    def _bounded_search_candidates(cls, v: Any) -> int:
+        v = v if v not in (None, "") else 200
+        return max(0, min(1000, int(v)))
+
+    @field_validator("search_cache_size", mode="before")
+    @classmethod
+    def _min_search_cache_size(cls, v: Any) -> int:
+        v = v if v not in (None, "") else 512
+        return max(0, int(v))
+
+    @field_validator("consolidation_workers", mode="before")
+    @classmethod
+    def _min_consolidation_workers(cls, v: Any) -> int:
+        v = v if v not in (None, "") else 2
+        return max(1, int(v))
+
+    @field_validator("consolidation_max_pending", mode="before")
+    @classmethod
+    def _min_consolidation_max_pending(cls, v: Any) -> int:
+        v = v if v not in (None, "") else 256
+        return max(1, int(v))
+
+    @field_validator("embedding_format", mode="before")
+    @classmethod
+    def _normalize_embedding_format(cls, v: Any) -> str:
+        v = str(v or "float32").strip().lower()
+        if v in {"float32", "float16", "int8", "json"}:
+            return v
+        return "float32"
+
 
 class AgentDefaultsConfig(Base):
     model: str = "gemini/gemini-2.5-flash"
@@ -709,6 +767,9 @@ class AgentDefaultsConfig(Base):
     memory_window: int = 100
     session_retention_messages: int | None = 2000
     session_retention_ttl_s: int | None = None
+    session_backend: str = "jsonl"
+    session_durability: str = "group"
+    session_commit_window_s: float = 0.005
     reasoning_effort: str | None = None
     semantic_history_summary_enabled: bool = False
     tool_result_compaction_enabled: bool = False
@@ -729,6 +790,12 @@ class AgentDefaultsConfig(Base):
             data["session_retention_messages"] = data["sessionRetentionMessages"]
         if "sessionRetentionTtlS" in data and "session_retention_ttl_s" not in data:
             data["session_retention_ttl_s"] = data["sessionRetentionTtlS"]
+        if "sessionBackend" in data and "session_backend" not in data:
+            data["session_backend"] = data["sessionBackend"]
+        if "sessionDurability" in data and "session_durability" not in data:
+            data["session_durability"] = data["sessionDurability"]
+        if "sessionCommitWindowS" in data and "session_commit_window_s" not in data:
+            data["session_commit_window_s"] = data["sessionCommitWindowS"]
         # Propagate legacy top-level memory flags into the memory sub-config
         legacy_semantic = bool(data.get("semantic_memory", data.get("semanticMemory", False)))
         legacy_auto_cat = bool(data.get("memory_auto_categorize", data.get("memoryAutoCategorize", False)))
@@ -807,6 +874,28 @@ class AgentDefaultsConfig(Base):
             return None
         return max(1, int(v))
 
+    @field_validator("session_backend", mode="before")
+    @classmethod
+    def _session_backend(cls, v: Any) -> str:
+        v = str(v or "jsonl").strip().lower()
+        if v in {"jsonl", "sqlite"}:
+            return v
+        return "jsonl"
+
+    @field_validator("session_durability", mode="before")
+    @classmethod
+    def _session_durability(cls, v: Any) -> str:
+        v = str(v or "group").strip().lower()
+        if v in {"fsync", "group", "buffered"}:
+            return v
+        return "group"
+
+    @field_validator("session_commit_window_s", mode="before")
+    @classmethod
+    def _session_commit_window(cls, v: Any) -> float:
+        v = v if v not in (None, "") else 0.005
+        return min(1.0, max(0.0, float(v)))
+
     @field_validator("reasoning_effort", mode="before")
     @classmethod
     def _reasoning_effort(cls, v: Any) -> str | None:
@@ -14,6 +14,9 @@ from typing import Any, AsyncGenerator, Awaitable, Callable
 
 from clawlite.core.context_window import ContextWindowManager
 from clawlite.core.memory import MemoryRecord, MemoryStore
+from clawlite.core.memory_consolidation_queue import CONSOLIDATION_MAX_PENDING
+from clawlite.core.memory_consolidation_queue import CONSOLIDATION_WORKERS
+from clawlite.core.memory_consolidation_queue import ConsolidationQueue
 from clawlite.core.prompt import PromptBuilder
 from clawlite.core.skills import SkillsLoader
 from clawlite.core.subagent import SubagentManager
@@ -548,6 +551,8 @@ class AgentEngine:
         reasoning_effort_default: str | None = None,
         loop_detection: LoopDetectionSettings | None = None,
         bus: Any | None = None,
+        consolidation_workers: int = CONSOLIDATION_WORKERS,
+        consolidation_max_pending: int = CONSOLIDATION_MAX_PENDING,
     ) -> None:
         self._bus = bus
         self.provider = provider
@@ -595,6 +600,11 @@ class AgentEngine:
         self._session_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
         self._session_locks_guard = asyncio.Lock()
         self._turn_persistence_tasks: dict[str, asyncio.Task[None]] = {}
+        self._consolidation_queue = ConsolidationQueue(
+            self._run_queued_consolidation,
+            workers=consolidation_workers,
+            max_pending=consolidation_max_pending,
+        )
         self._callable_parameter_specs: dict[tuple[int, int], _CallableParameterSpec | None] = {}
         self._retrieval_route_counts: dict[str, int] = {
             self._MEMORY_ROUTE_NO_RETRIEVE: 0,
@@ -685,6 +695,16 @@ class AgentEngine:
             },
             "last_route": str(self._retrieval_last_route),
             "last_query": str(self._retrieval_last_query),
+            "search_cache": self._memory_search_cache_snapshot(),
+        }
+
+    def _memory_search_cache_snapshot(self) -> dict[str, int]:
+        snapshot_fn = getattr(self.memory, "search_cache_snapshot", None)
+        raw = snapshot_fn() if callable(snapshot_fn) else {}
+        raw = raw if isinstance(raw, dict) else {}
+        return {
+            name: int(raw.get(name, 0) or 0)
+            for name in ("hits", "misses", "stale", "entries", "hit_rate_pct")
         }
 
     def _record_turn_latency(self, elapsed_ms: float) -> None:
@@ -731,6 +751,7 @@ class AgentEngine:
             },
             "last_outcome": str(self._turn_last_outcome),
             "last_model": str(self._turn_last_model),
+            "consolidation": self._consolidation_queue.snapshot(),
         }
 
     async def _complete_provider(
@@ -1542,26 +1563,34 @@ class AgentEngine:
         except TypeError:
             return search_fn(query, limit=limit)
 
-    def _memory_integration_policy(self, *, actor: str, session_id: str = "") -> dict[str, Any]:
-        policy_fn = getattr(self.memory, "integration_policy", None)
-        if not callable(policy_fn):
-            return {}
-        try:
-            payload = policy_fn(actor, session_id=session_id)
-        except TypeError:
-            try:
-                payload = policy_fn(actor)
-            except Exception:
-                return {}
-        except Exception:
-            return {}
-        if inspect.isawaitable(payload):
-            return {}
-        if isinstance(payload, dict):
-            return payload
-        if isinstance(payload, bool):
-            return {"allow_memory_write": payload}
-        return {}
+    async def _memory_search_async(
+        self,
+        *,
+        query: str,
+        limit: int,
+        user_id: str,
+        session_id: str,
+        include_shared: bool,
+        stop_event: asyncio.Event | None = None,
+    ) -> list[MemoryRecord]:
+        search_fn = getattr(self.memory, "search_async", None)
+        if not inspect.iscoroutinefunction(search_fn):
+            return await asyncio.to_thread(
+                self._memory_search,
+                query=query,
+                limit=limit,
+                user_id=user_id,
+                session_id=session_id,
+                include_shared=include_shared,
+            )
+        return await search_fn(
+            query,
+            limit=limit,
+            user_id=user_id,
+            session_id=session_id,
+            include_shared=include_shared,
+            stop_event=stop_event,
+        )
 
     async def _memory_integration_policy_async(self, *, actor: str, session_id: str = "") -> dict[str, Any]:
         policy_fn = getattr(self.memory, "integration_policy", None)
@@ -1681,6 +1710,7 @@ class AgentEngine:
         runtime_metadata: dict[str, Any] | None = None,
         run_log: Any,
         include_tool_guidance: bool = True,
+        stop_event: asyncio.Event | None = None,
     ) -> _PreparedTurnPrompt:
         runtime_channel, runtime_chat_id = self._resolve_runtime_context(session_id, channel, chat_id)
         await self._await_turn_persistence(session_id)
@@ -1694,12 +1724,13 @@ class AgentEngine:
                 proactive_snippets = _proactive.warm(user_text, session_id=session_id)
             except Exception:
                 pass
-        memories = self._plan_memory_snippets(
+        memories = await self._plan_memory_snippets_async(
             session_id=session_id,
             user_id=runtime_chat_id,
             user_text=user_text,
             run_log=run_log,
             policy=memory_policy,
+            stop_event=stop_event,
         )
         if proactive_snippets:
             seen: set[str] = set(memories)
@@ -1815,7 +1846,57 @@ class AgentEngine:
                 return ""
         return str(value or "").strip()
 
-    def _plan_memory_snippets(
+    def _memory_recovery_snippets(self, *, session_id: str, run_log: Any) -> list[str]:
+        recovery_snippets: list[str] = []
+        working_set_fn = getattr(self.memory, "get_working_set", None)
+        if callable(working_set_fn):
+            try:
+                working_rows = working_set_fn(
+                    session_id,
+                    limit=4,
+                    include_shared_subagents=True,
+                )
+                if inspect.isawaitable(working_rows):
+                    working_rows = []
+                if isinstance(working_rows, list):
+                    for item in working_rows:
+                        if isinstance(item, dict):
+                            clean = str(item.get("content", item.get("text", "")) or "").strip()
+                            source_session = str(item.get("session_id", session_id) or session_id).strip() or session_id
+                        else:
+                            clean = str(item or "").strip()
+                            source_session = session_id
+                        if clean:
+                            recovery_snippets.append(
+                                self._format_session_recovery_snippet(session_id=source_session, text=clean)
+                            )
+            except Exception as exc:
+                run_log.warning(
+                    "memory planner working-set recovery failed session={} error={}",
+                    session_id or "-",
+                    exc,
+                )
+
+        if not recovery_snippets:
+            recover_fn = getattr(self.memory, "recover_session_context", None)
+            if callable(recover_fn):
+                try:
+                    recovered = recover_fn(session_id, limit=4)
+                    for snippet in recovered:
+                        clean = str(snippet or "").strip()
+                        if clean:
+                            recovery_snippets.append(
+                                self._format_session_recovery_snippet(session_id=session_id, text=clean)
+                            )
+                except Exception as exc:
+                    run_log.warning(
+                        "memory planner session recovery failed session={} error={}",
+                        session_id or "-",
+                        exc,
+                    )
+        return recovery_snippets
+
+    async def _plan_memory_snippets_async(
         self,
         *,
         session_id: str = "",
@@ -1823,95 +1904,108 @@ class AgentEngine:
         user_text: str,
         run_log: Any,
         policy: dict[str, Any] | None = None,
+        stop_event: asyncio.Event | None = None,
     ) -> list[str]:
+        """Plan the memory snippets for a turn while keeping ranking off the event loop.
+
+        Every probe runs on the memory worker pool. Once the first pass comes
+        back insufficient, the follow-up probe (rewritten or expanded) and the
+        subagent-digest probe for the same query are issued together; the
+        digest result is dropped, and not counted as an attempt, when the
+        follow-up alone turns out sufficient. Planning stops with no snippets
+        as soon as the turn is asked to stop.
+        """
         route = self._MEMORY_ROUTE_NO_RETRIEVE
         selected_query = ""
         attempts = 0
         hits = 0
         rewrites = 0
-        effective_policy = dict(policy or {}) if isinstance(policy, dict) else self._memory_integration_policy(
+        effective_policy = dict(policy or {}) if isinstance(policy, dict) else await self._memory_integration_policy_async(
             actor="agent",
             session_id=session_id,
         )
         search_limit = self._clamp_memory_search_limit(effective_policy.get("recommended_search_limit", 6), default=6)
         probe_limit = self._memory_probe_limit(search_limit)
+        digest_limit = self._subagent_digest_probe_limit(search_limit)
+        pending: list[asyncio.Task[list[MemoryRecord]]] = []
+
+        def _probe(query: str, limit: int) -> asyncio.Task[list[MemoryRecord]]:
+            task = asyncio.create_task(
+                self._memory_search_async(
+                    query=query,
+                    limit=limit,
+                    user_id=user_id,
+                    session_id=session_id,
+                    include_shared=True,
+                    stop_event=stop_event,
+                )
+            )
+            pending.append(task)
+            return task
+
+        def _finish() -> None:
+            self._record_retrieval_metrics(
+                route=route,
+                query=selected_query,
+                attempts=attempts,
+                hits=hits,
+                rewrites=rewrites,
+            )
+
         try:
             if not self._is_memory_retrieval_candidate(user_text):
                 run_log.debug("memory planner route={} query=- rows=0", route)
-                self._record_retrieval_metrics(
-                    route=route,
-                    query=selected_query,
-                    attempts=attempts,
-                    hits=hits,
-                    rewrites=rewrites,
-                )
+                _finish()
                 return []
 
             route = self._MEMORY_ROUTE_RETRIEVE
             selected_query = " ".join(str(user_text or "").split()).strip()
             started = time.perf_counter()
-            first_rows = self._memory_search(
-                query=selected_query,
-                limit=probe_limit,
-                user_id=user_id,
-                session_id=session_id,
-                include_shared=True,
-            )
+            first_rows = await _probe(selected_query, probe_limit)
             attempts += 1
             self._record_retrieval_latency((time.perf_counter() - started) * 1000.0)
             if first_rows:
                 hits += 1
             selected_rows = first_rows
 
-            if not self._memory_result_sufficient(selected_query, first_rows):
+            digest_task: asyncio.Task[list[MemoryRecord]] | None = None
+            digest_query = ""
+            if not self._stop_requested(session_id=session_id, stop_event=stop_event) and not self._memory_result_sufficient(
+                selected_query, first_rows
+            ):
                 rewritten = self._rewrite_memory_query(selected_query)
+                follow_up: asyncio.Task[list[MemoryRecord]] | None = None
+                started = time.perf_counter()
                 if rewritten:
                     route = self._MEMORY_ROUTE_NEXT_QUERY
                     selected_query = rewritten
                     rewrites += 1
-                    started = time.perf_counter()
-                    second_rows = self._memory_search(
-                        query=rewritten,
-                        limit=search_limit,
-                        user_id=user_id,
-                        session_id=session_id,
-                        include_shared=True,
-                    )
-                    attempts += 1
-                    self._record_retrieval_latency((time.perf_counter() - started) * 1000.0)
-                    if second_rows:
-                        hits += 1
-                        selected_rows = second_rows
+                    follow_up = _probe(rewritten, search_limit)
                 elif probe_limit < search_limit:
-                    started = time.perf_counter()
-                    expanded_rows = self._memory_search(
-                        query=selected_query,
-                        limit=search_limit,
-                        user_id=user_id,
-                        session_id=session_id,
-                        include_shared=True,
-                    )
+                    follow_up = _probe(selected_query, search_limit)
+                if session_id and (follow_up is not None or selected_rows):
+                    digest_query = selected_query
+                    digest_task = _probe(digest_query, digest_limit)
+                if follow_up is not None:
+                    follow_rows = await follow_up
                     attempts += 1
                     self._record_retrieval_latency((time.perf_counter() - started) * 1000.0)
-                    if expanded_rows:
+                    if follow_rows:
                         hits += 1
-                        selected_rows = expanded_rows
+                        selected_rows = follow_rows
 
             subagent_digest_rows: list[MemoryRecord] = []
             if (
                 session_id
                 and selected_rows
+                and not self._stop_requested(session_id=session_id, stop_event=stop_event)
                 and not self._memory_result_sufficient(selected_query, selected_rows)
                 and not any(self._is_subagent_digest_record(row, session_id=session_id) for row in selected_rows)
             ):
                 started = time.perf_counter()
-                digest_probe_rows = self._memory_search(
-                    query=selected_query,
-                    limit=self._subagent_digest_probe_limit(search_limit),
-                    user_id=user_id,
-                    session_id=session_id,
-                    include_shared=True,
-                )
+                if digest_task is None or digest_query != selected_query:
+                    digest_task = _probe(selected_query, digest_limit)
+                digest_probe_rows = await digest_task
                 attempts += 1
                 self._record_retrieval_latency((time.perf_counter() - started) * 1000.0)
                 subagent_digest_rows = self._filter_subagent_digest_rows(
@@ -1924,57 +2018,21 @@ class AgentEngine:
                     selected_rows = self._merge_memory_rows(
                         subagent_digest_rows,
                         selected_rows,
-                        limit=self._subagent_digest_probe_limit(search_limit),
+                        limit=digest_limit,
                     )
 
+            if self._stop_requested(session_id=session_id, stop_event=stop_event):
+                run_log.debug("memory planner stopped route={} query={}", route, selected_query or "-")
+                _finish()
+                return []
+
             recovery_snippets: list[str] = []
             if not selected_rows:
-                working_set_fn = getattr(self.memory, "get_working_set", None)
-                if callable(working_set_fn):
-                    try:
-                        working_rows = working_set_fn(
-                            session_id,
-                            limit=4,
-                            include_shared_subagents=True,
-                        )
-                        if inspect.isawaitable(working_rows):
-                            working_rows = []
-                        if isinstance(working_rows, list):
-                            for item in working_rows:
-                                if isinstance(item, dict):
-                                    clean = str(item.get("content", item.get("text", "")) or "").strip()
-                                    source_session = str(item.get("session_id", session_id) or session_id).strip() or session_id
-                                else:
-                                    clean = str(item or "").strip()
-                                    source_session = session_id
-                                if clean:
-                                    recovery_snippets.append(
-                                        self._format_session_recovery_snippet(session_id=source_session, text=clean)
-                                    )
-                    except Exception as exc:
-                        run_log.warning(
-                            "memory planner working-set recovery failed session={} error={}",
-                            session_id or "-",
-                            exc,
-                        )
-
-            if not selected_rows and not recovery_snippets:
-                recover_fn = getattr(self.memory, "recover_session_context", None)
-                if callable(recover_fn):
-                    try:
-                        recovered = recover_fn(session_id, limit=4)
-                        for snippet in recovered:
-                            clean = str(snippet or "").strip()
-                            if clean:
-                                recovery_snippets.append(
-                                    self._format_session_recovery_snippet(session_id=session_id, text=clean)
-                                )
-                    except Exception as exc:
-                        run_log.warning(
-                            "memory planner session recovery failed session={} error={}",
-                            session_id or "-",
-                            exc,
-                        )
+                recovery_snippets = await asyncio.to_thread(
+                    self._memory_recovery_snippets,
+                    session_id=session_id,
+                    run_log=run_log,
+                )
 
             run_log.debug(
                 "memory planner route={} query={} rows={} subagent_digest_rows={} recovery_rows={}",
@@ -1984,26 +2042,20 @@ class AgentEngine:
                 len(subagent_digest_rows),
                 len(recovery_snippets),
             )
-            self._record_retrieval_metrics(
-                route=route,
-                query=selected_query,
-                attempts=attempts,
-                hits=hits,
-                rewrites=rewrites,
-            )
+            _finish()
             if selected_rows:
                 return [self._format_memory_snippet(row) for row in selected_rows]
             return recovery_snippets
+        except asyncio.CancelledError:
+            raise
         except Exception as exc:
             run_log.warning("memory planner failed route={} query={} error={}", route, selected_query or "-", exc)
-            self._record_retrieval_metrics(
-                route=route,
-                query=selected_query,
-                attempts=attempts,
-                hits=hits,
-                rewrites=rewrites,
-            )
+            _finish()
             return []
+        finally:
+            for task in pending:
+                if not task.done():
+                    task.cancel()
 
     def request_stop(self, session_id: str) -> bool:
         normalized = str(session_id or "").strip()
@@ -3450,11 +3502,18 @@ class AgentEngine:
         normalized_session_id = str(session_id or "").strip()
         if normalized_session_id:
             await self._await_turn_persistence(normalized_session_id)
+            await self._consolidation_queue.drain_keys(
+                lambda key: isinstance(key, tuple) and bool(key) and key[0] == normalized_session_id
+            )
             return
         pending = list(self._turn_persistence_tasks.values())
-        if not pending:
-            return
-        await asyncio.gather(*(asyncio.shield(task) for task in pending), return_exceptions=True)
+        if pending:
+            await asyncio.gather(*(asyncio.shield(task) for task in pending), return_exceptions=True)
+        await self._consolidation_queue.drain()
+        flush_sessions = getattr(self.sessions, "flush", None)
+        if callable(flush_sessions):
+            with contextlib.suppress(OSError):
+                await asyncio.to_thread(flush_sessions)
 
     def _queue_turn_persistence(
         self,
@@ -3581,7 +3640,43 @@ class AgentEngine:
         if not allow_memory_write:
             run_log.info("memory persistence skipped by integration policy session={}", session_id or "-")
             return
+        if offload_sync:
+            await self._consolidation_queue.submit(
+                (session_id, runtime_chat_id),
+                memory_messages,
+                session_id=session_id,
+                runtime_chat_id=runtime_chat_id,
+                run_log=run_log,
+            )
+            return
+        await self._consolidate_turn_memory(
+            memory_messages,
+            session_id=session_id,
+            runtime_chat_id=runtime_chat_id,
+            offload_sync=offload_sync,
+            run_log=run_log,
+        )
+
+    async def _run_queued_consolidation(self, messages: list[dict[str, str]], options: dict[str, Any]) -> None:
+        await self._consolidate_turn_memory(
+            messages,
+            session_id=str(options.get("session_id", "") or ""),
+            runtime_chat_id=str(options.get("runtime_chat_id", "") or ""),
+            offload_sync=True,
+            run_log=options.get("run_log") or bind_event("memory.consolidate"),
+            raise_errors=True,
+        )
 
+    async def _consolidate_turn_memory(
+        self,
+        memory_messages: list[dict[str, str]],
+        *,
+        session_id: str,
+        runtime_chat_id: str,
+        offload_sync: bool,
+        run_log: Any,
+        raise_errors: bool = False,
+    ) -> None:
         memorize_fn = getattr(self.memory, "memorize", None)
         if callable(memorize_fn):
             try:
@@ -3608,6 +3703,8 @@ class AgentEngine:
                     )
             except Exception as exc:
                 run_log.warning("memory memorize failed session={} error={}", session_id or "-", exc)
+                if raise_errors:
+                    raise
             return
 
         try:
@@ -3619,6 +3716,8 @@ class AgentEngine:
             )
         except Exception as exc:
             run_log.warning("memory consolidate failed session={} error={}", session_id or "-", exc)
+            if raise_errors:
+                raise
 
     async def _persist_completed_turn(
         self,
@@ -3692,6 +3791,7 @@ class AgentEngine:
             runtime_metadata=runtime_metadata,
             run_log=run_log,
             include_tool_guidance=True,
+            stop_event=stop_event,
         )
         runtime_channel = prepared.runtime_channel
         runtime_chat_id = prepared.runtime_chat_id
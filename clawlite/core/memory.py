@@ -7,17 +7,48 @@ import math
 import os
 import re
 import asyncio
+import functools
 import threading
+import time
 import unicodedata
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 from pathlib import Path
 from typing import Any, Callable, Iterable
 
+from clawlite.core.memory_ann import DEFAULT_ANN_PROBES
 from clawlite.core.memory_backend import MemoryBackend, resolve_memory_backend
+from clawlite.core.memory_embedding_store import DEFAULT_EMBEDDING_FORMAT
+from clawlite.core.memory_embedding_store import SidecarReader
+from clawlite.core.memory_embedding_store import append_sidecar_vectors
+from clawlite.core.memory_embedding_store import normalize_embedding_format
+from clawlite.core.memory_embedding_store import pack_float32
+from clawlite.core.memory_embedding_store import sidecar_path_for
+from clawlite.core.memory_embedding_store import vector_to_list
+from clawlite.core.memory_embedding_service import EMBEDDING_BATCH_SIZE
+from clawlite.core.memory_embedding_service import EMBEDDING_CACHE_FILENAME
+from clawlite.core.memory_embedding_service import EMBEDDING_CONCURRENCY
+from clawlite.core.memory_embedding_service import EmbeddingCache
+from clawlite.core.memory_embedding_service import EmbeddingService
+from clawlite.core.memory_features import RANK_FEATURES_KEY
+from clawlite.core.memory_features import RankFeatureMemo
+from clawlite.core.memory_features import RowRankTerms
+from clawlite.core.memory_features import compute_rank_features as _compute_rank_features_helper
+from clawlite.core.memory_features import decay_penalty_at as _decay_penalty_at
+from clawlite.core.memory_features import recency_score_at as _recency_score_at
+from clawlite.core.memory_features import row_rank_terms as _row_rank_terms_helper
+from clawlite.core.memory_features import salience_boost_at as _salience_boost_at
+from clawlite.core.memory_features import timestamp_epoch as _timestamp_epoch
+from clawlite.core.memory_features import upcoming_event_boost_at as _upcoming_event_boost_at
+from clawlite.core.memory_lexical import LexicalCorpus
+from clawlite.core.memory_lexical import LexicalIndex
+from clawlite.core.memory_lexical import LexicalIndexCache
+from clawlite.core.memory_query_cache import SEARCH_CACHE_MAX_ENTRIES
+from clawlite.core.memory_query_cache import SearchResultCache
 from clawlite.core.memory_artifacts import (
     append_resource_layer as _append_resource_layer_helper,
     upsert_item_layer as _upsert_item_layer_helper,
@@ -54,12 +85,25 @@ from clawlite.core.memory_curation import (
 )
 from clawlite.core.memory_history import (
     append_or_reinforce_history_record as _append_or_reinforce_history_record_helper,
+    compact_history_file as _compact_history_file_helper,
+    iter_history_records as _iter_history_records_helper,
     read_history_records as _read_history_records_helper,
+    read_history_records_by_ids as _read_history_records_by_ids_helper,
     read_history_records_from as _read_history_records_from_helper,
+    reencrypt_history_records as _reencrypt_history_records_helper,
     repair_history_file as _repair_history_file_helper,
     stored_history_payload as _stored_history_payload_helper,
+    sync_history_index as _sync_history_index_helper,
+    tombstone_history_records as _tombstone_history_records_helper,
     upsert_history_record_by_id as _upsert_history_record_by_id_helper,
 )
+from clawlite.core.memory_history_index import HistoryIndexCache
+from clawlite.core.memory_record_cache import RecordCache
+from clawlite.core.memory_record_cache import stat_signature as _stat_signature
+from clawlite.core.memory_stream import (
+    export_memory_stream as _export_memory_stream_helper,
+    import_memory_stream as _import_memory_stream_helper,
+)
 from clawlite.core.memory_ingest import (
     compact_whitespace as _compact_whitespace,
     memory_text_from_file as _memory_text_from_file,
@@ -95,13 +139,17 @@ from clawlite.core.memory_prune import (
     prune_jsonl_records_for_ids as _prune_jsonl_records_for_ids_helper,
 )
 from clawlite.core.memory_privacy import (
+    DecryptionMemo,
     append_privacy_audit_event as _append_privacy_audit_event_helper,
     decrypt_text_for_category as _decrypt_text_for_category_helper,
+    encrypted_categories as _encrypted_categories_helper,
     encrypted_prefix as _encrypted_prefix_helper,
     encrypt_text_for_category as _encrypt_text_for_category_helper,
     is_encrypted_category as _is_encrypted_category_helper,
+    is_encrypted_text as _is_encrypted_text_helper,
     legacy_encrypted_prefix as _legacy_encrypted_prefix_helper,
     load_or_create_privacy_key as _load_or_create_privacy_key_helper,
+    needs_reencryption as _needs_reencryption_helper,
     privacy_block_reason as _privacy_block_reason_helper,
     privacy_settings as _privacy_settings_helper,
     xor_with_keystream as _xor_with_keystream_helper,
@@ -109,6 +157,7 @@ from clawlite.core.memory_privacy import (
 from clawlite.core.memory_resources import (
     create_resource as _create_resource_helper,
     fetch_record_by_id as _fetch_record_by_id_helper,
+    fetch_records_by_ids as _fetch_records_by_ids_helper,
     get_record_ttl as _get_record_ttl_helper,
     get_resource as _get_resource_helper,
     get_resource_records as _get_resource_records_helper,
@@ -152,9 +201,12 @@ from clawlite.core.memory_reporting import (
 )
 from clawlite.core.memory_search import (
     BM25Okapi,
+    SEARCH_CANDIDATES,
     rank_records as _rank_records_helper,
+    search_candidate_ids as _search_candidate_ids_helper,
     search_records as _search_records_helper,
 )
+from clawlite.core.memory_vectors import EmbeddingMatrix
 from clawlite.core.memory_versions import (
     checkout_memory_branch as _checkout_memory_branch,
     create_memory_branch as _create_memory_branch,
@@ -164,6 +216,7 @@ from clawlite.core.memory_versions import (
     list_memory_branches as _list_memory_branches,
     merge_memory_branches as _merge_memory_branches,
     rollback_memory_version as _rollback_memory_version,
+    write_snapshot_manifest as _write_snapshot_manifest_helper,
     write_snapshot_payload as _write_snapshot_payload_helper,
 )
 from clawlite.core.memory_working_set import (
@@ -371,6 +424,8 @@ class MemoryStore:
     _WORKING_MEMORY_PROMOTION_WINDOW = 6
     _WORKING_MEMORY_PROMOTION_RATE_LIMIT_WINDOW_S = 3600
     _WORKING_MEMORY_PROMOTION_RATE_LIMIT_MAX = 6
+    _SEARCH_MAX_WORKERS = 4
+    _EMBEDDING_MODELS: tuple[str, ...] = ("gemini/text-embedding-004", "openai/text-embedding-3-small")
     _RECENCY_MAX_BOOST = 0.35
     _RECENCY_HALF_LIFE_HOURS = 24.0 * 21.0
     _TEMPORAL_INTENT_MATCH_BOOST = 0.2
@@ -753,24 +808,13 @@ class MemoryStore:
 
     @classmethod
     def _salience_boost(cls, metadata: dict[str, Any] | None) -> float:
-        reinforcement_count = cls._metadata_reinforcement_count(metadata)
-        last_reinforced_at = cls._metadata_last_reinforced_at(metadata)
-        reinforcement_factor = math.log(reinforcement_count + 1)
-
-        if not last_reinforced_at:
-            recency_factor = 0.5
-        else:
-            stamp = cls._parse_iso_timestamp(last_reinforced_at)
-            if stamp.year <= 1:
-                recency_factor = 0.5
-            else:
-                if stamp.tzinfo is None:
-                    stamp = stamp.replace(tzinfo=timezone.utc)
-                days_ago = max(0.0, float((datetime.now(timezone.utc) - stamp).total_seconds()) / 86400.0)
-                recency_factor = math.exp(-0.693 * days_ago / cls._SALIENCE_RECENCY_DECAY_DAYS)
-
-        score = reinforcement_factor * recency_factor * 0.25
-        return max(0.0, min(cls._SALIENCE_MAX_BOOST, round(score, 6)))
+        return _salience_boost_at(
+            cls._metadata_reinforcement_count(metadata),
+            _timestamp_epoch(cls._metadata_last_reinforced_at(metadata), parse_iso_timestamp=cls._parse_iso_timestamp),
+            time.time(),
+            recency_decay_days=cls._SALIENCE_RECENCY_DECAY_DAYS,
+            max_boost=cls._SALIENCE_MAX_BOOST,
+        )
 
     @classmethod
     def _record_decay_anchor(cls, row: MemoryRecord) -> str:
@@ -785,36 +829,59 @@ class MemoryStore:
         decay_rate = cls._normalize_decay_rate(getattr(row, "decay_rate", 0.0), default=0.0)
         if decay_rate <= 0.0:
             return 0.0
-        anchor = cls._parse_iso_timestamp(cls._record_decay_anchor(row))
-        if anchor.year <= 1:
-            return 0.0
-        if anchor.tzinfo is None:
-            anchor = anchor.replace(tzinfo=timezone.utc)
-        age_days = max(0.0, float((datetime.now(timezone.utc) - anchor).total_seconds()) / 86400.0)
-        if age_days <= 0.0:
-            return 0.0
-        penalty = cls._DECAY_MAX_PENALTY * (1.0 - math.exp(-(decay_rate * age_days) / 30.0))
-        return max(0.0, min(cls._DECAY_MAX_PENALTY, round(penalty, 6)))
+        return _decay_penalty_at(
+            decay_rate,
+            _timestamp_epoch(cls._record_decay_anchor(row), parse_iso_timestamp=cls._parse_iso_timestamp),
+            time.time(),
+            max_penalty=cls._DECAY_MAX_PENALTY,
+        )
 
     @classmethod
     def _upcoming_event_boost(cls, row: MemoryRecord) -> float:
         if cls._normalize_memory_type(getattr(row, "memory_type", "knowledge")) != "event":
             return 0.0
-        happened_at = cls._parse_iso_timestamp(str(getattr(row, "happened_at", "") or ""))
-        if happened_at.year <= 1:
-            return 0.0
-        if happened_at.tzinfo is None:
-            happened_at = happened_at.replace(tzinfo=timezone.utc)
-        delta_days = float((happened_at - datetime.now(timezone.utc)).total_seconds()) / 86400.0
-        if delta_days < -1.0:
-            return 0.0
-        if delta_days <= 30.0:
-            score = cls._UPCOMING_EVENT_MAX_BOOST * math.exp(-max(0.0, delta_days) / 30.0)
-            return max(0.0, min(cls._UPCOMING_EVENT_MAX_BOOST, round(score, 6)))
-        if delta_days <= 180.0:
-            score = (cls._UPCOMING_EVENT_MAX_BOOST * 0.45) * math.exp(-(delta_days - 30.0) / 120.0)
-            return max(0.0, min(cls._UPCOMING_EVENT_MAX_BOOST * 0.45, round(score, 6)))
-        return 0.0
+        return _upcoming_event_boost_at(
+            _timestamp_epoch(str(getattr(row, "happened_at", "") or ""), parse_iso_timestamp=cls._parse_iso_timestamp),
+            time.time(),
+            max_boost=cls._UPCOMING_EVENT_MAX_BOOST,
+        )
+
+    @classmethod
+    def _compute_rank_features(cls, row: MemoryRecord) -> dict[str, Any]:
+        return _compute_rank_features_helper(
+            row,
+            extract_entities=cls._extract_entities,
+            has_temporal_markers=cls._memory_has_temporal_markers,
+            temporal_anchor=cls._record_temporal_anchor,
+            decay_anchor=cls._record_decay_anchor,
+            reinforcement_count=cls._metadata_reinforcement_count,
+            last_reinforced_at=cls._metadata_last_reinforced_at,
+            normalize_memory_type=cls._normalize_memory_type,
+            parse_iso_timestamp=cls._parse_iso_timestamp,
+        )
+
+    def _attach_rank_features(self, row: MemoryRecord) -> MemoryRecord:
+        metadata = {**(row.metadata if isinstance(row.metadata, dict) else {})}
+        if self._is_encrypted_category(row.category):
+            # Entities and the digest come from the plaintext; the memo derives them at query time.
+            metadata.pop(RANK_FEATURES_KEY, None)
+        else:
+            metadata[RANK_FEATURES_KEY] = self._compute_rank_features(row)
+        row.metadata = metadata
+        return row
+
+    def _row_rank_terms(self, row: MemoryRecord, now: float) -> RowRankTerms:
+        return _row_rank_terms_helper(
+            self._rank_feature_memo.resolve(row, self._compute_rank_features),
+            decay_rate=self._normalize_decay_rate(getattr(row, "decay_rate", 0.0), default=0.0),
+            now=now,
+            recency_half_life_hours=self._RECENCY_HALF_LIFE_HOURS,
+            recency_max_boost=self._RECENCY_MAX_BOOST,
+            decay_max_penalty=self._DECAY_MAX_PENALTY,
+            upcoming_event_max_boost=self._UPCOMING_EVENT_MAX_BOOST,
+            salience_recency_decay_days=self._SALIENCE_RECENCY_DECAY_DAYS,
+            salience_max_boost=self._SALIENCE_MAX_BOOST,
+        )
 
     @classmethod
     def _bounded_confidence_score(cls, value: Any) -> float:
@@ -993,10 +1060,22 @@ class MemoryStore:
         memory_home: str | Path | None = None,
         memory_backend_name: str = "sqlite",
         memory_backend_url: str = "",
+        memory_ann_probes: int = DEFAULT_ANN_PROBES,
+        memory_embedding_format: str = DEFAULT_EMBEDDING_FORMAT,
+        memory_embedding_batch_size: int = EMBEDDING_BATCH_SIZE,
+        memory_embedding_concurrency: int = EMBEDDING_CONCURRENCY,
+        memory_search_candidates: int = SEARCH_CANDIDATES,
+        memory_search_cache_size: int = SEARCH_CACHE_MAX_ENTRIES,
+        embedding_provider: Callable[[list[str]], list[list[float] | None]] | None = None,
     ) -> None:
         base_history = Path(history_path) if history_path else (Path(db_path) if db_path else (Path.home() / ".clawlite" / "state" / "memory.jsonl"))
         self.path = base_history  # Backward-compatible alias.
         self.history_path = base_history
+        self._record_cache = RecordCache()
+        self._search_cache = SearchResultCache(max_entries=memory_search_cache_size)
+        self._decrypt_memo = DecryptionMemo()
+        self._privacy_migrations: dict[str, threading.Thread] = {}
+        self._privacy_migrations_lock = threading.Lock()
         if memory_home:
             derived_home = Path(memory_home)
         elif db_path is not None or history_path is not None:
@@ -1044,15 +1123,35 @@ class MemoryStore:
             self.embeddings_path = Path(embeddings_path)
         else:
             self.embeddings_path = self.embeddings_home / "embeddings.jsonl"
+        self.embedding_vectors_path = sidecar_path_for(self.embeddings_path)
 
         self.semantic_enabled = bool(semantic_enabled)
         self.memory_auto_categorize = bool(memory_auto_categorize)
         self.emotional_tracking = bool(emotional_tracking)
         self.memory_backend_name = str(memory_backend_name or "sqlite").strip().lower() or "sqlite"
         self.memory_backend_url = str(memory_backend_url or "")
+        self.memory_ann_probes = max(0, int(memory_ann_probes))
+        self.embedding_format = normalize_embedding_format(memory_embedding_format)
+        self.search_candidates = max(0, int(memory_search_candidates))
+        # A caller-supplied provider (tests, benchmarks, local models) replaces
+        # the LiteLLM models; its vectors are cached under their own key.
+        self._embedding_provider = embedding_provider
+        self._embedding_service = EmbeddingService(
+            lambda texts: self._embed_texts(texts),
+            cache=EmbeddingCache(self.embeddings_home / EMBEDDING_CACHE_FILENAME),
+            model_key=(
+                "|".join(self._EMBEDDING_MODELS)
+                if embedding_provider is None
+                else f"provider:{getattr(embedding_provider, '__qualname__', type(embedding_provider).__name__)}"
+            ),
+            batch_size=memory_embedding_batch_size,
+            concurrency=memory_embedding_concurrency,
+        )
         self.backend: MemoryBackend = resolve_memory_backend(
             backend_name=self.memory_backend_name,
             pgvector_url=self.memory_backend_url,
+            ann_probes=self.memory_ann_probes,
+            embedding_format=self.embedding_format,
         )
 
         self.history_path.parent.mkdir(parents=True, exist_ok=True)
@@ -1094,6 +1193,10 @@ class MemoryStore:
         self._diagnostics: dict[str, int | str] = {
             "history_read_corrupt_lines": 0,
             "history_repaired_files": 0,
+            "history_tombstones": 0,
+            "history_compactions": 0,
+            "search_candidate_queries": 0,
+            "search_full_queries": 0,
             "consolidate_writes": 0,
             "consolidate_dedup_hits": 0,
             "reinforcement_hits": 0,
@@ -1111,6 +1214,7 @@ class MemoryStore:
             "privacy_encrypt_errors": 0,
             "privacy_decrypt_events": 0,
             "privacy_decrypt_errors": 0,
+            "privacy_reencrypted": 0,
             "privacy_key_load_events": 0,
             "privacy_key_create_events": 0,
             "privacy_key_errors": 0,
@@ -1179,6 +1283,19 @@ class MemoryStore:
             "backend_vector_index_error": backend_vector_index_error,
         }
         self._privacy_key: bytes | None = None
+        self._embedding_matrix_lock = threading.Lock()
+        self._embedding_matrices: dict[int, EmbeddingMatrix] | None = None
+        self._embedding_matrix_signature: tuple[Any, ...] | None = None
+        self._embedding_write_generation = 0
+        # Entities come from the per-record ranking features, so the lexical
+        # index only tokenizes.
+        self._lexical_indexes = LexicalIndexCache(self._tokens)
+        self._rank_feature_memo = RankFeatureMemo()
+        self._history_indexes = HistoryIndexCache(self._history_index_key)
+        self._history_compactions: dict[str, threading.Thread] = {}
+        self._history_compactions_lock = threading.Lock()
+        self._search_executor: ThreadPoolExecutor | None = None
+        self._search_executor_lock = threading.Lock()
 
     @staticmethod
     def _ensure_file(path: Path, *, default: str) -> None:
@@ -1234,11 +1351,28 @@ class MemoryStore:
         # fallback path must avoid opening the destination during os.replace().
         if fcntl is None:
             with self._path_lock(path):
-                self._atomic_write_text(path, content)
+                try:
+                    self._atomic_write_text(path, content)
+                finally:
+                    self._invalidate_cached_reads(path)
             return
         with self._locked_file(path, "a+", exclusive=True):
             self._atomic_write_text(path, content)
 
+    def _replace_file_locked(self, path: Path, source_path: Path) -> None:
+        """Atomically move a fully written ``source_path`` over ``path`` under its lock."""
+        if fcntl is None:
+            with self._path_lock(path):
+                try:
+                    os.replace(source_path, path)
+                    self._fsync_parent_dir(path)
+                finally:
+                    self._invalidate_cached_reads(path)
+            return
+        with self._locked_file(path, "a+", exclusive=True):
+            os.replace(source_path, path)
+            self._fsync_parent_dir(path)
+
     @classmethod
     def _path_lock(cls, path: Path) -> threading.RLock:
         key = str(path.expanduser().resolve())
@@ -2125,6 +2259,7 @@ class MemoryStore:
         payload = self._load_shared_optin_map()
         payload[clean_user] = bool(enabled)
         self._write_json_dict(self.shared_optin_path, payload)
+        self._search_cache.bump("shared")
         return {"user_id": clean_user, "enabled": bool(enabled)}
 
     def shared_opt_in(self, user_id: str) -> bool:
@@ -2264,7 +2399,6 @@ class MemoryStore:
             settings=settings,
             privacy_settings_loader=self._privacy_settings,
             load_or_create_privacy_key_fn=self._load_or_create_privacy_key,
-            xor_with_keystream_fn=self._xor_with_keystream,
             diagnostics=self._diagnostics,
         )
 
@@ -2276,27 +2410,157 @@ class MemoryStore:
             load_or_create_privacy_key_fn=self._load_or_create_privacy_key,
             xor_with_keystream_fn=self._xor_with_keystream,
             diagnostics=self._diagnostics,
+            memo=self._decrypt_memo,
         )
 
+    def _reencrypt_stored_text(self, text: str, category: str, *, settings: dict[str, Any]) -> str | None:
+        if not _needs_reencryption_helper(text, category, categories=_encrypted_categories_helper(settings)):
+            return None
+        plain = self._decrypt_text_for_category(text, category)
+        if _is_encrypted_text_helper(plain):
+            # Unreadable here (missing key or optional cipher): leave it for a store that can.
+            return None
+        stored = self._encrypt_text_for_category(plain, category, settings=settings)
+        return stored if stored.startswith(self._encrypted_prefix()) else None
+
+    def _search_scope_for_path(self, path: Path) -> str:
+        if path in (self.privacy_path, self.embeddings_path, self.embedding_vectors_path):
+            return "store"
+        for root, scope in ((self.users_path, "user"), (self.shared_path, "shared")):
+            try:
+                relative = Path(path).relative_to(root)
+            except ValueError:
+                continue
+            if scope == "user" and relative.parts:
+                return f"user:{self._normalize_user_id(relative.parts[0])}"
+            return scope
+        return "default"
+
+    def _invalidate_cached_reads(self, path: Path) -> None:
+        self._record_cache.invalidate(path)
+        self._search_cache.bump(self._search_scope_for_path(path))
+
     @contextmanager
     def _locked_file(self, path: Path, mode: str, *, exclusive: bool):
         fallback_lock = self._path_lock(path) if fcntl is None else None
         if fallback_lock is not None:
             fallback_lock.acquire()
         try:
-            with path.open(mode, encoding="utf-8") as fh:
-                if fcntl is not None:
-                    lock_mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
-                    fcntl.flock(fh.fileno(), lock_mode)
+            while True:
+                fh = path.open(mode, encoding="utf-8")
+                if fcntl is None:
+                    break
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                if self._is_current_file(path, fh):
+                    break
+                # Replaced by an atomic rewrite (compaction, prune) while we waited for the lock.
+                fh.close()
+            with fh:
                 try:
                     yield fh
                 finally:
+                    if exclusive:
+                        self._invalidate_cached_reads(path)
                     if fcntl is not None:
                         fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
         finally:
             if fallback_lock is not None:
                 fallback_lock.release()
 
+    def _lexical_stamp(self, path: Path) -> tuple[Any, int]:
+        return (_stat_signature(path), self._record_cache.generation(path))
+
+    def _stamping_locked_file(self, sections: list[tuple[Any, Any]]) -> Callable[..., Any]:
+        """``_locked_file`` that records the lexical stamp before and after each exclusive section.
+
+        The exit stamp is taken while the lock is still held, and counts the
+        generation bump the section's exit is about to make.
+        """
+
+        @contextmanager
+        def locked_file(path: Path, mode: str, *, exclusive: bool):
+            with self._locked_file(path, mode, exclusive=exclusive) as fh:
+                if not exclusive:
+                    yield fh
+                    return
+                before = self._lexical_stamp(path)
+                yield fh
+                fh.flush()
+                sections.append((before, (_stat_signature(path), before[1] + 1)))
+
+        return locked_file
+
+    def _advance_lexical_index(
+        self,
+        path: Path,
+        sections: list[tuple[Any, Any]],
+        *,
+        upserts: Iterable[Any] = (),
+        discards: Iterable[str] = (),
+    ) -> None:
+        """Apply a write to the file's lexical index instead of leaving it for a full resync.
+
+        Only back-to-back sections are applied; anything written in between
+        by another writer leaves the index stale, to be resynced on its next
+        search. A file that was empty before the write gets its index here.
+        """
+        if not sections:
+            return
+        for (_before, after), (before, _after) in zip(sections, sections[1:]):
+            if after != before:
+                return
+        first = sections[0][0]
+        index = self._lexical_indexes.peek(str(path))
+        if index is None:
+            if first[0] is not None and first[0][2] > 0:
+                return
+            index = self._lexical_indexes.get(str(path))
+            index.refresh(first, list)
+        index.advance(first, sections[-1][1], upserts=upserts, discards=discards)
+
+    def _file_lexical_index(self, path: Path, load_rows: Callable[[], list[Any]]) -> LexicalIndex:
+        index = self._lexical_indexes.get(str(path))
+        index.refresh(self._lexical_stamp(path), load_rows)
+        return index
+
+    def _search_lexical_corpus(self, user_id: str, *, include_shared: bool, candidates: bool = False) -> LexicalCorpus | None:
+        """BM25 corpus over every curated and history file a search in this scope reads.
+
+        Candidate searches must not scan the history, so they take its index
+        as the write paths left it, and return ``None`` (rank the candidates
+        on their own) until a full search has built it.
+        """
+        clean_user = self._normalize_user_id(user_id or "default")
+        indexes: list[LexicalIndex] = []
+        for scope in self._resolve_retrieval_scopes(user_id=clean_user, include_shared=include_shared):
+            curated_path = scope["curated"]
+            history_path = scope["history"]
+            indexes.append(
+                self._file_lexical_index(
+                    curated_path,
+                    lambda path=curated_path: self._curated_records(self._read_curated_facts_from(path), user_id=clean_user),
+                )
+            )
+            if candidates:
+                history_index = self._lexical_indexes.peek(str(history_path))
+                if history_index is None:
+                    return None
+                indexes.append(history_index)
+            else:
+                indexes.append(
+                    self._file_lexical_index(history_path, lambda path=history_path: self._read_history_records_from(path))
+                )
+        return self._lexical_indexes.corpus(indexes)
+
+    @staticmethod
+    def _is_current_file(path: Path, fh: Any) -> bool:
+        try:
+            current = os.stat(path)
+        except FileNotFoundError:
+            return True
+        opened = os.fstat(fh.fileno())
+        return (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino)
+
     @staticmethod
     def _normalize_memory_text(text: str) -> str:
         return " ".join(WORD_RE.findall(text.lower()))
@@ -2503,44 +2767,71 @@ class MemoryStore:
 
     @classmethod
     def _extract_embedding_from_response(cls, payload: Any) -> list[float] | None:
+        embeddings = cls._extract_embeddings_from_response(payload, count=1)
+        return embeddings[0] if embeddings else None
+
+    @classmethod
+    def _extract_embeddings_from_response(cls, payload: Any, *, count: int) -> list[list[float] | None]:
         data = getattr(payload, "data", None)
         if data is None and isinstance(payload, dict):
             data = payload.get("data")
-        if not isinstance(data, list) or not data:
-            return None
-        first = data[0]
-        embedding = None
-        if isinstance(first, dict):
-            embedding = first.get("embedding")
-        else:
-            embedding = getattr(first, "embedding", None)
-        return cls._normalize_embedding(embedding)
+        out: list[list[float] | None] = [None] * max(0, int(count))
+        if not isinstance(data, list):
+            return out
+        for position, item in enumerate(data):
+            if isinstance(item, dict):
+                embedding = item.get("embedding")
+                index = item.get("index", position)
+            else:
+                embedding = getattr(item, "embedding", None)
+                index = getattr(item, "index", position)
+            try:
+                slot = int(index)
+            except (TypeError, ValueError):
+                slot = position
+            if 0 <= slot < len(out):
+                out[slot] = cls._normalize_embedding(embedding)
+        return out
 
-    def _generate_embedding(self, text: str) -> list[float] | None:
-        if not self.semantic_enabled:
-            return None
-        clean = str(text or "").strip()
-        if not clean:
-            return None
+    def _embed_texts(self, texts: list[str]) -> list[list[float] | None]:
+        """Embed ``texts`` with one provider call per model, falling back per missing text."""
+        if self._embedding_provider is not None:
+            return list(self._embedding_provider(texts))
+        out: list[list[float] | None] = [None] * len(texts)
         try:
             import litellm  # type: ignore
         except Exception:
-            return None
+            return out
 
-        for model_name in ("gemini/text-embedding-004", "openai/text-embedding-3-small"):
+        for model_name in self._EMBEDDING_MODELS:
+            pending = [idx for idx, vector in enumerate(out) if vector is None]
+            if not pending:
+                break
             try:
                 response = self._run_coro_sync(
                     litellm.aembedding(
                         model=model_name,
-                        input=[clean],
+                        input=[texts[idx] for idx in pending],
                     )
                 )
-                embedding = self._extract_embedding_from_response(response)
-                if embedding is not None:
-                    return embedding
             except Exception:
                 continue
-        return None
+            for idx, embedding in zip(pending, self._extract_embeddings_from_response(response, count=len(pending))):
+                out[idx] = embedding
+        return out
+
+    def _generate_embedding(self, text: str) -> list[float] | None:
+        if not self.semantic_enabled:
+            return None
+        clean = str(text or "").strip()
+        if not clean:
+            return None
+        return self._embedding_service.embed(clean)
+
+    def _generate_embeddings(self, texts: list[str]) -> list[list[float] | None]:
+        if not self.semantic_enabled:
+            return [None] * len(texts)
+        return self._embedding_service.embed_many(texts)
 
     @classmethod
     def _cosine_similarity(cls, left: list[float], right: list[float]) -> float:
@@ -2560,29 +2851,65 @@ class MemoryStore:
         return dot / math.sqrt(left_norm * right_norm)
 
     def _append_embedding(self, *, record_id: str, embedding: list[float], created_at: str, source: str) -> None:
-        payload = {
-            "id": str(record_id or ""),
-            "embedding": embedding,
-            "created_at": str(created_at or ""),
-            "source": str(source or ""),
-        }
+        self._append_embeddings([(record_id, embedding, created_at, source)])
+
+    def _append_embeddings(self, entries: list[tuple[str, list[float], str, str]]) -> None:
+        """Append ``(record_id, embedding, created_at, source)`` rows with one fsync per file."""
+        if not entries:
+            return
+        lines: list[str] = []
         with self._locked_file(self.embeddings_path, "a", exclusive=True) as fh:
-            fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            if self.embedding_format != "json":
+                locations = append_sidecar_vectors(
+                    self.embedding_vectors_path,
+                    [embedding for _record_id, embedding, _created_at, _source in entries],
+                    fsync=self._flush_and_fsync,
+                )
+            else:
+                locations = [None] * len(entries)
+            for (record_id, embedding, created_at, source), located in zip(entries, locations):
+                payload: dict[str, Any] = {"id": str(record_id or "")}
+                if located is None:
+                    payload["embedding"] = embedding
+                else:
+                    payload["offset"], payload["dim"] = located
+                payload["created_at"] = str(created_at or "")
+                payload["source"] = str(source or "")
+                lines.append(json.dumps(payload, ensure_ascii=False) + "\n")
+            fh.write("".join(lines))
             self._flush_and_fsync(fh)
-        try:
-            self.backend.upsert_embedding(
-                str(record_id or ""),
-                list(embedding),
-                str(created_at or ""),
-                str(source or ""),
-            )
-        except Exception:
-            pass
+        self._embedding_write_generation += 1
+        upsert_many = getattr(self.backend, "upsert_embeddings", None)
+        if callable(upsert_many) and len(entries) > 1:
+            try:
+                upsert_many([(str(rid or ""), list(vec), str(ts or ""), str(src or "")) for rid, vec, ts, src in entries])
+            except Exception:
+                pass
+            return
+        for record_id, embedding, created_at, source in entries:
+            try:
+                self.backend.upsert_embedding(
+                    str(record_id or ""),
+                    list(embedding),
+                    str(created_at or ""),
+                    str(source or ""),
+                )
+            except Exception:
+                pass
 
-    def _read_embeddings_map(self) -> dict[str, list[float]]:
-        out: dict[str, list[float]] = {}
+    def _read_embedding_entries(self) -> dict[str, dict[str, Any]]:
+        """Read ``embeddings.jsonl`` (last entry per id wins) with vectors resolved.
+
+        Lines either carry the vector inline (``embedding``, legacy/``json``
+        format) or point into the ``.f32`` sidecar via ``offset``/``dim``;
+        sidecar vectors are returned as zero-copy views when NumPy is present.
+        """
         with self._locked_file(self.embeddings_path, "r", exclusive=False) as fh:
-            lines = fh.read().splitlines()
+            return self._read_embedding_entries_unlocked(fh.read().splitlines())
+
+    def _read_embedding_entries_unlocked(self, lines: list[str]) -> dict[str, dict[str, Any]]:
+        sidecar: SidecarReader | None = None
+        out: dict[str, dict[str, Any]] = {}
         for line in lines:
             raw = line.strip()
             if not raw:
@@ -2596,10 +2923,23 @@ class MemoryStore:
             row_id = str(payload.get("id", "")).strip()
             if not row_id:
                 continue
-            embedding = self._normalize_embedding(payload.get("embedding"))
-            if embedding is None:
+            if "offset" in payload:
+                if sidecar is None:
+                    sidecar = SidecarReader(self.embedding_vectors_path)
+                vector = sidecar.vector(payload.get("offset"), payload.get("dim"))
+            else:
+                vector = self._normalize_embedding(payload.get("embedding"))
+            if vector is None:
                 continue
-            out[row_id] = embedding
+            payload["embedding"] = vector
+            out[row_id] = payload
+        return out
+
+    def _read_embeddings_map(self) -> dict[str, list[float]]:
+        return {row_id: vector_to_list(vector) for row_id, vector in self._read_embedding_vectors().items()}
+
+    def _read_embedding_vectors(self) -> dict[str, Any]:
+        out: dict[str, Any] = {row_id: payload["embedding"] for row_id, payload in self._read_embedding_entries().items()}
         try:
             backend_embeddings = self.backend.fetch_embeddings(limit=20000)
             if isinstance(backend_embeddings, dict):
@@ -2613,6 +2953,76 @@ class MemoryStore:
             pass
         return out
 
+    def migrate_embedding_storage(self, *, embedding_format: str | None = None) -> dict[str, Any]:
+        """Rewrite stored embeddings in ``embedding_format`` (defaults to the configured one).
+
+        The file store is compacted into a fresh ``.f32`` sidecar (or back to
+        inline JSON for ``json``), dropping superseded vectors; the backend
+        re-encodes its rows when it supports it.
+        """
+        target = normalize_embedding_format(embedding_format or self.embedding_format)
+
+        def _size(path: Path) -> int:
+            try:
+                return path.stat().st_size
+            except OSError:
+                return 0
+
+        bytes_before = _size(self.embeddings_path) + _size(self.embedding_vectors_path)
+        with self._locked_file(self.embeddings_path, "r+", exclusive=True) as fh:
+            entries = self._read_embedding_entries_unlocked(fh.read().splitlines())
+            lines: list[str] = []
+            sidecar_tmp = self.embedding_vectors_path.with_name(self.embedding_vectors_path.name + ".tmp")
+            offset = 0
+            with sidecar_tmp.open("wb") as vectors_fh:
+                for row_id, payload in entries.items():
+                    vector = vector_to_list(payload["embedding"])
+                    row: dict[str, Any] = {"id": row_id}
+                    if target == "json":
+                        row["embedding"] = vector
+                    else:
+                        blob = pack_float32(vector)
+                        vectors_fh.write(blob)
+                        row["offset"], row["dim"] = offset, len(vector)
+                        offset += len(blob)
+                    row["created_at"] = str(payload.get("created_at", "") or "")
+                    row["source"] = str(payload.get("source", "") or "")
+                    lines.append(json.dumps(row, ensure_ascii=False))
+                self._flush_and_fsync(vectors_fh)
+            if offset:
+                os.replace(sidecar_tmp, self.embedding_vectors_path)
+            else:
+                sidecar_tmp.unlink(missing_ok=True)
+                self.embedding_vectors_path.unlink(missing_ok=True)
+            fh.seek(0)
+            fh.truncate()
+            if lines:
+                fh.write("\n".join(lines) + "\n")
+            self._flush_and_fsync(fh)
+        self.embedding_format = target
+        self._embedding_write_generation += 1
+
+        backend_payload: dict[str, Any] = {"supported": False}
+        migrate_fn = getattr(self.backend, "migrate_embedding_storage", None)
+        if callable(migrate_fn):
+            try:
+                backend_payload = {"supported": True, **dict(migrate_fn(target))}
+            except Exception as exc:
+                self._diagnostics["last_error"] = str(exc)
+                backend_payload = {"supported": True, "ok": False, "error": str(exc)}
+        return {
+            "ok": bool(backend_payload.get("ok", True)),
+            "format": target,
+            "file": {
+                "rows": len(entries),
+                "bytes_before": bytes_before,
+                "bytes_after": _size(self.embeddings_path) + _size(self.embedding_vectors_path),
+                "index_path": str(self.embeddings_path),
+                "vectors_path": str(self.embedding_vectors_path),
+            },
+            "backend": backend_payload,
+        }
+
     def _prune_embeddings_for_ids(self, removed_ids: set[str]) -> int:
         removed = _prune_jsonl_records_for_ids_helper(
             path=self.embeddings_path,
@@ -2620,14 +3030,57 @@ class MemoryStore:
             locked_file=self._locked_file,
             flush_and_fsync=self._flush_and_fsync,
         )
+        self._embedding_write_generation += 1
         try:
             self.backend.delete_embeddings(list(removed_ids))
         except Exception:
             pass
         return removed
 
-    def backfill_embeddings(self, *, limit: int | None = None) -> dict[str, int | bool]:
+    def _embedding_matrix_signature_now(self) -> tuple[Any, ...]:
+        try:
+            stat = self.embeddings_path.stat()
+            file_signature: tuple[int, int, int] | None = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            file_signature = None
+        return (file_signature, self._embedding_write_generation)
+
+    def _embedding_matrices_snapshot(self) -> dict[int, EmbeddingMatrix]:
+        signature = self._embedding_matrix_signature_now()
+        with self._embedding_matrix_lock:
+            if self._embedding_matrices is not None and signature == self._embedding_matrix_signature:
+                return self._embedding_matrices
+        matrices = EmbeddingMatrix.group_by_dimension(self._read_embedding_vectors().items())
+        with self._embedding_matrix_lock:
+            self._embedding_matrices = matrices
+            self._embedding_matrix_signature = signature
+        return matrices
+
+    def _embedding_similarity_scores(self, query_embedding: list[float], record_ids: list[str]) -> dict[str, float] | None:
+        matrices = self._embedding_matrices_snapshot()
+        if not matrices:
+            return None
+        matrix = matrices.get(len(query_embedding))
+        if matrix is None:
+            return {}
+        return matrix.scores(query_embedding, record_ids)
+
+    def backfill_embeddings(
+        self,
+        *,
+        limit: int | None = None,
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> dict[str, int | bool]:
+        """Embed every record that has no embedding yet, in provider-sized batches.
+
+        Pending rows are split into batches of ``batch_size`` texts (default:
+        the embedding service's batch size) and up to ``concurrency`` batches
+        are embedded at once. Each finished batch is appended with a single
+        fsync, so a crash loses at most the batches still in flight.
+        """
         total_rows = len(self.all()) + len(self.curated())
+        bounded_limit = max(1, int(limit)) if limit is not None else None
         if not self.semantic_enabled:
             return {
                 "enabled": False,
@@ -2636,10 +3089,9 @@ class MemoryStore:
                 "created": 0,
                 "skipped_existing": 0,
                 "failed": 0,
-                "limit": max(1, int(limit)) if limit is not None else 0,
+                "limit": bounded_limit or 0,
             }
 
-        bounded_limit = max(1, int(limit)) if limit is not None else None
         records = self.curated() + self.all()
         seen_record_ids: set[str] = set()
         try:
@@ -2649,11 +3101,8 @@ class MemoryStore:
             existing_embeddings = {}
         embedded_ids = set(existing_embeddings.keys())
 
-        processed = 0
-        created = 0
         skipped_existing = 0
-        failed = 0
-
+        pending: list[MemoryRecord] = []
         for row in records:
             row_id = str(row.id or "").strip()
             if not row_id or row_id in seen_record_ids:
@@ -2662,31 +3111,42 @@ class MemoryStore:
             if row_id in embedded_ids:
                 skipped_existing += 1
                 continue
-            if bounded_limit is not None and created >= bounded_limit:
-                break
+            if bounded_limit is None or len(pending) < bounded_limit:
+                pending.append(row)
 
-            processed += 1
-            try:
-                embedding = self._generate_embedding(str(row.text or ""))
-                if embedding is None:
-                    failed += 1
+        step = max(1, int(batch_size or self._embedding_service.batch_size))
+        workers = max(1, int(concurrency or self._embedding_service.concurrency))
+        batches = [pending[idx : idx + step] for idx in range(0, len(pending), step)]
+        created = 0
+        failed = 0
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clawlite-embed-backfill") as pool:
+            futures = [pool.submit(self._generate_embeddings, [str(row.text or "") for row in batch]) for batch in batches]
+            for batch, future in zip(batches, futures):
+                try:
+                    embeddings = future.result()
+                except Exception as exc:
+                    self._diagnostics["last_error"] = str(exc)
+                    failed += len(batch)
                     continue
-                self._append_embedding(
-                    record_id=row_id,
-                    embedding=embedding,
-                    created_at=str(row.created_at or ""),
-                    source=str(row.source or ""),
-                )
-                embedded_ids.add(row_id)
-                created += 1
-            except Exception as exc:
-                self._diagnostics["last_error"] = str(exc)
-                failed += 1
+                entries = []
+                for row, embedding in zip(batch, embeddings):
+                    if embedding is None:
+                        failed += 1
+                        continue
+                    entries.append((str(row.id), embedding, str(row.created_at or ""), str(row.source or "")))
+                try:
+                    self._append_embeddings(entries)
+                except Exception as exc:
+                    self._diagnostics["last_error"] = str(exc)
+                    failed += len(entries)
+                    continue
+                created += len(entries)
 
         return {
             "enabled": True,
             "total_records": len(seen_record_ids),
-            "processed": processed,
+            "processed": len(pending),
             "created": created,
             "skipped_existing": skipped_existing,
             "failed": failed,
@@ -2974,43 +3434,23 @@ class MemoryStore:
         return (adjusted_importance, mentions, session_count, last_seen, created, text, rid)
 
     def _prune_history(self) -> None:
-        with self._locked_file(self.history_path, "r+", exclusive=True) as fh:
+        sections: list[tuple[Any, Any]] = []
+        with self._stamping_locked_file(sections)(self.history_path, "r+", exclusive=True) as fh:
             lines = fh.read().splitlines()
-            if len(lines) <= self._MAX_HISTORY_RECORDS:
+            if len(lines) > self._MAX_HISTORY_RECORDS:
+                # Trimmed rows leave the lexical index for a resync.
+                kept = lines[-self._MAX_HISTORY_RECORDS :]
+                fh.seek(0)
+                fh.truncate()
+                fh.write("\n".join(kept) + "\n")
+                self._flush_and_fsync(fh)
                 return
-            kept = lines[-self._MAX_HISTORY_RECORDS :]
-            fh.seek(0)
-            fh.truncate()
-            fh.write("\n".join(kept) + "\n")
-            self._flush_and_fsync(fh)
+        self._advance_lexical_index(self.history_path, sections)
 
     def _read_curated_facts(self) -> list[dict[str, object]]:
         if self.curated_path is None:
             return []
-        with self._locked_file(self.curated_path, "r", exclusive=False) as fh:
-            raw = fh.read().strip()
-        if not raw:
-            return []
-        try:
-            payload = json.loads(raw)
-        except json.JSONDecodeError:
-            return []
-        if not isinstance(payload, dict):
-            return []
-        facts = payload.get("facts", [])
-        if not isinstance(facts, list):
-            return []
-        out: list[dict[str, object]] = []
-        for row in facts:
-            if not isinstance(row, dict):
-                continue
-            normalized = self._normalize_curated_fact(row)
-            if normalized is None:
-                continue
-            category = str(normalized.get("category", "context") or "context")
-            normalized["text"] = self._decrypt_text_for_category(str(normalized.get("text", "") or ""), category)
-            out.append(normalized)
-        return out
+        return self._read_curated_facts_from(self.curated_path)
 
     def _write_curated_facts(self, facts: list[dict[str, object]]) -> None:
         if self.curated_path is None:
@@ -3031,6 +3471,14 @@ class MemoryStore:
         self._atomic_write_text_locked(self.curated_path, encoded + "\n")
 
     def _read_curated_facts_from(self, curated_path: Path) -> list[dict[str, object]]:
+        return self._record_cache.get(
+            "curated",
+            curated_path,
+            lambda: self._load_curated_facts_from(curated_path),
+            clone=self._clone_curated_fact,
+        )
+
+    def _load_curated_facts_from(self, curated_path: Path) -> list[dict[str, object]]:
         with self._locked_file(curated_path, "r", exclusive=False) as fh:
             raw = fh.read().strip()
         if not raw:
@@ -3073,12 +3521,115 @@ class MemoryStore:
         self._atomic_write_text_locked(curated_path, encoded + "\n")
 
     def _read_history_records_from(self, history_path: Path) -> list[MemoryRecord]:
-        return _read_history_records_from_helper(
+        return self._record_cache.get(
+            "history",
+            history_path,
+            lambda: self._load_history_records_from(history_path),
+            clone=self._clone_record,
+        )
+
+    def _load_history_records_from(self, history_path: Path) -> list[MemoryRecord]:
+        stale: list[str] = []
+        rows = _read_history_records_from_helper(
             history_path=history_path,
             locked_file=self._locked_file,
-            record_from_payload=self._record_from_payload,
+            record_from_payload=self._record_from_payload_tracking_stale(stale),
             decrypt_text_for_category=self._decrypt_text_for_category,
         )
+        if stale:
+            self._schedule_privacy_migration(history_path, stale)
+        return rows
+
+    def _record_from_payload_tracking_stale(self, stale: list[str]) -> Callable[[dict[str, Any]], MemoryRecord | None]:
+        """``_record_from_payload`` that also collects ids stored under an older cipher."""
+        categories = _encrypted_categories_helper(self._privacy_settings())
+
+        def _from_payload(payload: dict[str, Any]) -> MemoryRecord | None:
+            row = self._record_from_payload(payload)
+            if row is not None and categories and _needs_reencryption_helper(row.text, row.category, categories=categories):
+                stale.append(row.id)
+            return row
+
+        return _from_payload
+
+    def _schedule_privacy_migration(self, history_path: Path, record_ids: list[str]) -> None:
+        """Re-encrypt rows stored under an older scheme in a background thread."""
+        key = str(history_path)
+        with self._privacy_migrations_lock:
+            running = self._privacy_migrations.get(key)
+            if running is not None and running.is_alive():
+                return
+            thread = threading.Thread(
+                target=self._reencrypt_history_path,
+                args=(history_path, list(record_ids)),
+                name="clawlite-privacy-migrate",
+                daemon=True,
+            )
+            self._privacy_migrations[key] = thread
+            thread.start()
+
+    def _reencrypt_history_path(self, history_path: Path, record_ids: list[str]) -> int:
+        settings = self._privacy_settings()
+        sections: list[tuple[Any, Any]] = []
+        try:
+            count = _reencrypt_history_records_helper(
+                history_path=history_path,
+                record_ids=record_ids,
+                locked_file=self._stamping_locked_file(sections),
+                flush_and_fsync=self._flush_and_fsync,
+                history_index=self._history_indexes.get(history_path),
+                reencrypt_text=lambda text, category: self._reencrypt_stored_text(text, category, settings=settings),
+            )
+        except Exception as exc:
+            self._diagnostics["last_error"] = str(exc)
+            return 0
+        self._advance_lexical_index(history_path, sections)
+        if not count:
+            return 0
+        self._diagnostics["privacy_reencrypted"] = int(self._diagnostics.get("privacy_reencrypted", 0) or 0) + count
+        return count
+
+    def _wait_for_privacy_migrations(self) -> None:
+        with self._privacy_migrations_lock:
+            pending = list(self._privacy_migrations.values())
+            self._privacy_migrations.clear()
+        for thread in pending:
+            thread.join()
+
+    def _read_history_records_by_ids(self, history_path: Path, record_ids: list[str]) -> list[MemoryRecord] | None:
+        history_index = self._history_indexes.get(history_path)
+        for attempt in range(2):
+            rows = _read_history_records_by_ids_helper(
+                history_path=history_path,
+                record_ids=record_ids,
+                locked_file=self._locked_file,
+                history_index=history_index,
+                record_from_payload=self._record_from_payload,
+                decrypt_text_for_category=self._decrypt_text_for_category,
+            )
+            if rows is not None or attempt:
+                return rows
+            sections: list[tuple[Any, Any]] = []
+            _sync_history_index_helper(
+                history_path=history_path,
+                locked_file=self._stamping_locked_file(sections),
+                history_index=history_index,
+            )
+            self._advance_lexical_index(history_path, sections)
+        return None
+
+    @staticmethod
+    def _clone_record(row: MemoryRecord) -> MemoryRecord:
+        return replace(row, metadata=dict(row.metadata))
+
+    @staticmethod
+    def _clone_curated_fact(row: dict[str, object]) -> dict[str, object]:
+        clone = dict(row)
+        if isinstance(clone.get("sessions"), list):
+            clone["sessions"] = list(clone["sessions"])
+        if isinstance(clone.get("metadata"), dict):
+            clone["metadata"] = dict(clone["metadata"])
+        return clone
 
     @staticmethod
     def _source_session_key(source: str) -> str:
@@ -3176,18 +3727,12 @@ class MemoryStore:
 
     @classmethod
     def _recency_score(cls, created_at: str, *, now: datetime | None = None) -> float:
-        stamp = cls._parse_iso_timestamp(created_at)
-        if stamp.year <= 1:
-            return 0.0
-        if stamp.tzinfo is None:
-            stamp = stamp.replace(tzinfo=timezone.utc)
-        ref_now = now or datetime.now(timezone.utc)
-        age_seconds = max(0.0, float((ref_now - stamp).total_seconds()))
-        half_life_seconds = cls._RECENCY_HALF_LIFE_HOURS * 3600.0
-        if half_life_seconds <= 0.0:
-            return 0.0
-        score = cls._RECENCY_MAX_BOOST * math.exp(-age_seconds / half_life_seconds)
-        return max(0.0, min(cls._RECENCY_MAX_BOOST, round(score, 6)))
+        return _recency_score_at(
+            _timestamp_epoch(created_at, parse_iso_timestamp=cls._parse_iso_timestamp),
+            now.timestamp() if now is not None else time.time(),
+            half_life_hours=cls._RECENCY_HALF_LIFE_HOURS,
+            max_boost=cls._RECENCY_MAX_BOOST,
+        )
 
     @classmethod
     def _memory_is_temporally_relevant(cls, text: str, created_at: str) -> bool:
@@ -3288,7 +3833,7 @@ class MemoryStore:
             reinforced_decay = self._normalize_decay_rate(min(existing_decay, incoming_decay) * 0.9, default=min(existing_decay, incoming_decay))
         else:
             reinforced_decay = self._normalize_decay_rate(existing_decay or incoming_decay, default=0.0)
-        return MemoryRecord(
+        reinforced = MemoryRecord(
             id=str(existing.id or incoming.id or uuid.uuid4().hex),
             text=text,
             source=str(existing.source or incoming.source or "user"),
@@ -3309,6 +3854,7 @@ class MemoryStore:
             happened_at=str(existing.happened_at or incoming.happened_at or ""),
             metadata=metadata,
         )
+        return self._attach_rank_features(reinforced)
 
     def _append_or_reinforce_history_record(
         self,
@@ -3320,7 +3866,8 @@ class MemoryStore:
         source: str,
         reinforced_at: str,
     ) -> tuple[MemoryRecord, bool]:
-        return _append_or_reinforce_history_record_helper(
+        sections: list[tuple[Any, Any]] = []
+        result = _append_or_reinforce_history_record_helper(
             history_path=history_path,
             record=record,
             content_hash=content_hash,
@@ -3328,7 +3875,7 @@ class MemoryStore:
             source=source,
             reinforced_at=reinforced_at,
             ensure_file=lambda path: self._ensure_file(path, default=""),
-            locked_file=self._locked_file,
+            locked_file=self._stamping_locked_file(sections),
             flush_and_fsync=self._flush_and_fsync,
             record_from_payload=self._record_from_payload,
             decrypt_text_for_category=self._decrypt_text_for_category,
@@ -3336,18 +3883,96 @@ class MemoryStore:
             record_scope_key=self._record_scope_key,
             reinforce_record=self._reinforce_record,
             stored_history_payload_fn=self._stored_history_payload,
+            history_index=self._history_indexes.get(history_path),
         )
+        self._advance_lexical_index(history_path, sections, upserts=[result[0]])
+        if not result[1]:
+            self._schedule_history_compaction(history_path)
+        return result
 
     def _upsert_history_record_by_id(self, history_path: Path, record: MemoryRecord, *, append_if_missing: bool = False) -> bool:
-        return _upsert_history_record_by_id_helper(
+        sections: list[tuple[Any, Any]] = []
+        updated = _upsert_history_record_by_id_helper(
             history_path=history_path,
             record=record,
             append_if_missing=append_if_missing,
             ensure_file=lambda path: self._ensure_file(path, default=""),
-            locked_file=self._locked_file,
+            locked_file=self._stamping_locked_file(sections),
             flush_and_fsync=self._flush_and_fsync,
             stored_history_payload_fn=self._stored_history_payload,
+            history_index=self._history_indexes.get(history_path),
         )
+        self._advance_lexical_index(history_path, sections, upserts=[record] if updated else ())
+        self._schedule_history_compaction(history_path)
+        return updated
+
+    def _schedule_history_compaction(self, history_path: Path) -> None:
+        """Reclaim tombstoned space in a background thread once it dominates the file."""
+        index = self._history_indexes.peek(history_path)
+        if index is None or not index.needs_compaction():
+            return
+        key = str(history_path)
+        with self._history_compactions_lock:
+            running = self._history_compactions.get(key)
+            if running is not None and running.is_alive():
+                return
+            thread = threading.Thread(
+                target=self._compact_history_path,
+                args=(history_path,),
+                name="clawlite-history-compact",
+                daemon=True,
+            )
+            self._history_compactions[key] = thread
+            thread.start()
+
+    def _compact_history_path(self, history_path: Path) -> dict[str, int]:
+        try:
+            sections: list[tuple[Any, Any]] = []
+            stats = _compact_history_file_helper(
+                history_path=history_path,
+                locked_file=self._stamping_locked_file(sections),
+                flush_and_fsync=self._flush_and_fsync,
+                history_index=self._history_indexes.get(history_path),
+                fsync_parent_dir=self._fsync_parent_dir,
+            )
+        except Exception as exc:
+            self._diagnostics["last_error"] = str(exc)
+            return {"before_bytes": 0, "after_bytes": 0, "dropped_lines": 0}
+        self._advance_lexical_index(history_path, sections)
+        self._diagnostics["history_compactions"] = int(self._diagnostics.get("history_compactions", 0) or 0) + 1
+        return stats
+
+    def compact_history(self, *, wait: bool = True) -> dict[str, Any]:
+        """Compact the history log plus every scoped log touched by this store.
+
+        Waits for in-flight background compactions first so two passes never
+        interleave on the same file.
+        """
+        with self._history_compactions_lock:
+            pending = list(self._history_compactions.values())
+            self._history_compactions.clear()
+        if wait:
+            for thread in pending:
+                thread.join()
+        paths = {str(self.history_path): self.history_path}
+        for index in self._history_indexes.indexes():
+            paths.setdefault(str(index.history_path), index.history_path)
+        files: list[dict[str, Any]] = []
+        for key in sorted(paths):
+            stats = self._compact_history_path(paths[key])
+            files.append({"path": key, **stats})
+        return {
+            "ok": True,
+            "files": files,
+            "reclaimed_bytes": sum(max(0, item["before_bytes"] - item["after_bytes"]) for item in files),
+        }
+
+    def _history_index_key(self, payload: dict[str, Any]) -> tuple[str, str] | None:
+        row = self._record_from_payload(payload)
+        if row is None:
+            return None
+        row.text = self._decrypt_text_for_category(str(row.text or ""), row.category)
+        return self._record_scope_key(row), self._record_content_hash(row)
 
     def _upsert_item_layer(self, record: MemoryRecord) -> None:
         _upsert_item_layer_helper(
@@ -3450,12 +4075,27 @@ class MemoryStore:
         return deleted
 
     def _prune_history_records_for_ids(self, history_path: Path, record_ids: set[str]) -> int:
-        return _prune_jsonl_records_for_ids_helper(
+        sections: list[tuple[Any, Any]] = []
+        deleted = _tombstone_history_records_helper(
+            history_path=history_path,
+            record_ids=record_ids,
+            locked_file=self._stamping_locked_file(sections),
+            flush_and_fsync=self._flush_and_fsync,
+            history_index=self._history_indexes.get(history_path),
+        )
+        if deleted is not None:
+            self._advance_lexical_index(history_path, sections, discards=record_ids)
+            self._diagnostics["history_tombstones"] = int(self._diagnostics.get("history_tombstones", 0) or 0) + deleted
+            self._schedule_history_compaction(history_path)
+            return deleted
+        deleted = _prune_jsonl_records_for_ids_helper(
             path=history_path,
             record_ids=record_ids,
-            locked_file=self._locked_file,
+            locked_file=self._stamping_locked_file(sections),
             flush_and_fsync=self._flush_and_fsync,
         )
+        self._advance_lexical_index(history_path, sections, discards=record_ids)
+        return deleted
 
     def _prune_curated_facts_for_ids(self, curated_path: Path | None, record_ids: set[str]) -> int:
         return _prune_curated_facts_for_ids_helper(
@@ -3555,7 +4195,7 @@ class MemoryStore:
         return _get_resource_records_helper(
             backend=self.backend,
             resource_id=resource_id,
-            fetch_record_by_id_fn=self._fetch_record_by_id,
+            fetch_records_by_ids_fn=self._fetch_records_by_ids,
         )
 
     def _fetch_record_by_id(self, record_id: str) -> "MemoryRecord | None":
@@ -3566,6 +4206,14 @@ class MemoryStore:
             memory_record_cls=MemoryRecord,
         )
 
+    def _fetch_records_by_ids(self, record_ids: list[str]) -> list["MemoryRecord"]:
+        return _fetch_records_by_ids_helper(
+            backend=self.backend,
+            record_ids=record_ids,
+            item_layer_value=MemoryLayer.ITEM.value,
+            memory_record_cls=MemoryRecord,
+        )
+
     # ------------------------------------------------------------------
     # TTL
     # ------------------------------------------------------------------
@@ -3652,6 +4300,7 @@ class MemoryStore:
             metadata_content_hash=self._metadata_content_hash,
             memory_content_hash=self._memory_content_hash,
         )
+        self._attach_rank_features(row)
 
         if scoped:
             clean_user = str(row.user_id or "default")
@@ -3716,14 +4365,26 @@ class MemoryStore:
         )
 
     def _read_history_records(self) -> list[MemoryRecord]:
-        return _read_history_records_helper(
+        return self._record_cache.get(
+            "history",
+            self.history_path,
+            self._load_history_records,
+            clone=self._clone_record,
+        )
+
+    def _load_history_records(self) -> list[MemoryRecord]:
+        stale: list[str] = []
+        rows = _read_history_records_helper(
             history_path=self.history_path,
             locked_file=self._locked_file,
-            record_from_payload=self._record_from_payload,
+            record_from_payload=self._record_from_payload_tracking_stale(stale),
             decrypt_text_for_category=self._decrypt_text_for_category,
             repair_history_file_fn=self._repair_history_file,
             diagnostics=self._diagnostics,
         )
+        if stale:
+            self._schedule_privacy_migration(self.history_path, stale)
+        return rows
 
     def _repair_history_file(self, valid_lines: list[str]) -> None:
         _repair_history_file_helper(
@@ -3850,6 +4511,20 @@ class MemoryStore:
             ensure_scope_paths=self._ensure_scope_paths,
         )
 
+    def _curated_records(self, rows: list[dict[str, Any]], *, user_id: str) -> list[MemoryRecord]:
+        return _curated_records_helper(
+            rows,
+            record_cls=MemoryRecord,
+            user_id=user_id,
+            normalize_layer=self._normalize_layer,
+            normalize_reasoning_layer=self._normalize_reasoning_layer,
+            normalize_confidence=self._normalize_confidence,
+            normalize_decay_rate=self._normalize_decay_rate,
+            default_decay_rate=self._default_decay_rate,
+            normalize_memory_type=self._normalize_memory_type,
+            normalize_memory_metadata=self._normalize_memory_metadata,
+        )
+
     def _collect_retrieval_records(
         self,
         *,
@@ -3859,6 +4534,7 @@ class MemoryStore:
         reasoning_layers: Iterable[str] | None,
         min_confidence: float | None,
         filters: dict[str, Any] | None,
+        candidate_ids: list[str] | None = None,
     ) -> tuple[list[MemoryRecord], dict[str, float], dict[str, int], list[dict[str, Path]], bool]:
         return _collect_retrieval_records_helper(
             user_id=user_id,
@@ -3875,21 +4551,12 @@ class MemoryStore:
             shared_root=self.shared_path,
             read_curated_facts_from=self._read_curated_facts_from,
             read_history_records_from=self._read_history_records_from,
-            curated_records_fn=lambda rows, *, user_id: _curated_records_helper(
-                rows,
-                record_cls=MemoryRecord,
-                user_id=user_id,
-                normalize_layer=self._normalize_layer,
-                normalize_reasoning_layer=self._normalize_reasoning_layer,
-                normalize_confidence=self._normalize_confidence,
-                normalize_decay_rate=self._normalize_decay_rate,
-                default_decay_rate=self._default_decay_rate,
-                normalize_memory_type=self._normalize_memory_type,
-                normalize_memory_metadata=self._normalize_memory_metadata,
-            ),
+            curated_records_fn=self._curated_records,
             apply_retrieval_filters=self._apply_retrieval_filters,
             working_episode_visible_in_session=self._working_episode_visible_in_session,
             semantic_enabled=self.semantic_enabled,
+            candidate_ids=candidate_ids,
+            read_history_records_by_ids=self._read_history_records_by_ids,
         )
 
     @classmethod
@@ -3982,7 +4649,10 @@ class MemoryStore:
             collect_retrieval_records=self._collect_retrieval_records,
             retrieve_category_hits=self._retrieve_category_hits,
             evaluate_retrieval_sufficiency=self._evaluate_retrieval_sufficiency,
-            rank_records=self._rank_records,
+            rank_records=functools.partial(
+                self._rank_records,
+                lexical_index=self._search_lexical_corpus(user_id, include_shared=include_shared),
+            ),
             serialize_hit=self._serialize_hit,
             retrieve_resource_hits=self._retrieve_resource_hits,
             synthesize_visible_episode_digest=self._synthesize_visible_episode_digest,
@@ -4056,6 +4726,7 @@ class MemoryStore:
         limit: int,
         semantic_enabled: bool,
         session_id: str = "",
+        lexical_index: LexicalCorpus | None = None,
     ) -> list[MemoryRecord]:
         return _rank_records_helper(
             query,
@@ -4093,6 +4764,30 @@ class MemoryStore:
             temporal_intent_match_boost=self._TEMPORAL_INTENT_MATCH_BOOST,
             temporal_intent_miss_penalty=self._TEMPORAL_INTENT_MISS_PENALTY,
             bm25_class=BM25Okapi,
+            similarity_scores=self._embedding_similarity_scores,
+            lexical_index=lexical_index,
+            row_rank_terms=self._row_rank_terms,
+        )
+
+    @staticmethod
+    def _retrieval_scope_key(
+        *,
+        user_id: str,
+        include_shared: bool,
+        reasoning_layers: Iterable[str] | None,
+        min_confidence: float | None,
+        filters: dict[str, Any] | None,
+    ) -> str:
+        return json.dumps(
+            [
+                user_id,
+                bool(include_shared),
+                sorted(str(item) for item in reasoning_layers) if reasoning_layers is not None else None,
+                min_confidence,
+                filters or {},
+            ],
+            sort_keys=True,
+            default=str,
         )
 
     def search(
@@ -4107,7 +4802,28 @@ class MemoryStore:
         min_confidence: float | None = None,
         filters: dict[str, Any] | None = None,
     ) -> list[MemoryRecord]:
-        return _search_records_helper(
+        cache_key = stamp = None
+        if self._search_cache.enabled:
+            clean_user = self._normalize_user_id(user_id or "default")
+            cache_key = (
+                " ".join(str(query or "").split()),
+                max(1, int(limit or 1)),
+                str(session_id or ""),
+                self.search_candidates,
+                self.semantic_enabled,
+                self._retrieval_scope_key(
+                    user_id=clean_user,
+                    include_shared=include_shared,
+                    reasoning_layers=reasoning_layers,
+                    min_confidence=min_confidence,
+                    filters=filters,
+                ),
+            )
+            stamp = self._search_cache_stamp(clean_user, include_shared=include_shared)
+            cached = self._search_cache.get(cache_key, stamp)
+            if cached is not None:
+                return [self._clone_record(row) for row in cached]
+        found = _search_records_helper(
             query,
             limit=limit,
             user_id=user_id,
@@ -4119,7 +4835,133 @@ class MemoryStore:
             normalize_user_id=self._normalize_user_id,
             collect_retrieval_records=self._collect_retrieval_records,
             rank_records_fn=self._rank_records,
+            lexical_index_fn=self._search_lexical_corpus,
+            candidate_ids_fn=self._search_candidate_ids,
         )
+        if cache_key is not None:
+            self._search_cache.put(cache_key, stamp, [self._clone_record(row) for row in found])
+        return found
+
+    def _search_cache_stamp(self, clean_user: str, *, include_shared: bool) -> tuple[Any, ...]:
+        """Write generations and file signatures a cached search result must still match.
+
+        Store-wide files (privacy settings, embeddings) affect every scope.
+        Scoped writes are mirrored into the default history, so only default
+        searches depend on it. File signatures catch writes made by other
+        processes.
+        """
+        scopes = ["store", clean_user if clean_user == "default" else f"user:{clean_user}"]
+        paths = [self._scope_paths(user_id=clean_user)]
+        extra = [self.privacy_path, self.embeddings_path]
+        if clean_user != "default" and include_shared:
+            scopes.append("shared")
+            paths.append(self._scope_paths(shared=True))
+            extra.append(self.shared_optin_path)
+        signatures = tuple(_stat_signature(scope[name]) for scope in paths for name in ("history", "curated"))
+        return (self._search_cache.generations(scopes), signatures + tuple(_stat_signature(path) for path in extra))
+
+    def _search_candidate_ids(self, query: str, *, user_id: str, include_shared: bool) -> list[str] | None:
+        """Candidate ids from the backend's text and vector indexes, or ``None`` for a full scan.
+
+        Only the default scope mirrors its items into the backend, and text in
+        encrypted categories is stored as ciphertext there, so every other
+        case ranks the whole history.
+        """
+        candidate_ids = None
+        if user_id == "default" and not self._privacy_settings().get("encrypted_categories"):
+            candidate_ids = _search_candidate_ids_helper(
+                query,
+                fanout=self.search_candidates,
+                tokens=self._tokens,
+                query_has_temporal_intent=self._query_has_temporal_intent,
+                search_text=lambda text, *, limit, match_any: self.backend.search_text(
+                    text,
+                    layer=MemoryLayer.ITEM.value,
+                    limit=limit,
+                    match_any=match_any,
+                ),
+                semantic_enabled=self.semantic_enabled,
+                generate_embedding=self._generate_embedding,
+                query_similar_embeddings=lambda query_embedding, limit: self.backend.query_similar_embeddings(
+                    query_embedding,
+                    limit=limit,
+                ),
+            )
+        key = "search_full_queries" if candidate_ids is None else "search_candidate_queries"
+        self._diagnostics[key] = int(self._diagnostics.get(key, 0) or 0) + 1
+        return candidate_ids
+
+    def _search_pool(self) -> ThreadPoolExecutor:
+        with self._search_executor_lock:
+            if self._search_executor is None:
+                self._search_executor = ThreadPoolExecutor(
+                    max_workers=self._SEARCH_MAX_WORKERS,
+                    thread_name_prefix="clawlite-memory-search",
+                )
+            return self._search_executor
+
+    def close(self) -> None:
+        """Join running privacy migrations and shut down the search worker pool.
+
+        The store stays usable: a later search starts a fresh pool.
+        """
+        self._wait_for_privacy_migrations()
+        with self._search_executor_lock:
+            executor = self._search_executor
+            self._search_executor = None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def search_async(
+        self,
+        query: str,
+        *,
+        limit: int = 5,
+        user_id: str = "",
+        session_id: str = "",
+        include_shared: bool = False,
+        reasoning_layers: Iterable[str] | None = None,
+        min_confidence: float | None = None,
+        filters: dict[str, Any] | None = None,
+        stop_event: asyncio.Event | None = None,
+    ) -> list[MemoryRecord]:
+        """Run :meth:`search` on the store's bounded worker pool, off the event loop.
+
+        Returns ``[]`` as soon as ``stop_event`` is set. A search still queued
+        behind the pool is dropped; one already running finishes in its worker
+        and its result is discarded.
+        """
+        if stop_event is not None and stop_event.is_set():
+            return []
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._search_pool(),
+            functools.partial(
+                self.search,
+                query,
+                limit=limit,
+                user_id=user_id,
+                session_id=session_id,
+                include_shared=include_shared,
+                reasoning_layers=reasoning_layers,
+                min_confidence=min_confidence,
+                filters=filters,
+            ),
+        )
+        if stop_event is None:
+            return await future
+        stop_waiter = asyncio.ensure_future(stop_event.wait())
+        try:
+            await asyncio.wait({future, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        finally:
+            stop_waiter.cancel()
+        if future.done():
+            return future.result()
+        future.cancel()
+        return []
 
     def _consolidate_in_scope(
         self,
@@ -4251,12 +5093,33 @@ class MemoryStore:
             read_curated_facts=self._read_curated_facts,
         )
 
+    def search_cache_snapshot(self) -> dict[str, int]:
+        return self._search_cache.snapshot()
+
     def diagnostics(self) -> dict[str, int | str | bool]:
         return _build_memory_diagnostics(
             diagnostics=self._diagnostics,
             backend_diagnostics=self._backend_diagnostics,
+            record_cache=self._record_cache.snapshot(),
+            decrypt_memo=self._decrypt_memo.snapshot(),
+            rank_features=self._rank_feature_memo.snapshot(),
+            search_cache=self._search_cache.snapshot(),
         )
 
+    def vector_index_status(self, *, rebuild: bool = False, nlist: int | None = None) -> dict[str, Any]:
+        """Report (and optionally retrain) the backend's approximate vector index."""
+        backend_name = str(getattr(self.backend, "name", self.memory_backend_name) or self.memory_backend_name)
+        rebuild_fn = getattr(self.backend, "rebuild_vector_index", None)
+        status_fn = getattr(self.backend, "vector_index_status", None)
+        if not callable(status_fn):
+            return {"ok": False, "backend": backend_name, "supported": False, "rebuilt": False}
+        if rebuild and callable(rebuild_fn):
+            payload = dict(rebuild_fn(nlist=nlist, min_rows=1))
+        else:
+            payload = {"ok": True, **status_fn()}
+        payload.update(backend=backend_name, supported=True, rebuilt=bool(rebuild))
+        return payload
+
     @staticmethod
     def _normalize_prefix(value: str) -> str:
         clean = str(value or "").strip().lower()
@@ -4321,6 +5184,114 @@ class MemoryStore:
             default_privacy=self._default_privacy,
         )
 
+    def export_stream(
+        self,
+        out_path: str | Path,
+        *,
+        compress: bool | None = None,
+        progress: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
+        """Stream :meth:`export_payload` content to NDJSON without materializing the history."""
+        checkpoints_raw = self.checkpoints_path.read_text(encoding="utf-8") if self.checkpoints_path.exists() else ""
+        history_rows = _iter_history_records_helper(
+            history_path=self.history_path,
+            locked_file=self._locked_file,
+            record_from_payload=self._record_from_payload,
+            decrypt_text_for_category=self._decrypt_text_for_category,
+        )
+        try:
+            return _export_memory_stream_helper(
+                out_path=Path(out_path),
+                history_rows=history_rows,
+                curated_rows=self.curated(),
+                checkpoints=self._parse_checkpoints(checkpoints_raw),
+                profile=self._load_json_dict(self.profile_path, self._default_profile()),
+                privacy=self._load_json_dict(self.privacy_path, self._default_privacy()),
+                exported_at=self._utcnow_iso(),
+                compress=compress,
+                progress=progress,
+            )
+        finally:
+            history_rows.close()
+
+    def import_stream(
+        self,
+        in_path: str | Path,
+        *,
+        resume: bool = True,
+        progress: Callable[[dict[str, Any]], None] | None = None,
+        user_id: str = "default",
+        shared: bool = False,
+    ) -> dict[str, Any]:
+        """Replace memory with an NDJSON export, staging history on disk and resuming interrupted runs.
+
+        ``user_id`` / ``shared`` pick the scope whose history, curated facts
+        and checkpoints are replaced; profile and privacy are store-wide.
+        """
+        scope = self._scope_paths(user_id=user_id, shared=shared)
+        self._ensure_scope_paths(scope)
+        history_path = scope["history"]
+        return _import_memory_stream_helper(
+            in_path=Path(in_path),
+            history_path=history_path,
+            record_from_payload=self._record_from_payload,
+            encrypt_text_for_category=self._encrypt_text_for_category,
+            replace_history=lambda staged: self._replace_file_locked(history_path, staged),
+            flush_and_fsync=self._flush_and_fsync,
+            curated_enabled=history_path != self.history_path or self.curated_path is not None,
+            write_curated_facts=lambda facts: self._write_curated_facts_to(scope["curated"], facts),
+            atomic_write_text_locked=self._atomic_write_text_locked,
+            checkpoints_path=scope["checkpoints"],
+            format_checkpoints=self._format_checkpoints,
+            profile_path=self.profile_path,
+            privacy_path=self.privacy_path,
+            write_json_dict=self._write_json_dict,
+            default_profile=self._default_profile,
+            default_privacy=self._default_privacy,
+            resume=resume,
+            progress=progress,
+        )
+
+    def index_history(self, *, batch_size: int = 1000) -> int:
+        """Mirror the default history into the backend's item layer in bulk.
+
+        Records written by :meth:`add` reach the backend one by one; records
+        that arrived through :meth:`import_stream` do not, so the backend's
+        full-text and vector candidates miss them until this runs. Returns
+        the number of rows upserted.
+        """
+        bounded = max(1, int(batch_size))
+        written = 0
+        batch: list[dict[str, Any]] = []
+        rows = _iter_history_records_helper(
+            history_path=self.history_path,
+            locked_file=self._locked_file,
+            record_from_payload=self._record_from_payload,
+            decrypt_text_for_category=self._decrypt_text_for_category,
+        )
+        try:
+            for row in rows:
+                payload = self._serialize_hit(row)
+                payload["text"] = self._encrypt_text_for_category(str(payload.get("text", "") or ""), row.category)
+                batch.append(
+                    {
+                        "layer": MemoryLayer.ITEM.value,
+                        "record_id": row.id,
+                        "payload": payload,
+                        "category": row.category,
+                        "created_at": row.created_at,
+                        "updated_at": row.updated_at or row.created_at,
+                    }
+                )
+                if len(batch) >= bounded:
+                    written += int(self.backend.upsert_layer_records(batch) or 0)
+                    batch = []
+        finally:
+            rows.close()
+        if batch:
+            written += int(self.backend.upsert_layer_records(batch) or 0)
+        return written
+
     def _write_snapshot_payload(
         self,
         payload: dict[str, Any],
@@ -4339,6 +5310,24 @@ class MemoryStore:
             advance_branch_head=self._advance_branch_head,
         )
 
+    def _write_snapshot_manifest(
+        self,
+        manifest: dict[str, Any],
+        *,
+        tag: str = "",
+        advance_branch: bool = True,
+        branch_name: str = "",
+    ) -> str:
+        return _write_snapshot_manifest_helper(
+            manifest=manifest,
+            versions_path=self.versions_path,
+            tag=tag,
+            advance_branch=advance_branch,
+            branch_name=branch_name,
+            current_branch_name=self._current_branch_name,
+            advance_branch_head=self._advance_branch_head,
+        )
+
     def snapshot(self, tag: str = "") -> str:
         payload = self.export_payload()
         return self._write_snapshot_payload(payload, tag=tag)
@@ -4375,7 +5364,7 @@ class MemoryStore:
             sync_branch_head_file=self._sync_branch_head_file,
             versions_path=self.versions_path,
             utcnow_iso=self._utcnow_iso,
-            write_snapshot_payload=self._write_snapshot_payload,
+            write_snapshot_manifest=self._write_snapshot_manifest,
             import_payload=self.import_payload,
         )
 
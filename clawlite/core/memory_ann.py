@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import Any, Iterable, Mapping
+
+from clawlite.core.memory_vectors import EmbeddingMatrix, np
+
+DEFAULT_ANN_PROBES = 8
+ANN_MIN_ROWS = 2048
+ANN_TRAIN_SAMPLE = 32768
+ANN_TRAIN_ITERATIONS = 8
+ANN_EXACT_FILTER_MAX = 2048
+ANN_COMPACT_MIN_CHANGES = 256
+
+
+def default_list_count(rows: int) -> int:
+    """IVF list count heuristic: ~sqrt(rows), bounded to keep lists useful."""
+    if rows <= 1:
+        return 1
+    return max(1, min(4096, rows // 8, int(round(math.sqrt(rows)))))
+
+
+def _assign_lists(matrix: EmbeddingMatrix, centroids: EmbeddingMatrix, *, chunk: int = 4096) -> list[int]:
+    if not len(matrix) or not len(centroids):
+        return []
+    if np is not None:
+        out: list[int] = []
+        rows = matrix.rows
+        centroid_rows = centroids.rows
+        for start in range(0, len(matrix), chunk):
+            block = rows[start : start + chunk] @ centroid_rows.T
+            out.extend(np.argmax(block, axis=1).tolist())
+        return out
+    assignments: list[int] = []
+    centroid_rows = centroids.rows
+    for row in matrix.rows:
+        best_idx = 0
+        best_score = -math.inf
+        for idx, centroid in enumerate(centroid_rows):
+            score = math.fsum(a * b for a, b in zip(row, centroid))
+            if score > best_score:
+                best_score = score
+                best_idx = idx
+        assignments.append(best_idx)
+    return assignments
+
+
+def train_ivf_centroids(
+    matrix: EmbeddingMatrix,
+    nlist: int | None = None,
+    *,
+    iterations: int = ANN_TRAIN_ITERATIONS,
+    sample_size: int = ANN_TRAIN_SAMPLE,
+    seed: int = 0,
+) -> EmbeddingMatrix:
+    """Train IVF centroids with spherical k-means over a bounded sample.
+
+    Returns the centroids as a normalized matrix whose ids are the list ids
+    (``"0"``, ``"1"``, ...), so probing reuses :meth:`EmbeddingMatrix.top_k`.
+    """
+    rows = len(matrix)
+    if rows == 0:
+        return EmbeddingMatrix.empty()
+    target_lists = max(1, min(int(nlist or default_list_count(rows)), rows))
+    rng = random.Random(seed)
+    sample_positions = list(range(rows))
+    if rows > sample_size:
+        sample_positions = rng.sample(sample_positions, sample_size)
+    sample = EmbeddingMatrix.from_unit_rows(
+        [matrix.ids[pos] for pos in sample_positions],
+        matrix.rows[np.asarray(sample_positions, dtype=np.intp)] if np is not None else [matrix.rows[pos] for pos in sample_positions],
+        matrix.dim,
+    )
+    seeds = rng.sample(range(len(sample)), target_lists)
+    centroid_ids = [str(idx) for idx in range(target_lists)]
+    centroids = EmbeddingMatrix.from_unit_rows(
+        centroid_ids,
+        [sample.vector_at(pos) for pos in seeds],
+        matrix.dim,
+    )
+
+    for _ in range(max(1, int(iterations))):
+        assignments = _assign_lists(sample, centroids)
+        if np is not None:
+            sums = np.zeros((target_lists, matrix.dim), dtype=np.float64)
+            np.add.at(sums, np.asarray(assignments, dtype=np.intp), sample.rows)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = np.flatnonzero(norms <= 0.0).tolist()
+            for list_id in empty:
+                sums[list_id] = sample.rows[rng.randrange(len(sample))]
+                norms[list_id] = float(np.linalg.norm(sums[list_id]))
+            new_rows: Any = (sums / norms[:, None]).astype(np.float32)
+        else:
+            sums_py = [[0.0] * matrix.dim for _ in range(target_lists)]
+            for row, list_id in zip(sample.rows, assignments):
+                bucket = sums_py[list_id]
+                for idx, value in enumerate(row):
+                    bucket[idx] += value
+            new_rows = []
+            for bucket in sums_py:
+                norm = math.sqrt(math.fsum(value * value for value in bucket))
+                if norm <= 0.0:
+                    new_rows.append(sample.vector_at(rng.randrange(len(sample))))
+                else:
+                    new_rows.append([value / norm for value in bucket])
+        centroids = EmbeddingMatrix.from_unit_rows(centroid_ids, new_rows, matrix.dim)
+    return centroids
+
+
+class VectorIndex:
+    """Searchable vectors of one embedding dimension with an optional IVF layer.
+
+    The base matrix is immutable; writes land in a small delta (scored by
+    brute force) plus a tombstone set and are folded back into the matrix by
+    :meth:`compact`. When ``centroids`` are present, queries probe only the
+    ``probes`` nearest inverted lists instead of scanning every row.
+    """
+
+    __slots__ = ("dim", "matrix", "centroids", "assignments", "_lists", "_delta", "_delta_matrix", "_deleted")
+
+    def __init__(
+        self,
+        matrix: EmbeddingMatrix,
+        *,
+        dim: int | None = None,
+        centroids: EmbeddingMatrix | None = None,
+        assignments: Mapping[str, int] | None = None,
+    ) -> None:
+        self.dim = int(dim or matrix.dim)
+        self.matrix = matrix
+        self.centroids = centroids if centroids is not None and len(centroids) else None
+        self.assignments: dict[str, int] = dict(assignments or {})
+        self._delta: dict[str, list[float]] = {}
+        self._delta_matrix: EmbeddingMatrix | None = None
+        self._deleted: set[str] = set()
+        self._lists: dict[int, list[int]] = {}
+        self._rebuild_lists()
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        base = sum(1 for row_id in self.matrix.ids if row_id not in self._deleted and row_id not in self._delta)
+        return base + len(self._delta)
+
+    def pending_changes(self) -> int:
+        return len(self._delta) + len(self._deleted)
+
+    def _rebuild_lists(self) -> None:
+        self._lists = {}
+        if self.centroids is None:
+            return
+        for pos, row_id in enumerate(self.matrix.ids):
+            list_id = self.assignments.get(row_id)
+            if list_id is None:
+                continue
+            self._lists.setdefault(int(list_id), []).append(pos)
+
+    def unassigned_ids(self) -> list[str]:
+        if self.centroids is None:
+            return []
+        live = [row_id for row_id in self.matrix.ids if row_id not in self._deleted and row_id not in self._delta]
+        live.extend(self._delta)
+        return [row_id for row_id in live if row_id not in self.assignments]
+
+    def train(self, nlist: int | None = None, *, seed: int = 0) -> dict[str, int]:
+        """(Re)train centroids over the live vectors and reassign every row."""
+        self.compact()
+        self.centroids = train_ivf_centroids(self.matrix, nlist, seed=seed) if len(self.matrix) else None
+        if self.centroids is not None and not len(self.centroids):
+            self.centroids = None
+        self.assignments = {}
+        if self.centroids is not None:
+            lists = _assign_lists(self.matrix, self.centroids)
+            self.assignments = {row_id: int(list_id) for row_id, list_id in zip(self.matrix.ids, lists)}
+        self._rebuild_lists()
+        return dict(self.assignments)
+
+    def nearest_list(self, vector: Any) -> int | None:
+        if self.centroids is None:
+            return None
+        hits = self.centroids.top_k(vector, 1)
+        return int(hits[0]["record_id"]) if hits else None
+
+    def assign_missing(self) -> dict[str, int]:
+        """Assign rows that have no inverted list yet (e.g. written before training)."""
+        if self.centroids is None:
+            return {}
+        out: dict[str, int] = {}
+        for row_id in self.unassigned_ids():
+            pos = self.matrix.position(row_id)
+            vector = self._delta.get(row_id) if pos is None or row_id in self._delta else self.matrix.vector_at(pos)
+            list_id = self.nearest_list(vector)
+            if list_id is None:
+                continue
+            out[row_id] = list_id
+        self.assignments.update(out)
+        self._rebuild_lists()
+        return out
+
+    def upsert(self, record_id: str, vector: list[float], *, list_id: int | None = None) -> None:
+        self._delta[record_id] = list(vector)
+        self._delta_matrix = None
+        self._deleted.discard(record_id)
+        if list_id is not None:
+            self.assignments[record_id] = int(list_id)
+        self._maybe_compact()
+
+    def delete(self, record_ids: Iterable[str]) -> None:
+        for record_id in record_ids:
+            if record_id in self._delta:
+                self._delta.pop(record_id, None)
+                self._delta_matrix = None
+            if record_id in self.matrix:
+                self._deleted.add(record_id)
+            self.assignments.pop(record_id, None)
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if self.pending_changes() > max(ANN_COMPACT_MIN_CHANGES, len(self.matrix) // 20):
+            self.compact()
+
+    def compact(self) -> None:
+        if not self._delta and not self._deleted:
+            return
+        self.matrix = self.matrix.with_changes(self._delta, self._deleted)
+        if not self.matrix.dim:
+            self.matrix.dim = self.dim
+        self._delta = {}
+        self._delta_matrix = None
+        self._deleted = set()
+        self._rebuild_lists()
+
+    def _delta_hits(self, query: Any, limit: int, record_filter: set[str] | None) -> list[dict[str, Any]]:
+        if not self._delta:
+            return []
+        if self._delta_matrix is None:
+            self._delta_matrix = EmbeddingMatrix.from_mapping(self._delta, dim=self.dim)
+        record_ids = None if record_filter is None else [row_id for row_id in self._delta if row_id in record_filter]
+        if record_ids is not None and not record_ids:
+            return []
+        return self._delta_matrix.top_k(query, limit, record_ids=record_ids)
+
+    def search(
+        self,
+        query: Any,
+        limit: int,
+        *,
+        record_ids: Iterable[str] | None = None,
+        probes: int = DEFAULT_ANN_PROBES,
+    ) -> list[dict[str, Any]]:
+        """Return the best ``limit`` hits; ``probes <= 0`` forces an exact scan."""
+        bounded = max(1, int(limit or 1))
+        record_filter = None if record_ids is None else {str(item) for item in record_ids}
+        shadowed = self._deleted.union(self._delta) if (self._deleted or self._delta) else set()
+
+        positions: list[int] | None = None
+        use_ivf = (
+            self.centroids is not None
+            and int(probes) > 0
+            and int(probes) < len(self.centroids)
+            and (record_filter is None or len(record_filter) > ANN_EXACT_FILTER_MAX)
+        )
+        if use_ivf:
+            probed = self.centroids.top_k(query, int(probes))
+            positions = []
+            for hit in probed:
+                positions.extend(self._lists.get(int(hit["record_id"]), ()))
+            if record_filter is not None:
+                positions = [pos for pos in positions if self.matrix.ids[pos] in record_filter]
+        elif record_filter is not None:
+            positions = []
+            for row_id in record_filter:
+                pos = self.matrix.position(row_id)
+                if pos is not None:
+                    positions.append(pos)
+            positions.sort()
+        if shadowed:
+            source = positions if positions is not None else range(len(self.matrix))
+            positions = [pos for pos in source if self.matrix.ids[pos] not in shadowed]
+
+        hits = self.matrix.top_k_positions(query, bounded, positions=positions)
+        delta_hits = self._delta_hits(query, bounded, record_filter)
+        if delta_hits:
+            merged = sorted(
+                ((float(hit["score"]), str(hit["record_id"])) for hit in hits + delta_hits),
+                reverse=True,
+            )
+            hits = [{"record_id": row_id, "score": score} for score, row_id in merged[:bounded]]
+        return hits
+
+
+__all__ = [
+    "ANN_EXACT_FILTER_MAX",
+    "ANN_MIN_ROWS",
+    "DEFAULT_ANN_PROBES",
+    "VectorIndex",
+    "default_list_count",
+    "train_ivf_centroids",
+]
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import importlib
+import re
 import sqlite3
 import threading
 from contextlib import contextmanager
@@ -9,11 +10,23 @@ from dataclasses import dataclass
 from dataclasses import field
 from pathlib import Path
 from typing import Any
+from typing import Mapping
 from typing import Protocol
 from urllib.parse import urlparse
 
+from clawlite.core.memory_ann import ANN_MIN_ROWS, DEFAULT_ANN_PROBES, VectorIndex
+from clawlite.core.memory_embedding_store import DEFAULT_EMBEDDING_FORMAT
+from clawlite.core.memory_embedding_store import decode_embedding
+from clawlite.core.memory_embedding_store import encode_embedding
+from clawlite.core.memory_embedding_store import normalize_embedding_format
+from clawlite.core.memory_pg_pool import PG_POOL_MAX_SIZE, PgConnectionPool
+from clawlite.core.memory_vectors import EmbeddingMatrix
+from clawlite.utils.sqlite_pool import SQLITE_POOL_READERS, SQLiteConnectionPool
+
 
 def _normalize_embedding(raw: Any) -> list[float] | None:
+    if isinstance(raw, (bytes, bytearray, memoryview)):
+        raw = decode_embedding(raw)
     if isinstance(raw, str):
         try:
             raw = json.loads(raw)
@@ -30,21 +43,79 @@ def _normalize_embedding(raw: Any) -> list[float] | None:
     return out if out else None
 
 
-def _cosine_similarity(left: list[float], right: list[float]) -> float:
-    if not left or not right or len(left) != len(right):
-        return 0.0
-    dot = 0.0
-    left_norm = 0.0
-    right_norm = 0.0
-    for idx in range(len(left)):
-        lval = float(left[idx])
-        rval = float(right[idx])
-        dot += lval * rval
-        left_norm += lval * lval
-        right_norm += rval * rval
-    if left_norm <= 0.0 or right_norm <= 0.0:
-        return 0.0
-    return float(dot / ((left_norm * right_norm) ** 0.5))
+def _build_embedding_matrices(embeddings: Mapping[str, list[float]]) -> dict[int, EmbeddingMatrix]:
+    return EmbeddingMatrix.group_by_dimension(embeddings.items())
+
+
+def _query_embedding_matrices(
+    matrices: Mapping[int, EmbeddingMatrix],
+    query_embedding: list[float],
+    *,
+    limit: int,
+    record_ids: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    matrix = matrices.get(len(query_embedding))
+    if matrix is None:
+        return []
+    return matrix.top_k(query_embedding, limit, record_ids=record_ids or None)
+
+
+def _query_vector_indexes(
+    indexes: Mapping[int, VectorIndex],
+    query_embedding: list[float],
+    *,
+    limit: int,
+    record_ids: list[str] | None = None,
+    probes: int = DEFAULT_ANN_PROBES,
+) -> list[dict[str, Any]]:
+    index = indexes.get(len(query_embedding))
+    if index is None:
+        return []
+    return index.search(query_embedding, limit, record_ids=record_ids or None, probes=probes)
+
+
+_LAYER_LOOKUP_CHUNK = 500
+SEARCH_TEXT_MAX_LIMIT = 1000
+
+
+def _clean_record_ids(record_ids: list[str] | set[str]) -> list[str]:
+    ids: list[str] = []
+    seen: set[str] = set()
+    for item in record_ids:
+        clean = str(item or "").strip()
+        if clean and clean not in seen:
+            seen.add(clean)
+            ids.append(clean)
+    return ids
+
+
+def _layer_row_to_dict(row: Any) -> dict[str, Any]:
+    row_layer, row_id, row_category, row_payload, created_at, updated_at = row
+    payload: dict[str, Any] = {}
+    if isinstance(row_payload, dict):
+        payload = row_payload
+    else:
+        try:
+            parsed = json.loads(str(row_payload or "{}"))
+            if isinstance(parsed, dict):
+                payload = parsed
+        except Exception:
+            payload = {}
+    return {
+        "layer": str(row_layer or ""),
+        "record_id": str(row_id or ""),
+        "category": str(row_category or ""),
+        "payload": payload,
+        "created_at": str(created_at or ""),
+        "updated_at": str(updated_at or ""),
+    }
+
+
+def _order_layer_rows(rows: list[dict[str, Any]], ids: list[str]) -> list[dict[str, Any]]:
+    # ``(layer, record_id)`` is the key, so an unscoped lookup can match one
+    # id in several layers; keep every match, grouped in request order.
+    position = {record_id: idx for idx, record_id in enumerate(ids)}
+    return sorted(rows, key=lambda row: (position.get(row["record_id"], len(ids)), row["layer"]))
 
 
 class MemoryBackend(Protocol):
@@ -72,12 +143,27 @@ class MemoryBackend(Protocol):
     ) -> None:
         ...
 
+    def upsert_layer_records(self, rows: list[dict[str, Any]]) -> int:
+        ...
+
     def delete_layer_records(self, record_ids: list[str] | set[str]) -> int:
         ...
 
     def fetch_layer_records(self, *, layer: str, category: str | None = None, limit: int = 200) -> list[dict[str, Any]]:
         ...
 
+    def fetch_layer_records_by_ids(
+        self,
+        record_ids: list[str] | set[str],
+        *,
+        layer: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Keyed multi-get. Returns rows in first-seen ``record_ids`` order."""
+        ...
+
+    def fetch_layer_record(self, record_id: str, *, layer: str | None = None) -> dict[str, Any] | None:
+        ...
+
     def upsert_embedding(self, record_id: str, embedding: list[float], created_at: str, source: str) -> None:
         ...
 
@@ -100,26 +186,43 @@ class MemoryBackend(Protocol):
         query: str,
         layer: str | None = None,
         limit: int = 10,
+        *,
+        match_any: bool = False,
     ) -> list[dict[str, Any]]:
-        """Full-text BM25 search. Returns list of {record_id, score} dicts."""
+        """Full-text BM25 search. Returns list of {record_id, score} dicts.
+
+        ``match_any`` matches rows containing any query word instead of all.
+        """
         ...
 
 
 @dataclass(slots=True)
 class SQLiteMemoryBackend:
     db_path: str = ""
+    ann_probes: int = DEFAULT_ANN_PROBES
+    ann_min_rows: int = ANN_MIN_ROWS
+    embedding_format: str = DEFAULT_EMBEDDING_FORMAT
+    pool_readers: int = SQLITE_POOL_READERS
     _db_file: Path | None = field(init=False, default=None)
     _lock: threading.Lock = field(init=False)
+    _pool_lock: threading.Lock = field(init=False)
+    _pool: SQLiteConnectionPool | None = field(init=False, default=None)
     _status: dict[str, Any] = field(init=False)
+    _vector_indexes: dict[int, VectorIndex] | None = field(init=False, default=None)
+    _embedding_generation: int = field(init=False, default=-1)
 
     def __post_init__(self) -> None:
         self._db_file = Path(self.db_path).expanduser() if str(self.db_path or "").strip() else None
         self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
         self._status = {
             "driver_name": "sqlite3",
             "connection_ok": False,
             "vector_extension": False,
             "vector_version": "",
+            "vector_index": False,
+            "vector_index_kind": "",
+            "vector_index_error": "",
             "supported": True,
             "last_error": "",
         }
@@ -132,25 +235,55 @@ class SQLiteMemoryBackend:
         return True
 
     def diagnostics(self) -> dict[str, Any]:
-        return dict(self._status)
+        out = dict(self._status)
+        pool = self._pool
+        if pool is not None:
+            out.update({f"pool_{key}": value for key, value in pool.snapshot().items()})
+        return out
 
-    @contextmanager
-    def _connect(self):
+    def _prepare_connection(self, conn: sqlite3.Connection) -> None:
+        """Hook run once on every pooled connection right after it opens."""
+
+    def _connection_pool(self) -> SQLiteConnectionPool:
         if self._db_file is None:
             raise RuntimeError("sqlite backend not initialized")
-        conn = sqlite3.connect(str(self._db_file))
-        try:
+        with self._pool_lock:
+            pool = self._pool
+            if pool is None or pool.path != self._db_file:
+                if pool is not None:
+                    pool.close()
+                pool = SQLiteConnectionPool(
+                    self._db_file,
+                    readers=self.pool_readers,
+                    on_connect=self._prepare_connection,
+                )
+                self._pool = pool
+            return pool
+
+    @contextmanager
+    def _connect(self):
+        """Borrow a pooled reader connection."""
+        with self._connection_pool().reader() as conn:
+            yield conn
+
+    @contextmanager
+    def _write(self):
+        """Borrow the pooled writer connection; writes are serialized."""
+        with self._connection_pool().writer() as conn:
             yield conn
-        finally:
-            conn.close()
+
+    def close(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
 
     def initialize(self, memory_home: str | Path) -> None:
         with self._lock:
             if self._db_file is None:
                 self._db_file = Path(memory_home).expanduser() / "memory-index.sqlite3"
             self._db_file.parent.mkdir(parents=True, exist_ok=True)
-            with self._connect() as conn:
-                conn.execute("PRAGMA journal_mode=WAL")
+            with self._write() as conn:
                 conn.execute(
                     """
                     CREATE TABLE IF NOT EXISTS layer_records (
@@ -168,7 +301,7 @@ class SQLiteMemoryBackend:
                     """
                     CREATE TABLE IF NOT EXISTS embeddings (
                         record_id TEXT PRIMARY KEY,
-                        embedding TEXT NOT NULL,
+                        embedding BLOB NOT NULL,
                         created_at TEXT NOT NULL,
                         source TEXT NOT NULL
                     )
@@ -178,6 +311,55 @@ class SQLiteMemoryBackend:
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_layer_records_category ON layer_records(category)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_layer_records_updated_at ON layer_records(updated_at)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_created_at ON embeddings(created_at)")
+                # Generation counter bumped on every embeddings write so the
+                # in-process similarity matrix can detect changes (including
+                # writes from other processes) with a single-row read.
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS embedding_state (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        generation INTEGER NOT NULL DEFAULT 0
+                    )
+                    """
+                )
+                conn.execute("INSERT OR IGNORE INTO embedding_state (id, generation) VALUES (1, 0)")
+                for trigger_event in ("INSERT", "UPDATE", "DELETE"):
+                    conn.execute(
+                        f"""
+                        CREATE TRIGGER IF NOT EXISTS embeddings_generation_{trigger_event.lower()}
+                        AFTER {trigger_event} ON embeddings BEGIN
+                            UPDATE embedding_state SET generation = generation + 1 WHERE id = 1;
+                        END
+                        """
+                    )
+                # IVF approximate-nearest-neighbour index: trained centroids per
+                # embedding dimension plus each row's inverted-list assignment.
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS ann_centroids (
+                        dim INTEGER NOT NULL,
+                        list_id INTEGER NOT NULL,
+                        centroid TEXT NOT NULL,
+                        PRIMARY KEY (dim, list_id)
+                    )
+                    """
+                )
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS ann_assignments (
+                        record_id TEXT PRIMARY KEY,
+                        dim INTEGER NOT NULL,
+                        list_id INTEGER NOT NULL
+                    )
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_ann_assignments_list ON ann_assignments(dim, list_id)")
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS embeddings_ann_delete
+                    AFTER DELETE ON embeddings BEGIN
+                        DELETE FROM ann_assignments WHERE record_id = old.record_id;
+                    END
+                """)
                 # FTS5 virtual table for fast full-text search (BM25 native).
                 # Uses a standalone (non-content) table so FTS5 manages its own
                 # copy of the indexed text; triggers keep it in sync.
@@ -245,32 +427,30 @@ class SQLiteMemoryBackend:
     def upsert_resource(self, resource: dict[str, Any]) -> None:
         if self._db_file is None:
             return
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute(
-                    """INSERT INTO resources (id, name, kind, description, tags, created_at, updated_at)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)
-                       ON CONFLICT(id) DO UPDATE SET
-                           name=excluded.name, kind=excluded.kind,
-                           description=excluded.description, tags=excluded.tags,
-                           updated_at=excluded.updated_at""",
-                    (
-                        resource["id"], resource["name"], resource.get("kind", "project"),
-                        resource.get("description", ""), resource.get("tags", "[]"),
-                        resource.get("created_at", ""), resource.get("updated_at", ""),
-                    ),
-                )
-                conn.commit()
+        with self._write() as conn:
+            conn.execute(
+                """INSERT INTO resources (id, name, kind, description, tags, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET
+                       name=excluded.name, kind=excluded.kind,
+                       description=excluded.description, tags=excluded.tags,
+                       updated_at=excluded.updated_at""",
+                (
+                    resource["id"], resource["name"], resource.get("kind", "project"),
+                    resource.get("description", ""), resource.get("tags", "[]"),
+                    resource.get("created_at", ""), resource.get("updated_at", ""),
+                ),
+            )
+            conn.commit()
 
     def fetch_resource(self, resource_id: str) -> dict[str, Any] | None:
         if self._db_file is None:
             return None
-        with self._lock:
-            with self._connect() as conn:
-                row = conn.execute(
-                    "SELECT id, name, kind, description, tags, created_at, updated_at FROM resources WHERE id=?",
-                    (resource_id,),
-                ).fetchone()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, name, kind, description, tags, created_at, updated_at FROM resources WHERE id=?",
+                (resource_id,),
+            ).fetchone()
         if row is None:
             return None
         return {"id": row[0], "name": row[1], "kind": row[2], "description": row[3],
@@ -279,43 +459,39 @@ class SQLiteMemoryBackend:
     def fetch_all_resources(self) -> list[dict[str, Any]]:
         if self._db_file is None:
             return []
-        with self._lock:
-            with self._connect() as conn:
-                rows = conn.execute(
-                    "SELECT id, name, kind, description, tags, created_at, updated_at FROM resources ORDER BY created_at DESC"
-                ).fetchall()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, name, kind, description, tags, created_at, updated_at FROM resources ORDER BY created_at DESC"
+            ).fetchall()
         return [{"id": r[0], "name": r[1], "kind": r[2], "description": r[3],
                  "tags": r[4], "created_at": r[5], "updated_at": r[6]} for r in rows]
 
     def delete_resource(self, resource_id: str) -> None:
         if self._db_file is None:
             return
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute("DELETE FROM resources WHERE id=?", (resource_id,))
-                conn.execute("DELETE FROM record_resources WHERE resource_id=?", (resource_id,))
-                conn.commit()
+        with self._write() as conn:
+            conn.execute("DELETE FROM resources WHERE id=?", (resource_id,))
+            conn.execute("DELETE FROM record_resources WHERE resource_id=?", (resource_id,))
+            conn.commit()
 
     def link_record_resource(self, record_id: str, resource_id: str) -> None:
         if self._db_file is None:
             return
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute(
-                    "INSERT OR IGNORE INTO record_resources (record_id, resource_id) VALUES (?, ?)",
-                    (record_id, resource_id),
-                )
-                conn.commit()
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO record_resources (record_id, resource_id) VALUES (?, ?)",
+                (record_id, resource_id),
+            )
+            conn.commit()
 
     def fetch_records_by_resource(self, resource_id: str) -> list[str]:
         if self._db_file is None:
             return []
-        with self._lock:
-            with self._connect() as conn:
-                rows = conn.execute(
-                    "SELECT record_id FROM record_resources WHERE resource_id=? ORDER BY rowid ASC",
-                    (resource_id,),
-                ).fetchall()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT record_id FROM record_resources WHERE resource_id=? ORDER BY rowid ASC",
+                (resource_id,),
+            ).fetchall()
         return [r[0] for r in rows]
 
     # ------------------------------------------------------------------
@@ -325,22 +501,20 @@ class SQLiteMemoryBackend:
     def set_ttl(self, record_id: str, expires_at: str) -> None:
         if self._db_file is None:
             return
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute(
-                    "INSERT OR REPLACE INTO memory_ttl (record_id, expires_at) VALUES (?, ?)",
-                    (record_id, expires_at),
-                )
-                conn.commit()
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO memory_ttl (record_id, expires_at) VALUES (?, ?)",
+                (record_id, expires_at),
+            )
+            conn.commit()
 
     def get_ttl(self, record_id: str) -> dict[str, str] | None:
         if self._db_file is None:
             return None
-        with self._lock:
-            with self._connect() as conn:
-                row = conn.execute(
-                    "SELECT record_id, expires_at FROM memory_ttl WHERE record_id=?", (record_id,)
-                ).fetchone()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT record_id, expires_at FROM memory_ttl WHERE record_id=?", (record_id,)
+            ).fetchone()
         return {"record_id": row[0], "expires_at": row[1]} if row else None
 
     def fetch_expired_record_ids(self) -> list[str]:
@@ -348,21 +522,19 @@ class SQLiteMemoryBackend:
             return []
         from datetime import datetime, timezone
         now = datetime.now(timezone.utc).isoformat()
-        with self._lock:
-            with self._connect() as conn:
-                rows = conn.execute(
-                    "SELECT record_id FROM memory_ttl WHERE expires_at <= ?", (now,)
-                ).fetchall()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT record_id FROM memory_ttl WHERE expires_at <= ?", (now,)
+            ).fetchall()
         return [r[0] for r in rows]
 
     def delete_ttl_entries(self, record_ids: list[str]) -> None:
         if not record_ids or self._db_file is None:
             return
         placeholders = ", ".join("?" for _ in record_ids)
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute(f"DELETE FROM memory_ttl WHERE record_id IN ({placeholders})", record_ids)
-                conn.commit()
+        with self._write() as conn:
+            conn.execute(f"DELETE FROM memory_ttl WHERE record_id IN ({placeholders})", record_ids)
+            conn.commit()
 
     def upsert_layer_record(
         self,
@@ -378,27 +550,57 @@ class SQLiteMemoryBackend:
             return
         if self._db_file is None:
             return
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO layer_records (layer, record_id, category, payload, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(layer, record_id) DO UPDATE SET
-                        category = excluded.category,
-                        payload = excluded.payload,
-                        updated_at = excluded.updated_at
-                    """,
-                    (
-                        str(layer or "item"),
-                        str(record_id),
-                        str(category or "context"),
-                        json.dumps(payload or {}, ensure_ascii=False),
-                        str(created_at or ""),
-                        str(updated_at or ""),
-                    ),
-                )
-                conn.commit()
+        with self._write() as conn:
+            conn.execute(
+                """
+                INSERT INTO layer_records (layer, record_id, category, payload, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(layer, record_id) DO UPDATE SET
+                    category = excluded.category,
+                    payload = excluded.payload,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    str(layer or "item"),
+                    str(record_id),
+                    str(category or "context"),
+                    json.dumps(payload or {}, ensure_ascii=False),
+                    str(created_at or ""),
+                    str(updated_at or ""),
+                ),
+            )
+            conn.commit()
+
+    def upsert_layer_records(self, rows: list[dict[str, Any]]) -> int:
+        """Bulk :meth:`upsert_layer_record` in one ``executemany`` transaction."""
+        if self._db_file is None:
+            return 0
+        params = [
+            (
+                str(row.get("layer") or "item"),
+                str(row.get("record_id") or "").strip(),
+                str(row.get("category") or "context"),
+                json.dumps(row.get("payload") or {}, ensure_ascii=False),
+                str(row.get("created_at") or ""),
+                str(row.get("updated_at") or ""),
+            )
+            for row in rows
+            if str(row.get("record_id") or "").strip()
+        ]
+        if not params:
+            return 0
+        self._connection_pool().executemany(
+            """
+            INSERT INTO layer_records (layer, record_id, category, payload, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(layer, record_id) DO UPDATE SET
+                category = excluded.category,
+                payload = excluded.payload,
+                updated_at = excluded.updated_at
+            """,
+            params,
+        )
+        return len(params)
 
     def delete_layer_records(self, record_ids: list[str] | set[str]) -> int:
         ids = [str(item).strip() for item in record_ids if str(item).strip()]
@@ -407,11 +609,10 @@ class SQLiteMemoryBackend:
         if self._db_file is None:
             return 0
         placeholders = ", ".join("?" for _ in ids)
-        with self._lock:
-            with self._connect() as conn:
-                cursor = conn.execute(f"DELETE FROM layer_records WHERE record_id IN ({placeholders})", ids)
-                conn.commit()
-                return int(cursor.rowcount or 0)
+        with self._write() as conn:
+            cursor = conn.execute(f"DELETE FROM layer_records WHERE record_id IN ({placeholders})", ids)
+            conn.commit()
+            return int(cursor.rowcount or 0)
 
     def fetch_layer_records(self, *, layer: str, category: str | None = None, limit: int = 200) -> list[dict[str, Any]]:
         bounded_limit = max(1, int(limit or 1))
@@ -429,30 +630,41 @@ class SQLiteMemoryBackend:
         if self._db_file is None:
             return []
 
-        with self._lock:
-            with self._connect() as conn:
-                rows = conn.execute(query, params).fetchall()
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
 
-        out: list[dict[str, Any]] = []
-        for row_layer, row_id, row_category, row_payload, created_at, updated_at in rows:
-            payload: dict[str, Any] = {}
-            try:
-                parsed = json.loads(str(row_payload or "{}"))
-                if isinstance(parsed, dict):
-                    payload = parsed
-            except Exception:
-                payload = {}
-            out.append(
-                {
-                    "layer": str(row_layer or ""),
-                    "record_id": str(row_id or ""),
-                    "category": str(row_category or ""),
-                    "payload": payload,
-                    "created_at": str(created_at or ""),
-                    "updated_at": str(updated_at or ""),
-                }
-            )
-        return out
+        return [_layer_row_to_dict(row) for row in rows]
+
+    def fetch_layer_records_by_ids(
+        self,
+        record_ids: list[str] | set[str],
+        *,
+        layer: str | None = None,
+    ) -> list[dict[str, Any]]:
+        ids = _clean_record_ids(record_ids)
+        if not ids or self._db_file is None:
+            return []
+
+        rows: list[Any] = []
+        with self._connect() as conn:
+            for start in range(0, len(ids), _LAYER_LOOKUP_CHUNK):
+                chunk = ids[start : start + _LAYER_LOOKUP_CHUNK]
+                placeholders = ", ".join("?" for _ in chunk)
+                query = (
+                    "SELECT layer, record_id, category, payload, created_at, updated_at "
+                    f"FROM layer_records WHERE record_id IN ({placeholders})"
+                )
+                params: list[Any] = list(chunk)
+                if layer is not None:
+                    query += " AND layer = ?"
+                    params.append(str(layer or "item"))
+                rows.extend(conn.execute(query, params).fetchall())
+
+        return _order_layer_rows([_layer_row_to_dict(row) for row in rows], ids)
+
+    def fetch_layer_record(self, record_id: str, *, layer: str | None = None) -> dict[str, Any] | None:
+        rows = self.fetch_layer_records_by_ids([record_id], layer=layer)
+        return rows[0] if rows else None
 
     def upsert_embedding(self, record_id: str, embedding: list[float], created_at: str, source: str) -> None:
         clean_id = str(record_id or "").strip()
@@ -462,7 +674,9 @@ class SQLiteMemoryBackend:
         if self._db_file is None:
             return
         with self._lock:
-            with self._connect() as conn:
+            with self._write() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                before = self._read_embedding_generation(conn)
                 conn.execute(
                     """
                     INSERT INTO embeddings (record_id, embedding, created_at, source)
@@ -474,12 +688,33 @@ class SQLiteMemoryBackend:
                     """,
                     (
                         clean_id,
-                        json.dumps(normalized, ensure_ascii=False),
+                        encode_embedding(normalized, self.embedding_format),
                         str(created_at or ""),
                         str(source or ""),
                     ),
                 )
+                indexes = self._vector_indexes if self._embedding_generation == before else None
+                index = indexes.get(len(normalized)) if indexes is not None else None
+                list_id = index.nearest_list(normalized) if index is not None else None
+                if list_id is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO ann_assignments (record_id, dim, list_id) VALUES (?, ?, ?)",
+                        (clean_id, len(normalized), list_id),
+                    )
+                else:
+                    conn.execute("DELETE FROM ann_assignments WHERE record_id = ?", (clean_id,))
+                after = self._read_embedding_generation(conn)
                 conn.commit()
+                if indexes is None:
+                    return
+                for dim, other in indexes.items():
+                    if dim != len(normalized):
+                        other.delete([clean_id])
+                if index is None:
+                    index = VectorIndex(EmbeddingMatrix.empty(), dim=len(normalized))
+                    indexes[len(normalized)] = index
+                index.upsert(clean_id, normalized, list_id=list_id)
+                self._embedding_generation = after
 
     def delete_embeddings(self, record_ids: list[str] | set[str]) -> int:
         ids = [str(item).strip() for item in record_ids if str(item).strip()]
@@ -489,9 +724,16 @@ class SQLiteMemoryBackend:
             return 0
         placeholders = ", ".join("?" for _ in ids)
         with self._lock:
-            with self._connect() as conn:
+            with self._write() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                before = self._read_embedding_generation(conn)
                 cursor = conn.execute(f"DELETE FROM embeddings WHERE record_id IN ({placeholders})", ids)
+                after = self._read_embedding_generation(conn)
                 conn.commit()
+                if self._vector_indexes is not None and self._embedding_generation == before:
+                    for index in self._vector_indexes.values():
+                        index.delete(ids)
+                    self._embedding_generation = after
                 return int(cursor.rowcount or 0)
 
     def fetch_embeddings(self, record_ids: list[str] | None = None, limit: int = 5000) -> dict[str, list[float]]:
@@ -509,9 +751,8 @@ class SQLiteMemoryBackend:
         query += " ORDER BY created_at DESC, record_id DESC LIMIT ?"
         params.append(bounded_limit)
 
-        with self._lock:
-            with self._connect() as conn:
-                rows = conn.execute(query, params).fetchall()
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
 
         out: dict[str, list[float]] = {}
         for row_id, row_embedding in rows:
@@ -534,22 +775,202 @@ class SQLiteMemoryBackend:
         if normalized_query is None:
             return []
         bounded_limit = max(1, int(limit or 1))
-        embeddings = self.fetch_embeddings(record_ids=record_ids, limit=max(bounded_limit, 5000))
-        if not embeddings:
-            return []
+        clean_ids = [str(item).strip() for item in (record_ids or []) if str(item).strip()]
+        return _query_vector_indexes(
+            self._load_vector_indexes(),
+            normalized_query,
+            limit=bounded_limit,
+            record_ids=clean_ids,
+            probes=int(self.ann_probes),
+        )
+
+    @staticmethod
+    def _read_embedding_generation(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT generation FROM embedding_state WHERE id = 1").fetchone()
+        return int(row[0]) if row else 0
+
+    def _load_vector_indexes(self, *, auto_train: bool = True) -> dict[int, VectorIndex]:
+        """Return cached per-dimension vector indexes, reloading after foreign writes.
+
+        Writes made through this backend are applied to the cached indexes in
+        place; a generation mismatch means another connection or process
+        changed the table, so the indexes are rebuilt from SQLite.
+        """
+        if self._db_file is None:
+            return {}
+        with self._lock:
+            with self._connect() as conn:
+                generation = self._read_embedding_generation(conn)
+                cached = self._vector_indexes
+                if cached is not None and generation == self._embedding_generation:
+                    return cached
+                rows = conn.execute("SELECT record_id, embedding FROM embeddings").fetchall()
+                centroid_rows = conn.execute(
+                    "SELECT dim, list_id, centroid FROM ann_centroids ORDER BY dim, list_id"
+                ).fetchall()
+                assignment_rows = conn.execute("SELECT record_id, dim, list_id FROM ann_assignments").fetchall()
+
+        embeddings: dict[str, list[float]] = {}
+        for row_id, row_embedding in rows:
+            clean_id = str(row_id or "").strip()
+            if not clean_id:
+                continue
+            parsed = _normalize_embedding(row_embedding)
+            if parsed is None:
+                continue
+            embeddings[clean_id] = parsed
+        centroids_by_dim: dict[int, list[tuple[str, list[float]]]] = {}
+        for dim, list_id, centroid in centroid_rows:
+            parsed = _normalize_embedding(centroid)
+            if parsed is not None:
+                centroids_by_dim.setdefault(int(dim), []).append((str(int(list_id)), parsed))
+        assignments_by_dim: dict[int, dict[str, int]] = {}
+        for row_id, dim, list_id in assignment_rows:
+            assignments_by_dim.setdefault(int(dim), {})[str(row_id)] = int(list_id)
+
+        indexes: dict[int, VectorIndex] = {}
+        trained: dict[int, VectorIndex] = {}
+        assigned: dict[int, dict[str, int]] = {}
+        for dim, matrix in _build_embedding_matrices(embeddings).items():
+            centroid_items = centroids_by_dim.get(dim)
+            index = VectorIndex(
+                matrix,
+                centroids=EmbeddingMatrix.from_items(centroid_items, dim=dim) if centroid_items else None,
+                assignments=assignments_by_dim.get(dim),
+            )
+            if auto_train and not index.trained and self.ann_min_rows > 0 and len(matrix) >= self.ann_min_rows:
+                index.train()
+                trained[dim] = index
+            elif index.trained:
+                missing = index.assign_missing()
+                if missing:
+                    assigned[dim] = missing
+            indexes[dim] = index
+        if trained or assigned:
+            self._persist_ann_state(trained=trained, assigned=assigned)
+        with self._lock:
+            self._vector_indexes = indexes
+            self._embedding_generation = generation
+            self._update_vector_index_status(indexes)
+        return indexes
+
+    def _persist_ann_state(
+        self,
+        *,
+        trained: Mapping[int, VectorIndex],
+        assigned: Mapping[int, Mapping[str, int]] | None = None,
+    ) -> None:
+        if self._db_file is None:
+            return
+        with self._lock:
+            with self._write() as conn:
+                for dim, index in trained.items():
+                    conn.execute("DELETE FROM ann_centroids WHERE dim = ?", (dim,))
+                    conn.execute("DELETE FROM ann_assignments WHERE dim = ?", (dim,))
+                    if index.centroids is None:
+                        continue
+                    conn.executemany(
+                        "INSERT INTO ann_centroids (dim, list_id, centroid) VALUES (?, ?, ?)",
+                        [
+                            (dim, int(list_id), json.dumps(index.centroids.vector_at(pos), separators=(",", ":")))
+                            for pos, list_id in enumerate(index.centroids.ids)
+                        ],
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO ann_assignments (record_id, dim, list_id) VALUES (?, ?, ?)",
+                        [(row_id, dim, list_id) for row_id, list_id in index.assignments.items()],
+                    )
+                for dim, rows in (assigned or {}).items():
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO ann_assignments (record_id, dim, list_id) VALUES (?, ?, ?)",
+                        [(row_id, dim, list_id) for row_id, list_id in rows.items()],
+                    )
+                conn.commit()
+
+    def _update_vector_index_status(self, indexes: Mapping[int, VectorIndex]) -> None:
+        trained = any(index.trained for index in indexes.values())
+        self._status.update(vector_index=trained, vector_index_kind="ivf" if trained else "")
+
+    def rebuild_vector_index(self, *, nlist: int | None = None, min_rows: int | None = None) -> dict[str, Any]:
+        """Retrain IVF centroids from scratch for every dimension with enough rows."""
+        if self._db_file is None:
+            return {"ok": False, "error": "sqlite backend not initialized", "dimensions": {}}
+        with self._lock:
+            with self._write() as conn:
+                conn.execute("DELETE FROM ann_centroids")
+                conn.execute("DELETE FROM ann_assignments")
+                conn.commit()
+            self._vector_indexes = None
+            self._embedding_generation = -1
+        threshold = self.ann_min_rows if min_rows is None else max(1, int(min_rows))
+        indexes = self._load_vector_indexes(auto_train=False)
+        retrained: dict[int, VectorIndex] = {}
+        for dim, index in indexes.items():
+            if not index.trained and len(index) >= threshold:
+                index.train(nlist)
+                retrained[dim] = index
+        if retrained:
+            self._persist_ann_state(trained=retrained)
+            with self._lock:
+                self._update_vector_index_status(indexes)
+        return {"ok": True, **self.vector_index_status()}
+
+    def migrate_embedding_storage(self, embedding_format: str | None = None) -> dict[str, Any]:
+        """Re-encode every stored embedding in ``embedding_format`` and reclaim space."""
+        target = normalize_embedding_format(embedding_format or self.embedding_format)
+        if self._db_file is None:
+            return {"ok": False, "error": "sqlite backend not initialized", "format": target}
+        with self._lock:
+            with self._write() as conn:
+                bytes_before = int(conn.execute("SELECT COALESCE(SUM(LENGTH(CAST(embedding AS BLOB))), 0) FROM embeddings").fetchone()[0])
+                rows = conn.execute("SELECT record_id, embedding FROM embeddings").fetchall()
+                updates: list[tuple[Any, str]] = []
+                skipped = 0
+                for row_id, raw in rows:
+                    parsed = _normalize_embedding(raw)
+                    if parsed is None:
+                        skipped += 1
+                        continue
+                    updates.append((encode_embedding(parsed, target), str(row_id)))
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany("UPDATE embeddings SET embedding = ? WHERE record_id = ?", updates)
+                conn.commit()
+                bytes_after = int(conn.execute("SELECT COALESCE(SUM(LENGTH(CAST(embedding AS BLOB))), 0) FROM embeddings").fetchone()[0])
+                conn.execute("VACUUM")
+            self.embedding_format = target
+        return {
+            "ok": True,
+            "format": target,
+            "rows": len(updates),
+            "skipped": skipped,
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+        }
 
-        scored: list[dict[str, Any]] = []
-        for row_id, vector in embeddings.items():
-            score = _cosine_similarity(normalized_query, vector)
-            scored.append({"record_id": row_id, "score": float(score)})
-        scored.sort(key=lambda item: (float(item.get("score", 0.0)), str(item.get("record_id", ""))), reverse=True)
-        return scored[:bounded_limit]
+    def vector_index_status(self) -> dict[str, Any]:
+        indexes = self._load_vector_indexes()
+        return {
+            "kind": "ivf",
+            "probes": int(self.ann_probes),
+            "min_rows": int(self.ann_min_rows),
+            "dimensions": {
+                str(dim): {
+                    "rows": len(index),
+                    "trained": index.trained,
+                    "lists": len(index.centroids) if index.centroids is not None else 0,
+                    "pending_changes": index.pending_changes(),
+                }
+                for dim, index in sorted(indexes.items())
+            },
+        }
 
     def search_text(
         self,
         query: str,
         layer: str | None = None,
         limit: int = 10,
+        *,
+        match_any: bool = False,
     ) -> list[dict[str, Any]]:
         """BM25 full-text search via SQLite FTS5.
 
@@ -559,46 +980,54 @@ class SQLiteMemoryBackend:
         query = str(query or "").strip()
         if not query or self._db_file is None:
             return []
-        limit = max(1, min(int(limit or 10), 200))
+        limit = max(1, min(int(limit or 10), SEARCH_TEXT_MAX_LIMIT))
         # Convert plain multi-word queries to AND boolean so each token is matched
         # independently (FTS5 treats bare phrases as exact adjacency matches).
         import re as _re
-        if not any(op in query for op in ("AND", "OR", "NOT", '"', "*", "NEAR")):
+        if match_any:
+            tokens = _re.findall(r'\w+', query)
+            if not tokens:
+                return []
+            query = " OR ".join(f'"{token}"' for token in tokens)
+        elif not any(op in query for op in ("AND", "OR", "NOT", '"', "*", "NEAR")):
             tokens = _re.findall(r'\w+', query)
             query = " AND ".join(tokens) if tokens else query
-        with self._lock:
-            with self._connect() as conn:
-                try:
-                    if layer:
-                        rows = conn.execute(
-                            """
-                            SELECT f.record_id, rank AS score
-                            FROM layer_records_fts f
-                            JOIN layer_records r ON r.record_id = f.record_id
-                            WHERE layer_records_fts MATCH ? AND r.layer = ?
-                            ORDER BY rank
-                            LIMIT ?
-                            """,
-                            (query, str(layer), limit),
-                        ).fetchall()
-                    else:
-                        rows = conn.execute(
-                            """
-                            SELECT record_id, rank AS score
-                            FROM layer_records_fts
-                            WHERE layer_records_fts MATCH ?
-                            ORDER BY rank
-                            LIMIT ?
-                            """,
-                            (query, limit),
-                        ).fetchall()
-                    return [{"record_id": r[0], "score": float(r[1])} for r in rows]
-                except Exception:
-                    return []
+        with self._connect() as conn:
+            try:
+                if layer:
+                    rows = conn.execute(
+                        """
+                        SELECT f.record_id, f.rank AS score
+                        FROM layer_records_fts f
+                        JOIN layer_records r ON r.rowid = f.rowid
+                        WHERE layer_records_fts MATCH ? AND r.layer = ?
+                        ORDER BY f.rank
+                        LIMIT ?
+                        """,
+                        (query, str(layer), limit),
+                    ).fetchall()
+                else:
+                    # Each layer row of a record has its own FTS row; keep its best match.
+                    rows = conn.execute(
+                        """
+                        SELECT record_id, MIN(rank) AS score
+                        FROM layer_records_fts
+                        WHERE layer_records_fts MATCH ?
+                        GROUP BY record_id
+                        ORDER BY score
+                        LIMIT ?
+                        """,
+                        (query, limit),
+                    ).fetchall()
+                return [{"record_id": r[0], "score": float(r[1])} for r in rows]
+            except Exception:
+                return []
 
 
 @dataclass(slots=True)
 class SQLiteVecMemoryBackend(SQLiteMemoryBackend):
+    _vec_connections: dict[int, tuple[bool, str, str]] = field(init=False, default_factory=dict)
+
     @property
     def name(self) -> str:
         return "sqlite-vec"
@@ -634,20 +1063,34 @@ class SQLiteVecMemoryBackend(SQLiteMemoryBackend):
             except Exception:
                 pass
 
+    def _ensure_sqlite_vec(self, conn: sqlite3.Connection) -> tuple[bool, str, str]:
+        # Pooled connections are long-lived, so the extension is loaded once
+        # per connection rather than on every query.
+        key = id(conn)
+        state = self._vec_connections.get(key)
+        if state is None:
+            state = self._load_sqlite_vec(conn)
+            self._vec_connections[key] = state
+        enabled, version, error = state
+        self._status.update(
+            connection_ok=True,
+            vector_extension=enabled,
+            vector_version=version,
+            supported=True,
+            last_error=error,
+        )
+        return state
+
     def initialize(self, memory_home: str | Path) -> None:
         SQLiteMemoryBackend.initialize(self, memory_home)
         if self._db_file is None:
             return
-        with self._lock:
-            with self._connect() as conn:
-                enabled, version, error = self._load_sqlite_vec(conn)
-                self._status.update(
-                    connection_ok=True,
-                    vector_extension=enabled,
-                    vector_version=version,
-                    supported=True,
-                    last_error=error,
-                )
+        with self._connect() as conn:
+            self._ensure_sqlite_vec(conn)
+
+    def close(self) -> None:
+        SQLiteMemoryBackend.close(self)
+        self._vec_connections.clear()
 
     def query_similar_embeddings(
         self,
@@ -665,33 +1108,25 @@ class SQLiteVecMemoryBackend(SQLiteMemoryBackend):
         query_literal = json.dumps(normalized_query, ensure_ascii=True, separators=(",", ":"))
         params: list[Any] = [query_literal, *clean_ids, bounded_limit]
         try:
-            with self._lock:
-                with self._connect() as conn:
-                    enabled, version, error = self._load_sqlite_vec(conn)
-                    self._status.update(
-                        connection_ok=True,
-                        vector_extension=enabled,
-                        vector_version=version,
-                        supported=True,
-                        last_error=error,
+            with self._connect() as conn:
+                enabled, _version, error = self._ensure_sqlite_vec(conn)
+                if not enabled:
+                    raise RuntimeError(error or "sqlite_vec unavailable")
+                rows = conn.execute(
+                    f"""
+                    SELECT record_id, distance
+                    FROM (
+                        SELECT
+                            record_id,
+                            vec_distance_cosine(vec_f32(embedding), vec_f32(?)) AS distance
+                        FROM embeddings
+                        {where_clause}
                     )
-                    if not enabled:
-                        raise RuntimeError(error or "sqlite_vec unavailable")
-                    rows = conn.execute(
-                        f"""
-                        SELECT record_id, distance
-                        FROM (
-                            SELECT
-                                record_id,
-                                vec_distance_cosine(vec_f32(embedding), vec_f32(?)) AS distance
-                            FROM embeddings
-                            {where_clause}
-                        )
-                        ORDER BY distance ASC, record_id DESC
-                        LIMIT ?
-                        """,
-                        params,
-                    ).fetchall()
+                    ORDER BY distance ASC, record_id DESC
+                    LIMIT ?
+                    """,
+                    params,
+                ).fetchall()
         except Exception as exc:
             self._status["last_error"] = str(exc)
             return SQLiteMemoryBackend.query_similar_embeddings(
@@ -714,8 +1149,10 @@ class SQLiteVecMemoryBackend(SQLiteMemoryBackend):
 @dataclass(slots=True)
 class PgvectorMemoryBackend:
     pgvector_url: str = ""
+    pool_size: int = PG_POOL_MAX_SIZE
     _lock: threading.Lock = field(init=False)
     _status: dict[str, Any] = field(init=False)
+    _pool: PgConnectionPool | None = field(init=False, default=None)
 
     def __post_init__(self) -> None:
         self._lock = threading.RLock()
@@ -744,7 +1181,11 @@ class PgvectorMemoryBackend:
 
     def diagnostics(self) -> dict[str, Any]:
         with self._lock:
-            return dict(self._status)
+            out = dict(self._status)
+            pool = self._pool
+        if pool is not None:
+            out.update({f"pool_{key}": value for key, value in pool.snapshot().items()})
+        return out
 
     def support_error(self) -> str:
         if not bool(self.diagnostics().get("supported", False)):
@@ -928,7 +1369,26 @@ class PgvectorMemoryBackend:
                 errors.append(f"{index_kind}:{exc}")
         raise RuntimeError("pgvector ANN index unavailable: " + "; ".join(errors))
 
+    def _connection_pool(self) -> PgConnectionPool:
+        with self._lock:
+            if self._pool is None:
+                self._pool = PgConnectionPool(self._dial_connection, max_size=self.pool_size)
+            return self._pool
+
     def _open_connection(self) -> Any | None:
+        """Borrow a pooled connection; its ``close()`` hands it back to the pool."""
+        conn = self._connection_pool().acquire()
+        if conn is None and bool(self._status.get("connection_ok", False)):
+            self._set_status(last_error="pgvector connection pool exhausted")
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+    def _dial_connection(self) -> Any | None:
         if not self._is_valid_pg_url():
             self._set_status(
                 url_valid=False,
@@ -1084,44 +1544,106 @@ class PgvectorMemoryBackend:
         conn = self._open_connection()
         if conn is None:
             return
-        with self._lock:
-            cursor = None
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO layer_records (layer, record_id, category, payload, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT(layer, record_id) DO UPDATE SET
+                    category = EXCLUDED.category,
+                    payload = EXCLUDED.payload,
+                    updated_at = EXCLUDED.updated_at
+                """,
+                (
+                    str(layer or "item"),
+                    str(record_id),
+                    str(category or "context"),
+                    json.dumps(payload or {}, ensure_ascii=False),
+                    str(created_at or ""),
+                    str(updated_at or ""),
+                ),
+            )
+            conn.commit()
+        except Exception:
             try:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    INSERT INTO layer_records (layer, record_id, category, payload, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    ON CONFLICT(layer, record_id) DO UPDATE SET
-                        category = EXCLUDED.category,
-                        payload = EXCLUDED.payload,
-                        updated_at = EXCLUDED.updated_at
-                    """,
-                    (
-                        str(layer or "item"),
-                        str(record_id),
-                        str(category or "context"),
-                        json.dumps(payload or {}, ensure_ascii=False),
-                        str(created_at or ""),
-                        str(updated_at or ""),
-                    ),
-                )
-                conn.commit()
+                conn.rollback()
             except Exception:
+                pass
+        finally:
+            if cursor is not None:
                 try:
-                    conn.rollback()
+                    cursor.close()
                 except Exception:
                     pass
-            finally:
-                if cursor is not None:
-                    try:
-                        cursor.close()
-                    except Exception:
-                        pass
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _execute_values(self, *, head: str, row_sql: str, tail: str, rows: list[tuple[Any, ...]]) -> int:
+        """Run ``head VALUES row_sql, row_sql, ... tail`` in chunks, in one transaction."""
+        if not rows:
+            return 0
+        conn = self._open_connection()
+        if conn is None:
+            return 0
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            for start in range(0, len(rows), _LAYER_LOOKUP_CHUNK):
+                chunk = rows[start : start + _LAYER_LOOKUP_CHUNK]
+                values = ", ".join(row_sql for _ in chunk)
+                params = tuple(item for row in chunk for item in row)
+                cursor.execute(f"{head} VALUES {values} {tail}", params)
+            conn.commit()
+            return len(rows)
+        except Exception as exc:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            self._set_status(last_error=str(exc))
+            return 0
+        finally:
+            if cursor is not None:
                 try:
-                    conn.close()
+                    cursor.close()
                 except Exception:
                     pass
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def upsert_layer_records(self, rows: list[dict[str, Any]]) -> int:
+        """Bulk :meth:`upsert_layer_record` as multi-row ``INSERT ... VALUES``."""
+        # ON CONFLICT cannot touch the same row twice in one statement, so the
+        # last write per key wins before the rows are sent.
+        by_key: dict[tuple[str, str], tuple[Any, ...]] = {}
+        for row in rows:
+            record_id = str(row.get("record_id") or "").strip()
+            if not record_id:
+                continue
+            layer = str(row.get("layer") or "item")
+            by_key[(layer, record_id)] = (
+                layer,
+                record_id,
+                str(row.get("category") or "context"),
+                json.dumps(row.get("payload") or {}, ensure_ascii=False),
+                str(row.get("created_at") or ""),
+                str(row.get("updated_at") or ""),
+            )
+        return self._execute_values(
+            head="INSERT INTO layer_records (layer, record_id, category, payload, created_at, updated_at)",
+            row_sql="(%s, %s, %s, %s, %s, %s)",
+            tail=(
+                "ON CONFLICT(layer, record_id) DO UPDATE SET "
+                "category = EXCLUDED.category, payload = EXCLUDED.payload, updated_at = EXCLUDED.updated_at"
+            ),
+            rows=list(by_key.values()),
+        )
 
     def delete_layer_records(self, record_ids: list[str] | set[str]) -> int:
         ids = [str(item).strip() for item in record_ids if str(item).strip()]
@@ -1133,30 +1655,29 @@ class PgvectorMemoryBackend:
             return 0
 
         placeholders = ", ".join("%s" for _ in ids)
-        with self._lock:
-            cursor = None
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"DELETE FROM layer_records WHERE record_id IN ({placeholders})", tuple(ids))
+            deleted = int(getattr(cursor, "rowcount", 0) or 0)
+            conn.commit()
+            return deleted
+        except Exception:
             try:
-                cursor = conn.cursor()
-                cursor.execute(f"DELETE FROM layer_records WHERE record_id IN ({placeholders})", tuple(ids))
-                deleted = int(getattr(cursor, "rowcount", 0) or 0)
-                conn.commit()
-                return deleted
+                conn.rollback()
             except Exception:
+                pass
+            return 0
+        finally:
+            if cursor is not None:
                 try:
-                    conn.rollback()
-                except Exception:
-                    pass
-                return 0
-            finally:
-                if cursor is not None:
-                    try:
-                        cursor.close()
-                    except Exception:
-                        pass
-                try:
-                    conn.close()
+                    cursor.close()
                 except Exception:
                     pass
+            try:
+                conn.close()
+            except Exception:
+                pass
 
     def fetch_layer_records(self, *, layer: str, category: str | None = None, limit: int = 200) -> list[dict[str, Any]]:
         bounded_limit = max(1, int(limit or 1))
@@ -1175,48 +1696,75 @@ class PgvectorMemoryBackend:
         if conn is None:
             return []
 
-        with self._lock:
-            cursor = None
-            try:
-                cursor = conn.cursor()
-                cursor.execute(query, tuple(params))
-                rows = cursor.fetchall()
-            except Exception:
-                return []
-            finally:
-                if cursor is not None:
-                    try:
-                        cursor.close()
-                    except Exception:
-                        pass
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+        except Exception:
+            return []
+        finally:
+            if cursor is not None:
                 try:
-                    conn.close()
+                    cursor.close()
                 except Exception:
                     pass
+            try:
+                conn.close()
+            except Exception:
+                pass
 
-        out: list[dict[str, Any]] = []
-        for row_layer, row_id, row_category, row_payload, created_at, updated_at in rows:
-            payload: dict[str, Any] = {}
-            if isinstance(row_payload, dict):
-                payload = row_payload
-            else:
+        return [_layer_row_to_dict(row) for row in rows]
+
+    def fetch_layer_records_by_ids(
+        self,
+        record_ids: list[str] | set[str],
+        *,
+        layer: str | None = None,
+    ) -> list[dict[str, Any]]:
+        ids = _clean_record_ids(record_ids)
+        if not ids:
+            return []
+
+        conn = self._open_connection()
+        if conn is None:
+            return []
+
+        rows: list[Any] = []
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            for start in range(0, len(ids), _LAYER_LOOKUP_CHUNK):
+                chunk = ids[start : start + _LAYER_LOOKUP_CHUNK]
+                placeholders = ", ".join("%s" for _ in chunk)
+                query = (
+                    "SELECT layer, record_id, category, payload, created_at, updated_at "
+                    f"FROM layer_records WHERE record_id IN ({placeholders})"
+                )
+                params: list[Any] = list(chunk)
+                if layer is not None:
+                    query += " AND layer = %s"
+                    params.append(str(layer or "item"))
+                cursor.execute(query, tuple(params))
+                rows.extend(cursor.fetchall())
+        except Exception:
+            return []
+        finally:
+            if cursor is not None:
                 try:
-                    parsed = json.loads(str(row_payload or "{}"))
-                    if isinstance(parsed, dict):
-                        payload = parsed
+                    cursor.close()
                 except Exception:
-                    payload = {}
-            out.append(
-                {
-                    "layer": str(row_layer or ""),
-                    "record_id": str(row_id or ""),
-                    "category": str(row_category or ""),
-                    "payload": payload,
-                    "created_at": str(created_at or ""),
-                    "updated_at": str(updated_at or ""),
-                }
-            )
-        return out
+                    pass
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+        return _order_layer_rows([_layer_row_to_dict(row) for row in rows], ids)
+
+    def fetch_layer_record(self, record_id: str, *, layer: str | None = None) -> dict[str, Any] | None:
+        rows = self.fetch_layer_records_by_ids([record_id], layer=layer)
+        return rows[0] if rows else None
 
     def upsert_embedding(self, record_id: str, embedding: list[float], created_at: str, source: str) -> None:
         clean_id = str(record_id or "").strip()
@@ -1226,42 +1774,60 @@ class PgvectorMemoryBackend:
         conn = self._open_connection()
         if conn is None:
             return
-        with self._lock:
-            cursor = None
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO embeddings (record_id, embedding, created_at, source)
+                VALUES (%s, %s::vector, %s, %s)
+                ON CONFLICT(record_id) DO UPDATE SET
+                    embedding = EXCLUDED.embedding,
+                    created_at = EXCLUDED.created_at,
+                    source = EXCLUDED.source
+                """,
+                (
+                    clean_id,
+                    self._to_vector_literal(normalized),
+                    str(created_at or ""),
+                    str(source or ""),
+                ),
+            )
+            conn.commit()
+        except Exception:
             try:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    INSERT INTO embeddings (record_id, embedding, created_at, source)
-                    VALUES (%s, %s::vector, %s, %s)
-                    ON CONFLICT(record_id) DO UPDATE SET
-                        embedding = EXCLUDED.embedding,
-                        created_at = EXCLUDED.created_at,
-                        source = EXCLUDED.source
-                    """,
-                    (
-                        clean_id,
-                        self._to_vector_literal(normalized),
-                        str(created_at or ""),
-                        str(source or ""),
-                    ),
-                )
-                conn.commit()
+                conn.rollback()
             except Exception:
+                pass
+        finally:
+            if cursor is not None:
                 try:
-                    conn.rollback()
-                except Exception:
-                    pass
-            finally:
-                if cursor is not None:
-                    try:
-                        cursor.close()
-                    except Exception:
-                        pass
-                try:
-                    conn.close()
+                    cursor.close()
                 except Exception:
                     pass
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def upsert_embeddings(self, entries: list[tuple[str, list[float], str, str]]) -> int:
+        """Bulk :meth:`upsert_embedding` for ``(record_id, embedding, created_at, source)`` rows."""
+        by_id: dict[str, tuple[Any, ...]] = {}
+        for record_id, embedding, created_at, source in entries:
+            clean_id = str(record_id or "").strip()
+            normalized = _normalize_embedding(embedding)
+            if not clean_id or normalized is None:
+                continue
+            by_id[clean_id] = (clean_id, self._to_vector_literal(normalized), str(created_at or ""), str(source or ""))
+        return self._execute_values(
+            head="INSERT INTO embeddings (record_id, embedding, created_at, source)",
+            row_sql="(%s, %s::vector, %s, %s)",
+            tail=(
+                "ON CONFLICT(record_id) DO UPDATE SET "
+                "embedding = EXCLUDED.embedding, created_at = EXCLUDED.created_at, source = EXCLUDED.source"
+            ),
+            rows=list(by_id.values()),
+        )
 
     def delete_embeddings(self, record_ids: list[str] | set[str]) -> int:
         ids = [str(item).strip() for item in record_ids if str(item).strip()]
@@ -1272,30 +1838,29 @@ class PgvectorMemoryBackend:
             return 0
 
         placeholders = ", ".join("%s" for _ in ids)
-        with self._lock:
-            cursor = None
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"DELETE FROM embeddings WHERE record_id IN ({placeholders})", tuple(ids))
+            deleted = int(getattr(cursor, "rowcount", 0) or 0)
+            conn.commit()
+            return deleted
+        except Exception:
             try:
-                cursor = conn.cursor()
-                cursor.execute(f"DELETE FROM embeddings WHERE record_id IN ({placeholders})", tuple(ids))
-                deleted = int(getattr(cursor, "rowcount", 0) or 0)
-                conn.commit()
-                return deleted
+                conn.rollback()
             except Exception:
+                pass
+            return 0
+        finally:
+            if cursor is not None:
                 try:
-                    conn.rollback()
-                except Exception:
-                    pass
-                return 0
-            finally:
-                if cursor is not None:
-                    try:
-                        cursor.close()
-                    except Exception:
-                        pass
-                try:
-                    conn.close()
+                    cursor.close()
                 except Exception:
                     pass
+            try:
+                conn.close()
+            except Exception:
+                pass
 
     def fetch_embeddings(self, record_ids: list[str] | None = None, limit: int = 5000) -> dict[str, list[float]]:
         bounded_limit = max(1, int(limit or 1))
@@ -1313,24 +1878,23 @@ class PgvectorMemoryBackend:
         query += " ORDER BY created_at DESC, record_id DESC LIMIT %s"
         params.append(bounded_limit)
 
-        with self._lock:
-            cursor = None
-            try:
-                cursor = conn.cursor()
-                cursor.execute(query, tuple(params))
-                rows = cursor.fetchall()
-            except Exception:
-                return {}
-            finally:
-                if cursor is not None:
-                    try:
-                        cursor.close()
-                    except Exception:
-                        pass
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+        except Exception:
+            return {}
+        finally:
+            if cursor is not None:
                 try:
-                    conn.close()
+                    cursor.close()
                 except Exception:
                     pass
+            try:
+                conn.close()
+            except Exception:
+                pass
 
         out: dict[str, list[float]] = {}
         for row_id, row_embedding in rows:
@@ -1357,54 +1921,53 @@ class PgvectorMemoryBackend:
         sql_hits: list[dict[str, Any]] | None = None
         conn = self._open_connection()
         if conn is not None:
-            with self._lock:
-                cursor = None
-                try:
-                    vector_literal = self._to_vector_literal(normalized_query)
-                    params: list[Any] = [vector_literal]
-                    query = (
-                        "SELECT record_id, (1 - (embedding <=> %s::vector)) AS score "
-                        "FROM embeddings"
-                    )
+            cursor = None
+            try:
+                vector_literal = self._to_vector_literal(normalized_query)
+                params: list[Any] = [vector_literal]
+                query = (
+                    "SELECT record_id, (1 - (embedding <=> %s::vector)) AS score "
+                    "FROM embeddings"
+                )
+
+                clean_ids = [str(item).strip() for item in (record_ids or []) if str(item).strip()]
+                if clean_ids:
+                    placeholders = ", ".join("%s" for _ in clean_ids)
+                    query += f" WHERE record_id IN ({placeholders})"
+                    params.extend(clean_ids)
 
-                    clean_ids = [str(item).strip() for item in (record_ids or []) if str(item).strip()]
-                    if clean_ids:
-                        placeholders = ", ".join("%s" for _ in clean_ids)
-                        query += f" WHERE record_id IN ({placeholders})"
-                        params.extend(clean_ids)
-
-                    query += " ORDER BY embedding <=> %s::vector ASC, record_id DESC LIMIT %s"
-                    params.append(vector_literal)
-                    params.append(bounded_limit)
-
-                    cursor = conn.cursor()
-                    cursor.execute(query, tuple(params))
-                    rows = cursor.fetchall()
-                    self._set_status(sql_similarity_available=True, last_error="")
-
-                    sql_hits = []
-                    for row in rows:
-                        row_id = str(row[0] or "").strip() if len(row) >= 1 else ""
-                        if not row_id:
-                            continue
-                        try:
-                            score = float(row[1]) if len(row) >= 2 else 0.0
-                        except Exception:
-                            score = 0.0
-                        sql_hits.append({"record_id": row_id, "score": score})
-                except Exception as exc:
-                    self._set_status(sql_similarity_available=False, last_error=str(exc))
-                    sql_hits = None
-                finally:
-                    if cursor is not None:
-                        try:
-                            cursor.close()
-                        except Exception:
-                            pass
+                query += " ORDER BY embedding <=> %s::vector ASC, record_id DESC LIMIT %s"
+                params.append(vector_literal)
+                params.append(bounded_limit)
+
+                cursor = conn.cursor()
+                cursor.execute(query, tuple(params))
+                rows = cursor.fetchall()
+                self._set_status(sql_similarity_available=True, last_error="")
+
+                sql_hits = []
+                for row in rows:
+                    row_id = str(row[0] or "").strip() if len(row) >= 1 else ""
+                    if not row_id:
+                        continue
                     try:
-                        conn.close()
+                        score = float(row[1]) if len(row) >= 2 else 0.0
+                    except Exception:
+                        score = 0.0
+                    sql_hits.append({"record_id": row_id, "score": score})
+            except Exception as exc:
+                self._set_status(sql_similarity_available=False, last_error=str(exc))
+                sql_hits = None
+            finally:
+                if cursor is not None:
+                    try:
+                        cursor.close()
                     except Exception:
                         pass
+                try:
+                    conn.close()
+                except Exception:
+                    pass
 
         if sql_hits is not None:
             return sql_hits[:bounded_limit]
@@ -1412,80 +1975,104 @@ class PgvectorMemoryBackend:
         embeddings = self.fetch_embeddings(record_ids=record_ids, limit=max(bounded_limit, 5000))
         if not embeddings:
             return []
-        scored: list[dict[str, Any]] = []
-        for row_id, vector in embeddings.items():
-            scored.append({"record_id": row_id, "score": _cosine_similarity(normalized_query, vector)})
-        scored.sort(key=lambda item: (float(item.get("score", 0.0)), str(item.get("record_id", ""))), reverse=True)
-        return scored[:bounded_limit]
+        return _query_embedding_matrices(
+            _build_embedding_matrices(embeddings),
+            normalized_query,
+            limit=bounded_limit,
+        )
 
-    def search_text(self, query: str, layer: str | None = None, limit: int = 10) -> list[dict[str, Any]]:
+    def search_text(
+        self,
+        query: str,
+        layer: str | None = None,
+        limit: int = 10,
+        *,
+        match_any: bool = False,
+    ) -> list[dict[str, Any]]:
         """Full-text search via PostgreSQL plainto_tsquery on payload->>'text'.
 
         Returns list of {record_id, score} sorted best-match first (score in [0,1]).
         Falls back gracefully to [] when the connection is unavailable.
+        ``match_any`` ORs the query words through websearch_to_tsquery.
         """
         query = str(query or "").strip()
         if not query:
             return []
-        limit = max(1, min(int(limit or 10), 200))
+        limit = max(1, min(int(limit or 10), SEARCH_TEXT_MAX_LIMIT))
+        if match_any:
+            words = re.findall(r"\w+", query)
+            if not words:
+                return []
+            query = " or ".join(words)
 
         conn = self._open_connection()
         if conn is None:
             return []
 
-        with self._lock:
-            cursor = None
-            try:
-                cursor = conn.cursor()
-                text_col = "COALESCE(payload::json->>'text', '')"
-                tsv = f"to_tsvector('english', {text_col})"
-                tsq = "plainto_tsquery('english', %s)"
-                if layer:
-                    cursor.execute(
-                        f"""
-                        SELECT record_id,
-                               ts_rank({tsv}, {tsq}) AS score
-                        FROM layer_records
-                        WHERE layer = %s
-                          AND {tsv} @@ {tsq}
-                        ORDER BY score DESC
-                        LIMIT %s
-                        """,
-                        (query, str(layer), query, limit),
-                    )
-                else:
-                    cursor.execute(
-                        f"""
-                        SELECT record_id,
-                               ts_rank({tsv}, {tsq}) AS score
-                        FROM layer_records
-                        WHERE {tsv} @@ {tsq}
-                        ORDER BY score DESC
-                        LIMIT %s
-                        """,
-                        (query, query, limit),
-                    )
-                rows = cursor.fetchall()
-                return [{"record_id": str(r[0] or ""), "score": float(r[1])} for r in rows]
-            except Exception as exc:
-                self._set_status(last_error=str(exc))
-                return []
-            finally:
-                if cursor is not None:
-                    try:
-                        cursor.close()
-                    except Exception:
-                        pass
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            text_col = "COALESCE(payload::json->>'text', '')"
+            tsv = f"to_tsvector('english', {text_col})"
+            tsq = "websearch_to_tsquery('english', %s)" if match_any else "plainto_tsquery('english', %s)"
+            if layer:
+                cursor.execute(
+                    f"""
+                    SELECT record_id,
+                           ts_rank({tsv}, {tsq}) AS score
+                    FROM layer_records
+                    WHERE layer = %s
+                      AND {tsv} @@ {tsq}
+                    ORDER BY score DESC
+                    LIMIT %s
+                    """,
+                    (query, str(layer), query, limit),
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    SELECT record_id,
+                           ts_rank({tsv}, {tsq}) AS score
+                    FROM layer_records
+                    WHERE {tsv} @@ {tsq}
+                    ORDER BY score DESC
+                    LIMIT %s
+                    """,
+                    (query, query, limit),
+                )
+            rows = cursor.fetchall()
+            return [{"record_id": str(r[0] or ""), "score": float(r[1])} for r in rows]
+        except Exception as exc:
+            self._set_status(last_error=str(exc))
+            return []
+        finally:
+            if cursor is not None:
                 try:
-                    conn.close()
+                    cursor.close()
                 except Exception:
                     pass
+            try:
+                conn.close()
+            except Exception:
+                pass
 
 
-def resolve_memory_backend(backend_name: str, pgvector_url: str = "") -> MemoryBackend:
+def resolve_memory_backend(
+    backend_name: str,
+    pgvector_url: str = "",
+    *,
+    ann_probes: int = DEFAULT_ANN_PROBES,
+    ann_min_rows: int = ANN_MIN_ROWS,
+    embedding_format: str = DEFAULT_EMBEDDING_FORMAT,
+) -> MemoryBackend:
     normalized = str(backend_name or "sqlite").strip().lower()
+    ann_options = {
+        "ann_probes": max(0, int(ann_probes)),
+        "ann_min_rows": max(0, int(ann_min_rows)),
+        "embedding_format": normalize_embedding_format(embedding_format),
+    }
     if normalized in {"sqlite-vec", "sqlite_vec"}:
-        return SQLiteVecMemoryBackend()
+        return SQLiteVecMemoryBackend(**ann_options)
     if normalized == "pgvector":
         return PgvectorMemoryBackend(pgvector_url=str(pgvector_url or ""))
-    return SQLiteMemoryBackend()
+    return SQLiteMemoryBackend(**ann_options)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+CONSOLIDATION_WORKERS = 2
+CONSOLIDATION_MAX_PENDING = 256
+CONSOLIDATION_COALESCE_S = 0.25
+
+RunPass = Callable[[list[dict[str, str]], dict[str, Any]], Awaitable[Any]]
+
+
+class _PendingPass:
+    __slots__ = ("messages", "options", "enqueued_at")
+
+    def __init__(self, messages: list[dict[str, str]], options: dict[str, Any], enqueued_at: float) -> None:
+        self.messages = messages
+        self.options = options
+        self.enqueued_at = enqueued_at
+
+
+class ConsolidationQueue:
+    """Memory consolidation passes run off the turn path, coalesced per key.
+
+    :meth:`submit` appends a turn's messages to the pending pass of its key
+    (a session and user), or opens one. Passes of one key never overlap,
+    and a pass keeps absorbing the key's turns until a worker starts it,
+    at least ``coalesce_s`` after it was opened; a chatty session therefore
+    costs one consolidation, and one curated-fact rewrite, per burst rather
+    than per turn. At most ``workers`` passes run at once. Once
+    ``max_pending`` keys are waiting, submitting another key waits for a
+    slot, which holds back the submitting turn's persistence task instead
+    of growing the queue without bound.
+
+    Workers are started on the running loop by the first submit and
+    stopped by :meth:`drain` once the queue is empty.
+    """
+
+    def __init__(
+        self,
+        run_pass: RunPass,
+        *,
+        workers: int = CONSOLIDATION_WORKERS,
+        max_pending: int = CONSOLIDATION_MAX_PENDING,
+        coalesce_s: float = CONSOLIDATION_COALESCE_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._run_pass = run_pass
+        self._worker_count = max(1, int(workers))
+        self._max_pending = max(1, int(max_pending))
+        self._coalesce_s = max(0.0, float(coalesce_s))
+        self._clock = clock
+        self._pending: dict[Hashable, _PendingPass] = {}
+        self._running: set[Hashable] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ready: asyncio.Queue[Hashable] | None = None
+        self._changed: asyncio.Condition | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self.submitted = 0
+        self.coalesced = 0
+        self.passes = 0
+        self.failures = 0
+        self.backpressure_waits = 0
+        self.last_error = ""
+        self._last_lag_s = 0.0
+        self._max_lag_s = 0.0
+        self._last_pass_s = 0.0
+        self._max_pass_s = 0.0
+        self._total_pass_s = 0.0
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._ready is None or self._changed is None:
+            # Queue primitives belong to one loop; passes left by a closed loop restart here.
+            self._loop = loop
+            self._ready = asyncio.Queue()
+            self._changed = asyncio.Condition()
+            self._workers = []
+            self._running.clear()
+            for key in self._pending:
+                self._ready.put_nowait(key)
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self._worker_count:
+            self._workers.append(loop.create_task(self._worker()))
+
+    async def submit(self, key: Hashable, messages: Iterable[dict[str, str]], **options: Any) -> None:
+        """Queue ``messages`` for consolidation under ``key``; ``options`` of the latest turn win."""
+        self._ensure_workers()
+        assert self._ready is not None and self._changed is not None
+        rows = [dict(row) for row in messages]
+        if key not in self._pending and len(self._pending) >= self._max_pending:
+            self.backpressure_waits += 1
+            async with self._changed:
+                await self._changed.wait_for(lambda: key in self._pending or len(self._pending) < self._max_pending)
+        self.submitted += 1
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.messages.extend(rows)
+            pending.options = dict(options)
+            self.coalesced += 1
+            return
+        self._pending[key] = _PendingPass(rows, dict(options), self._clock())
+        if key not in self._running:
+            self._ready.put_nowait(key)
+
+    async def _worker(self) -> None:
+        assert self._ready is not None and self._changed is not None
+        ready = self._ready
+        changed = self._changed
+        while True:
+            key = await ready.get()
+            pending = self._pending.get(key)
+            if pending is None or key in self._running:
+                continue
+            self._running.add(key)
+            try:
+                delay = pending.enqueued_at + self._coalesce_s - self._clock()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                pending = self._pending.pop(key, pending)
+                async with changed:
+                    changed.notify_all()
+                started = self._clock()
+                self._last_lag_s = max(0.0, started - pending.enqueued_at)
+                self._max_lag_s = max(self._max_lag_s, self._last_lag_s)
+                try:
+                    await self._run_pass(pending.messages, pending.options)
+                except Exception as exc:
+                    self.failures += 1
+                    self.last_error = str(exc)
+                finally:
+                    elapsed = max(0.0, self._clock() - started)
+                    self.passes += 1
+                    self._last_pass_s = elapsed
+                    self._max_pass_s = max(self._max_pass_s, elapsed)
+                    self._total_pass_s += elapsed
+            finally:
+                self._running.discard(key)
+                if key in self._pending:
+                    ready.put_nowait(key)
+                async with changed:
+                    changed.notify_all()
+
+    async def drain(self) -> None:
+        """Wait until every queued pass has run, then stop the idle workers."""
+        if not self._pending and not self._running and not self._workers:
+            return
+        self._ensure_workers()
+        assert self._changed is not None
+        async with self._changed:
+            await self._changed.wait_for(lambda: not self._pending and not self._running)
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        for task in workers:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def drain_keys(self, match: Callable[[Hashable], bool]) -> None:
+        """Wait until no pass whose key satisfies ``match`` is queued or running; workers keep going."""
+
+        def _busy() -> bool:
+            return any(match(key) for key in self._pending) or any(match(key) for key in self._running)
+
+        if not _busy():
+            return
+        self._ensure_workers()
+        assert self._changed is not None
+        async with self._changed:
+            await self._changed.wait_for(lambda: not _busy())
+
+    def snapshot(self) -> dict[str, Any]:
+        now = self._clock()
+        oldest = min((pending.enqueued_at for pending in self._pending.values()), default=now)
+        return {
+            "workers": self._worker_count,
+            "max_pending": self._max_pending,
+            "depth": len(self._pending),
+            "running": len(self._running),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "passes": self.passes,
+            "failures": self.failures,
+            "backpressure_waits": self.backpressure_waits,
+            "oldest_pending_ms": int(max(0.0, now - oldest) * 1000),
+            "last_lag_ms": int(self._last_lag_s * 1000),
+            "max_lag_ms": int(self._max_lag_s * 1000),
+            "last_pass_ms": int(self._last_pass_s * 1000),
+            "avg_pass_ms": int(self._total_pass_s * 1000 / self.passes) if self.passes else 0,
+            "max_pass_ms": int(self._max_pass_s * 1000),
+            "last_error": self.last_error,
+        }
+
+
+__all__ = [
+    "CONSOLIDATION_COALESCE_S",
+    "CONSOLIDATION_MAX_PENDING",
+    "CONSOLIDATION_WORKERS",
+    "ConsolidationQueue",
+]
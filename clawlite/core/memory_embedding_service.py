@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Sequence
+
+from clawlite.core.memory_embedding_store import pack_float32, unpack_float32
+
+EMBEDDING_CACHE_FILENAME = "embedding-cache.sqlite3"
+EMBEDDING_BATCH_SIZE = 64
+EMBEDDING_CONCURRENCY = 4
+EMBEDDING_COALESCE_WINDOW_S = 0.005
+EMBEDDING_HOT_CACHE_SIZE = 1024
+
+Vector = list[float]
+
+
+def embedding_cache_key(model_key: str, text: str) -> str:
+    return hashlib.sha256(f"{model_key}\n{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent ``sha256(model, text) -> vector`` cache backed by SQLite.
+
+    Vectors are stored as float32 BLOBs. A small in-process LRU sits in front
+    of the table so repeated queries within a process never touch disk. The
+    database is opened lazily, so stores that never embed never create it.
+    Every failure degrades to a cache miss.
+    """
+
+    def __init__(self, path: Path, *, hot_size: int = EMBEDDING_HOT_CACHE_SIZE) -> None:
+        self.path = Path(path)
+        self._hot_size = max(0, int(hot_size))
+        self._hot: OrderedDict[str, Vector] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                "key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, vector: Vector) -> None:
+        if self._hot_size <= 0:
+            return
+        self._hot[key] = vector
+        self._hot.move_to_end(key)
+        while len(self._hot) > self._hot_size:
+            self._hot.popitem(last=False)
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, Vector]:
+        found: dict[str, Vector] = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vector = self._hot.get(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    self._hot.move_to_end(key)
+                    found[key] = vector
+            if not missing:
+                return found
+            try:
+                conn = self._connection()
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start : start + 500]
+                    placeholders = ",".join("?" for _ in chunk)
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = unpack_float32(blob)
+                        found[str(key)] = vector
+                        self._remember(str(key), vector)
+            except sqlite3.Error:
+                pass
+        return found
+
+    def put_many(self, items: dict[str, Vector]) -> None:
+        if not items:
+            return
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embedding_cache (key, dim, vector) VALUES (?, ?, ?)",
+                        [(key, len(vector), pack_float32(vector)) for key, vector in items.items()],
+                    )
+            except (sqlite3.Error, ValueError, OverflowError):
+                pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._conn is None and not self.path.exists():
+                return 0
+            try:
+                return int(self._connection().execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0])
+            except sqlite3.Error:
+                return 0
+
+
+class EmbeddingService:
+    """Cached, coalescing front end for a batch embedding provider.
+
+    ``embed_batch`` takes a list of texts and returns one vector (or ``None``)
+    per text, in order. Callers go through :meth:`embed` or :meth:`embed_many`:
+
+    - texts already in the :class:`EmbeddingCache` never reach the provider;
+    - identical texts requested concurrently share one in-flight future;
+    - cache misses from concurrent callers are queued. While fewer than
+      ``concurrency`` callers are draining, a caller with queued texts becomes
+      a drainer: it waits ``coalesce_window_s`` for company, then takes
+      batches of at most ``batch_size`` texts off the queue until it is
+      empty. Everyone else waits on their futures, so at most
+      ``concurrency`` provider calls are in flight at once.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[list[str]], Sequence[Vector | None]],
+        *,
+        cache: EmbeddingCache | None = None,
+        model_key: str = "",
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        concurrency: int = EMBEDDING_CONCURRENCY,
+        coalesce_window_s: float = EMBEDDING_COALESCE_WINDOW_S,
+    ) -> None:
+        self._embed_batch = embed_batch
+        self.cache = cache
+        self.model_key = str(model_key or "")
+        self.batch_size = max(1, int(batch_size))
+        self.concurrency = max(1, int(concurrency))
+        self.coalesce_window_s = max(0.0, float(coalesce_window_s))
+        self._lock = threading.Lock()
+        self._queue: list[tuple[str, str]] = []
+        self._inflight: dict[str, Future[Vector | None]] = {}
+        self._drainers = 0
+        self.stats: dict[str, int] = {
+            "requests": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "provider_calls": 0,
+            "provider_texts": 0,
+            "failures": 0,
+        }
+
+    def embed(self, text: str) -> Vector | None:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[str]) -> list[Vector | None]:
+        clean = [str(text or "").strip() for text in texts]
+        keys = [embedding_cache_key(self.model_key, text) if text else "" for text in clean]
+        wanted = sorted({key for key in keys if key})
+        cached = self.cache.get_many(wanted) if self.cache is not None and wanted else {}
+
+        futures: dict[str, Future[Vector | None]] = {}
+        drain = False
+        with self._lock:
+            self.stats["requests"] += len(clean)
+            self.stats["cache_hits"] += sum(1 for key in keys if key and key in cached)
+            for key, text in zip(keys, clean):
+                if not key or key in cached or key in futures:
+                    continue
+                future = self._inflight.get(key)
+                if future is not None:
+                    self.stats["coalesced"] += 1
+                else:
+                    future = Future()
+                    self._inflight[key] = future
+                    self._queue.append((key, text))
+                futures[key] = future
+            if self._queue and self._drainers < self.concurrency:
+                self._drainers += 1
+                drain = True
+        if drain:
+            self._drain()
+
+        out: list[Vector | None] = []
+        for key in keys:
+            if not key:
+                out.append(None)
+            elif key in cached:
+                out.append(list(cached[key]))
+            else:
+                vector = futures[key].result()
+                out.append(list(vector) if vector is not None else None)
+        return out
+
+    def _drain(self) -> None:
+        if self.coalesce_window_s > 0:
+            time.sleep(self.coalesce_window_s)
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._drainers -= 1
+                    return
+                batch = self._queue[: self.batch_size]
+                del self._queue[: self.batch_size]
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list[tuple[str, str]]) -> None:
+        vectors: Sequence[Vector | None]
+        try:
+            vectors = self._embed_batch([text for _key, text in batch])
+        except Exception:
+            vectors = []
+        resolved: dict[str, Vector] = {}
+        with self._lock:
+            self.stats["provider_calls"] += 1
+            self.stats["provider_texts"] += len(batch)
+            for idx, (key, _text) in enumerate(batch):
+                vector = vectors[idx] if idx < len(vectors) else None
+                if vector is None:
+                    self.stats["failures"] += 1
+                else:
+                    resolved[key] = vector
+        if self.cache is not None and resolved:
+            self.cache.put_many(resolved)
+        with self._lock:
+            for key, _text in batch:
+                future = self._inflight.pop(key, None)
+                if future is not None:
+                    future.set_result(resolved.get(key))
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+
+__all__ = [
+    "EMBEDDING_BATCH_SIZE",
+    "EMBEDDING_CACHE_FILENAME",
+    "EMBEDDING_COALESCE_WINDOW_S",
+    "EMBEDDING_CONCURRENCY",
+    "EMBEDDING_HOT_CACHE_SIZE",
+    "EmbeddingCache",
+    "EmbeddingService",
+    "embedding_cache_key",
+]
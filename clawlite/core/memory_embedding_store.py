@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Iterable
+
+from clawlite.core.memory_vectors import np
+
+EMBEDDING_FORMATS = ("float32", "float16", "int8", "json")
+DEFAULT_EMBEDDING_FORMAT = "float32"
+SIDECAR_SUFFIX = ".f32"
+
+# Quantized blobs start with a float32 NaN bit pattern followed by a format
+# byte. No stored embedding can begin with NaN (non-finite vectors are kept as
+# JSON), so plain float32 blobs need no header and stay readable by
+# sqlite-vec's ``vec_f32()``.
+_QUANTIZED_MAGIC = b"\xff\xff\xff\x7f"
+_FORMAT_CODES = {"float16": b"h", "int8": b"b"}
+_CODE_FORMATS = {code: name for name, code in _FORMAT_CODES.items()}
+
+
+def normalize_embedding_format(value: Any) -> str:
+    clean = str(value or DEFAULT_EMBEDDING_FORMAT).strip().lower().replace("-", "").replace("_", "")
+    aliases = {"f32": "float32", "fp32": "float32", "f16": "float16", "fp16": "float16", "half": "float16", "q8": "int8"}
+    clean = aliases.get(clean, clean)
+    return clean if clean in EMBEDDING_FORMATS else DEFAULT_EMBEDDING_FORMAT
+
+
+def _finite_floats(vector: Iterable[Any]) -> list[float] | None:
+    try:
+        values = [float(item) for item in vector]
+    except Exception:
+        return None
+    if not values or not all(math.isfinite(item) for item in values):
+        return None
+    return values
+
+
+def pack_float32(values: Any) -> bytes:
+    if np is not None:
+        return np.asarray(values, dtype="<f4").tobytes()
+    return struct.pack(f"<{len(values)}f", *values)
+
+
+def unpack_float32(raw: Any) -> list[float]:
+    return list(struct.unpack(f"<{len(raw) // 4}f", raw))
+
+
+def encode_embedding(vector: Iterable[Any], fmt: str = DEFAULT_EMBEDDING_FORMAT) -> bytes | str:
+    """Encode ``vector`` for the SQLite ``embeddings.embedding`` column.
+
+    ``json`` (and any vector with non-finite values) is stored as JSON text,
+    exactly like older builds wrote it; the binary formats produce a BLOB.
+    """
+    values = _finite_floats(vector)
+    clean_format = normalize_embedding_format(fmt)
+    if values is None or clean_format == "json":
+        return json.dumps(list(vector) if values is None else values, ensure_ascii=False)
+    if clean_format == "float32":
+        return pack_float32(values)
+    header = _QUANTIZED_MAGIC + _FORMAT_CODES[clean_format]
+    if clean_format == "float16":
+        if np is not None:
+            return header + np.asarray(values, dtype="<f2").tobytes()
+        return header + struct.pack(f"<{len(values)}e", *values)
+    scale = max(abs(item) for item in values) / 127.0
+    if scale <= 0.0:
+        quantized = [0] * len(values)
+    else:
+        quantized = [max(-127, min(127, int(round(item / scale)))) for item in values]
+    return header + struct.pack("<f", scale) + struct.pack(f"<{len(values)}b", *quantized)
+
+
+def decode_embedding(raw: Any) -> list[float] | None:
+    """Decode a BLOB written by :func:`encode_embedding` (``None`` if malformed)."""
+    data = bytes(raw)
+    if data.startswith(_QUANTIZED_MAGIC) and len(data) > len(_QUANTIZED_MAGIC):
+        fmt = _CODE_FORMATS.get(data[4:5])
+        body = data[5:]
+        if fmt == "float16" and body and len(body) % 2 == 0:
+            return [float(item) for item in struct.unpack(f"<{len(body) // 2}e", body)]
+        if fmt == "int8" and len(body) > 4:
+            (scale,) = struct.unpack("<f", body[:4])
+            return [item * scale for item in struct.unpack(f"<{len(body) - 4}b", body[4:])]
+        return None
+    if not data or len(data) % 4:
+        return None
+    return unpack_float32(data)
+
+
+def sidecar_path_for(index_path: Path) -> Path:
+    """``embeddings.jsonl`` keeps ids/metadata; vectors live in ``embeddings.f32``."""
+    return index_path.with_suffix(SIDECAR_SUFFIX)
+
+
+def append_sidecar_vector(path: Path, vector: Iterable[Any], *, fsync: Any = None) -> tuple[int, int] | None:
+    """Append one float32 row to the sidecar and return ``(byte_offset, dim)``."""
+    values = _finite_floats(vector)
+    if values is None:
+        return None
+    with path.open("ab") as fh:
+        offset = fh.seek(0, 2)
+        fh.write(pack_float32(values))
+        if fsync is not None:
+            fsync(fh)
+    return offset, len(values)
+
+
+def append_sidecar_vectors(
+    path: Path,
+    vectors: Iterable[Iterable[Any]],
+    *,
+    fsync: Any = None,
+) -> list[tuple[int, int] | None]:
+    """Append many float32 rows with one open and one fsync.
+
+    Returns ``(byte_offset, dim)`` per input vector, or ``None`` for vectors
+    that cannot be stored as float32 (callers keep those as JSON).
+    """
+    located: list[tuple[int, int] | None] = []
+    with path.open("ab") as fh:
+        offset = fh.seek(0, 2)
+        for vector in vectors:
+            values = _finite_floats(vector)
+            if values is None:
+                located.append(None)
+                continue
+            fh.write(pack_float32(values))
+            located.append((offset, len(values)))
+            offset += 4 * len(values)
+        if fsync is not None:
+            fsync(fh)
+    return located
+
+
+class SidecarReader:
+    """Read-only view over an ``.f32`` sidecar.
+
+    With NumPy the returned vectors are zero-copy ``float32`` views into the
+    memory map; otherwise they are decoded with :mod:`array`. Entries that
+    point past the end of the file (a crash between the two appends) are
+    reported as missing.
+    """
+
+    __slots__ = ("_buffer", "_size")
+
+    def __init__(self, path: Path) -> None:
+        self._buffer: Any = None
+        self._size = 0
+        try:
+            with path.open("rb") as fh:
+                size = fh.seek(0, 2)
+                if size > 0:
+                    self._buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._size = size
+        except (OSError, ValueError):
+            self._buffer = None
+            self._size = 0
+
+    def vector(self, offset: Any, dim: Any) -> Any | None:
+        try:
+            start = int(offset)
+            count = int(dim)
+        except (TypeError, ValueError):
+            return None
+        end = start + count * 4
+        if self._buffer is None or start < 0 or count <= 0 or end > self._size:
+            return None
+        if np is not None:
+            return np.frombuffer(self._buffer, dtype="<f4", count=count, offset=start)
+        values = array("f")
+        values.frombytes(self._buffer[start:end])
+        if struct.pack("=f", 1.0) != struct.pack("<f", 1.0):  # pragma: no cover - big-endian hosts
+            values.byteswap()
+        return values
+
+
+def vector_to_list(vector: Any) -> list[float]:
+    return vector.tolist() if hasattr(vector, "tolist") else [float(item) for item in vector]
+
+
+__all__ = [
+    "DEFAULT_EMBEDDING_FORMAT",
+    "EMBEDDING_FORMATS",
+    "SidecarReader",
+    "append_sidecar_vector",
+    "append_sidecar_vectors",
+    "decode_embedding",
+    "encode_embedding",
+    "normalize_embedding_format",
+    "sidecar_path_for",
+    "vector_to_list",
+]
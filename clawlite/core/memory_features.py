@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+RANK_FEATURES_KEY = "rank_features"
+RANK_FEATURES_VERSION = 1
+RANK_FEATURE_MEMO_SIZE = 8192
+PLAINTEXT_METADATA_KEYS = (RANK_FEATURES_KEY, "entities")
+
+
+def timestamp_epoch(value: str, *, parse_iso_timestamp: Callable[[str], datetime]) -> float | None:
+    """POSIX seconds for an ISO timestamp (naive means UTC), ``None`` when unparsable."""
+    raw = str(value or "").strip()
+    if not raw:
+        return None
+    stamp = parse_iso_timestamp(raw)
+    if stamp.year <= 1:
+        return None
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.timestamp()
+
+
+def rank_features_fingerprint(row: Any) -> str:
+    """Digest of every record field the cached features were derived from."""
+    metadata = getattr(row, "metadata", None)
+    metadata = metadata if isinstance(metadata, dict) else {}
+    basis = "\x1f".join(
+        (
+            str(getattr(row, "text", "") or ""),
+            str(getattr(row, "happened_at", "") or ""),
+            str(getattr(row, "memory_type", "") or ""),
+            str(getattr(row, "created_at", "") or ""),
+            str(getattr(row, "updated_at", "") or ""),
+            str(metadata.get("last_reinforced_at", "") or ""),
+            str(metadata.get("reinforcement_count", "") or ""),
+        )
+    )
+    return hashlib.blake2b(basis.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def compute_rank_features(
+    row: Any,
+    *,
+    extract_entities: Callable[[str], dict[str, list[str]]],
+    has_temporal_markers: Callable[[str], bool],
+    temporal_anchor: Callable[[Any], str],
+    decay_anchor: Callable[[Any], str],
+    reinforcement_count: Callable[[dict[str, Any] | None], int],
+    last_reinforced_at: Callable[[dict[str, Any] | None], str],
+    normalize_memory_type: Callable[[Any], str],
+    parse_iso_timestamp: Callable[[str], datetime],
+) -> dict[str, Any]:
+    """The query-independent ranking inputs of ``row``, in the compact stored form.
+
+    ``ent`` holds the non-empty entity lists and ``tm`` the temporal-marker
+    flag; ``ta``/``da``/``ev``/``ra`` are the temporal anchor, decay anchor,
+    event date (events only) and last reinforcement as POSIX seconds, and
+    ``rc`` the reinforcement count. Scores that depend on the current time
+    are derived from these at query time by :func:`row_rank_terms`.
+    """
+    text = str(getattr(row, "text", "") or "")
+    metadata = getattr(row, "metadata", None)
+
+    def epoch(value: str) -> float | None:
+        return timestamp_epoch(value, parse_iso_timestamp=parse_iso_timestamp)
+
+    is_event = normalize_memory_type(getattr(row, "memory_type", "knowledge")) == "event"
+    return {
+        "v": RANK_FEATURES_VERSION,
+        "fp": rank_features_fingerprint(row),
+        "ent": {key: list(values) for key, values in extract_entities(text).items() if values},
+        "tm": 1 if has_temporal_markers(text) else 0,
+        "ta": epoch(temporal_anchor(row)),
+        "da": epoch(decay_anchor(row)),
+        "ev": epoch(str(getattr(row, "happened_at", "") or "")) if is_event else None,
+        "rc": reinforcement_count(metadata),
+        "ra": epoch(last_reinforced_at(metadata)),
+    }
+
+
+def stored_rank_features(row: Any, *, fingerprint: str) -> dict[str, Any] | None:
+    metadata = getattr(row, "metadata", None)
+    if not isinstance(metadata, dict):
+        return None
+    features = metadata.get(RANK_FEATURES_KEY)
+    if not isinstance(features, dict):
+        return None
+    if features.get("v") != RANK_FEATURES_VERSION or features.get("fp") != fingerprint:
+        return None
+    return features
+
+
+def strip_plaintext_metadata(payload: dict[str, Any]) -> dict[str, Any]:
+    """Drop metadata derived from the plaintext from a payload whose text is stored encrypted.
+
+    Stored features and the write-time ``entities`` hold URLs, emails and a
+    digest of the text, so an encrypted row keeps none of them on disk;
+    :class:`RankFeatureMemo` computes features from the decrypted row at
+    query time instead.
+    """
+    metadata = payload.get("metadata")
+    if isinstance(metadata, dict) and any(key in metadata for key in PLAINTEXT_METADATA_KEYS):
+        payload["metadata"] = {key: value for key, value in metadata.items() if key not in PLAINTEXT_METADATA_KEYS}
+    return payload
+
+
+class RankFeatureMemo:
+    """Features computed at query time for records stored without them (LRU).
+
+    Keyed by record id and fingerprint, so an edited record misses instead
+    of reusing features of its previous text.
+    """
+
+    def __init__(self, *, max_entries: int = RANK_FEATURE_MEMO_SIZE) -> None:
+        self._max_entries = max(0, int(max_entries))
+        self._entries: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stored_hits = 0
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, row: Any, compute: Callable[[Any], dict[str, Any]]) -> dict[str, Any]:
+        fingerprint = rank_features_fingerprint(row)
+        features = stored_rank_features(row, fingerprint=fingerprint)
+        if features is not None:
+            with self._lock:
+                self.stored_hits += 1
+            return features
+        key = (str(getattr(row, "id", "") or ""), fingerprint)
+        with self._lock:
+            features = self._entries.get(key)
+            if features is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return features
+            self.misses += 1
+        features = compute(row)
+        if self._max_entries > 0:
+            with self._lock:
+                self._entries[key] = features
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return features
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "stored_hits": self.stored_hits,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def recency_score_at(stamp: float | None, now: float, *, half_life_hours: float, max_boost: float) -> float:
+    if stamp is None:
+        return 0.0
+    half_life_seconds = half_life_hours * 3600.0
+    if half_life_seconds <= 0.0:
+        return 0.0
+    score = max_boost * math.exp(-max(0.0, now - stamp) / half_life_seconds)
+    return max(0.0, min(max_boost, round(score, 6)))
+
+
+def decay_penalty_at(decay_rate: float, anchor: float | None, now: float, *, max_penalty: float) -> float:
+    if decay_rate <= 0.0 or anchor is None:
+        return 0.0
+    age_days = max(0.0, (now - anchor) / 86400.0)
+    if age_days <= 0.0:
+        return 0.0
+    penalty = max_penalty * (1.0 - math.exp(-(decay_rate * age_days) / 30.0))
+    return max(0.0, min(max_penalty, round(penalty, 6)))
+
+
+def upcoming_event_boost_at(happened: float | None, now: float, *, max_boost: float) -> float:
+    if happened is None:
+        return 0.0
+    delta_days = (happened - now) / 86400.0
+    if delta_days < -1.0:
+        return 0.0
+    if delta_days <= 30.0:
+        score = max_boost * math.exp(-max(0.0, delta_days) / 30.0)
+        return max(0.0, min(max_boost, round(score, 6)))
+    if delta_days <= 180.0:
+        score = (max_boost * 0.45) * math.exp(-(delta_days - 30.0) / 120.0)
+        return max(0.0, min(max_boost * 0.45, round(score, 6)))
+    return 0.0
+
+
+def salience_boost_at(
+    reinforcement_count: int,
+    reinforced: float | None,
+    now: float,
+    *,
+    recency_decay_days: float,
+    max_boost: float,
+) -> float:
+    reinforcement_factor = math.log(reinforcement_count + 1)
+    if reinforced is None:
+        recency_factor = 0.5
+    else:
+        days_ago = max(0.0, (now - reinforced) / 86400.0)
+        recency_factor = math.exp(-0.693 * days_ago / recency_decay_days)
+    score = reinforcement_factor * recency_factor * 0.25
+    return max(0.0, min(max_boost, round(score, 6)))
+
+
+def _stamp(value: Any) -> float | None:
+    # Stored features round-trip through JSON; anything but a number means "no timestamp".
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+class RowRankTerms:
+    """Per-record ranking terms for one query, resolved from cached features."""
+
+    __slots__ = ("entities", "temporal_markers", "temporal_score", "decay_penalty", "upcoming_boost", "salience_boost")
+
+    def __init__(
+        self,
+        entities: dict[str, list[str]],
+        temporal_markers: bool,
+        temporal_score: float,
+        decay_penalty: float,
+        upcoming_boost: float,
+        salience_boost: float,
+    ) -> None:
+        self.entities = entities
+        self.temporal_markers = temporal_markers
+        self.temporal_score = temporal_score
+        self.decay_penalty = decay_penalty
+        self.upcoming_boost = upcoming_boost
+        self.salience_boost = salience_boost
+
+
+def row_rank_terms(
+    features: dict[str, Any],
+    *,
+    decay_rate: float,
+    now: float,
+    recency_half_life_hours: float,
+    recency_max_boost: float,
+    decay_max_penalty: float,
+    upcoming_event_max_boost: float,
+    salience_recency_decay_days: float,
+    salience_max_boost: float,
+) -> RowRankTerms:
+    entities = features.get("ent")
+    try:
+        reinforcement_count = max(1, int(features.get("rc", 1) or 1))
+    except (TypeError, ValueError):
+        reinforcement_count = 1
+    return RowRankTerms(
+        entities=entities if isinstance(entities, dict) else {},
+        temporal_markers=bool(features.get("tm")),
+        temporal_score=recency_score_at(
+            _stamp(features.get("ta")), now, half_life_hours=recency_half_life_hours, max_boost=recency_max_boost
+        ),
+        decay_penalty=decay_penalty_at(decay_rate, _stamp(features.get("da")), now, max_penalty=decay_max_penalty),
+        upcoming_boost=upcoming_event_boost_at(_stamp(features.get("ev")), now, max_boost=upcoming_event_max_boost),
+        salience_boost=salience_boost_at(
+            reinforcement_count,
+            _stamp(features.get("ra")),
+            now,
+            recency_decay_days=salience_recency_decay_days,
+            max_boost=salience_max_boost,
+        ),
+    )
+
+
+__all__ = [
+    "PLAINTEXT_METADATA_KEYS",
+    "RANK_FEATURES_KEY",
+    "RANK_FEATURES_VERSION",
+    "RANK_FEATURE_MEMO_SIZE",
+    "RankFeatureMemo",
+    "RowRankTerms",
+    "compute_rank_features",
+    "decay_penalty_at",
+    "rank_features_fingerprint",
+    "recency_score_at",
+    "row_rank_terms",
+    "salience_boost_at",
+    "stored_rank_features",
+    "strip_plaintext_metadata",
+    "timestamp_epoch",
+    "upcoming_event_boost_at",
+]
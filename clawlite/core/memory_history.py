@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import json
+import os
+import uuid
 from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterable, Iterator
+
+from clawlite.core.memory_features import strip_plaintext_metadata
 
 
 def stored_history_payload(
@@ -12,7 +16,10 @@ def stored_history_payload(
     encrypt_text_for_category: Callable[[str, str], str],
 ) -> dict[str, Any]:
     payload = asdict(record)
-    payload["text"] = encrypt_text_for_category(str(getattr(record, "text", "") or ""), getattr(record, "category", "context"))
+    plain = str(getattr(record, "text", "") or "")
+    payload["text"] = encrypt_text_for_category(plain, getattr(record, "category", "context"))
+    if payload["text"] != plain:
+        strip_plaintext_metadata(payload)
     return payload
 
 
@@ -44,6 +51,93 @@ def read_history_records_from(
     return out
 
 
+def iter_history_records(
+    *,
+    history_path: Path,
+    locked_file: Callable[..., Any],
+    record_from_payload: Callable[[dict[str, Any]], Any | None],
+    decrypt_text_for_category: Callable[[str, str], str],
+) -> Iterator[Any]:
+    """Yield decoded rows one line at a time under the shared lock.
+
+    Memory stays bounded by the longest line. Writers block until the
+    iterator is exhausted or closed, so the caller sees one consistent file.
+    """
+    if not history_path.exists():
+        return
+    with locked_file(history_path, "r", exclusive=False) as fh:
+        for line in fh:
+            raw = line.strip()
+            if not raw:
+                continue
+            try:
+                payload = json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(payload, dict):
+                continue
+            row = record_from_payload(payload)
+            if row is None:
+                continue
+            row.text = decrypt_text_for_category(str(getattr(row, "text", "") or ""), getattr(row, "category", "context"))
+            yield row
+
+
+def read_history_records_by_ids(
+    *,
+    history_path: Path,
+    record_ids: Iterable[str],
+    locked_file: Callable[..., Any],
+    history_index: Any,
+    record_from_payload: Callable[[dict[str, Any]], Any | None],
+    decrypt_text_for_category: Callable[[str, str], str],
+) -> list[Any] | None:
+    """Positioned reads of ``record_ids`` through the file's locator.
+
+    Ids the file does not hold are skipped. Returns ``None`` when the locator
+    cannot answer for the file as it is now (stale signature, an id stored
+    more than once, or a slot that no longer holds its id), so the caller
+    reads the whole file instead. Only the shared lock is taken; the
+    locator is never mutated here.
+    """
+    payloads: list[dict[str, Any]] = []
+    with locked_file(history_path, "r", exclusive=False) as fh:
+        raw = fh.buffer
+        if not history_index.matches(raw):
+            return None
+        for record_id in dict.fromkeys(str(item or "").strip() for item in record_ids):
+            if not record_id:
+                continue
+            if history_index.has_duplicates(record_id):
+                return None
+            slot = history_index.locate(record_id)
+            if slot is None:
+                continue
+            payload = _read_slot(raw, slot[0], slot[1])
+            if payload is None or str(payload.get("id", "") or "").strip() != record_id:
+                return None
+            payloads.append(payload)
+    out: list[Any] = []
+    for payload in payloads:
+        row = record_from_payload(payload)
+        if row is None:
+            continue
+        row.text = decrypt_text_for_category(str(getattr(row, "text", "") or ""), getattr(row, "category", "context"))
+        out.append(row)
+    return out
+
+
+def sync_history_index(
+    *,
+    history_path: Path,
+    locked_file: Callable[..., Any],
+    history_index: Any,
+) -> None:
+    """Bring ``history_index`` up to date with the file (load or rebuild under the exclusive lock)."""
+    with locked_file(history_path, "r+", exclusive=True) as fh:
+        history_index.ensure(fh.buffer)
+
+
 def repair_history_file(
     *,
     history_path: Path,
@@ -102,6 +196,145 @@ def read_history_records(
     return out
 
 
+def _encode_line(payload: dict[str, Any]) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _read_slot(raw: Any, offset: int, length: int) -> dict[str, Any] | None:
+    raw.seek(offset)
+    data = raw.read(length)
+    if len(data) != length:
+        return None
+    try:
+        payload = json.loads(data.strip() or b"null")
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _append_line(raw: Any, encoded: bytes) -> int:
+    end = raw.seek(0, 2)
+    if end > 0:
+        raw.seek(end - 1)
+        if raw.read(1) != b"\n":
+            raw.write(b"\n")
+            end += 1
+    raw.write(encoded + b"\n")
+    return end
+
+
+def _write_slot(raw: Any, offset: int, length: int, encoded: bytes) -> tuple[int, int]:
+    """Overwrite a line in place (space padded) or blank it and append the new line.
+
+    Whitespace-only lines are skipped by every history reader and dropped by
+    the next full rewrite (prune or repair), so neither path rewrites the file.
+    """
+    if len(encoded) <= length:
+        raw.seek(offset)
+        raw.write(encoded + b" " * (length - len(encoded)))
+        return offset, length
+    raw.seek(offset)
+    raw.write(b" " * length)
+    return _append_line(raw, encoded), len(encoded)
+
+
+def _append_or_reinforce_indexed(
+    fh: Any,
+    *,
+    history_index: Any,
+    record: Any,
+    content_hash: str,
+    scope_key: str,
+    source: str,
+    reinforced_at: str,
+    flush_and_fsync: Callable[[Any], None],
+    record_from_payload: Callable[[dict[str, Any]], Any | None],
+    decrypt_text_for_category: Callable[[str, str], str],
+    record_content_hash: Callable[[Any], str],
+    record_scope_key: Callable[[Any], str],
+    reinforce_record: Callable[..., Any],
+    stored_history_payload_fn: Callable[[Any], dict[str, Any]],
+) -> tuple[Any, bool] | None:
+    """Indexed dedupe: one lookup and at most one line read and written.
+
+    Returns ``None`` when the index disagrees with the file after a rebuild,
+    so the caller falls back to the full scan.
+    """
+    raw = fh.buffer
+    history_index.ensure(raw)
+    key = (scope_key, content_hash)
+    for attempt in range(2):
+        hit = history_index.lookup(scope_key, content_hash)
+        if hit is None:
+            encoded = _encode_line(stored_history_payload_fn(record))
+            offset = _append_line(raw, encoded)
+            flush_and_fsync(fh)
+            history_index.note(str(getattr(record, "id", "") or ""), offset, len(encoded), key=key, handle=raw)
+            return record, True
+        record_id, offset, length = hit
+        payload = _read_slot(raw, offset, length)
+        candidate = record_from_payload(payload) if payload is not None else None
+        if candidate is not None and str(getattr(candidate, "id", "") or "") == record_id:
+            candidate.text = decrypt_text_for_category(str(getattr(candidate, "text", "") or ""), getattr(candidate, "category", "context"))
+            if record_content_hash(candidate) == content_hash and record_scope_key(candidate) == scope_key:
+                reinforced_row = reinforce_record(
+                    candidate,
+                    record,
+                    source=source,
+                    scope_key=scope_key,
+                    reinforced_at=reinforced_at,
+                )
+                encoded = _encode_line(stored_history_payload_fn(reinforced_row))
+                new_offset, new_length = _write_slot(raw, offset, length, encoded)
+                flush_and_fsync(fh)
+                history_index.note(record_id, new_offset, new_length, key=key, handle=raw)
+                return reinforced_row, False
+        if attempt == 0:
+            history_index.rebuild(raw)
+    history_index.invalidate()
+    raw.seek(0)
+    return None
+
+
+def _upsert_indexed(
+    fh: Any,
+    *,
+    history_index: Any,
+    record_id: str,
+    stored_payload: dict[str, Any],
+    append_if_missing: bool,
+    flush_and_fsync: Callable[[Any], None],
+) -> bool | None:
+    raw = fh.buffer
+    history_index.ensure(raw)
+    if not record_id or history_index.has_duplicates(record_id):
+        history_index.invalidate()
+        raw.seek(0)
+        return None
+    encoded = _encode_line(stored_payload)
+    for attempt in range(2):
+        slot = history_index.locate(record_id)
+        if slot is None:
+            if not append_if_missing:
+                return False
+            offset = _append_line(raw, encoded)
+            flush_and_fsync(fh)
+            history_index.note(record_id, offset, len(encoded), key=history_index.key_for(stored_payload), handle=raw)
+            return True
+        offset, length = slot
+        payload = _read_slot(raw, offset, length)
+        if payload is not None and str(payload.get("id", "")).strip() == record_id:
+            new_offset, new_length = _write_slot(raw, offset, length, encoded)
+            flush_and_fsync(fh)
+            history_index.note(record_id, new_offset, new_length, key=history_index.key_for(stored_payload), handle=raw)
+            return True
+        if attempt == 0:
+            history_index.rebuild(raw)
+    history_index.invalidate()
+    raw.seek(0)
+    return None
+
+
 def append_or_reinforce_history_record(
     *,
     history_path: Path,
@@ -119,9 +352,29 @@ def append_or_reinforce_history_record(
     record_scope_key: Callable[[Any], str],
     reinforce_record: Callable[..., Any],
     stored_history_payload_fn: Callable[[Any], dict[str, Any]],
+    history_index: Any | None = None,
 ) -> tuple[Any, bool]:
     ensure_file(history_path)
     with locked_file(history_path, "r+", exclusive=True) as fh:
+        if history_index is not None:
+            indexed = _append_or_reinforce_indexed(
+                fh,
+                history_index=history_index,
+                record=record,
+                content_hash=content_hash,
+                scope_key=scope_key,
+                source=source,
+                reinforced_at=reinforced_at,
+                flush_and_fsync=flush_and_fsync,
+                record_from_payload=record_from_payload,
+                decrypt_text_for_category=decrypt_text_for_category,
+                record_content_hash=record_content_hash,
+                record_scope_key=record_scope_key,
+                reinforce_record=reinforce_record,
+                stored_history_payload_fn=stored_history_payload_fn,
+            )
+            if indexed is not None:
+                return indexed
         lines = fh.read().splitlines()
         rewritten_lines: list[str] = []
         reinforced_row: Any | None = None
@@ -179,10 +432,22 @@ def upsert_history_record_by_id(
     locked_file: Callable[..., Any],
     flush_and_fsync: Callable[[Any], None],
     stored_history_payload_fn: Callable[[Any], dict[str, Any]],
+    history_index: Any | None = None,
 ) -> bool:
     ensure_file(history_path)
     stored_payload = stored_history_payload_fn(record)
     with locked_file(history_path, "r+", exclusive=True) as fh:
+        if history_index is not None:
+            indexed = _upsert_indexed(
+                fh,
+                history_index=history_index,
+                record_id=str(getattr(record, "id", "") or ""),
+                stored_payload=stored_payload,
+                append_if_missing=append_if_missing,
+                flush_and_fsync=flush_and_fsync,
+            )
+            if indexed is not None:
+                return indexed
         lines = fh.read().splitlines()
         rewritten_lines: list[str] = []
         found = False
@@ -222,11 +487,150 @@ def upsert_history_record_by_id(
         return True
 
 
+def tombstone_history_records(
+    *,
+    history_path: Path,
+    record_ids: set[str],
+    locked_file: Callable[..., Any],
+    flush_and_fsync: Callable[[Any], None],
+    history_index: Any,
+) -> int | None:
+    """Delete ``record_ids`` by blanking their lines in place.
+
+    A blanked (whitespace-only) line is the tombstone: readers already skip
+    it and :func:`compact_history_file` drops it later, so a delete writes
+    O(record) bytes instead of rewriting the file. Returns ``None`` when the
+    locator cannot vouch for every id (duplicates or a mismatched line), so
+    the caller falls back to the rewriting prune.
+    """
+    if not record_ids or not history_path.exists():
+        return 0
+    with locked_file(history_path, "r+", exclusive=True) as fh:
+        raw = fh.buffer
+        history_index.ensure(raw)
+        slots: list[tuple[str, int, int]] = []
+        for record_id in sorted(record_ids):
+            if history_index.has_duplicates(record_id):
+                return None
+            slot = history_index.locate(record_id)
+            if slot is None:
+                continue
+            payload = _read_slot(raw, slot[0], slot[1])
+            if payload is None or str(payload.get("id", "")).strip() != record_id:
+                history_index.invalidate()
+                return None
+            slots.append((record_id, slot[0], slot[1]))
+        if not slots:
+            return 0
+        for _record_id, offset, length in slots:
+            raw.seek(offset)
+            raw.write(b" " * length)
+        flush_and_fsync(fh)
+        for record_id, _offset, _length in slots:
+            history_index.drop(record_id, handle=raw)
+    return len(slots)
+
+
+def reencrypt_history_records(
+    *,
+    history_path: Path,
+    record_ids: Iterable[str],
+    locked_file: Callable[..., Any],
+    flush_and_fsync: Callable[[Any], None],
+    history_index: Any,
+    reencrypt_text: Callable[[str, str], str | None],
+) -> int | None:
+    """Rewrite the stored text of ``record_ids`` under the current cipher.
+
+    ``reencrypt_text(stored_text, category)`` returns the new stored text, or
+    ``None`` to leave the row alone. Each slot is re-read under the exclusive
+    lock, so a row rewritten since the caller looked is judged as it is now
+    and never overwritten with older content. All rows share one fsync.
+    Returns ``None`` when the locator cannot vouch for an id.
+    """
+    if not history_path.exists():
+        return 0
+    with locked_file(history_path, "r+", exclusive=True) as fh:
+        raw = fh.buffer
+        history_index.ensure(raw)
+        written: list[tuple[str, int, int, dict[str, Any]]] = []
+        for record_id in dict.fromkeys(str(item or "").strip() for item in record_ids):
+            if not record_id:
+                continue
+            if history_index.has_duplicates(record_id):
+                return None
+            slot = history_index.locate(record_id)
+            if slot is None:
+                continue
+            payload = _read_slot(raw, slot[0], slot[1])
+            if payload is None or str(payload.get("id", "")).strip() != record_id:
+                history_index.invalidate()
+                return None
+            text = reencrypt_text(str(payload.get("text", "") or ""), str(payload.get("category", "context") or "context"))
+            if text is None:
+                continue
+            payload["text"] = text
+            strip_plaintext_metadata(payload)
+            offset, length = _write_slot(raw, slot[0], slot[1], _encode_line(payload))
+            written.append((record_id, offset, length, payload))
+        if not written:
+            return 0
+        flush_and_fsync(fh)
+        for record_id, offset, length, payload in written:
+            history_index.note(record_id, offset, length, key=history_index.key_for(payload), handle=raw)
+    return len(written)
+
+
+def compact_history_file(
+    *,
+    history_path: Path,
+    locked_file: Callable[..., Any],
+    flush_and_fsync: Callable[[Any], None],
+    history_index: Any | None = None,
+    fsync_parent_dir: Callable[[Path], None] | None = None,
+) -> dict[str, int]:
+    """Rewrite ``history_path`` without tombstones and padding.
+
+    The compacted lines go to a temporary file in the same directory, which
+    is fsynced and moved over the log while its exclusive lock is held, so
+    a crash or error mid-rewrite leaves the original intact. Writers queued
+    on the lock reopen the path once they get it (see ``_locked_file``).
+    """
+    if not history_path.exists():
+        return {"before_bytes": 0, "after_bytes": 0, "dropped_lines": 0}
+    with locked_file(history_path, "r+", exclusive=True) as fh:
+        raw = fh.buffer
+        raw.seek(0)
+        lines = raw.read().splitlines()
+        kept = [line.rstrip() for line in lines if line.strip()]
+        before = sum(len(line) + 1 for line in lines)
+        body = b"\n".join(kept) + b"\n" if kept else b""
+        temp_path = history_path.parent / f".{history_path.name}.{uuid.uuid4().hex}.tmp"
+        try:
+            with temp_path.open("w+b") as temp:
+                temp.write(body)
+                flush_and_fsync(temp)
+                os.replace(temp_path, history_path)
+                if fsync_parent_dir is not None:
+                    fsync_parent_dir(history_path)
+                if history_index is not None:
+                    history_index.rebuild(temp)
+        finally:
+            temp_path.unlink(missing_ok=True)
+    return {"before_bytes": before, "after_bytes": len(body), "dropped_lines": len(lines) - len(kept)}
+
+
 __all__ = [
     "append_or_reinforce_history_record",
+    "compact_history_file",
+    "iter_history_records",
     "read_history_records",
+    "read_history_records_by_ids",
     "read_history_records_from",
+    "reencrypt_history_records",
     "repair_history_file",
     "stored_history_payload",
+    "sync_history_index",
+    "tombstone_history_records",
     "upsert_history_record_by_id",
 ]
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+HISTORY_INDEX_SUFFIX = ".hashidx"
+HISTORY_INDEX_MAX_FILES = 32
+HISTORY_COMPACT_MIN_DEAD_BYTES = 64 * 1024
+HISTORY_COMPACT_DEAD_RATIO = 0.5
+
+Signature = tuple[int, int, int]
+
+
+def history_index_path_for(history_path: Path) -> Path:
+    """``memory.jsonl`` keeps the records; its locator log is ``memory.jsonl.hashidx``."""
+    return history_path.with_name(history_path.name + HISTORY_INDEX_SUFFIX)
+
+
+def file_signature(handle: Any) -> Signature:
+    stat = os.fstat(handle.fileno())
+    return (int(stat.st_ino), int(stat.st_size), int(stat.st_mtime_ns))
+
+
+class HistoryHashIndex:
+    """Persisted locator for the records of one ``history.jsonl`` file.
+
+    Maps ``(scope_key, content_hash)`` to the record id that owns it and each
+    record id to the ``(byte_offset, length)`` of its line, so dedupe and
+    reinforcement need one dict lookup plus one positioned read instead of
+    decoding the whole file. The locator is an append-only JSONL log next to
+    the history file; every entry carries the history file's
+    ``(inode, size, mtime_ns)`` after the write it describes. When the last
+    signature no longer matches the file (a prune, repair or another writer
+    that bypassed the index, or a crash between the two writes), the index is
+    rebuilt with one full scan.
+
+    The index also tracks how many bytes of the file belong to live lines;
+    the remainder is dead space left by tombstoned or relocated rows, which
+    :func:`~clawlite.core.memory_history.compact_history_file` reclaims.
+
+    All mutating calls must run while the caller holds the history file's
+    exclusive lock; the log is best-effort and never fsynced because it can
+    always be rebuilt from the history file.
+    """
+
+    __slots__ = (
+        "history_path",
+        "path",
+        "_key_for_payload",
+        "_ids",
+        "_keys",
+        "_duplicates",
+        "_signature",
+        "_log_entries",
+        "_live_bytes",
+        "rebuilds",
+    )
+
+    def __init__(
+        self,
+        history_path: Path,
+        *,
+        key_for_payload: Callable[[dict[str, Any]], tuple[str, str] | None],
+    ) -> None:
+        self.history_path = Path(history_path)
+        self.path = history_index_path_for(self.history_path)
+        self._key_for_payload = key_for_payload
+        self._ids: dict[str, tuple[int, int]] = {}
+        self._keys: dict[tuple[str, str], str] = {}
+        self._duplicates: set[str] = set()
+        self._signature: Signature | None = None
+        self._log_entries = 0
+        self._live_bytes = 0
+        self.rebuilds = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def lookup(self, scope_key: str, content_hash: str) -> tuple[str, int, int] | None:
+        record_id = self._keys.get((scope_key, content_hash))
+        if record_id is None:
+            return None
+        slot = self._ids.get(record_id)
+        if slot is None:
+            return None
+        return record_id, slot[0], slot[1]
+
+    def locate(self, record_id: str) -> tuple[int, int] | None:
+        """Byte slot of ``record_id``, or ``None`` when missing or stored more than once."""
+        if record_id in self._duplicates:
+            return None
+        return self._ids.get(record_id)
+
+    @property
+    def dead_bytes(self) -> int:
+        """Bytes of whitespace (tombstones, padding, relocated rows) in the history file."""
+        if self._signature is None:
+            return 0
+        return max(0, self._signature[1] - self._live_bytes)
+
+    @property
+    def file_bytes(self) -> int:
+        return self._signature[1] if self._signature is not None else 0
+
+    def needs_compaction(
+        self,
+        *,
+        min_dead_bytes: int = HISTORY_COMPACT_MIN_DEAD_BYTES,
+        dead_ratio: float = HISTORY_COMPACT_DEAD_RATIO,
+    ) -> bool:
+        dead = self.dead_bytes
+        return dead >= min_dead_bytes and dead >= dead_ratio * max(1, self.file_bytes)
+
+    def key_for(self, payload: dict[str, Any]) -> tuple[str, str] | None:
+        try:
+            key = self._key_for_payload(payload)
+        except Exception:
+            return None
+        return None if key is None else (str(key[0]), str(key[1]))
+
+    def has_duplicates(self, record_id: str) -> bool:
+        return record_id in self._duplicates
+
+    def ensure(self, handle: Any) -> None:
+        """Make the index match the (locked) binary ``handle`` of the history file."""
+        signature = file_signature(handle)
+        if self._signature == signature:
+            return
+        if self._load(signature):
+            return
+        self.rebuild(handle)
+
+    def matches(self, handle: Any) -> bool:
+        """Whether the in-memory locator already describes ``handle`` (read-only check)."""
+        return self._signature is not None and self._signature == file_signature(handle)
+
+    def invalidate(self) -> None:
+        self._signature = None
+
+    def note(
+        self,
+        record_id: str,
+        offset: int,
+        length: int,
+        *,
+        key: tuple[str, str] | None,
+        handle: Any,
+    ) -> None:
+        """Record that ``record_id`` now lives at ``offset`` and log the new file signature."""
+        previous = self._ids.get(record_id)
+        if previous is None or previous[0] != int(offset):
+            if previous is not None:
+                self._live_bytes -= previous[1] + 1
+            self._live_bytes += int(length) + 1
+        self._ids[record_id] = (int(offset), int(length))
+        if key is not None:
+            self._keys.setdefault(key, record_id)
+        entry: dict[str, Any] = {"id": record_id, "o": int(offset), "n": int(length)}
+        if key is not None:
+            entry["k"] = [key[0], key[1]]
+        self._log(entry, handle)
+
+    def drop(self, record_id: str, *, handle: Any) -> None:
+        """Forget a tombstoned ``record_id`` (its keys stop resolving on lookup)."""
+        slot = self._ids.pop(record_id, None)
+        if slot is not None:
+            self._live_bytes -= slot[1] + 1
+        self._log({"id": record_id, "del": True}, handle)
+
+    def _log(self, entry: dict[str, Any], handle: Any) -> None:
+        self._signature = file_signature(handle)
+        entry["sig"] = list(self._signature)
+        entry["live"] = self._live_bytes
+        if self._log_entries > 2 * len(self._ids) + 1024:
+            self._write_compact()
+            return
+        try:
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._log_entries += 1
+        except OSError:
+            pass
+
+    def rebuild(self, handle: Any) -> None:
+        """Scan the whole history file once and rewrite the locator log."""
+        ids: dict[str, tuple[int, int]] = {}
+        keys: dict[tuple[str, str], str] = {}
+        duplicates: set[str] = set()
+        live_bytes = 0
+        handle.seek(0)
+        offset = 0
+        for line in handle:
+            start = offset
+            offset += len(line)
+            body = line.rstrip(b"\r\n")
+            stripped = body.strip()
+            if not stripped:
+                continue
+            live_bytes += len(line)
+            try:
+                payload = json.loads(stripped)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if not isinstance(payload, dict):
+                continue
+            record_id = str(payload.get("id", "") or "").strip()
+            if not record_id:
+                continue
+            if record_id in ids:
+                duplicates.add(record_id)
+            else:
+                ids[record_id] = (start, len(body))
+            key = self.key_for(payload)
+            if key is not None:
+                keys.setdefault(key, record_id)
+        self._ids = ids
+        self._keys = keys
+        self._duplicates = duplicates
+        self._live_bytes = live_bytes
+        self._signature = file_signature(handle)
+        self.rebuilds += 1
+        self._write_compact()
+
+    def _load(self, signature: Signature) -> bool:
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except (OSError, UnicodeDecodeError):
+            return False
+        ids: dict[str, tuple[int, int]] = {}
+        keys: dict[tuple[str, str], str] = {}
+        duplicates: set[str] = set()
+        last_signature: Signature | None = None
+        live_bytes = 0
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            raw_signature = entry.get("sig")
+            if isinstance(raw_signature, list) and len(raw_signature) == 3:
+                try:
+                    last_signature = (int(raw_signature[0]), int(raw_signature[1]), int(raw_signature[2]))
+                except (TypeError, ValueError):
+                    last_signature = None
+            if "live" in entry:
+                try:
+                    live_bytes = int(entry["live"])
+                except (TypeError, ValueError):
+                    live_bytes = 0
+            if entry.get("dup"):
+                duplicates.update(str(item) for item in entry.get("dup") or [])
+            record_id = str(entry.get("id", "") or "")
+            if not record_id:
+                continue
+            if entry.get("del"):
+                ids.pop(record_id, None)
+                continue
+            try:
+                ids[record_id] = (int(entry["o"]), int(entry["n"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            raw_key = entry.get("k")
+            if isinstance(raw_key, list) and len(raw_key) == 2:
+                keys.setdefault((str(raw_key[0]), str(raw_key[1])), record_id)
+        if last_signature != signature:
+            return False
+        self._ids = ids
+        self._keys = keys
+        self._duplicates = duplicates
+        self._live_bytes = live_bytes
+        self._signature = signature
+        self._log_entries = len(lines)
+        return True
+
+    def _write_compact(self) -> None:
+        slot_keys: dict[str, list[tuple[str, str]]] = {}
+        for key, record_id in self._keys.items():
+            slot_keys.setdefault(record_id, []).append(key)
+        lines: list[str] = []
+        for record_id, (offset, length) in self._ids.items():
+            owned = slot_keys.get(record_id) or [None]
+            for key in owned:
+                entry: dict[str, Any] = {"id": record_id, "o": offset, "n": length}
+                if key is not None:
+                    entry["k"] = [key[0], key[1]]
+                lines.append(json.dumps(entry, ensure_ascii=False))
+        footer: dict[str, Any] = {"sig": list(self._signature) if self._signature else None, "live": self._live_bytes}
+        if self._duplicates:
+            footer["dup"] = sorted(self._duplicates)
+        lines.append(json.dumps(footer, ensure_ascii=False))
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            tmp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            self._log_entries = len(lines)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+
+class HistoryIndexCache:
+    """Bounded per-file ``HistoryHashIndex`` registry (least recently used evicted)."""
+
+    def __init__(
+        self,
+        key_for_payload: Callable[[dict[str, Any]], tuple[str, str] | None],
+        *,
+        max_files: int = HISTORY_INDEX_MAX_FILES,
+    ) -> None:
+        self._key_for_payload = key_for_payload
+        self._max_files = max(1, int(max_files))
+        self._indexes: OrderedDict[str, HistoryHashIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, history_path: Path) -> HistoryHashIndex:
+        key = str(history_path)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = HistoryHashIndex(Path(history_path), key_for_payload=self._key_for_payload)
+                self._indexes[key] = index
+                while len(self._indexes) > self._max_files:
+                    self._indexes.popitem(last=False)
+            else:
+                self._indexes.move_to_end(key)
+            return index
+
+    def invalidate(self, paths: Iterable[Path] | None = None) -> None:
+        with self._lock:
+            targets = list(self._indexes.values()) if paths is None else [
+                self._indexes[str(path)] for path in paths if str(path) in self._indexes
+            ]
+        for index in targets:
+            index.invalidate()
+
+    def indexes(self) -> list[HistoryHashIndex]:
+        with self._lock:
+            return list(self._indexes.values())
+
+    def peek(self, history_path: Path) -> HistoryHashIndex | None:
+        with self._lock:
+            return self._indexes.get(str(history_path))
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            indexes = list(self._indexes.values())
+        return {
+            "files": len(indexes),
+            "records": sum(len(index) for index in indexes),
+            "rebuilds": sum(index.rebuilds for index in indexes),
+            "dead_bytes": sum(index.dead_bytes for index in indexes),
+        }
+
+
+__all__ = [
+    "HISTORY_COMPACT_DEAD_RATIO",
+    "HISTORY_COMPACT_MIN_DEAD_BYTES",
+    "HISTORY_INDEX_MAX_FILES",
+    "HISTORY_INDEX_SUFFIX",
+    "HistoryHashIndex",
+    "HistoryIndexCache",
+    "file_signature",
+    "history_index_path_for",
+]
@@ -5,6 +5,8 @@ from collections import Counter
 from pathlib import Path
 from typing import Any, Callable
 
+from clawlite.core.memory_features import strip_plaintext_metadata
+
 
 def load_category_items_from_path(
     *,
@@ -114,6 +116,19 @@ def write_category_summary_to_path(
     atomic_write_text_locked(category_path, body)
 
 
+def _encrypted_item_row(
+    row: dict[str, Any],
+    category: str,
+    encrypt_text_for_category: Callable[[str, str], str],
+) -> dict[str, Any]:
+    stored = dict(row)
+    plain = str(row.get("text", "") or "")
+    stored["text"] = encrypt_text_for_category(plain, category)
+    if stored["text"] != plain:
+        strip_plaintext_metadata(stored)
+    return stored
+
+
 def upsert_category_item_rows(
     *,
     record: Any,
@@ -123,8 +138,7 @@ def upsert_category_item_rows(
 ) -> tuple[str, list[dict[str, Any]]]:
     category = str(getattr(record, "category", "context") or "context")
     row_payload = serialize_hit(record)
-    stored_payload = dict(row_payload)
-    stored_payload["text"] = encrypt_text_for_category(str(row_payload.get("text", "") or ""), category)
+    stored_payload = _encrypted_item_row(row_payload, category, encrypt_text_for_category)
     updated_rows: list[dict[str, Any]] = []
     found = False
     record_id = str(getattr(record, "id", "") or "")
@@ -133,9 +147,7 @@ def upsert_category_item_rows(
             updated_rows.append(stored_payload)
             found = True
         else:
-            preserved = dict(row)
-            preserved["text"] = encrypt_text_for_category(str(preserved.get("text", "") or ""), category)
-            updated_rows.append(preserved)
+            updated_rows.append(_encrypted_item_row(row, category, encrypt_text_for_category))
     if not found:
         updated_rows.append(stored_payload)
     return category, updated_rows
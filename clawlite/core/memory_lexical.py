@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import contextlib
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+LEXICAL_INDEX_MAX_FILES = 32
+
+
+class _IndexedDoc:
+    __slots__ = ("text", "terms", "length", "entities")
+
+    def __init__(self, text: str, terms: dict[str, int], length: int, entities: dict[str, list[str]] | None) -> None:
+        self.text = text
+        self.terms = terms
+        self.length = length
+        self.entities = entities
+
+
+class LexicalIndex:
+    """Incremental inverted index that scores BM25 exactly like ``BM25Okapi``.
+
+    Documents keep their term counts, length and extracted entities, so a
+    record is tokenized once per text change instead of once per query.
+    Postings map each term to the documents containing it, and a histogram of
+    document frequencies keeps the corpus-wide average IDF (used by Okapi's
+    negative-IDF floor) computable without walking the vocabulary. Scoring a
+    query touches only the postings of its terms.
+
+    ``stamp`` is an opaque marker owned by the caller, naming the state of
+    the source the documents were last made to match.
+    """
+
+    __slots__ = (
+        "_tokenize",
+        "_extract_entities",
+        "_docs",
+        "_postings",
+        "_df_histogram",
+        "_total_length",
+        "_lock",
+        "k1",
+        "b",
+        "epsilon",
+        "stamp",
+    )
+
+    def __init__(
+        self,
+        tokenize: Callable[[str], list[str]],
+        *,
+        extract_entities: Callable[[str], dict[str, list[str]]] | None = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> None:
+        self._tokenize = tokenize
+        self._extract_entities = extract_entities
+        self._docs: dict[str, _IndexedDoc] = {}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._df_histogram: dict[int, int] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.stamp: Any = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._docs
+
+    def _shift_df(self, old_df: int, new_df: int) -> None:
+        if old_df > 0:
+            remaining = self._df_histogram.get(old_df, 0) - 1
+            if remaining > 0:
+                self._df_histogram[old_df] = remaining
+            else:
+                self._df_histogram.pop(old_df, None)
+        if new_df > 0:
+            self._df_histogram[new_df] = self._df_histogram.get(new_df, 0) + 1
+
+    def upsert(self, key: str, text: str) -> _IndexedDoc:
+        current = self._docs.get(key)
+        if current is not None and current.text == text:
+            return current
+        if current is not None:
+            self.discard([key])
+        tokens = self._tokenize(text)
+        terms: dict[str, int] = {}
+        for token in tokens:
+            terms[token] = terms.get(token, 0) + 1
+        entities = self._extract_entities(text) if self._extract_entities is not None else None
+        doc = _IndexedDoc(text, terms, len(tokens), entities)
+        self._docs[key] = doc
+        self._total_length += doc.length
+        for term, count in terms.items():
+            posting = self._postings.setdefault(term, {})
+            self._shift_df(len(posting), len(posting) + 1)
+            posting[key] = count
+        return doc
+
+    def discard(self, keys: Iterable[str]) -> int:
+        removed = 0
+        for key in keys:
+            doc = self._docs.pop(key, None)
+            if doc is None:
+                continue
+            removed += 1
+            self._total_length -= doc.length
+            for term in doc.terms:
+                posting = self._postings.get(term)
+                if posting is None or key not in posting:
+                    continue
+                self._shift_df(len(posting), len(posting) - 1)
+                del posting[key]
+                if not posting:
+                    del self._postings[term]
+        return removed
+
+    def sync(self, records: list[Any]) -> list[str]:
+        """Make the index hold exactly ``records`` and return their document keys.
+
+        Unchanged records cost one dict lookup; new or edited ones are
+        re-tokenized; records that disappeared are removed. Repeated ids
+        get distinct keys so duplicates count as separate documents, as they
+        would in a freshly built corpus.
+        """
+        keys: list[str] = []
+        seen: dict[str, int] = {}
+        for row in records:
+            row_id = str(getattr(row, "id", "") or "")
+            occurrence = seen.get(row_id, 0)
+            seen[row_id] = occurrence + 1
+            key = row_id if occurrence == 0 else f"{row_id}\x00{occurrence}"
+            self.upsert(key, str(getattr(row, "text", "") or ""))
+            keys.append(key)
+        if len(self._docs) != len(keys):
+            wanted = set(keys)
+            self.discard([key for key in self._docs if key not in wanted])
+        return keys
+
+    def doc(self, key: str) -> _IndexedDoc | None:
+        return self._docs.get(key)
+
+    def refresh(self, stamp: Any, load: Callable[[], list[Any]]) -> None:
+        """Resync to ``load()`` unless the index already stands at ``stamp``.
+
+        Callers capture ``stamp`` before loading, so a write racing the load
+        can only leave the index looking stale, never stale-but-current.
+        """
+        with self._lock:
+            if self.stamp is not None and self.stamp == stamp:
+                return
+            self.sync(load())
+            self.stamp = stamp
+
+    def advance(self, before: Any, after: Any, *, upserts: Iterable[Any] = (), discards: Iterable[str] = ()) -> bool:
+        """Apply one write to the source, if the index was current just before it.
+
+        ``upserts`` are records (``id`` and ``text``) the write stored and
+        ``discards`` the ids it removed. Returns ``False``, leaving the index
+        for the next full sync, when ``stamp`` is not ``before``.
+        """
+        with self._lock:
+            if self.stamp is None or self.stamp != before:
+                return False
+            self.discard(discards)
+            for row in upserts:
+                row_id = str(getattr(row, "id", "") or "")
+                if row_id:
+                    self.upsert(row_id, str(getattr(row, "text", "") or ""))
+            self.stamp = after
+            return True
+
+    def analyze(self, records: list[Any], query_tokens: list[str]) -> tuple[list[_IndexedDoc], list[float]]:
+        """Sync to ``records`` and return their analyzed docs plus aligned BM25 scores.
+
+        Runs under the index lock so concurrent searches on the same scope
+        never observe a half-applied sync; returned docs are immutable.
+        """
+        with self._lock:
+            keys = self.sync(records)
+            docs = [self._docs[key] for key in keys]
+            by_key = self.scores(query_tokens)
+        return docs, [by_key.get(key, 0.0) for key in keys]
+
+    def _average_idf(self, corpus_size: int) -> float:
+        vocabulary = 0
+        idf_sum = 0.0
+        for df, term_count in self._df_histogram.items():
+            vocabulary += term_count
+            idf_sum += term_count * (math.log(corpus_size - df + 0.5) - math.log(df + 0.5))
+        return idf_sum / vocabulary if vocabulary else 0.0
+
+    def scores(self, query_tokens: Iterable[str]) -> dict[str, float]:
+        """BM25 scores for every document sharing at least one query term."""
+        corpus_size = len(self._docs)
+        if not corpus_size or self._total_length <= 0:
+            return {}
+        average_length = self._total_length / corpus_size
+        floor: float | None = None
+        out: dict[str, float] = {}
+        for term in query_tokens:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(corpus_size - df + 0.5) - math.log(df + 0.5)
+            if idf < 0:
+                if floor is None:
+                    floor = self.epsilon * self._average_idf(corpus_size)
+                idf = floor
+            if not idf:
+                continue
+            for key, freq in posting.items():
+                length = self._docs[key].length
+                weight = freq * (self.k1 + 1) / (freq + self.k1 * (1 - self.b + self.b * length / average_length))
+                out[key] = out.get(key, 0.0) + idf * weight
+        return out
+
+
+class LexicalCorpus:
+    """Several indexes scored as one BM25 corpus.
+
+    Each memory file keeps its own :class:`LexicalIndex`; a search spans the
+    files of its scopes. Corpus size, average length and document frequencies
+    are summed across them, and the negative-IDF floor averages over their
+    merged vocabulary, so the scores equal ``BM25Okapi`` over all of their
+    documents. Ranking a subset (filtered rows, pushed-down candidates) looks
+    those rows up here and keeps the statistics of the whole corpus.
+    """
+
+    __slots__ = ("_indexes", "_tokenize", "_extract_entities")
+
+    def __init__(
+        self,
+        indexes: Iterable[LexicalIndex],
+        tokenize: Callable[[str], list[str]],
+        *,
+        extract_entities: Callable[[str], dict[str, list[str]]] | None = None,
+    ) -> None:
+        unique: dict[int, LexicalIndex] = {}
+        for index in indexes:
+            unique.setdefault(id(index), index)
+        self._indexes = list(unique.values())
+        self._tokenize = tokenize
+        self._extract_entities = extract_entities
+
+    def _average_idf(self, corpus_size: int) -> float:
+        def _idf(df: int) -> float:
+            return math.log(corpus_size - df + 0.5) - math.log(df + 0.5)
+
+        base = max(self._indexes, key=len)
+        vocabulary = 0
+        idf_sum = 0.0
+        for df, term_count in base._df_histogram.items():
+            vocabulary += term_count
+            idf_sum += term_count * _idf(df)
+        # Terms of the other files shift their frequency, or join the vocabulary.
+        seen: set[str] = set()
+        for index in self._indexes:
+            if index is base:
+                continue
+            for term in index._postings:
+                if term in seen:
+                    continue
+                seen.add(term)
+                base_df = len(base._postings.get(term, ()))
+                if base_df:
+                    idf_sum -= _idf(base_df)
+                else:
+                    vocabulary += 1
+                idf_sum += _idf(sum(len(other._postings.get(term, ())) for other in self._indexes))
+        return idf_sum / vocabulary if vocabulary else 0.0
+
+    def analyze(self, records: list[Any], query_tokens: list[str]) -> tuple[list[_IndexedDoc], list[float]]:
+        """Docs of ``records`` plus aligned BM25 scores against the whole corpus.
+
+        Only the postings of the query terms are walked. A record missing
+        from every index, or indexed under other text (its file changed since
+        the last sync), is tokenized on the spot and scored against the
+        corpus statistics without joining them.
+        """
+        with contextlib.ExitStack() as stack:
+            for index in sorted(self._indexes, key=id):
+                stack.enter_context(index._lock)
+            corpus_size = sum(len(index) for index in self._indexes)
+            total_length = sum(index._total_length for index in self._indexes)
+            average_length = total_length / corpus_size if corpus_size and total_length > 0 else 0.0
+            floor: float | None = None
+            weights: dict[str, float] = {}
+            for term in query_tokens:
+                if term in weights or not average_length:
+                    continue
+                df = sum(len(index._postings.get(term, ())) for index in self._indexes)
+                if not df:
+                    continue
+                idf = math.log(corpus_size - df + 0.5) - math.log(df + 0.5)
+                if idf < 0:
+                    if floor is None:
+                        floor = self.epsilon * self._average_idf(corpus_size)
+                    idf = floor
+                weights[term] = idf
+            scored: list[dict[str, float]] = [{} for _ in self._indexes]
+            for term in query_tokens:
+                idf = weights.get(term)
+                if not idf:
+                    continue
+                for position, index in enumerate(self._indexes):
+                    posting = index._postings.get(term)
+                    if not posting:
+                        continue
+                    out = scored[position]
+                    for key, freq in posting.items():
+                        out[key] = out.get(key, 0.0) + idf * self._weight(freq, index._docs[key].length, average_length)
+            docs: list[_IndexedDoc] = []
+            scores: list[float] = []
+            for row in records:
+                key = str(getattr(row, "id", "") or "")
+                text = str(getattr(row, "text", "") or "")
+                for position, index in enumerate(self._indexes):
+                    doc = index._docs.get(key)
+                    if doc is not None and doc.text == text:
+                        docs.append(doc)
+                        scores.append(scored[position].get(key, 0.0))
+                        break
+                else:
+                    doc = self._loose_doc(text)
+                    docs.append(doc)
+                    scores.append(
+                        sum(
+                            weights.get(term, 0.0) * self._weight(doc.terms[term], doc.length, average_length)
+                            for term in query_tokens
+                            if term in doc.terms and average_length
+                        )
+                    )
+        return docs, scores
+
+    @property
+    def epsilon(self) -> float:
+        return self._indexes[0].epsilon if self._indexes else 0.25
+
+    def _weight(self, freq: int, length: int, average_length: float) -> float:
+        k1 = self._indexes[0].k1
+        b = self._indexes[0].b
+        return freq * (k1 + 1) / (freq + k1 * (1 - b + b * length / average_length))
+
+    def _loose_doc(self, text: str) -> _IndexedDoc:
+        tokens = self._tokenize(text)
+        terms: dict[str, int] = {}
+        for token in tokens:
+            terms[token] = terms.get(token, 0) + 1
+        entities = self._extract_entities(text) if self._extract_entities is not None else None
+        return _IndexedDoc(text, terms, len(tokens), entities)
+
+
+class LexicalIndexCache:
+    """Bounded per-file ``LexicalIndex`` registry (least recently used evicted)."""
+
+    def __init__(
+        self,
+        tokenize: Callable[[str], list[str]],
+        *,
+        extract_entities: Callable[[str], dict[str, list[str]]] | None = None,
+        max_files: int = LEXICAL_INDEX_MAX_FILES,
+    ) -> None:
+        self._tokenize = tokenize
+        self._extract_entities = extract_entities
+        self._max_files = max(1, int(max_files))
+        self._indexes: OrderedDict[str, LexicalIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> LexicalIndex:
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = LexicalIndex(self._tokenize, extract_entities=self._extract_entities)
+                self._indexes[key] = index
+                while len(self._indexes) > self._max_files:
+                    self._indexes.popitem(last=False)
+            else:
+                self._indexes.move_to_end(key)
+            return index
+
+    def peek(self, key: str) -> LexicalIndex | None:
+        with self._lock:
+            return self._indexes.get(key)
+
+    def corpus(self, indexes: Iterable[LexicalIndex]) -> LexicalCorpus:
+        return LexicalCorpus(indexes, self._tokenize, extract_entities=self._extract_entities)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return {"files": len(self._indexes), "documents": sum(len(index) for index in self._indexes.values())}
+
+
+__all__ = [
+    "LEXICAL_INDEX_MAX_FILES",
+    "LexicalCorpus",
+    "LexicalIndex",
+    "LexicalIndexCache",
+]
@@ -121,6 +121,7 @@ async def consolidate_categories(
         by_category.setdefault(category, []).append(row)
 
     upsert = getattr(backend, "upsert_layer_record", None)
+    upsert_many = getattr(backend, "upsert_layer_records", None)
     for category, rows in by_category.items():
         if len(rows) < threshold:
             continue
@@ -149,25 +150,33 @@ async def consolidate_categories(
             diagnostics["last_error"] = f"consolidation_add: {exc}"
             continue
 
-        if callable(upsert):
-            for row in rows:
-                payload = row.get("payload", {})
-                if not isinstance(payload, dict):
-                    continue
-                meta = dict(payload.get("metadata") or {})
-                meta["consolidated"] = True
-                meta["consolidated_at"] = now
-                updated_payload = {**payload, "metadata": meta}
+        marked: list[dict[str, Any]] = []
+        for row in rows:
+            payload = row.get("payload", {})
+            if not isinstance(payload, dict):
+                continue
+            meta = dict(payload.get("metadata") or {})
+            meta["consolidated"] = True
+            meta["consolidated_at"] = now
+            marked.append(
+                {
+                    "layer": row.get("layer", "item"),
+                    "record_id": row["record_id"],
+                    "payload": {**payload, "metadata": meta},
+                    "category": row.get("category", "context"),
+                    "created_at": row.get("created_at", now),
+                    "updated_at": now,
+                }
+            )
+        if callable(upsert_many):
+            try:
+                await asyncio.to_thread(upsert_many, marked)
+            except Exception:
+                pass
+        elif callable(upsert):
+            for item in marked:
                 try:
-                    await asyncio.to_thread(
-                        upsert,
-                        layer=row.get("layer", "item"),
-                        record_id=row["record_id"],
-                        payload=updated_payload,
-                        category=row.get("category", "context"),
-                        created_at=row.get("created_at", now),
-                        updated_at=now,
-                    )
+                    await asyncio.to_thread(upsert, **item)
                 except Exception:
                     pass
 
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable
+
+PG_POOL_MAX_SIZE = 4
+PG_POOL_ACQUIRE_TIMEOUT_S = 10.0
+PG_POOL_HEALTH_CHECK_AFTER_S = 30.0
+PG_POOL_MAX_IDLE_S = 300.0
+PG_POOL_MAX_LIFETIME_S = 1800.0
+
+
+def _connection_is_broken(conn: Any) -> bool:
+    # psycopg2 exposes ``closed`` as an int, psycopg 3 as a bool plus ``broken``.
+    try:
+        return bool(getattr(conn, "closed", False)) or bool(getattr(conn, "broken", False))
+    except Exception:
+        return True
+
+
+class _PooledConnection:
+    """Borrowed DB-API connection whose :meth:`close` returns it to the pool."""
+
+    __slots__ = ("_pool", "_raw")
+
+    def __init__(self, pool: "PgConnectionPool", raw: Any) -> None:
+        self._pool = pool
+        self._raw = raw
+
+    @property
+    def raw(self) -> Any:
+        return self._raw
+
+    def cursor(self, *args: Any, **kwargs: Any) -> Any:
+        if self._raw is None:
+            raise RuntimeError("pooled connection already released")
+        return self._raw.cursor(*args, **kwargs)
+
+    def commit(self) -> None:
+        if self._raw is None:
+            raise RuntimeError("pooled connection already released")
+        self._raw.commit()
+
+    def rollback(self) -> None:
+        if self._raw is None:
+            raise RuntimeError("pooled connection already released")
+        self._raw.rollback()
+
+    def close(self) -> None:
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.release(raw)
+
+
+class _Slot:
+    __slots__ = ("conn", "created_at", "released_at")
+
+    def __init__(self, conn: Any, created_at: float) -> None:
+        self.conn = conn
+        self.created_at = created_at
+        self.released_at = created_at
+
+
+class PgConnectionPool:
+    """Bounded pool of driver connections for :class:`PgvectorMemoryBackend`.
+
+    ``connect`` dials a new connection (or returns ``None`` when the server is
+    unreachable). At most ``max_size`` connections exist at once; callers past
+    that wait up to ``acquire_timeout_s`` for one to come back.
+
+    Idle connections are recycled when they have sat unused for longer than
+    ``max_idle_s`` or are older than ``max_lifetime_s``, and are probed with
+    ``SELECT 1`` before reuse once idle for ``health_check_after_s``. A
+    connection handed back is rolled back first so it never returns to the
+    pool idle-in-transaction; one that fails that, or reports itself closed
+    or broken, is dropped instead.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any | None],
+        *,
+        max_size: int = PG_POOL_MAX_SIZE,
+        acquire_timeout_s: float = PG_POOL_ACQUIRE_TIMEOUT_S,
+        health_check_after_s: float = PG_POOL_HEALTH_CHECK_AFTER_S,
+        max_idle_s: float = PG_POOL_MAX_IDLE_S,
+        max_lifetime_s: float = PG_POOL_MAX_LIFETIME_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._connect = connect
+        self.max_size = max(1, int(max_size))
+        self.acquire_timeout_s = max(0.0, float(acquire_timeout_s))
+        self.health_check_after_s = max(0.0, float(health_check_after_s))
+        self.max_idle_s = max(0.0, float(max_idle_s))
+        self.max_lifetime_s = max(0.0, float(max_lifetime_s))
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._idle: list[_Slot] = []
+        self._in_use: dict[int, _Slot] = {}
+        self._opening = 0
+        self._closed = False
+        self.stats: dict[str, int] = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "connect_failures": 0,
+            "acquires": 0,
+            "reuses": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "health_checks": 0,
+            "health_check_failures": 0,
+            "recycled": 0,
+            "discarded": 0,
+        }
+
+    def _expired(self, slot: _Slot, now: float) -> bool:
+        if self.max_lifetime_s and now - slot.created_at >= self.max_lifetime_s:
+            return True
+        return bool(self.max_idle_s and now - slot.released_at >= self.max_idle_s)
+
+    @staticmethod
+    def _close_raw(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn: Any) -> bool:
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    def acquire(self) -> _PooledConnection | None:
+        deadline = self._clock() + self.acquire_timeout_s
+        stale: list[Any] = []
+        slot: _Slot | None = None
+        with self._cond:
+            if self._closed:
+                return None
+            self.stats["acquires"] += 1
+            waited = False
+            while True:
+                now = self._clock()
+                while self._idle:
+                    candidate = self._idle.pop()
+                    if self._expired(candidate, now):
+                        self.stats["recycled"] += 1
+                        stale.append(candidate.conn)
+                        continue
+                    slot = candidate
+                    break
+                if slot is not None:
+                    break
+                if len(self._in_use) + self._opening < self.max_size:
+                    self._opening += 1
+                    break
+                if not waited:
+                    self.stats["waits"] += 1
+                    waited = True
+                remaining = deadline - self._clock()
+                if remaining <= 0 or self._closed:
+                    self.stats["timeouts"] += 1
+                    for conn in stale:
+                        self._close_raw(conn)
+                    self.stats["connections_closed"] += len(stale)
+                    return None
+                self._cond.wait(remaining)
+            self.stats["connections_closed"] += len(stale)
+        for conn in stale:
+            self._close_raw(conn)
+
+        if slot is not None:
+            if self.health_check_after_s and self._clock() - slot.released_at >= self.health_check_after_s:
+                healthy = self._healthy(slot.conn)
+                with self._cond:
+                    self.stats["health_checks"] += 1
+                    if not healthy:
+                        self.stats["health_check_failures"] += 1
+                        self.stats["connections_closed"] += 1
+                        self._opening += 1
+                if not healthy:
+                    self._close_raw(slot.conn)
+                    slot = None
+            if slot is not None:
+                with self._cond:
+                    self.stats["reuses"] += 1
+                    self._in_use[id(slot.conn)] = slot
+                return _PooledConnection(self, slot.conn)
+
+        try:
+            conn = self._connect()
+        except Exception:
+            conn = None
+        with self._cond:
+            self._opening -= 1
+            if conn is None:
+                self.stats["connect_failures"] += 1
+                self._cond.notify()
+                return None
+            self.stats["connections_opened"] += 1
+            self._in_use[id(conn)] = _Slot(conn, self._clock())
+        return _PooledConnection(self, conn)
+
+    def release(self, conn: Any) -> None:
+        reusable = not _connection_is_broken(conn)
+        if reusable:
+            try:
+                conn.rollback()
+            except Exception:
+                reusable = False
+        with self._cond:
+            slot = self._in_use.pop(id(conn), None)
+            if slot is not None and reusable and not self._closed:
+                slot.released_at = self._clock()
+                self._idle.append(slot)
+                self._cond.notify()
+                return
+            self.stats["discarded"] += 1
+            self.stats["connections_closed"] += 1
+            self._cond.notify()
+        self._close_raw(conn)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self.stats["connections_closed"] += len(idle)
+            self._cond.notify_all()
+        for slot in idle:
+            self._close_raw(slot.conn)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                **self.stats,
+                "size": len(self._idle) + len(self._in_use),
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "max_size": self.max_size,
+            }
+
+
+__all__ = [
+    "PG_POOL_ACQUIRE_TIMEOUT_S",
+    "PG_POOL_HEALTH_CHECK_AFTER_S",
+    "PG_POOL_MAX_IDLE_S",
+    "PG_POOL_MAX_LIFETIME_S",
+    "PG_POOL_MAX_SIZE",
+    "PgConnectionPool",
+]
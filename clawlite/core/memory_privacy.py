@@ -6,9 +6,16 @@ import hmac
 import json
 import os
 import secrets
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Callable
 
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except Exception:  # pragma: no cover - optional accelerator
+    AESGCM = None
+
 
 def privacy_settings(
     *,
@@ -64,26 +71,142 @@ def append_privacy_audit_event(
         diagnostics["last_error"] = str(exc)
 
 
+ENC_V1_PREFIX = "enc:v1:"
+ENC_V2_PREFIX = "enc:v2:"
+ENC_V3_PREFIX = "enc:v3:"
+ENC_V4_PREFIX = "enc:v4:"
+ENCRYPTED_PREFIXES = (ENC_V4_PREFIX, ENC_V3_PREFIX, ENC_V2_PREFIX, ENC_V1_PREFIX)
+DECRYPT_MEMO_SIZE = 4096
+
+_V3_STREAM_LABEL = b"clawlite-memory:v3:stream"
+_V3_MAC_LABEL = b"clawlite-memory:v3:mac"
+
+
+def aead_available() -> bool:
+    return AESGCM is not None
+
+
 def encrypted_prefix() -> str:
-    return "enc:v2:"
+    """Prefix new ciphertexts are written with.
+
+    ``enc:v4:`` (AES-256-GCM) when ``cryptography`` is installed, otherwise
+    ``enc:v3:`` (SHAKE-256 stream + HMAC-SHA256). Readers accept every prefix
+    in :data:`ENCRYPTED_PREFIXES`.
+    """
+    return ENC_V4_PREFIX if aead_available() else ENC_V3_PREFIX
 
 
 def legacy_encrypted_prefix() -> str:
-    return "enc:v1:"
+    return ENC_V1_PREFIX
+
+
+def is_encrypted_text(text: str) -> bool:
+    return str(text or "").startswith(ENCRYPTED_PREFIXES)
+
+
+def _xor_bytes(data: bytes, keystream: bytes) -> bytes:
+    # One big-int XOR runs in C; the old per-byte loop dominated decrypt time.
+    size = len(data)
+    if not size:
+        return b""
+    return (int.from_bytes(data, "big") ^ int.from_bytes(keystream[:size], "big")).to_bytes(size, "big")
 
 
 def xor_with_keystream(data: bytes, *, key: bytes, nonce: bytes) -> bytes:
-    output = bytearray(len(data))
-    counter = 0
-    cursor = 0
-    while cursor < len(data):
-        block = hashlib.sha256(key + nonce + counter.to_bytes(4, "big")).digest()
-        take = min(len(block), len(data) - cursor)
-        for idx in range(take):
-            output[cursor + idx] = data[cursor + idx] ^ block[idx]
-        cursor += take
-        counter += 1
-    return bytes(output)
+    """The ``enc:v2:`` keystream: SHA-256(key + nonce + counter) blocks."""
+    seed = key + nonce
+    blocks = (len(data) + 31) // 32
+    keystream = b"".join(hashlib.sha256(seed + counter.to_bytes(4, "big")).digest() for counter in range(blocks))
+    return _xor_bytes(data, keystream)
+
+
+def _derive_subkey(key: bytes, label: bytes) -> bytes:
+    return hmac.new(key, label, hashlib.sha256).digest()
+
+
+def _seal_v3(data: bytes, key: bytes) -> bytes:
+    nonce = secrets.token_bytes(16)
+    stream = hashlib.shake_256(_derive_subkey(key, _V3_STREAM_LABEL) + nonce).digest(len(data))
+    ciphertext = _xor_bytes(data, stream)
+    tag = hmac.new(_derive_subkey(key, _V3_MAC_LABEL), nonce + ciphertext, hashlib.sha256).digest()
+    return nonce + ciphertext + tag
+
+
+def _open_v3(payload: bytes, key: bytes) -> bytes:
+    if len(payload) < 16 + 32:
+        raise ValueError("invalid_enc_v3_payload")
+    nonce, ciphertext, tag = payload[:16], payload[16:-32], payload[-32:]
+    expected_tag = hmac.new(_derive_subkey(key, _V3_MAC_LABEL), nonce + ciphertext, hashlib.sha256).digest()
+    if not hmac.compare_digest(tag, expected_tag):
+        raise ValueError("invalid_enc_v3_tag")
+    stream = hashlib.shake_256(_derive_subkey(key, _V3_STREAM_LABEL) + nonce).digest(len(ciphertext))
+    return _xor_bytes(ciphertext, stream)
+
+
+def _seal_v4(data: bytes, key: bytes) -> bytes:
+    nonce = secrets.token_bytes(12)
+    return nonce + AESGCM(key).encrypt(nonce, data, ENC_V4_PREFIX.encode("ascii"))
+
+
+def _open_v4(payload: bytes, key: bytes) -> bytes:
+    if AESGCM is None:
+        raise RuntimeError("enc_v4_requires_cryptography")
+    if len(payload) < 12 + 16:
+        raise ValueError("invalid_enc_v4_payload")
+    return AESGCM(key).decrypt(payload[:12], payload[12:], ENC_V4_PREFIX.encode("ascii"))
+
+
+def privacy_key_id(key: bytes) -> str:
+    """Short fingerprint naming ``key`` without revealing it."""
+    return hashlib.sha256(b"clawlite-key-id:" + bytes(key)).hexdigest()[:16]
+
+
+class DecryptionMemo:
+    """Plaintexts of recently decrypted ciphertexts (LRU).
+
+    Every encryption draws a fresh nonce, so a ciphertext string names
+    exactly one generation of one record: an unchanged row hits, a rewritten
+    row misses. This keeps record-cache reloads after an unrelated append from
+    re-decrypting the whole file. Entries are keyed by the id of the key
+    that opened them as well, so a rotated or replaced key never serves a
+    plaintext it would not decrypt.
+    """
+
+    def __init__(self, *, max_entries: int = DECRYPT_MEMO_SIZE) -> None:
+        self._max_entries = max(0, int(max_entries))
+        self._entries: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key_id: str, ciphertext: str) -> str | None:
+        entry = (key_id, ciphertext)
+        with self._lock:
+            plaintext = self._entries.get(entry)
+            if plaintext is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry)
+            self.hits += 1
+            return plaintext
+
+    def put(self, key_id: str, ciphertext: str, plaintext: str) -> None:
+        if self._max_entries <= 0:
+            return
+        entry = (key_id, ciphertext)
+        with self._lock:
+            self._entries[entry] = plaintext
+            self._entries.move_to_end(entry)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
 
 
 def load_or_create_privacy_key(
@@ -137,6 +260,13 @@ def load_or_create_privacy_key(
         return None
 
 
+def encrypted_categories(settings: dict[str, Any]) -> set[str]:
+    raw_categories = settings.get("encrypted_categories", [])
+    if not isinstance(raw_categories, list):
+        return set()
+    return {str(item or "").strip().lower() for item in raw_categories if str(item or "").strip()}
+
+
 def is_encrypted_category(
     category: str,
     *,
@@ -144,10 +274,18 @@ def is_encrypted_category(
     privacy_settings_loader: Callable[[], dict[str, Any]],
 ) -> bool:
     payload = settings if isinstance(settings, dict) else privacy_settings_loader()
-    raw_categories = payload.get("encrypted_categories", [])
-    if not isinstance(raw_categories, list):
+    return str(category or "").strip().lower() in encrypted_categories(payload)
+
+
+def needs_reencryption(text: str, category: str, *, categories: set[str]) -> bool:
+    """Whether a stored ``text`` of an encrypted category predates the current scheme.
+
+    True for plaintext and for ciphertext under an older prefix; rows of
+    categories that are no longer encrypted are left as they are.
+    """
+    clean = str(text or "")
+    if not clean or clean.startswith(encrypted_prefix()):
         return False
-    categories = {str(item or "").strip().lower() for item in raw_categories if str(item or "").strip()}
     return str(category or "").strip().lower() in categories
 
 
@@ -158,7 +296,6 @@ def encrypt_text_for_category(
     settings: dict[str, Any] | None,
     privacy_settings_loader: Callable[[], dict[str, Any]],
     load_or_create_privacy_key_fn: Callable[[], bytes | None],
-    xor_with_keystream_fn: Callable[..., bytes],
     diagnostics: dict[str, Any],
 ) -> str:
     clean = str(text or "")
@@ -170,12 +307,11 @@ def encrypt_text_for_category(
         key = load_or_create_privacy_key_fn()
         if key is None:
             return clean
-        nonce = secrets.token_bytes(16)
-        ciphertext = xor_with_keystream_fn(clean.encode("utf-8"), key=key, nonce=nonce)
-        tag = hmac.new(key, nonce + ciphertext, hashlib.sha256).digest()
-        encoded = base64.urlsafe_b64encode(nonce + ciphertext + tag).decode("ascii")
+        prefix = encrypted_prefix()
+        seal = _seal_v4 if prefix == ENC_V4_PREFIX else _seal_v3
+        encoded = base64.urlsafe_b64encode(seal(clean.encode("utf-8"), key)).decode("ascii")
         diagnostics["privacy_encrypt_events"] = int(diagnostics.get("privacy_encrypt_events", 0)) + 1
-        return f"{encrypted_prefix()}{encoded}"
+        return f"{prefix}{encoded}"
     except Exception as exc:
         diagnostics["privacy_encrypt_errors"] = int(diagnostics.get("privacy_encrypt_errors", 0)) + 1
         diagnostics["last_error"] = str(exc)
@@ -190,36 +326,48 @@ def decrypt_text_for_category(
     load_or_create_privacy_key_fn: Callable[[], bytes | None],
     xor_with_keystream_fn: Callable[..., bytes],
     diagnostics: dict[str, Any],
+    memo: DecryptionMemo | None = None,
 ) -> str:
     clean = str(text or "")
-    if not clean:
-        return clean
-    prefix_v2 = encrypted_prefix()
-    prefix_v1 = legacy_encrypted_prefix()
-    if not clean.startswith(prefix_v2) and not clean.startswith(prefix_v1):
+    if not clean or not clean.startswith(ENCRYPTED_PREFIXES):
         return clean
     _ = category
     _ = settings
+    key: bytes | None = None
+    key_id = ""
+    if not clean.startswith(ENC_V1_PREFIX):
+        key = load_or_create_privacy_key_fn()
+        if key is None:
+            return clean
+        key_id = privacy_key_id(key)
+    if memo is not None:
+        cached = memo.get(key_id, clean)
+        if cached is not None:
+            return cached
     try:
-        if clean.startswith(prefix_v2):
-            encoded = clean[len(prefix_v2) :]
-            payload = base64.urlsafe_b64decode(encoded.encode("ascii"))
-            if len(payload) < 16 + 32:
-                raise ValueError("invalid_enc_v2_payload")
-            nonce = payload[:16]
-            ciphertext = payload[16:-32]
-            tag = payload[-32:]
-            key = load_or_create_privacy_key_fn()
-            if key is None:
-                return clean
-            expected_tag = hmac.new(key, nonce + ciphertext, hashlib.sha256).digest()
-            if not hmac.compare_digest(tag, expected_tag):
-                raise ValueError("invalid_enc_v2_tag")
-            decoded = xor_with_keystream_fn(ciphertext, key=key, nonce=nonce).decode("utf-8")
+        if key is None:
+            decoded = base64.urlsafe_b64decode(clean[len(ENC_V1_PREFIX) :].encode("ascii")).decode("utf-8")
         else:
-            encoded = clean[len(prefix_v1) :]
-            decoded = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8")
+            prefix = clean[: len(ENC_V2_PREFIX)]
+            payload = base64.urlsafe_b64decode(clean[len(prefix) :].encode("ascii"))
+            if prefix == ENC_V4_PREFIX:
+                plain = _open_v4(payload, key)
+            elif prefix == ENC_V3_PREFIX:
+                plain = _open_v3(payload, key)
+            else:
+                if len(payload) < 16 + 32:
+                    raise ValueError("invalid_enc_v2_payload")
+                nonce = payload[:16]
+                ciphertext = payload[16:-32]
+                tag = payload[-32:]
+                expected_tag = hmac.new(key, nonce + ciphertext, hashlib.sha256).digest()
+                if not hmac.compare_digest(tag, expected_tag):
+                    raise ValueError("invalid_enc_v2_tag")
+                plain = xor_with_keystream_fn(ciphertext, key=key, nonce=nonce)
+            decoded = plain.decode("utf-8")
         diagnostics["privacy_decrypt_events"] = int(diagnostics.get("privacy_decrypt_events", 0)) + 1
+        if memo is not None:
+            memo.put(key_id, clean, decoded)
         return decoded
     except Exception as exc:
         diagnostics["privacy_decrypt_errors"] = int(diagnostics.get("privacy_decrypt_errors", 0)) + 1
@@ -245,14 +393,26 @@ def privacy_block_reason(
 
 
 __all__ = [
+    "DECRYPT_MEMO_SIZE",
+    "DecryptionMemo",
+    "ENCRYPTED_PREFIXES",
+    "ENC_V1_PREFIX",
+    "ENC_V2_PREFIX",
+    "ENC_V3_PREFIX",
+    "ENC_V4_PREFIX",
+    "aead_available",
     "append_privacy_audit_event",
     "decrypt_text_for_category",
     "encrypt_text_for_category",
+    "encrypted_categories",
     "encrypted_prefix",
     "is_encrypted_category",
+    "is_encrypted_text",
     "legacy_encrypted_prefix",
     "load_or_create_privacy_key",
+    "needs_reencryption",
     "privacy_block_reason",
+    "privacy_key_id",
     "privacy_settings",
     "xor_with_keystream",
 ]
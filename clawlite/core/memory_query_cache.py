@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable
+
+SEARCH_CACHE_MAX_ENTRIES = 512
+SEARCH_CACHE_TTL_S = 60.0
+
+
+class _CachedResult:
+    __slots__ = ("stamp", "stored_at", "rows")
+
+    def __init__(self, stamp: Hashable, stored_at: float, rows: tuple[Any, ...]) -> None:
+        self.stamp = stamp
+        self.stored_at = stored_at
+        self.rows = rows
+
+
+class SearchResultCache:
+    """Ranked results of recent searches (LRU), invalidated per memory scope.
+
+    Each scope (``default``, ``user:<id>``, ``shared``) has a write
+    generation that the store bumps on every write under one of its files.
+    A caller builds a *stamp* from the generations of the scopes a search
+    reads (plus anything else that must match, such as file signatures)
+    with :meth:`generations`, *before* running the search, and stores the
+    result under it. A later lookup hits only while the stamp is unchanged,
+    so a write racing the search can only make the entry look stale.
+
+    Entries also expire after ``ttl_s`` seconds: recency, decay and
+    upcoming-event boosts drift with the clock, and writes made by other
+    processes are only visible through the stamp's file signatures.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        ttl_s: float = SEARCH_CACHE_TTL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max(0, int(max_entries))
+        self._ttl_s = max(0.0, float(ttl_s))
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _CachedResult] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    def generations(self, scopes: Iterable[str]) -> tuple[int, ...]:
+        with self._lock:
+            return tuple(self._generations.get(scope, 0) for scope in scopes)
+
+    def bump(self, scope: str) -> None:
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def get(self, key: Hashable, stamp: Hashable) -> tuple[Any, ...] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.stamp != stamp or (self._ttl_s and self._clock() - entry.stored_at >= self._ttl_s):
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.rows
+
+    def put(self, key: Hashable, stamp: Hashable, rows: Iterable[Any]) -> None:
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = _CachedResult(stamp, self._clock(), tuple(rows))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for scope in list(self._generations):
+                self._generations[scope] += 1
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_rate_pct": int(round(100.0 * self.hits / lookups)) if lookups else 0,
+            }
+
+
+__all__ = [
+    "SEARCH_CACHE_MAX_ENTRIES",
+    "SEARCH_CACHE_TTL_S",
+    "SearchResultCache",
+]
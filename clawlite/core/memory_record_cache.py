@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+RECORD_CACHE_MAX_FILES = 64
+
+Signature = tuple[int, int, int]
+
+
+def stat_signature(path: Path) -> Signature | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (int(stat.st_ino), int(stat.st_mtime_ns), int(stat.st_size))
+
+
+class _CachedRows:
+    __slots__ = ("signature", "generation", "rows")
+
+    def __init__(self, signature: Signature | None, generation: int, rows: tuple[Any, ...]) -> None:
+        self.signature = signature
+        self.generation = generation
+        self.rows = rows
+
+
+class RecordCache:
+    """Decoded rows of the memory files, keyed on each file's generation.
+
+    An entry stays valid while the file's ``(inode, mtime_ns, size)`` and the
+    in-process write generation both match what they were when it was
+    loaded. The stat signature catches writers in other processes; the
+    generation catches in-process writes that keep the size and land in the
+    same mtime tick (in-place upserts and tombstones do both). Callers bump
+    the generation through :meth:`invalidate` while they still hold the
+    file's exclusive lock.
+
+    The generation and signature are captured *before* a miss reads the
+    file, so a write racing the read can only make the stored entry look
+    stale, never make a stale entry look fresh.
+
+    Rows are decrypted, normalized objects; :meth:`get` hands out copies
+    made by the loader-supplied ``clone`` so callers may mutate them freely.
+    """
+
+    def __init__(self, *, max_files: int = RECORD_CACHE_MAX_FILES) -> None:
+        self._max_files = max(1, int(max_files))
+        self._entries: OrderedDict[tuple[str, str], _CachedRows] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        kind: str,
+        path: Path,
+        load: Callable[[], Iterable[Any]],
+        *,
+        clone: Callable[[Any], Any],
+    ) -> list[Any]:
+        path_key = str(path)
+        key = (kind, path_key)
+        signature = stat_signature(Path(path))
+        with self._lock:
+            generation = self._generations.get(path_key, 0)
+            entry = self._entries.get(key)
+            if entry is not None and signature is not None and entry.signature == signature and entry.generation == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                rows = entry.rows
+            else:
+                self.misses += 1
+                rows = None
+        if rows is None:
+            rows = tuple(load())
+            if signature is not None:
+                with self._lock:
+                    self._entries[key] = _CachedRows(signature, generation, rows)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self._max_files:
+                        self._entries.popitem(last=False)
+        return [clone(row) for row in rows]
+
+    def generation(self, path: Path) -> int:
+        with self._lock:
+            return self._generations.get(str(path), 0)
+
+    def invalidate(self, path: Path) -> None:
+        path_key = str(path)
+        with self._lock:
+            self._generations[path_key] = self._generations.get(path_key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for path_key in list(self._generations):
+                self._generations[path_key] += 1
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "files": len(self._entries),
+                "rows": sum(len(entry.rows) for entry in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+__all__ = [
+    "RECORD_CACHE_MAX_FILES",
+    "RecordCache",
+    "stat_signature",
+]
@@ -6,7 +6,15 @@ from datetime import datetime, timezone
 from typing import Any, Callable
 
 
-def build_memory_diagnostics(*, diagnostics: dict[str, Any], backend_diagnostics: dict[str, Any]) -> dict[str, int | str | bool]:
+def build_memory_diagnostics(
+    *,
+    diagnostics: dict[str, Any],
+    backend_diagnostics: dict[str, Any],
+    record_cache: dict[str, Any] | None = None,
+    decrypt_memo: dict[str, Any] | None = None,
+    rank_features: dict[str, Any] | None = None,
+    search_cache: dict[str, Any] | None = None,
+) -> dict[str, int | str | bool]:
     def _int_metric(source: dict[str, Any], name: str) -> int:
         return int(source.get(name, 0) or 0)
 
@@ -19,6 +27,18 @@ def build_memory_diagnostics(*, diagnostics: dict[str, Any], backend_diagnostics
     return {
         "history_read_corrupt_lines": _int_metric(diagnostics, "history_read_corrupt_lines"),
         "history_repaired_files": _int_metric(diagnostics, "history_repaired_files"),
+        "history_tombstones": _int_metric(diagnostics, "history_tombstones"),
+        "history_compactions": _int_metric(diagnostics, "history_compactions"),
+        "record_cache_hits": _int_metric(record_cache or {}, "hits"),
+        "record_cache_misses": _int_metric(record_cache or {}, "misses"),
+        "record_cache_rows": _int_metric(record_cache or {}, "rows"),
+        "search_candidate_queries": _int_metric(diagnostics, "search_candidate_queries"),
+        "search_full_queries": _int_metric(diagnostics, "search_full_queries"),
+        "search_cache_hits": _int_metric(search_cache or {}, "hits"),
+        "search_cache_misses": _int_metric(search_cache or {}, "misses"),
+        "rank_features_stored_hits": _int_metric(rank_features or {}, "stored_hits"),
+        "rank_features_memo_hits": _int_metric(rank_features or {}, "hits"),
+        "rank_features_computed": _int_metric(rank_features or {}, "misses"),
         "consolidate_writes": _int_metric(diagnostics, "consolidate_writes"),
         "consolidate_dedup_hits": _int_metric(diagnostics, "consolidate_dedup_hits"),
         "session_recovery_attempts": _int_metric(diagnostics, "session_recovery_attempts"),
@@ -34,6 +54,9 @@ def build_memory_diagnostics(*, diagnostics: dict[str, Any], backend_diagnostics
         "privacy_encrypt_errors": _int_metric(diagnostics, "privacy_encrypt_errors"),
         "privacy_decrypt_events": _int_metric(diagnostics, "privacy_decrypt_events"),
         "privacy_decrypt_errors": _int_metric(diagnostics, "privacy_decrypt_errors"),
+        "privacy_decrypt_memo_hits": _int_metric(decrypt_memo or {}, "hits"),
+        "privacy_decrypt_memo_misses": _int_metric(decrypt_memo or {}, "misses"),
+        "privacy_reencrypted": _int_metric(diagnostics, "privacy_reencrypted"),
         "privacy_key_load_events": _int_metric(diagnostics, "privacy_key_load_events"),
         "privacy_key_create_events": _int_metric(diagnostics, "privacy_key_create_events"),
         "privacy_key_errors": _int_metric(diagnostics, "privacy_key_errors"),
@@ -66,49 +66,102 @@ def list_resources(
     return resources
 
 
-def fetch_record_by_id(
+def _record_from_layer_row(
+    row: dict[str, Any],
     *,
-    backend: Any,
     record_id: str,
     item_layer_value: str,
     memory_record_cls: Callable[..., Any],
 ) -> Any | None:
+    payload = row.get("payload", {})
+    if not isinstance(payload, dict) or not payload.get("text"):
+        return None
+    return memory_record_cls(
+        id=str(payload.get("id", record_id)),
+        text=str(payload.get("text", "")),
+        source=str(payload.get("source", "user")),
+        created_at=str(payload.get("created_at", row.get("created_at", ""))),
+        category=str(payload.get("category", row.get("category", "context"))),
+        user_id=str(payload.get("user_id", "default")),
+        layer=str(payload.get("layer", item_layer_value)),
+        reasoning_layer=str(payload.get("reasoning_layer", "fact")),
+        modality=str(payload.get("modality", "text")),
+        updated_at=str(payload.get("updated_at", "")),
+        confidence=float(payload.get("confidence", 1.0)),
+        decay_rate=float(payload.get("decay_rate", 0.0)),
+        emotional_tone=str(payload.get("emotional_tone", "neutral")),
+        memory_type=str(payload.get("memory_type", "knowledge")),
+        happened_at=str(payload.get("happened_at", "")),
+        metadata=payload.get("metadata", {}),
+    )
+
+
+def _fetch_item_rows(*, backend: Any, record_ids: list[str], item_layer_value: str) -> list[dict[str, Any]]:
+    fetch_by_ids = getattr(backend, "fetch_layer_records_by_ids", None)
+    if callable(fetch_by_ids):
+        return list(fetch_by_ids(record_ids, layer=item_layer_value))
+    # Backends without a keyed lookup still get the legacy bounded scan.
+    wanted = set(record_ids)
     all_rows = backend.fetch_layer_records(layer=item_layer_value, limit=50000)
-    for row in all_rows:
-        if row.get("record_id") != record_id:
-            continue
-        payload = row.get("payload", {})
-        if not isinstance(payload, dict) or not payload.get("text"):
+    return [row for row in all_rows if row.get("record_id") in wanted]
+
+
+def fetch_records_by_ids(
+    *,
+    backend: Any,
+    record_ids: list[str],
+    item_layer_value: str,
+    memory_record_cls: Callable[..., Any],
+) -> list[Any]:
+    ids = [str(item or "").strip() for item in record_ids]
+    ids = [item for item in dict.fromkeys(ids) if item]
+    if not ids:
+        return []
+    by_id: dict[str, Any] = {}
+    for row in _fetch_item_rows(backend=backend, record_ids=ids, item_layer_value=item_layer_value):
+        row_id = str(row.get("record_id", "") or "")
+        if row_id in by_id:
             continue
-        return memory_record_cls(
-            id=str(payload.get("id", record_id)),
-            text=str(payload.get("text", "")),
-            source=str(payload.get("source", "user")),
-            created_at=str(payload.get("created_at", row.get("created_at", ""))),
-            category=str(payload.get("category", row.get("category", "context"))),
-            user_id=str(payload.get("user_id", "default")),
-            layer=str(payload.get("layer", item_layer_value)),
-            reasoning_layer=str(payload.get("reasoning_layer", "fact")),
-            modality=str(payload.get("modality", "text")),
-            updated_at=str(payload.get("updated_at", "")),
-            confidence=float(payload.get("confidence", 1.0)),
-            decay_rate=float(payload.get("decay_rate", 0.0)),
-            emotional_tone=str(payload.get("emotional_tone", "neutral")),
-            memory_type=str(payload.get("memory_type", "knowledge")),
-            happened_at=str(payload.get("happened_at", "")),
-            metadata=payload.get("metadata", {}),
+        record = _record_from_layer_row(
+            row,
+            record_id=row_id,
+            item_layer_value=item_layer_value,
+            memory_record_cls=memory_record_cls,
         )
-    return None
+        if record is not None:
+            by_id[row_id] = record
+    return [by_id[rid] for rid in ids if rid in by_id]
+
+
+def fetch_record_by_id(
+    *,
+    backend: Any,
+    record_id: str,
+    item_layer_value: str,
+    memory_record_cls: Callable[..., Any],
+) -> Any | None:
+    records = fetch_records_by_ids(
+        backend=backend,
+        record_ids=[record_id],
+        item_layer_value=item_layer_value,
+        memory_record_cls=memory_record_cls,
+    )
+    return records[0] if records else None
 
 
 def get_resource_records(
     *,
     backend: Any,
     resource_id: str,
-    fetch_record_by_id_fn: Callable[[str], Any | None],
+    fetch_record_by_id_fn: Callable[[str], Any | None] | None = None,
+    fetch_records_by_ids_fn: Callable[[list[str]], list[Any]] | None = None,
 ) -> list[Any]:
     record_ids = backend.fetch_records_by_resource(resource_id)
+    if fetch_records_by_ids_fn is not None:
+        return list(fetch_records_by_ids_fn(list(record_ids)))
     results: list[Any] = []
+    if fetch_record_by_id_fn is None:
+        return results
     for rid in record_ids:
         rec = fetch_record_by_id_fn(rid)
         if rec is not None:
@@ -137,6 +190,7 @@ def purge_expired_records(*, backend: Any) -> int:
 __all__ = [
     "create_resource",
     "fetch_record_by_id",
+    "fetch_records_by_ids",
     "get_record_ttl",
     "get_resource",
     "get_resource_records",
@@ -434,6 +434,8 @@ def collect_retrieval_records(
     apply_retrieval_filters: Callable[[list[Any], dict[str, Any]], list[Any]],
     working_episode_visible_in_session: Callable[[Any, str], bool],
     semantic_enabled: bool,
+    candidate_ids: list[str] | None = None,
+    read_history_records_by_ids: Callable[[Path, list[str]], list[Any] | None] | None = None,
 ) -> tuple[list[Any], dict[str, float], dict[str, int], list[dict[str, Path]], bool]:
     clean_user = normalize_user_id(user_id or "default")
     reasoning_filter = normalize_reasoning_layers_filter(reasoning_layers)
@@ -463,7 +465,12 @@ def collect_retrieval_records(
             except Exception:
                 curated_mentions[row_id] = 1
 
-        records.extend(read_history_records_from(scope["history"]))
+        history_rows = None
+        if candidate_ids is not None and read_history_records_by_ids is not None:
+            history_rows = read_history_records_by_ids(scope["history"], candidate_ids)
+        if history_rows is None:
+            history_rows = read_history_records_from(scope["history"])
+        records.extend(history_rows)
 
     records = apply_retrieval_filters(records, normalized_filters)
     if reasoning_filter:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from typing import Any, Callable, Iterable
 
 try:
@@ -7,6 +8,8 @@ try:
 except Exception:  # pragma: no cover
     BM25Okapi = None
 
+SEARCH_CANDIDATES = 200
+
 
 def rank_records(
     query: str,
@@ -41,7 +44,18 @@ def rank_records(
     temporal_intent_match_boost: float,
     temporal_intent_miss_penalty: float,
     bm25_class: Any = None,
+    similarity_scores: Callable[[list[float], list[str]], dict[str, float] | None] | None = None,
+    lexical_index: Any = None,
+    row_rank_terms: Callable[[Any, float], Any] | None = None,
 ) -> list[Any]:
+    """Order ``records`` by relevance to ``query`` and return the top ``limit``.
+
+    With ``row_rank_terms`` the query-independent terms of each row
+    (entities, temporal markers, recency, decay, upcoming-event and salience
+    scores) come from features cached at write time, evaluated against one
+    shared clock reading; without it they are recomputed per row through the
+    individual callables.
+    """
     if not records:
         return []
 
@@ -52,17 +66,44 @@ def rank_records(
     if not query_tokens:
         return records[-limit:][::-1]
 
-    corpus_tokens = [tokens(str(getattr(item, "text", "") or "")) for item in records]
-    corpus_entities = [extract_entities(str(getattr(item, "text", "") or "")) for item in records]
     query_token_set = set(query_tokens)
-
+    now = time.time()
     resolved_bm25 = BM25Okapi if bm25_class is None else bm25_class
-    if resolved_bm25 is None:
-        bm25_scores = [0.0 for _ in records]
+    corpus_terms: list[Any]
+    if lexical_index is not None and resolved_bm25 is BM25Okapi:
+        # The incremental index reproduces BM25Okapi exactly, so it replaces
+        # the per-query corpus rebuild; injected scorers keep the old path.
+        docs, bm25_scores = lexical_index.analyze(records, query_tokens)
+        if not semantic_enabled and not has_temporal_intent and not any(query_entities.values()):
+            # Without vector, entity or temporal signals a row sharing no query
+            # term sorts below every row that shares one, so once those fill
+            # ``limit`` the rest (curated rows aside) cannot be picked.
+            matching = [idx for idx, doc in enumerate(docs) if not query_token_set.isdisjoint(doc.terms)]
+            if len(matching) >= limit:
+                keep = set(matching)
+                keep.update(
+                    idx for idx, row in enumerate(records) if str(getattr(row, "source", "") or "").startswith("curated:")
+                )
+                positions = sorted(keep)
+                records = [records[idx] for idx in positions]
+                docs = [docs[idx] for idx in positions]
+                bm25_scores = [bm25_scores[idx] for idx in positions]
+        rank_terms = [row_rank_terms(row, now) for row in records] if row_rank_terms is not None else None
+        corpus_terms = [doc.terms for doc in docs]
+        corpus_entities = [
+            doc.entities if doc.entities is not None or rank_terms else extract_entities(doc.text) for doc in docs
+        ]
     else:
-        bm25 = resolved_bm25(corpus_tokens)
-        scores = bm25.get_scores(query_tokens)
-        bm25_scores = [float(scores[idx]) for idx in range(len(records))]
+        rank_terms = [row_rank_terms(row, now) for row in records] if row_rank_terms is not None else None
+        corpus_tokens = [tokens(str(getattr(item, "text", "") or "")) for item in records]
+        corpus_entities = [None if rank_terms else extract_entities(str(getattr(item, "text", "") or "")) for item in records]
+        corpus_terms = corpus_tokens
+        if resolved_bm25 is None:
+            bm25_scores = [0.0 for _ in records]
+        else:
+            bm25 = resolved_bm25(corpus_tokens)
+            scores = bm25.get_scores(query_tokens)
+            bm25_scores = [float(scores[idx]) for idx in range(len(records))]
 
     semantic_scores = [0.0 for _ in records]
     semantic_active = False
@@ -89,7 +130,14 @@ def rank_records(
                     for idx, row in enumerate(records):
                         semantic_scores[idx] = score_by_id.get(str(getattr(row, "id", "") or ""), 0.0)
                     semantic_active = True
-            if not semantic_active:
+            if not semantic_active and similarity_scores is not None:
+                record_ids = [str(getattr(row, "id", "") or "") for row in records]
+                batch_scores = similarity_scores(query_embedding, record_ids)
+                if batch_scores is not None:
+                    for idx, row_id in enumerate(record_ids):
+                        semantic_scores[idx] = batch_scores.get(row_id, 0.0)
+                    semantic_active = True
+            elif not semantic_active:
                 embeddings = read_embeddings_map()
                 if embeddings:
                     for idx, row in enumerate(records):
@@ -100,10 +148,11 @@ def rank_records(
                     semantic_active = True
 
     scored: list[tuple[float, float, float, int]] = []
-    for idx, row_tokens in enumerate(corpus_tokens):
+    for idx, row_tokens in enumerate(corpus_terms):
         row = records[idx]
+        terms = rank_terms[idx] if rank_terms is not None else None
         overlap = len(query_token_set.intersection(row_tokens))
-        entity_score = entity_match_score(query_entities, corpus_entities[idx])
+        entity_score = entity_match_score(query_entities, terms.entities if terms is not None else corpus_entities[idx])
         curated_boost = 0.0
         if str(getattr(row, "source", "") or "").startswith("curated:"):
             row_id = str(getattr(row, "id", "") or "")
@@ -111,10 +160,14 @@ def rank_records(
             mentions = curated_mentions.get(row_id, 1)
             curated_boost = 0.75 + min(2.0, importance * 0.25) + min(1.0, mentions * 0.1)
 
-        temporal_score = recency_score(record_temporal_anchor(row))
-        row_text = str(getattr(row, "text", "") or "")
+        if terms is not None:
+            temporal_score = terms.temporal_score
+        else:
+            temporal_score = recency_score(record_temporal_anchor(row))
         if has_temporal_intent:
-            if getattr(row, "happened_at", "") or memory_has_temporal_markers(row_text):
+            if getattr(row, "happened_at", "") or (
+                terms.temporal_markers if terms is not None else memory_has_temporal_markers(str(getattr(row, "text", "") or ""))
+            ):
                 temporal_score += temporal_intent_match_boost
             else:
                 temporal_score -= temporal_intent_miss_penalty
@@ -122,15 +175,20 @@ def rank_records(
         confidence_boost = bounded_confidence_score(getattr(row, "confidence", 1.0)) * ranking_confidence_boost_max
         reasoning_layer = normalize_reasoning_layer(getattr(row, "reasoning_layer", "fact"))
         reasoning_boost = reasoning_boosts.get(reasoning_layer, 0.0)
-        row_decay_penalty = decay_penalty(row)
-        row_upcoming_boost = upcoming_event_boost(row)
+        row_decay_penalty = terms.decay_penalty if terms is not None else decay_penalty(row)
+        row_upcoming_boost = terms.upcoming_boost if terms is not None else upcoming_event_boost(row)
         relevance_signal = bool(
             overlap > 0
             or bm25_scores[idx] > 0.0
             or entity_score > 0.0
             or (semantic_active and semantic_scores[idx] > 0.05)
         )
-        row_salience_boost = salience_boost(getattr(row, "metadata", {})) if relevance_signal else 0.0
+        if not relevance_signal:
+            row_salience_boost = 0.0
+        elif terms is not None:
+            row_salience_boost = terms.salience_boost
+        else:
+            row_salience_boost = salience_boost(getattr(row, "metadata", {}))
         raw_episodic_boost = episodic_session_boost(row)
         episodic_boost = raw_episodic_boost if relevance_signal or has_temporal_intent else 0.0
         if not relevance_signal and episodic_boost > 0.0 and has_temporal_intent:
@@ -194,6 +252,57 @@ def rank_records(
     return picked if picked else records[-limit:][::-1]
 
 
+def search_candidate_ids(
+    query: str,
+    *,
+    fanout: int,
+    tokens: Callable[[str], list[str]],
+    query_has_temporal_intent: Callable[[str], bool],
+    search_text: Callable[..., list[dict[str, Any]]] | None,
+    semantic_enabled: bool = False,
+    generate_embedding: Callable[[str], list[float] | None] | None = None,
+    query_similar_embeddings: Callable[[list[float], int], list[dict[str, Any]]] | None = None,
+) -> list[str] | None:
+    """Ids of the history records worth ranking for ``query``, or ``None`` to rank them all.
+
+    Up to ``fanout`` full-text hits matching any query word come first,
+    followed by up to ``fanout`` nearest vector neighbours when semantic
+    search is on. Queries without words and temporal queries return
+    ``None``: recency rather than text match decides those, so every record
+    has to be ranked. An empty candidate set also returns ``None`` so the
+    caller keeps the full path's recent-records fallback.
+    """
+    bounded = max(0, int(fanout or 0))
+    if bounded <= 0 or search_text is None:
+        return None
+    query_tokens = tokens(query)
+    if not query_tokens or query_has_temporal_intent(query):
+        return None
+    ids: dict[str, None] = {}
+    try:
+        hits = search_text(" ".join(query_tokens), limit=bounded, match_any=True)
+    except Exception:
+        hits = []
+    for hit in hits:
+        if isinstance(hit, dict):
+            row_id = str(hit.get("record_id", "") or "").strip()
+            if row_id:
+                ids.setdefault(row_id, None)
+    if semantic_enabled and generate_embedding is not None and query_similar_embeddings is not None:
+        query_embedding = generate_embedding(query)
+        if query_embedding is not None:
+            try:
+                neighbours = query_similar_embeddings(query_embedding, bounded)
+            except Exception:
+                neighbours = []
+            for hit in neighbours:
+                if isinstance(hit, dict):
+                    row_id = str(hit.get("record_id", "") or "").strip()
+                    if row_id:
+                        ids.setdefault(row_id, None)
+    return list(ids) or None
+
+
 def search_records(
     query: str,
     *,
@@ -207,9 +316,17 @@ def search_records(
     normalize_user_id: Callable[[str], str],
     collect_retrieval_records: Callable[..., tuple[list[Any], dict[str, float], dict[str, int], list[dict[str, Any]], bool]],
     rank_records_fn: Callable[..., list[Any]],
+    lexical_index_fn: Callable[..., Any] | None = None,
+    candidate_ids_fn: Callable[..., list[str] | None] | None = None,
 ) -> list[Any]:
     bounded_limit = max(1, int(limit or 1))
     clean_user = normalize_user_id(user_id or "default")
+    candidate_ids = (
+        candidate_ids_fn(query, user_id=clean_user, include_shared=include_shared)
+        if candidate_ids_fn is not None
+        else None
+    )
+    collect_extra: dict[str, Any] = {} if candidate_ids is None else {"candidate_ids": candidate_ids}
     records, curated_importance, curated_mentions, _scopes, semantic_enabled = collect_retrieval_records(
         user_id=clean_user,
         include_shared=include_shared,
@@ -217,7 +334,17 @@ def search_records(
         reasoning_layers=reasoning_layers,
         min_confidence=min_confidence,
         filters=filters,
+        **collect_extra,
     )
+    extra: dict[str, Any] = {}
+    if lexical_index_fn is not None:
+        # Candidates are scored against the statistics of the whole scope,
+        # not of the candidate subset, so pushing down does not change BM25.
+        extra["lexical_index"] = lexical_index_fn(
+            clean_user,
+            include_shared=include_shared,
+            candidates=candidate_ids is not None,
+        )
     return rank_records_fn(
         query,
         records,
@@ -226,10 +353,13 @@ def search_records(
         limit=bounded_limit,
         semantic_enabled=semantic_enabled,
         session_id=session_id,
+        **extra,
     )
 
 
 __all__ = [
+    "SEARCH_CANDIDATES",
     "rank_records",
+    "search_candidate_ids",
     "search_records",
 ]
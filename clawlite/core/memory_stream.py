@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import IO, Any, Callable, Iterable
+
+from clawlite.core.memory_history import stored_history_payload
+
+STREAM_FORMAT = "clawlite-memory-ndjson"
+STREAM_VERSION = 1
+STREAM_PROGRESS_EVERY = 1000
+STREAM_CHECKPOINT_EVERY = 5000
+
+Progress = Callable[[dict[str, Any]], None]
+
+
+def open_stream_writer(path: Path, *, compress: bool | None = None) -> IO[str]:
+    """Open ``path`` for NDJSON output, gzip'd when ``compress`` (default: a ``.gz`` suffix)."""
+    use_gzip = path.name.endswith(".gz") if compress is None else bool(compress)
+    if use_gzip:
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    return path.open("w", encoding="utf-8")
+
+
+def open_stream_reader(path: Path) -> IO[str]:
+    """Open an NDJSON stream, detecting gzip by its magic bytes rather than the name."""
+    with path.open("rb") as fh:
+        magic = fh.read(2)
+    if magic == b"\x1f\x8b":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def is_memory_stream(path: Path) -> bool:
+    try:
+        with open_stream_reader(path) as fh:
+            first = fh.readline(1 << 16)
+        payload = json.loads(first)
+    except (OSError, EOFError, ValueError):
+        return False
+    return isinstance(payload, dict) and payload.get("kind") == "header" and payload.get("format") == STREAM_FORMAT
+
+
+def _line(kind: str, **fields: Any) -> str:
+    return json.dumps({"kind": kind, **fields}, ensure_ascii=False) + "\n"
+
+
+def export_memory_stream(
+    *,
+    out_path: Path,
+    history_rows: Iterable[Any],
+    curated_rows: list[Any],
+    checkpoints: dict[str, Any],
+    profile: dict[str, Any],
+    privacy: dict[str, Any],
+    exported_at: str,
+    compress: bool | None = None,
+    progress: Progress | None = None,
+    progress_every: int = STREAM_PROGRESS_EVERY,
+) -> dict[str, Any]:
+    """Write the ``export_payload()`` content as NDJSON, one record per line.
+
+    Layout: a ``header`` line, then ``profile``, ``privacy``, ``checkpoints``,
+    one ``curated`` line per fact, one ``history`` line per record and a final
+    ``end`` line carrying the counts, which lets the importer tell a complete
+    stream from a truncated one. ``history_rows`` is consumed lazily, so only
+    one record is held at a time. The file is written beside ``out_path`` and
+    renamed into place when complete.
+    """
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = out_path.parent / f".{out_path.name}.partial"
+    every = max(1, int(progress_every))
+    counts = {"history": 0, "curated": 0}
+    try:
+        with open_stream_writer(temp_path, compress=out_path.name.endswith(".gz") if compress is None else compress) as fh:
+            fh.write(_line("header", format=STREAM_FORMAT, version=STREAM_VERSION, exported_at=exported_at))
+            fh.write(_line("profile", data=profile))
+            fh.write(_line("privacy", data=privacy))
+            fh.write(_line("checkpoints", data=checkpoints))
+            for row in curated_rows:
+                fh.write(_line("curated", record=asdict(row)))
+                counts["curated"] += 1
+            for row in history_rows:
+                fh.write(_line("history", record=asdict(row)))
+                counts["history"] += 1
+                if progress is not None and counts["history"] % every == 0:
+                    progress({"phase": "export", "history": counts["history"]})
+            fh.write(_line("end", counts=counts))
+        os.replace(temp_path, out_path)
+    finally:
+        if temp_path.exists():
+            try:
+                temp_path.unlink()
+            except Exception:
+                pass
+    if progress is not None:
+        progress({"phase": "export", "history": counts["history"], "done": True})
+    return {"version": STREAM_VERSION, "counts": counts}
+
+
+def _source_identity(path: Path) -> dict[str, Any]:
+    stat = path.stat()
+    return {"path": str(path.resolve()), "size": int(stat.st_size), "mtime_ns": int(stat.st_mtime_ns)}
+
+
+def _load_import_state(state_path: Path) -> dict[str, Any]:
+    try:
+        payload = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _save_import_state(state_path: Path, state: dict[str, Any]) -> None:
+    temp_path = state_path.parent / f"{state_path.name}.tmp"
+    temp_path.write_text(json.dumps(state, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(temp_path, state_path)
+
+
+def import_memory_stream(
+    *,
+    in_path: Path,
+    history_path: Path,
+    record_from_payload: Callable[[dict[str, Any]], Any | None],
+    encrypt_text_for_category: Callable[[str, str], str],
+    replace_history: Callable[[Path], None],
+    flush_and_fsync: Callable[[Any], None],
+    curated_enabled: bool,
+    write_curated_facts: Callable[[list[dict[str, object]]], None],
+    atomic_write_text_locked: Callable[[Path, str], None],
+    checkpoints_path: Path,
+    format_checkpoints: Callable[[dict[str, dict[str, object]]], str],
+    profile_path: Path,
+    privacy_path: Path,
+    write_json_dict: Callable[[Path, dict[str, Any]], None],
+    default_profile: Callable[[], dict[str, Any]],
+    default_privacy: Callable[[], dict[str, Any]],
+    resume: bool = True,
+    progress: Progress | None = None,
+    progress_every: int = STREAM_PROGRESS_EVERY,
+    checkpoint_every: int = STREAM_CHECKPOINT_EVERY,
+) -> dict[str, Any]:
+    """Replace the store's content with an NDJSON stream, record by record.
+
+    History lines are encrypted and appended to a staging file beside
+    ``history_path``, which replaces the live history only once the ``end``
+    line has been read; until then the store is untouched. Every
+    ``checkpoint_every`` records the staging file is fsynced and its length
+    recorded in a state file, so an interrupted import of the same source
+    (same path, size and mtime) resumes from there when ``resume`` is set.
+    Curated facts, checkpoints, profile and privacy are small and are
+    applied after the history swap, as :func:`import_memory_payload` does.
+    """
+    staging_path = history_path.parent / f".{history_path.name}.import"
+    state_path = history_path.parent / f".{history_path.name}.import.json"
+    identity = _source_identity(in_path)
+    state = _load_import_state(state_path) if resume else {}
+    skip = staged_bytes = written = 0
+    if state.get("source") == identity and staging_path.exists():
+        skip = max(0, int(state.get("history", 0) or 0))
+        staged_bytes = max(0, int(state.get("staged_bytes", 0) or 0))
+        written = max(0, int(state.get("written", 0) or 0))
+        if staging_path.stat().st_size < staged_bytes:
+            skip = staged_bytes = written = 0
+    resumed_from = skip
+    every = max(1, int(progress_every))
+    checkpoint = max(1, int(checkpoint_every))
+
+    curated: list[dict[str, object]] | None = None
+    sections: dict[str, dict[str, Any]] = {}
+    seen = 0
+    skipped = 0
+    ended = False
+    staging = staging_path.open("r+b" if staged_bytes else "wb")
+    try:
+        staging.truncate(staged_bytes)
+        staging.seek(staged_bytes)
+        with open_stream_reader(in_path) as reader:
+            for line_no, line in enumerate(reader, start=1):
+                raw = line.strip()
+                if not raw:
+                    continue
+                try:
+                    entry = json.loads(raw)
+                except json.JSONDecodeError:
+                    skipped += 1
+                    continue
+                if not isinstance(entry, dict):
+                    skipped += 1
+                    continue
+                kind = str(entry.get("kind", "") or "")
+                if line_no == 1 and kind != "header":
+                    raise ValueError("not a clawlite memory stream")
+                if kind == "history":
+                    seen += 1
+                    if seen <= skip:
+                        continue
+                    record = entry.get("record")
+                    parsed = record_from_payload(record) if isinstance(record, dict) else None
+                    if parsed is None:
+                        skipped += 1
+                    else:
+                        stored = stored_history_payload(record=parsed, encrypt_text_for_category=encrypt_text_for_category)
+                        staging.write((json.dumps(stored, ensure_ascii=False) + "\n").encode("utf-8"))
+                        written += 1
+                    if seen % checkpoint == 0:
+                        flush_and_fsync(staging)
+                        _save_import_state(
+                            state_path,
+                            {"source": identity, "history": seen, "written": written, "staged_bytes": staging.tell()},
+                        )
+                    if progress is not None and seen % every == 0:
+                        progress({"phase": "import", "history": seen})
+                elif kind == "curated":
+                    record = entry.get("record")
+                    if isinstance(record, dict):
+                        curated = curated if curated is not None else []
+                        curated.append(record)
+                elif kind in {"profile", "privacy", "checkpoints"}:
+                    data = entry.get("data")
+                    if isinstance(data, dict):
+                        sections[kind] = data
+                elif kind == "header":
+                    if entry.get("format") != STREAM_FORMAT:
+                        raise ValueError("not a clawlite memory stream")
+                    if int(entry.get("version", 0) or 0) > STREAM_VERSION:
+                        raise ValueError(f"unsupported memory stream version: {entry.get('version')}")
+                elif kind == "end":
+                    expected = entry.get("counts", {}) if isinstance(entry.get("counts"), dict) else {}
+                    if int(expected.get("history", seen) or 0) != seen:
+                        raise ValueError(f"memory stream history count mismatch: expected {expected.get('history')}, read {seen}")
+                    ended = True
+                    break
+        flush_and_fsync(staging)
+        if not ended:
+            _save_import_state(state_path, {"source": identity, "history": seen, "written": written, "staged_bytes": staging.tell()})
+            raise ValueError("memory stream is truncated (no end record); rerun the import to resume")
+    finally:
+        staging.close()
+
+    replace_history(staging_path)
+    if curated_enabled and curated is not None:
+        write_curated_facts(curated)
+    if "checkpoints" in sections:
+        atomic_write_text_locked(checkpoints_path, format_checkpoints(sections["checkpoints"]))
+    if "profile" in sections:
+        merged_profile = default_profile()
+        merged_profile.update(sections["profile"])
+        write_json_dict(profile_path, merged_profile)
+    if "privacy" in sections:
+        merged_privacy = default_privacy()
+        merged_privacy.update(sections["privacy"])
+        write_json_dict(privacy_path, merged_privacy)
+    try:
+        state_path.unlink()
+    except FileNotFoundError:
+        pass
+    if progress is not None:
+        progress({"phase": "import", "history": seen, "done": True})
+    return {
+        "version": STREAM_VERSION,
+        "counts": {"history": written, "curated": len(curated or [])},
+        "resumed_from": resumed_from,
+        "skipped": skipped,
+    }
+
+
+__all__ = [
+    "STREAM_CHECKPOINT_EVERY",
+    "STREAM_FORMAT",
+    "STREAM_PROGRESS_EVERY",
+    "STREAM_VERSION",
+    "export_memory_stream",
+    "import_memory_stream",
+    "is_memory_stream",
+    "open_stream_reader",
+    "open_stream_writer",
+]
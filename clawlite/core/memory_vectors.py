@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import heapq
+import math
+import operator
+from typing import Any, Iterable, Mapping
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional accelerator
+    np = None
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def _coerce_vector(raw: Any) -> list[float] | None:
+    if raw is None:
+        return None
+    if np is not None and isinstance(raw, np.ndarray):
+        # Already numeric (e.g. a view into the .f32 sidecar): skip the
+        # per-element float() pass; stacking copies it into the matrix.
+        return raw if raw.ndim == 1 and raw.size else None
+    try:
+        values = [float(item) for item in raw]
+    except Exception:
+        return None
+    return values if values else None
+
+
+def _unit_list(values: list[float]) -> list[float] | None:
+    norm = math.sqrt(math.fsum(item * item for item in values))
+    if norm <= 0.0 or not math.isfinite(norm):
+        return None
+    return [item / norm for item in values]
+
+
+class EmbeddingMatrix:
+    """Row-normalized embedding matrix scored with one batched dot product.
+
+    Rows are L2-normalized once at build time, so cosine similarity against a
+    query is a single matrix-vector product. NumPy is used when installed
+    (contiguous ``float32``); otherwise rows stay as normalized Python lists.
+    Vectors whose dimension differs from the matrix, or whose norm is zero,
+    are dropped at build time and score ``0.0`` like the scalar helper does.
+    """
+
+    __slots__ = ("ids", "dim", "_index", "_rows")
+
+    def __init__(self, ids: list[str], rows: Any, dim: int) -> None:
+        self.ids = ids
+        self.dim = dim
+        self._rows = rows
+        self._index = {row_id: idx for idx, row_id in enumerate(ids)}
+
+    @classmethod
+    def empty(cls) -> "EmbeddingMatrix":
+        rows: Any = np.zeros((0, 0), dtype=np.float32) if np is not None else []
+        return cls([], rows, 0)
+
+    @classmethod
+    def from_mapping(cls, embeddings: Mapping[str, Any], *, dim: int | None = None) -> "EmbeddingMatrix":
+        return cls.from_items(embeddings.items(), dim=dim)
+
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[str, Any]], *, dim: int | None = None) -> "EmbeddingMatrix":
+        ids: list[str] = []
+        vectors: list[list[float]] = []
+        target_dim = int(dim) if dim else 0
+        seen: dict[str, int] = {}
+        for row_id, raw in items:
+            clean_id = str(row_id or "").strip()
+            vector = _coerce_vector(raw)
+            if not clean_id or vector is None:
+                continue
+            if not target_dim:
+                target_dim = len(vector)
+            if len(vector) != target_dim:
+                continue
+            if clean_id in seen:
+                vectors[seen[clean_id]] = vector
+                continue
+            seen[clean_id] = len(ids)
+            ids.append(clean_id)
+            vectors.append(vector)
+        if not ids:
+            return cls.empty()
+
+        if np is not None:
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1)
+            keep = norms > 0.0
+            if not bool(keep.all()):
+                ids = [row_id for row_id, ok in zip(ids, keep.tolist()) if ok]
+                matrix = matrix[keep]
+                norms = norms[keep]
+            matrix /= norms[:, None]
+            return cls(ids, np.ascontiguousarray(matrix), target_dim)
+
+        kept_ids: list[str] = []
+        rows: list[list[float]] = []
+        for row_id, vector in zip(ids, vectors):
+            unit = _unit_list(vector)
+            if unit is None:
+                continue
+            kept_ids.append(row_id)
+            rows.append(unit)
+        return cls(kept_ids, rows, target_dim)
+
+    @classmethod
+    def group_by_dimension(cls, items: Iterable[tuple[str, Any]]) -> dict[int, "EmbeddingMatrix"]:
+        """Build one matrix per embedding dimension (stores may mix models)."""
+        buckets: dict[int, list[tuple[str, list[float]]]] = {}
+        for row_id, raw in items:
+            vector = _coerce_vector(raw)
+            if vector is None:
+                continue
+            buckets.setdefault(len(vector), []).append((row_id, vector))
+        out: dict[int, EmbeddingMatrix] = {}
+        for dim, rows in buckets.items():
+            matrix = cls.from_items(rows, dim=dim)
+            if len(matrix):
+                out[dim] = matrix
+        return out
+
+    @classmethod
+    def from_unit_rows(cls, ids: list[str], rows: Any, dim: int) -> "EmbeddingMatrix":
+        """Wrap rows that are already L2-normalized (no copy, no re-normalization)."""
+        if not ids:
+            matrix = cls.empty()
+            matrix.dim = dim
+            return matrix
+        if np is not None:
+            return cls(list(ids), np.ascontiguousarray(np.asarray(rows, dtype=np.float32)), dim)
+        return cls(list(ids), [list(row) for row in rows], dim)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self._index
+
+    @property
+    def rows(self) -> Any:
+        """Normalized rows: a ``float32`` array with NumPy, else a list of lists."""
+        return self._rows
+
+    def position(self, record_id: str) -> int | None:
+        return self._index.get(record_id)
+
+    def vector_at(self, position: int) -> list[float]:
+        row = self._rows[position]
+        return row.tolist() if np is not None else list(row)
+
+    def with_changes(self, upserts: Mapping[str, Any], deletes: Iterable[str] = ()) -> "EmbeddingMatrix":
+        """Return a new matrix with ``deletes`` dropped and ``upserts`` added or replaced."""
+        dropped = set(deletes) | set(upserts)
+        keep = [pos for pos, row_id in enumerate(self.ids) if row_id not in dropped]
+        added = EmbeddingMatrix.from_mapping(upserts, dim=self.dim or None)
+        ids = [self.ids[pos] for pos in keep] + added.ids
+        dim = self.dim or added.dim
+        if np is not None:
+            parts = []
+            if keep and self.ids:
+                parts.append(self._rows[np.asarray(keep, dtype=np.intp)])
+            if added.ids:
+                parts.append(added.rows)
+            rows: Any = np.vstack(parts) if parts else np.zeros((0, dim), dtype=np.float32)
+        else:
+            rows = [self._rows[pos] for pos in keep] + list(added.rows)
+        return EmbeddingMatrix.from_unit_rows(ids, rows, dim)
+
+    def unit_query(self, query: Any) -> Any | None:
+        """Normalize ``query`` for this matrix, or ``None`` when it cannot be scored."""
+        return self._unit_query(query)
+
+    def _unit_query(self, query: Any) -> Any | None:
+        vector = _coerce_vector(query)
+        if vector is None or len(vector) != self.dim:
+            return None
+        if np is not None:
+            arr = np.asarray(vector, dtype=np.float32)
+            norm = float(np.linalg.norm(arr))
+            if norm <= 0.0 or not math.isfinite(norm):
+                return None
+            return arr / norm
+        return _unit_list(vector)
+
+    def _row_positions(self, record_ids: Iterable[str] | None) -> list[int] | None:
+        if record_ids is None:
+            return None
+        positions: list[int] = []
+        seen: set[int] = set()
+        for row_id in record_ids:
+            pos = self._index.get(str(row_id or "").strip())
+            if pos is None or pos in seen:
+                continue
+            seen.add(pos)
+            positions.append(pos)
+        return positions
+
+    def _score_rows(self, unit_query: Any, positions: list[int] | None) -> Any:
+        if np is not None:
+            if positions is None:
+                return self._rows @ unit_query
+            index = np.asarray(positions, dtype=np.intp)
+            if len(positions) * 4 < len(self.ids):
+                # Small candidate sets: gather rows first so the product only
+                # touches the probed slice of the matrix.
+                return self._rows[index] @ unit_query
+            return (self._rows @ unit_query)[index]
+        rows = self._rows if positions is None else [self._rows[pos] for pos in positions]
+        return [math.fsum(map(operator.mul, row, unit_query)) for row in rows]
+
+    def scores(self, query: Any, record_ids: Iterable[str] | None = None) -> dict[str, float]:
+        """Return cosine scores for ``record_ids`` (or every row) that have a vector."""
+        if not self.ids:
+            return {}
+        unit_query = self._unit_query(query)
+        if unit_query is None:
+            return {}
+        positions = self._row_positions(record_ids)
+        if positions is not None and not positions:
+            return {}
+        raw_scores = self._score_rows(unit_query, positions)
+        values = raw_scores.tolist() if np is not None else raw_scores
+        order = positions if positions is not None else range(len(self.ids))
+        return {self.ids[pos]: float(score) for pos, score in zip(order, values)}
+
+    def top_k(self, query: Any, k: int, *, record_ids: Iterable[str] | None = None) -> list[dict[str, Any]]:
+        """Return the ``k`` best ``{record_id, score}`` hits, best first.
+
+        Ties are broken by descending ``record_id`` so results match a full
+        ``(score, record_id)`` sort even though only the top slice is ordered.
+        """
+        if not self.ids:
+            return []
+        return self.top_k_positions(query, k, positions=self._row_positions(record_ids))
+
+    def top_k_positions(self, query: Any, k: int, *, positions: list[int] | None = None) -> list[dict[str, Any]]:
+        """Same as :meth:`top_k`, restricted to explicit row ``positions``."""
+        bounded = max(1, int(k or 1))
+        if not self.ids:
+            return []
+        if positions is not None and not positions:
+            return []
+        unit_query = self._unit_query(query)
+        if unit_query is None:
+            return []
+        raw_scores = self._score_rows(unit_query, positions)
+        order = positions if positions is not None else list(range(len(self.ids)))
+
+        if np is not None:
+            count = int(raw_scores.shape[0])
+            if bounded < count:
+                # Keep every row tied with the k-th score so the final
+                # (score, id) ordering is identical to a full sort.
+                kth = count - bounded
+                threshold = np.partition(raw_scores, kth)[kth]
+                picked = np.flatnonzero(raw_scores >= threshold)
+            else:
+                picked = np.arange(count)
+            candidates = [
+                (float(raw_scores[slot]), self.ids[order[slot]])
+                for slot in picked.tolist()
+            ]
+        else:
+            pairs = [(float(score), self.ids[pos]) for pos, score in zip(order, raw_scores)]
+            if bounded < len(pairs):
+                threshold = heapq.nlargest(bounded, pairs)[-1][0]
+                candidates = [pair for pair in pairs if pair[0] >= threshold]
+            else:
+                candidates = pairs
+
+        candidates.sort(reverse=True)
+        return [{"record_id": row_id, "score": score} for score, row_id in candidates[:bounded]]
+
+
+__all__ = [
+    "EmbeddingMatrix",
+    "numpy_available",
+]
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
 import gzip
+import hashlib
 import json
+import os
 import re
+import threading
 from dataclasses import asdict
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Callable
 
+from clawlite.core.memory_history import stored_history_payload
+
+VERSION_MANIFEST_SUFFIX = ".manifest.json"
+LEGACY_VERSION_SUFFIX = ".json.gz"
+VERSION_OBJECTS_DIRNAME = "objects"
+
 
 def export_memory_payload(
     *,
@@ -67,8 +76,7 @@ def import_memory_payload(
             parsed = record_from_payload(row)
             if parsed is None:
                 continue
-            stored = asdict(parsed)
-            stored["text"] = encrypt_text_for_category(str(parsed.text or ""), parsed.category)
+            stored = stored_history_payload(record=parsed, encrypt_text_for_category=encrypt_text_for_category)
             history_lines.append(json.dumps(stored, ensure_ascii=False))
     atomic_write_text_locked(history_path, ("\n".join(history_lines) + "\n") if history_lines else "")
 
@@ -90,9 +98,114 @@ def import_memory_payload(
         write_json_dict(privacy_path, merged_privacy)
 
 
-def write_snapshot_payload(
+def history_bucket(record_id: str) -> str:
+    """Chunk a history record belongs to: the first byte of ``sha256(id)``, as hex."""
+    return hashlib.sha256(str(record_id or "").encode("utf-8")).hexdigest()[:2]
+
+
+def _canonical_bytes(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _object_path(versions_path: Path, digest: str) -> Path:
+    return versions_path / VERSION_OBJECTS_DIRNAME / digest[:2] / f"{digest[2:]}.json.gz"
+
+
+def put_version_object(versions_path: Path, value: Any) -> str:
+    """Store ``value`` under the SHA-256 of its canonical JSON; existing objects are never rewritten."""
+    data = _canonical_bytes(value)
+    digest = hashlib.sha256(data).hexdigest()
+    path = _object_path(versions_path, digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(gzip.compress(data, mtime=0))
+        os.replace(tmp_path, path)
+    return digest
+
+
+def get_version_object(versions_path: Path, digest: str) -> Any:
+    with gzip.open(_object_path(versions_path, digest), "rb") as fh:
+        return json.loads(fh.read().decode("utf-8"))
+
+
+def build_snapshot_manifest(payload: dict[str, Any], *, put_object: Callable[[Any], str]) -> dict[str, Any]:
+    """Split an exported payload into content-addressed chunks and return its manifest.
+
+    History rows are grouped by :func:`history_bucket` into at most 256
+    chunks (rows sorted by id inside each), so a snapshot only adds the
+    chunks that hold a changed record; curated facts, checkpoints, profile
+    and privacy are one chunk each.
+    """
+    history_rows = payload.get("history", [])
+    buckets: dict[str, list[dict[str, Any]]] = {}
+    if isinstance(history_rows, list):
+        for row in history_rows:
+            if isinstance(row, dict):
+                buckets.setdefault(history_bucket(str(row.get("id", "") or "")), []).append(row)
+    curated_rows = payload.get("curated", [])
+    return {
+        "version": 2,
+        "exported_at": str(payload.get("exported_at", "") or ""),
+        "history": {
+            bucket: put_object(sorted(rows, key=lambda item: str(item.get("id", "") or "")))
+            for bucket, rows in sorted(buckets.items())
+        },
+        "curated": put_object(curated_rows if isinstance(curated_rows, list) else []),
+        "checkpoints": put_object(payload.get("checkpoints", {})),
+        "profile": put_object(payload.get("profile", {})),
+        "privacy": put_object(payload.get("privacy", {})),
+    }
+
+
+def _record_order(item: dict[str, Any]) -> tuple[str, str]:
+    return (str(item.get("created_at", "")), str(item.get("id", "")))
+
+
+def materialize_snapshot_manifest(manifest: dict[str, Any], *, get_object: Callable[[str], Any]) -> dict[str, Any]:
+    """Inflate a manifest back into the ``export_payload()`` shape (history ordered by creation time)."""
+    history: list[dict[str, Any]] = []
+    buckets = manifest.get("history", {})
+    if isinstance(buckets, dict):
+        for digest in buckets.values():
+            rows = get_object(str(digest))
+            if isinstance(rows, list):
+                history.extend(row for row in rows if isinstance(row, dict))
+    history.sort(key=_record_order)
+    return {
+        "version": 1,
+        "exported_at": str(manifest.get("exported_at", "") or ""),
+        "history": history,
+        "curated": get_object(str(manifest.get("curated", ""))),
+        "checkpoints": get_object(str(manifest.get("checkpoints", ""))),
+        "profile": get_object(str(manifest.get("profile", ""))),
+        "privacy": get_object(str(manifest.get("privacy", ""))),
+    }
+
+
+def version_path_for(versions_path: Path, version_id: str) -> Path:
+    """The file holding ``version_id``: its manifest, or a legacy full ``.json.gz`` copy."""
+    clean_version_id = str(version_id or "").strip()
+    manifest_path = versions_path / f"{clean_version_id}{VERSION_MANIFEST_SUFFIX}"
+    legacy_path = versions_path / f"{clean_version_id}{LEGACY_VERSION_SUFFIX}"
+    if not manifest_path.exists() and legacy_path.exists():
+        return legacy_path
+    return manifest_path
+
+
+def list_memory_versions(versions_path: Path) -> list[str]:
+    """Every snapshot id in ``versions_path``, newest first."""
+    version_ids: set[str] = set()
+    for suffix in (VERSION_MANIFEST_SUFFIX, LEGACY_VERSION_SUFFIX):
+        for path in versions_path.glob(f"*{suffix}"):
+            if path.is_file():
+                version_ids.add(path.name[: -len(suffix)])
+    return sorted(version_ids, reverse=True)
+
+
+def write_snapshot_manifest(
     *,
-    payload: dict[str, Any],
+    manifest: dict[str, Any],
     versions_path: Path,
     tag: str = "",
     advance_branch: bool = True,
@@ -103,15 +216,38 @@ def write_snapshot_payload(
     stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
     safe_tag = re.sub(r"[^a-zA-Z0-9_-]+", "-", str(tag or "").strip()).strip("-")
     version_id = f"{stamp}-{safe_tag}" if safe_tag else stamp
-    version_path = versions_path / f"{version_id}.json.gz"
-    with gzip.open(version_path, "wt", encoding="utf-8") as fh:
-        json.dump(payload, fh, ensure_ascii=False)
+    manifest_path = versions_path / f"{version_id}{VERSION_MANIFEST_SUFFIX}"
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
     if advance_branch:
         current_branch = branch_name or current_branch_name()
         advance_branch_head(current_branch, version_id)
     return version_id
 
 
+def write_snapshot_payload(
+    *,
+    payload: dict[str, Any],
+    versions_path: Path,
+    tag: str = "",
+    advance_branch: bool = True,
+    branch_name: str = "",
+    current_branch_name: Callable[[], str],
+    advance_branch_head: Callable[[str, str], None],
+) -> str:
+    manifest = build_snapshot_manifest(payload, put_object=lambda value: put_version_object(versions_path, value))
+    return write_snapshot_manifest(
+        manifest=manifest,
+        versions_path=versions_path,
+        tag=tag,
+        advance_branch=advance_branch,
+        branch_name=branch_name,
+        current_branch_name=current_branch_name,
+        advance_branch_head=advance_branch_head,
+    )
+
+
 def create_memory_branch(
     *,
     name: str,
@@ -174,16 +310,60 @@ def checkout_memory_branch(
     return {"current": clean_name, "head": current_branch_head()}
 
 
+def _load_legacy_payload(versions_path: Path, version_id: str) -> dict[str, Any] | None:
+    version_path = versions_path / f"{version_id}{LEGACY_VERSION_SUFFIX}"
+    if not version_path.exists():
+        return None
+    with gzip.open(version_path, "rt", encoding="utf-8") as fh:
+        payload = json.load(fh)
+    return payload if isinstance(payload, dict) else {}
+
+
+def open_version_manifest(
+    *,
+    versions_path: Path,
+    version_id: str,
+    persist_legacy: bool = False,
+) -> tuple[dict[str, Any], Callable[[str], Any]] | None:
+    """Manifest of ``version_id`` plus a reader for the chunks it references.
+
+    Legacy full-copy snapshots are chunked on the fly; their chunks stay in
+    memory unless ``persist_legacy`` stores them so a new manifest can point
+    at them. Returns ``None`` when the version does not exist.
+    """
+    clean_version_id = str(version_id or "").strip()
+    if not clean_version_id:
+        return None
+    manifest_path = versions_path / f"{clean_version_id}{VERSION_MANIFEST_SUFFIX}"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if not isinstance(manifest, dict):
+            return None
+        return manifest, lambda digest: get_version_object(versions_path, digest)
+    payload = _load_legacy_payload(versions_path, clean_version_id)
+    if payload is None:
+        return None
+    inline: dict[str, Any] = {}
+
+    def _put(value: Any) -> str:
+        digest = put_version_object(versions_path, value) if persist_legacy else hashlib.sha256(_canonical_bytes(value)).hexdigest()
+        inline[digest] = value
+        return digest
+
+    return build_snapshot_manifest(payload, put_object=_put), inline.__getitem__
+
+
 def load_version_payload(*, versions_path: Path, version_id: str) -> dict[str, Any]:
     clean_version_id = str(version_id or "").strip()
     if not clean_version_id:
         return {}
-    version_path = versions_path / f"{clean_version_id}.json.gz"
-    if not version_path.exists():
+    if not (versions_path / f"{clean_version_id}{VERSION_MANIFEST_SUFFIX}").exists():
+        return _load_legacy_payload(versions_path, clean_version_id) or {}
+    opened = open_version_manifest(versions_path=versions_path, version_id=clean_version_id)
+    if opened is None:
         return {}
-    with gzip.open(version_path, "rt", encoding="utf-8") as fh:
-        payload = json.load(fh)
-    return payload if isinstance(payload, dict) else {}
+    manifest, get_object = opened
+    return materialize_snapshot_manifest(manifest, get_object=get_object)
 
 
 def merge_record_lists(preferred: list[dict[str, Any]], fallback: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -240,6 +420,72 @@ def merge_privacy_conservative(source: dict[str, Any], target: dict[str, Any]) -
     return merged
 
 
+def _sorted_by_id(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return sorted(rows, key=lambda item: str(item.get("id", "") or ""))
+
+
+def _object_list(get_object: Callable[[str], Any], digest: Any) -> list[dict[str, Any]]:
+    value = get_object(str(digest)) if digest else []
+    return [row for row in value if isinstance(row, dict)] if isinstance(value, list) else []
+
+
+def _object_dict(get_object: Callable[[str], Any], digest: Any) -> dict[str, Any]:
+    value = get_object(str(digest)) if digest else {}
+    return dict(value) if isinstance(value, dict) else {}
+
+
+def merge_version_manifests(
+    source: dict[str, Any],
+    target: dict[str, Any],
+    *,
+    read_source: Callable[[str], Any],
+    read_target: Callable[[str], Any],
+    put_object: Callable[[Any], str],
+    exported_at: str,
+) -> dict[str, Any]:
+    """Merge two manifests chunk by chunk; only chunks that differ on both sides are read."""
+    source_buckets = source.get("history", {}) if isinstance(source.get("history", {}), dict) else {}
+    target_buckets = target.get("history", {}) if isinstance(target.get("history", {}), dict) else {}
+    history: dict[str, str] = {}
+    for bucket in sorted(set(source_buckets) | set(target_buckets)):
+        source_digest = source_buckets.get(bucket)
+        target_digest = target_buckets.get(bucket)
+        if source_digest is None or source_digest == target_digest:
+            history[bucket] = str(target_digest if source_digest is None else source_digest)
+        elif target_digest is None:
+            history[bucket] = str(source_digest)
+        else:
+            merged_rows = merge_record_lists(
+                _object_list(read_source, source_digest),
+                _object_list(read_target, target_digest),
+            )
+            history[bucket] = put_object(_sorted_by_id(merged_rows))
+    return {
+        "version": 2,
+        "exported_at": exported_at,
+        "history": history,
+        "curated": put_object(
+            merge_record_lists(
+                _object_list(read_source, source.get("curated")),
+                _object_list(read_target, target.get("curated")),
+            )
+        ),
+        "checkpoints": str(target.get("checkpoints", "") or "") or put_object({}),
+        "profile": put_object(
+            merge_profile_conservative(
+                _object_dict(read_source, source.get("profile")),
+                _object_dict(read_target, target.get("profile")),
+            )
+        ),
+        "privacy": put_object(
+            merge_privacy_conservative(
+                _object_dict(read_source, source.get("privacy")),
+                _object_dict(read_target, target.get("privacy")),
+            )
+        ),
+    }
+
+
 def merge_memory_branches(
     *,
     source_branch: str,
@@ -250,7 +496,7 @@ def merge_memory_branches(
     sync_branch_head_file: Callable[[], None],
     versions_path: Path,
     utcnow_iso: Callable[[], str],
-    write_snapshot_payload: Callable[..., str],
+    write_snapshot_manifest: Callable[..., str],
     import_payload: Callable[[dict[str, Any]], None],
 ) -> dict[str, Any]:
     meta = load_branches_metadata()
@@ -267,32 +513,24 @@ def merge_memory_branches(
     if not source_head or not target_head:
         raise ValueError("source and target branches must have head versions")
 
-    source_payload = load_version_payload(versions_path=versions_path, version_id=source_head)
-    target_payload = load_version_payload(versions_path=versions_path, version_id=target_head)
-    merged_payload = {
-        "version": 1,
-        "exported_at": utcnow_iso(),
-        "history": merge_record_lists(
-            list(source_payload.get("history", [])) if isinstance(source_payload.get("history", []), list) else [],
-            list(target_payload.get("history", [])) if isinstance(target_payload.get("history", []), list) else [],
-        ),
-        "curated": merge_record_lists(
-            list(source_payload.get("curated", [])) if isinstance(source_payload.get("curated", []), list) else [],
-            list(target_payload.get("curated", [])) if isinstance(target_payload.get("curated", []), list) else [],
-        ),
-        "checkpoints": target_payload.get("checkpoints", {}),
-        "profile": merge_profile_conservative(
-            dict(source_payload.get("profile", {})) if isinstance(source_payload.get("profile", {}), dict) else {},
-            dict(target_payload.get("profile", {})) if isinstance(target_payload.get("profile", {}), dict) else {},
-        ),
-        "privacy": merge_privacy_conservative(
-            dict(source_payload.get("privacy", {})) if isinstance(source_payload.get("privacy", {}), dict) else {},
-            dict(target_payload.get("privacy", {})) if isinstance(target_payload.get("privacy", {}), dict) else {},
-        ),
-    }
+    empty: tuple[dict[str, Any], Callable[[str], Any]] = ({}, lambda digest: get_version_object(versions_path, digest))
+    source_manifest, read_source = (
+        open_version_manifest(versions_path=versions_path, version_id=source_head, persist_legacy=True) or empty
+    )
+    target_manifest, read_target = (
+        open_version_manifest(versions_path=versions_path, version_id=target_head, persist_legacy=True) or empty
+    )
+    merged_manifest = merge_version_manifests(
+        source_manifest,
+        target_manifest,
+        read_source=read_source,
+        read_target=read_target,
+        put_object=lambda value: put_version_object(versions_path, value),
+        exported_at=utcnow_iso(),
+    )
 
-    version_id = write_snapshot_payload(
-        merged_payload,
+    version_id = write_snapshot_manifest(
+        merged_manifest,
         tag=f"{tag}-{source_branch}-into-{target_branch}",
         advance_branch=False,
     )
@@ -315,7 +553,12 @@ def merge_memory_branches(
     current_branch = str(meta.get("current", "main") or "main")
     imported = False
     if current_branch == target_branch:
-        import_payload(merged_payload)
+        import_payload(
+            materialize_snapshot_manifest(
+                merged_manifest,
+                get_object=lambda digest: get_version_object(versions_path, digest),
+            )
+        )
         imported = True
     return {
         "source": source_branch,
@@ -337,27 +580,38 @@ def rollback_memory_version(
     clean_version_id = str(version_id or "").strip()
     if not clean_version_id:
         return
-    version_path = versions_path / f"{clean_version_id}.json.gz"
+    version_path = version_path_for(versions_path, clean_version_id)
     if not version_path.exists():
         raise FileNotFoundError(str(version_path))
     payload = load_version_payload(versions_path=versions_path, version_id=clean_version_id)
     import_payload(payload)
 
 
-def diff_memory_versions(*, versions_path: Path, version_a: str, version_b: str) -> dict[str, Any]:
-    left = load_version_payload(versions_path=versions_path, version_id=version_a)
-    right = load_version_payload(versions_path=versions_path, version_id=version_b)
-
-    left_history = {
-        str(item.get("id", "")): str(item.get("text", ""))
-        for item in left.get("history", [])
-        if isinstance(item, dict) and str(item.get("id", "")).strip()
-    }
-    right_history = {
+def _history_texts(rows: list[dict[str, Any]]) -> dict[str, str]:
+    return {
         str(item.get("id", "")): str(item.get("text", ""))
-        for item in right.get("history", [])
-        if isinstance(item, dict) and str(item.get("id", "")).strip()
+        for item in rows
+        if str(item.get("id", "")).strip()
     }
+
+
+def diff_memory_versions(*, versions_path: Path, version_a: str, version_b: str) -> dict[str, Any]:
+    """Compare two snapshots' history texts, reading only the chunks whose digests differ."""
+    missing: tuple[dict[str, Any], Callable[[str], Any]] = ({}, lambda digest: [])
+    left, read_left = open_version_manifest(versions_path=versions_path, version_id=version_a) or missing
+    right, read_right = open_version_manifest(versions_path=versions_path, version_id=version_b) or missing
+    left_buckets = left.get("history", {}) if isinstance(left.get("history", {}), dict) else {}
+    right_buckets = right.get("history", {}) if isinstance(right.get("history", {}), dict) else {}
+
+    left_history: dict[str, str] = {}
+    right_history: dict[str, str] = {}
+    for bucket in set(left_buckets) | set(right_buckets):
+        if left_buckets.get(bucket) == right_buckets.get(bucket):
+            continue
+        if bucket in left_buckets:
+            left_history.update(_history_texts(_object_list(read_left, left_buckets[bucket])))
+        if bucket in right_buckets:
+            right_history.update(_history_texts(_object_list(read_right, right_buckets[bucket])))
     left_ids = set(left_history.keys())
     right_ids = set(right_history.keys())
     added_ids = sorted(right_ids - left_ids)
@@ -11,15 +11,22 @@ def dashboard_preview(value: Any, *, max_chars: int = 140) -> str:
     return f"{text[: max(1, max_chars - 3)]}..."
 
 
-def recent_dashboard_sessions(*, sessions: Any, subagents: Any, limit: int = 8) -> dict[str, Any]:
+def _recent_session_activity(sessions: Any, limit: int) -> tuple[int, list[tuple[str, float]]]:
+    session_activity = getattr(sessions, "session_activity", None)
+    if callable(session_activity):
+        return session_activity(limit)
     paths = sorted(
         sessions.root.glob("*.jsonl"),
         key=lambda path: path.stat().st_mtime,
         reverse=True,
     )
+    return len(paths), [(sessions._restore_session_id(path.stem), path.stat().st_mtime) for path in paths[:limit]]
+
+
+def recent_dashboard_sessions(*, sessions: Any, subagents: Any, limit: int = 8) -> dict[str, Any]:
+    total, recent = _recent_session_activity(sessions, max(1, int(limit or 1)))
     rows: list[dict[str, Any]] = []
-    for path in paths[: max(1, int(limit or 1))]:
-        session_id = sessions._restore_session_id(path.stem)
+    for session_id, updated_at in recent:
         history = sessions.read(session_id, limit=1)
         last_message = history[-1] if history else {}
         session_runs = subagents.list_runs(session_id=session_id)
@@ -34,11 +41,11 @@ def recent_dashboard_sessions(*, sessions: Any, subagents: Any, limit: int = 8)
                 "last_preview": dashboard_preview(last_message.get("content", "")),
                 "active_subagents": len(active_runs),
                 "subagent_statuses": dict(sorted(subagent_statuses.items())),
-                "updated_at": dt.datetime.fromtimestamp(path.stat().st_mtime, tz=dt.timezone.utc).isoformat(),
+                "updated_at": dt.datetime.fromtimestamp(updated_at, tz=dt.timezone.utc).isoformat(),
             }
         )
     return {
-        "count": len(paths),
+        "count": total,
         "items": rows,
     }
 
@@ -34,6 +34,7 @@ from clawlite.gateway.self_evolution_approval import handle_self_evolution_inbou
 from clawlite.gateway.tool_approval import handle_tool_approval_inbound_action
 from clawlite.scheduler.cron import CronService
 from clawlite.scheduler.heartbeat import HeartbeatService
+from clawlite.session.sqlite_store import SQLiteSessionStore
 from clawlite.session.store import SessionStore
 from clawlite.tools.agents import AgentsListTool
 from clawlite.tools.apply_patch import ApplyPatchTool
@@ -384,11 +385,22 @@ def build_runtime(
         config_profile=config_profile,
     )
 
-    sessions = SessionStore(
-        root=Path(config.state_path) / "sessions",
-        max_messages_per_session=config.agents.defaults.session_retention_messages,
-        session_retention_ttl_s=config.agents.defaults.session_retention_ttl_s,
-    )
+    sessions: SessionStore | SQLiteSessionStore
+    if config.agents.defaults.session_backend == "sqlite":
+        sessions = SQLiteSessionStore(
+            root=Path(config.state_path) / "sessions",
+            max_messages_per_session=config.agents.defaults.session_retention_messages,
+            session_retention_ttl_s=config.agents.defaults.session_retention_ttl_s,
+            durability=config.agents.defaults.session_durability,
+        )
+    else:
+        sessions = SessionStore(
+            root=Path(config.state_path) / "sessions",
+            max_messages_per_session=config.agents.defaults.session_retention_messages,
+            session_retention_ttl_s=config.agents.defaults.session_retention_ttl_s,
+            durability=config.agents.defaults.session_durability,
+            group_commit_window_s=config.agents.defaults.session_commit_window_s,
+        )
     memory_backend = resolve_memory_backend(
         backend_name=str(config.agents.defaults.memory.backend or "sqlite"),
         pgvector_url=str(config.agents.defaults.memory.pgvector_url or ""),
@@ -417,6 +429,12 @@ def build_runtime(
         ),
         memory_backend_name=str(config.agents.defaults.memory.backend or "sqlite"),
         memory_backend_url=str(config.agents.defaults.memory.pgvector_url or ""),
+        memory_ann_probes=int(config.agents.defaults.memory.ann_probes),
+        memory_embedding_format=str(config.agents.defaults.memory.embedding_format or "float32"),
+        memory_embedding_batch_size=int(config.agents.defaults.memory.embedding_batch_size),
+        memory_embedding_concurrency=int(config.agents.defaults.memory.embedding_concurrency),
+        memory_search_candidates=int(config.agents.defaults.memory.search_candidates),
+        memory_search_cache_size=int(config.agents.defaults.memory.search_cache_size),
     )
     memory.supports_deferred_turn_persistence = True
     tools.register(SkillTool(loader=skills, registry=tools, memory=memory, provider=provider))
@@ -466,6 +484,8 @@ def build_runtime(
             repeat_threshold=config.tools.loop_detection.repeat_threshold,
             critical_threshold=config.tools.loop_detection.critical_threshold,
         ),
+        consolidation_workers=int(config.agents.defaults.memory.consolidation_workers),
+        consolidation_max_pending=int(config.agents.defaults.memory.consolidation_max_pending),
     )
 
     async def _subagent_runner(session_id: str, task: str) -> str:
@@ -3237,6 +3237,12 @@ def create_app(
             bus_close = getattr(runtime.bus, "close", None)
             if callable(bus_close):
                 await bus_close()
+            sessions_close = getattr(getattr(runtime.engine, "sessions", None), "close", None)
+            if callable(sessions_close):
+                await asyncio.to_thread(sessions_close)
+            memory_close = getattr(getattr(runtime.engine, "memory", None), "close", None)
+            if callable(memory_close):
+                await asyncio.to_thread(memory_close)
             lifecycle.phase = "stopped"
             bind_event("gateway.lifecycle").info("gateway shutdown complete")
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from .sqlite_store import SQLiteSessionStore, migrate_jsonl_sessions
 from .store import SessionStore
 
-__all__ = ["SessionStore"]
+__all__ = ["SQLiteSessionStore", "SessionStore", "migrate_jsonl_sessions"]
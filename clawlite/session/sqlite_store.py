@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+from clawlite.session.store import TAIL_READ_SLACK, SessionStore
+from clawlite.session.wal import normalize_durability
+from clawlite.utils.sqlite_pool import SQLiteConnectionPool
+
+SESSION_DB_NAME = "sessions.sqlite3"
+SESSION_IMPORT_BATCH = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions(updated_at);
+CREATE TABLE IF NOT EXISTS session_messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_session_messages_session_seq ON session_messages(session_id, seq);
+CREATE INDEX IF NOT EXISTS idx_session_messages_session_role ON session_messages(session_id, role, seq);
+"""
+
+# ``group`` maps to WAL with synchronous=NORMAL: commits are batched into the
+# log and synced at checkpoints, SQLite's own form of group commit.
+_SYNCHRONOUS = {"fsync": "FULL", "group": "NORMAL", "buffered": "OFF"}
+
+_Row = tuple[str, str, str, str, str]
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SQLiteSessionStore:
+    """Session storage in one SQLite database (``<root>/sessions.sqlite3``).
+
+    A drop-in alternative to :class:`~clawlite.session.store.SessionStore`
+    with the same public API. Messages are rows keyed by a global sequence
+    and indexed on ``(session_id, seq)`` and ``(session_id, role, seq)``;
+    a ``sessions`` table keeps each session's last write time (indexed) and
+    message count. Listing, counting, TTL pruning, retention trimming and
+    history reads are index lookups, so none of them grow with the number
+    or length of the sessions they do not touch.
+
+    Existing JSONL logs are imported with :func:`migrate_jsonl_sessions`.
+    """
+
+    supports_async_offload = True
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        max_messages_per_session: int | None = 2000,
+        session_retention_ttl_s: float | int | None = None,
+        *,
+        durability: str = "fsync",
+        db_path: str | Path | None = None,
+    ) -> None:
+        base = Path(root) if root else (Path.home() / ".clawlite" / "state" / "sessions")
+        self.root = base
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.db_path = Path(db_path) if db_path else self.root / SESSION_DB_NAME
+        configured_limit = None if max_messages_per_session is None else int(max_messages_per_session)
+        self.max_messages_per_session = configured_limit if configured_limit and configured_limit > 0 else None
+        configured_ttl = None if session_retention_ttl_s is None else float(session_retention_ttl_s)
+        self.session_retention_ttl_s = configured_ttl if configured_ttl and configured_ttl > 0 else None
+        self.durability = normalize_durability(durability)
+        synchronous = _SYNCHRONOUS[self.durability]
+        self._pool = SQLiteConnectionPool(
+            self.db_path,
+            on_connect=lambda conn: conn.execute(f"PRAGMA synchronous={synchronous}"),
+        )
+        with self._pool.writer() as conn:
+            conn.executescript(_SCHEMA)
+            conn.commit()
+        self._diagnostics: dict[str, int | str] = {
+            "append_attempts": 0,
+            "append_failures": 0,
+            "append_success": 0,
+            "compaction_runs": 0,
+            "compaction_trimmed_lines": 0,
+            "read_tail": 0,
+            "ttl_prune_runs": 0,
+            "ttl_prune_deleted_sessions": 0,
+            "ttl_prune_failures": 0,
+            "ttl_last_prune_iso": "",
+            "last_error": "",
+        }
+
+    @staticmethod
+    def _clean_session_id(session_id: str) -> str:
+        clean = str(session_id or "").strip()
+        if not clean:
+            raise ValueError("session_id is required")
+        return clean
+
+    @staticmethod
+    def _message_row(session_id: str, role: Any, content: Any, metadata: Any, ts: str = "") -> _Row | None:
+        clean_role = str(role or "").strip().lower()
+        clean_content = str(content or "").strip()
+        metadata_payload = dict(metadata or {})
+        if clean_role not in {"system", "user", "assistant", "tool"}:
+            raise ValueError("invalid role")
+        if not clean_content and not SessionStore._metadata_allows_empty_content(metadata_payload):
+            return None
+        return (
+            session_id,
+            clean_role,
+            clean_content,
+            ts or _utc_now(),
+            json.dumps(metadata_payload, ensure_ascii=False),
+        )
+
+    def append(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        *,
+        metadata: dict[str, Any] | None = None,
+        durable: bool = True,
+    ) -> None:
+        del durable
+        row = self._message_row(self._clean_session_id(session_id), role, content, metadata)
+        if row is not None:
+            self._insert(row[0], [row])
+
+    def append_many(
+        self,
+        session_id: str,
+        rows: list[dict[str, Any]],
+        *,
+        durable: bool = True,
+    ) -> None:
+        del durable
+        clean_session_id = self._clean_session_id(session_id)
+        messages: list[_Row] = []
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            message = self._message_row(clean_session_id, row.get("role"), row.get("content"), row.get("metadata"))
+            if message is not None:
+                messages.append(message)
+        if messages:
+            self._insert(clean_session_id, messages)
+
+    def _insert(self, session_id: str, rows: list[_Row], *, updated_at: float | None = None) -> None:
+        self._diagnostics["append_attempts"] = int(self._diagnostics["append_attempts"]) + 1
+        try:
+            with self._pool.writer() as conn:
+                self._insert_rows(conn, session_id, rows, updated_at=updated_at)
+                conn.commit()
+        except sqlite3.Error as exc:
+            self._diagnostics["append_failures"] = int(self._diagnostics["append_failures"]) + 1
+            self._diagnostics["last_error"] = str(exc)
+            raise
+        self._diagnostics["append_success"] = int(self._diagnostics["append_success"]) + len(rows)
+        self._diagnostics["last_error"] = ""
+
+    def _insert_rows(
+        self, conn: sqlite3.Connection, session_id: str, rows: list[_Row], *, updated_at: float | None = None
+    ) -> None:
+        conn.executemany(
+            "INSERT INTO session_messages (session_id, role, content, ts, metadata) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute(
+            """INSERT INTO sessions (session_id, created_at, updated_at, message_count)
+               VALUES (?, ?, ?, ?)
+               ON CONFLICT(session_id) DO UPDATE SET
+               updated_at = MAX(sessions.updated_at, excluded.updated_at),
+               message_count = sessions.message_count + excluded.message_count""",
+            (session_id, rows[0][3], time.time() if updated_at is None else float(updated_at), len(rows)),
+        )
+        self._trim(conn, session_id)
+
+    def _trim(self, conn: sqlite3.Connection, session_id: str) -> None:
+        limit = self.max_messages_per_session
+        if limit is None:
+            return
+        row = conn.execute("SELECT message_count FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None or int(row[0]) <= limit:
+            return
+        self._diagnostics["compaction_runs"] = int(self._diagnostics["compaction_runs"]) + 1
+        cursor = conn.execute(
+            """DELETE FROM session_messages WHERE session_id = ? AND seq <= (
+                   SELECT seq FROM session_messages WHERE session_id = ? ORDER BY seq DESC LIMIT 1 OFFSET ?
+               )""",
+            (session_id, session_id, limit),
+        )
+        conn.execute("UPDATE sessions SET message_count = ? WHERE session_id = ?", (limit, session_id))
+        self._diagnostics["compaction_trimmed_lines"] = int(self._diagnostics["compaction_trimmed_lines"]) + max(
+            0, int(cursor.rowcount or 0)
+        )
+
+    def _newest(self, session_id: str, count: int) -> list[tuple[str, str, str]]:
+        with self._pool.reader() as conn:
+            rows = conn.execute(
+                "SELECT role, content, metadata FROM session_messages WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+                (session_id, max(1, int(count))),
+            ).fetchall()
+        rows.reverse()
+        return rows
+
+    @staticmethod
+    def _decode_metadata(raw: str) -> dict[str, Any]:
+        try:
+            metadata = json.loads(raw or "{}")
+        except json.JSONDecodeError:
+            return {}
+        return metadata if isinstance(metadata, dict) else {}
+
+    def read(self, session_id: str, limit: int = 20) -> list[dict[str, str]]:
+        simplified: list[dict[str, str]] = []
+        for row in self.read_messages(session_id, limit=limit):
+            role = str(row.get("role", "")).strip()
+            content = str(row.get("content", "")).strip()
+            if role and content:
+                simplified.append({"role": role, "content": content})
+        return simplified
+
+    def read_messages(self, session_id: str, limit: int = 20) -> list[dict[str, Any]]:
+        clean_session_id = str(session_id or "").strip()
+        if not clean_session_id:
+            raise ValueError("session_id is required")
+        bounded = max(1, int(limit or 1))
+        window = bounded + TAIL_READ_SLACK
+        while True:
+            newest = self._newest(clean_session_id, window)
+            complete = len(newest) < window
+            rows: list[dict[str, Any]] = []
+            for role, content, raw_metadata in newest:
+                payload = {"role": role, "content": content, "metadata": self._decode_metadata(raw_metadata)}
+                row = SessionStore._payload_to_message_row(payload)
+                if row is not None:
+                    rows.append(row)
+            legalized = SessionStore._legalize_window(rows, complete=complete)
+            if complete or len(legalized) >= bounded:
+                self._diagnostics["read_tail"] = int(self._diagnostics["read_tail"]) + 1
+                return legalized[-bounded:]
+            window *= 2
+
+    def history_messages(self, session_id: str, *, limit: int, include_tools: bool = True) -> list[dict[str, Any]]:
+        """The newest ``limit`` messages with content, with ``ts`` and ``metadata``, oldest first."""
+        rows: list[dict[str, Any]] = []
+        sql = "SELECT role, content, ts, metadata FROM session_messages WHERE session_id = ? AND content != ''"
+        if not include_tools:
+            sql += " AND role != 'tool'"
+        with self._pool.reader() as conn:
+            found = conn.execute(
+                f"{sql} ORDER BY seq DESC LIMIT ?", (str(session_id or "").strip(), max(1, int(limit or 1)))
+            ).fetchall()
+        for role, content, ts, raw_metadata in reversed(found):
+            row: dict[str, Any] = {"role": role, "content": content}
+            if ts:
+                row["ts"] = ts
+            metadata = self._decode_metadata(raw_metadata)
+            if metadata:
+                row["metadata"] = metadata
+            rows.append(row)
+        return rows
+
+    def count_messages(self, session_id: str) -> int:
+        """Messages of ``session_id`` that have content."""
+        with self._pool.reader() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM session_messages WHERE session_id = ? AND content != ''",
+                (str(session_id or "").strip(),),
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    def has_session(self, session_id: str) -> bool:
+        with self._pool.reader() as conn:
+            row = conn.execute("SELECT 1 FROM sessions WHERE session_id = ?", (str(session_id or "").strip(),)).fetchone()
+        return row is not None
+
+    def session_activity(self, limit: int) -> tuple[int, list[tuple[str, float]]]:
+        """Session count and the ``limit`` most recently written sessions with their write time (epoch)."""
+        with self._pool.reader() as conn:
+            total = int(conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0])
+            rows = conn.execute(
+                "SELECT session_id, updated_at FROM sessions ORDER BY updated_at DESC, session_id LIMIT ?",
+                (max(1, int(limit or 1)),),
+            ).fetchall()
+        return total, [(str(session_id), float(updated_at)) for session_id, updated_at in rows]
+
+    def list_sessions(self) -> list[str]:
+        with self._pool.reader() as conn:
+            rows = conn.execute("SELECT session_id FROM sessions ORDER BY updated_at DESC, session_id").fetchall()
+        return [str(row[0]) for row in rows]
+
+    def delete(self, session_id: str) -> bool:
+        clean_session_id = str(session_id or "").strip()
+        with self._pool.writer() as conn:
+            conn.execute("DELETE FROM session_messages WHERE session_id = ?", (clean_session_id,))
+            deleted = conn.execute("DELETE FROM sessions WHERE session_id = ?", (clean_session_id,)).rowcount
+            conn.commit()
+        return bool(deleted)
+
+    def prune_expired(self, *, now: float | None = None, max_age_seconds: float | None = None) -> int:
+        ttl_s = self.session_retention_ttl_s if max_age_seconds is None else float(max_age_seconds)
+        if ttl_s is None or ttl_s <= 0:
+            return 0
+        current_time = time.time() if now is None else float(now)
+        self._diagnostics["ttl_prune_runs"] = int(self._diagnostics["ttl_prune_runs"]) + 1
+        self._diagnostics["ttl_last_prune_iso"] = _utc_now()
+        try:
+            with self._pool.writer() as conn:
+                expired = [
+                    row[0]
+                    for row in conn.execute("SELECT session_id FROM sessions WHERE updated_at < ?", (current_time - ttl_s,))
+                ]
+                conn.executemany("DELETE FROM session_messages WHERE session_id = ?", [(sid,) for sid in expired])
+                conn.executemany("DELETE FROM sessions WHERE session_id = ?", [(sid,) for sid in expired])
+                conn.commit()
+        except sqlite3.Error as exc:
+            self._diagnostics["ttl_prune_failures"] = int(self._diagnostics["ttl_prune_failures"]) + 1
+            self._diagnostics["last_error"] = str(exc)
+            return 0
+        if expired:
+            self._diagnostics["ttl_prune_deleted_sessions"] = int(self._diagnostics["ttl_prune_deleted_sessions"]) + len(
+                expired
+            )
+        self._diagnostics["last_error"] = ""
+        return len(expired)
+
+    def import_session(self, session_id: str, rows: Iterable[dict[str, Any]], *, updated_at: float | None = None) -> int:
+        """Add stored messages (``role``/``content``/``ts``/``metadata`` dicts) keeping their timestamps.
+
+        The whole session is written in one transaction, so an interrupted
+        import leaves either all of its messages or none.
+        """
+        clean_session_id = self._clean_session_id(session_id)
+        imported = 0
+        self._diagnostics["append_attempts"] = int(self._diagnostics["append_attempts"]) + 1
+        try:
+            # The pool rolls back whatever is left uncommitted when the writer is released.
+            with self._pool.writer() as conn:
+                batch: list[_Row] = []
+                for row in rows:
+                    try:
+                        message = self._message_row(
+                            clean_session_id, row.get("role"), row.get("content"), row.get("metadata"), str(row.get("ts", "") or "")
+                        )
+                    except ValueError:
+                        continue
+                    if message is None:
+                        continue
+                    batch.append(message)
+                    if len(batch) >= SESSION_IMPORT_BATCH:
+                        self._insert_rows(conn, clean_session_id, batch, updated_at=updated_at)
+                        imported += len(batch)
+                        batch = []
+                if batch:
+                    self._insert_rows(conn, clean_session_id, batch, updated_at=updated_at)
+                    imported += len(batch)
+                conn.commit()
+        except sqlite3.Error as exc:
+            self._diagnostics["append_failures"] = int(self._diagnostics["append_failures"]) + 1
+            self._diagnostics["last_error"] = str(exc)
+            raise
+        self._diagnostics["append_success"] = int(self._diagnostics["append_success"]) + imported
+        self._diagnostics["last_error"] = ""
+        return imported
+
+    def flush(self) -> None:
+        """Checkpoint the database's write-ahead log into the main file."""
+        with self._pool.writer() as conn:
+            conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def diagnostics(self) -> dict[str, int | str]:
+        return {
+            "backend": "sqlite",
+            "durability": self.durability,
+            "append_attempts": int(self._diagnostics["append_attempts"]),
+            "append_retries": 0,
+            "append_failures": int(self._diagnostics["append_failures"]),
+            "append_success": int(self._diagnostics["append_success"]),
+            "compaction_runs": int(self._diagnostics["compaction_runs"]),
+            "compaction_trimmed_lines": int(self._diagnostics["compaction_trimmed_lines"]),
+            "compaction_failures": 0,
+            "read_tail": int(self._diagnostics["read_tail"]),
+            "session_retention_ttl_s": (
+                None if self.session_retention_ttl_s is None else float(self.session_retention_ttl_s)
+            ),
+            "ttl_prune_runs": int(self._diagnostics["ttl_prune_runs"]),
+            "ttl_prune_deleted_sessions": int(self._diagnostics["ttl_prune_deleted_sessions"]),
+            "ttl_prune_failures": int(self._diagnostics["ttl_prune_failures"]),
+            "ttl_last_prune_iso": str(self._diagnostics["ttl_last_prune_iso"]),
+            "last_error": str(self._diagnostics["last_error"]),
+        }
+
+
+def _jsonl_rows(path: Path) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+        raw = line.strip()
+        if not raw:
+            continue
+        try:
+            payload = json.loads(raw)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(payload, dict):
+            rows.append(payload)
+    return rows
+
+
+def migrate_jsonl_sessions(source: str | Path, store: SQLiteSessionStore) -> dict[str, Any]:
+    """Import every ``<session>.jsonl`` log under ``source`` into ``store``.
+
+    Each session is imported in one transaction and sessions already present
+    in the database are skipped, so an interrupted migration can simply be
+    run again. Each session keeps its messages'
+    timestamps and its file's modification time as last write time. The
+    JSONL files are left in place.
+    """
+    root = Path(source)
+    # Replays any group-commit log a crashed JSONL store left behind.
+    legacy = SessionStore(root=root, max_messages_per_session=None)
+    migrated = 0
+    skipped = 0
+    messages = 0
+    for path in sorted(root.glob("*.jsonl")):
+        rows = _jsonl_rows(path)
+        session_id = next(
+            (str(row.get("session_id", "") or "").strip() for row in rows if str(row.get("session_id", "") or "").strip()),
+            legacy._restore_session_id(path.stem),
+        )
+        if not session_id or store.has_session(session_id):
+            skipped += 1
+            continue
+        imported = store.import_session(session_id, rows, updated_at=path.stat().st_mtime)
+        if imported:
+            migrated += 1
+            messages += imported
+        else:
+            skipped += 1
+    return {
+        "ok": True,
+        "source": str(root),
+        "database": str(store.db_path),
+        "migrated_sessions": migrated,
+        "migrated_messages": messages,
+        "skipped_sessions": skipped,
+    }
+
+
+__all__ = [
+    "SESSION_DB_NAME",
+    "SQLiteSessionStore",
+    "migrate_jsonl_sessions",
+]
@@ -1,13 +1,38 @@
 from __future__ import annotations
 
+import contextlib
 import json
 import os
+import threading
 import time
 from urllib.parse import quote, unquote
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable
+
+from clawlite.session.tail import (
+    TAIL_CHUNK_BYTES,
+    append_offset_index,
+    head_cut,
+    line_count,
+    line_ends,
+    read_tail_lines,
+    remove_offset_index,
+    write_line_ends,
+)
+from clawlite.session.wal import (
+    GROUP_COMMIT_WINDOW_S,
+    WAL_SUPPORTED,
+    CommitTicket,
+    GroupCommitLog,
+    fsync_path,
+    normalize_durability,
+    recover_session_wal,
+)
+
+TAIL_READ_SLACK = 32
+COMPACTION_CATCH_UP_ATTEMPTS = 3
 
 
 def _utc_now() -> str:
@@ -29,6 +54,18 @@ class SessionStore:
 
     Each session is persisted in its own file:
     ~/.clawlite/state/sessions/<session_id>.jsonl
+
+    A ``<session_id>.jsonl.idx`` sidecar holds the byte offset of every line,
+    kept current on append and rewrite, so reading the recent history only
+    decodes its tail.
+
+    ``durability`` decides when an append reaches the disk: ``fsync`` syncs
+    the session file on every append; ``group`` logs appends to a
+    write-ahead log that a background thread fsyncs once per
+    ``group_commit_window_s`` for all sessions (see
+    :class:`~clawlite.session.wal.GroupCommitLog`); ``buffered`` leaves it
+    to the OS until :meth:`flush`. An append waits for its commit unless
+    called with ``durable=False``.
     """
 
     def __init__(
@@ -36,6 +73,9 @@ class SessionStore:
         root: str | Path | None = None,
         max_messages_per_session: int | None = 2000,
         session_retention_ttl_s: float | int | None = None,
+        *,
+        durability: str = "fsync",
+        group_commit_window_s: float = GROUP_COMMIT_WINDOW_S,
     ) -> None:
         base = Path(root) if root else (Path.home() / ".clawlite" / "state" / "sessions")
         self.root = base
@@ -46,6 +86,18 @@ class SessionStore:
         self.session_retention_ttl_s = configured_ttl if configured_ttl and configured_ttl > 0 else None
         self._strict_compaction_limit = 64
         self._session_line_estimates: dict[Path, int] = {}
+        self._index_lock = threading.Lock()
+        # Serializes appends with rewrites and deletes; taken before ``_index_lock``.
+        self._write_lock = threading.RLock()
+        mode = normalize_durability(durability)
+        self.durability = "fsync" if mode == "group" and not WAL_SUPPORTED else mode
+        self._wal = (
+            GroupCommitLog(self.root, window_s=group_commit_window_s) if self.durability == "group" else None
+        )
+        self._unsynced: set[Path] = set()
+        recovered, touched = recover_session_wal(self.root)
+        for path in touched:
+            remove_offset_index(path)
         self._diagnostics: dict[str, int | str] = {
             "append_attempts": 0,
             "append_retries": 0,
@@ -56,10 +108,13 @@ class SessionStore:
             "compaction_failures": 0,
             "read_corrupt_lines": 0,
             "read_repaired_files": 0,
+            "read_tail": 0,
+            "read_full": 0,
             "ttl_prune_runs": 0,
             "ttl_prune_deleted_sessions": 0,
             "ttl_prune_failures": 0,
             "ttl_last_prune_iso": "",
+            "wal_recovered_records": recovered,
             "last_error": "",
         }
 
@@ -98,6 +153,7 @@ class SessionStore:
         content: str,
         *,
         metadata: dict[str, Any] | None = None,
+        durable: bool = True,
     ) -> None:
         clean_role = str(role or "").strip().lower()
         clean_content = str(content or "").strip()
@@ -120,7 +176,7 @@ class SessionStore:
         for attempt in range(1, attempts + 1):
             self._diagnostics["append_attempts"] = int(self._diagnostics["append_attempts"]) + 1
             try:
-                self._append_once(path, payload)
+                ticket = self._write_payload(path, payload)
                 self._diagnostics["append_success"] = int(self._diagnostics["append_success"]) + 1
                 self._diagnostics["last_error"] = ""
                 cached_count = self._session_line_estimates.get(path)
@@ -129,7 +185,7 @@ class SessionStore:
                 else:
                     self._session_line_estimates[path] = cached_count + 1
                 self._maybe_compact_session_file(path)
-                return
+                break
             except OSError as exc:
                 self._diagnostics["last_error"] = str(exc)
                 if attempt < attempts:
@@ -138,11 +194,15 @@ class SessionStore:
                     continue
                 self._diagnostics["append_failures"] = int(self._diagnostics["append_failures"]) + 1
                 raise
+        if durable:
+            self._await_commit(ticket)
 
     def append_many(
         self,
         session_id: str,
         rows: list[dict[str, Any]],
+        *,
+        durable: bool = True,
     ) -> None:
         clean_session_id = str(session_id or "").strip()
         if not clean_session_id:
@@ -175,7 +235,7 @@ class SessionStore:
         for attempt in range(1, attempts + 1):
             self._diagnostics["append_attempts"] = int(self._diagnostics["append_attempts"]) + 1
             try:
-                self._append_once(path, payload)
+                ticket = self._write_payload(path, payload)
                 self._diagnostics["append_success"] = int(self._diagnostics["append_success"]) + len(messages)
                 self._diagnostics["last_error"] = ""
                 cached_count = self._session_line_estimates.get(path)
@@ -184,7 +244,7 @@ class SessionStore:
                 else:
                     self._session_line_estimates[path] = cached_count + len(messages)
                 self._maybe_compact_session_file(path)
-                return
+                break
             except OSError as exc:
                 self._diagnostics["last_error"] = str(exc)
                 if attempt < attempts:
@@ -193,13 +253,78 @@ class SessionStore:
                     continue
                 self._diagnostics["append_failures"] = int(self._diagnostics["append_failures"]) + 1
                 raise
+        if durable:
+            self._await_commit(ticket)
 
-    @staticmethod
-    def _append_once(path: Path, payload: str) -> None:
+    def _write_payload(self, path: Path, payload: str) -> CommitTicket | None:
+        with self._write_lock:
+            try:
+                start = path.stat().st_size
+            except FileNotFoundError:
+                start = 0
+            self._append_once(path, payload)
+            self._index_appended(path, payload)
+            if self._wal is not None:
+                # Submitted under the lock so the log keeps each file's append order.
+                return self._wal.submit(path, start, payload)
+            if self.durability == "buffered":
+                self._unsynced.add(path)
+            return None
+
+    def _append_once(self, path: Path, payload: str) -> None:
         with path.open("a", encoding="utf-8") as handle:
             handle.write(payload)
             handle.flush()
-            os.fsync(handle.fileno())
+            if self.durability == "fsync":
+                os.fsync(handle.fileno())
+
+    def _await_commit(self, ticket: CommitTicket | None) -> None:
+        if ticket is None:
+            return
+        try:
+            ticket.wait()
+        except OSError as exc:
+            # The rows are in the session file; only their durability is in doubt.
+            self._diagnostics["last_error"] = str(exc)
+            raise
+
+    def flush(self) -> None:
+        """Wait until every append so far is on disk (immediate in ``fsync`` mode)."""
+        wal = self._wal
+        if wal is not None:
+            wal.barrier().wait()
+        with self._write_lock:
+            pending, self._unsynced = self._unsynced, set()
+        for path in sorted(pending):
+            fsync_path(path)
+
+    def close(self) -> None:
+        """Flush, stop the group-commit writer and remove its log; later appends fsync each write."""
+        self.flush()
+        with self._write_lock:
+            wal, self._wal = self._wal, None
+            if wal is not None:
+                self.durability = "fsync"
+        if wal is not None:
+            wal.close()
+
+    def _checkpoint_wal(self) -> None:
+        # Log records address files by byte offset: none may outlive a rewrite or delete.
+        wal = self._wal
+        if wal is None:
+            return
+        with contextlib.suppress(OSError):
+            wal.barrier().wait()
+        wal.checkpoint()
+
+    def _index_appended(self, path: Path, payload: str) -> None:
+        with self._index_lock:
+            try:
+                append_offset_index(path, payload.encode("utf-8"), file_size=path.stat().st_size)
+            except OSError:
+                # The index is advisory; the next read rebuilds it from the file.
+                with contextlib.suppress(OSError):
+                    remove_offset_index(path)
 
     def read(self, session_id: str, limit: int = 20) -> list[dict[str, str]]:
         rows = self.read_messages(session_id, limit=limit)
@@ -353,10 +478,51 @@ class SessionStore:
         flush_pending()
         return out
 
+    @classmethod
+    def _legalize_window(cls, rows: list[dict[str, Any]], *, complete: bool) -> list[dict[str, Any]]:
+        """Legalize the newest rows of a transcript; ``complete`` when they start at its beginning."""
+        if not complete:
+            # Leading tool results may answer a call outside the window; from the
+            # first other row on, legalization matches a pass over the whole transcript.
+            first = next((idx for idx, row in enumerate(rows) if row["role"] != "tool"), len(rows))
+            rows = rows[first:]
+        return cls._legalize_transcript_rows(rows)
+
     def read_messages(self, session_id: str, limit: int = 20) -> list[dict[str, Any]]:
         path = self._path(session_id)
         if not path.exists():
             return []
+        bounded = max(1, int(limit or 1))
+        window = bounded + TAIL_READ_SLACK
+        while True:
+            try:
+                with self._index_lock:
+                    lines, complete = read_tail_lines(path, window)
+            except OSError:
+                return self._read_all_messages(path, bounded)
+            rows: list[dict[str, Any]] = []
+            for line in lines:
+                raw = line.strip()
+                if not raw:
+                    continue
+                try:
+                    payload = json.loads(raw)
+                except json.JSONDecodeError:
+                    # Repairing needs the whole file.
+                    return self._read_all_messages(path, bounded)
+                if not isinstance(payload, dict):
+                    continue
+                row = self._payload_to_message_row(payload)
+                if row is not None:
+                    rows.append(row)
+            legalized = self._legalize_window(rows, complete=complete)
+            if complete or len(legalized) >= bounded:
+                self._diagnostics["read_tail"] = int(self._diagnostics["read_tail"]) + 1
+                return legalized[-bounded:]
+            window *= 2
+
+    def _read_all_messages(self, path: Path, limit: int) -> list[dict[str, Any]]:
+        self._diagnostics["read_full"] = int(self._diagnostics["read_full"]) + 1
         rows: list[dict[str, Any]] = []
         valid_lines: list[str] = []
         corrupt_lines = 0
@@ -402,16 +568,10 @@ class SessionStore:
         if not path.exists():
             self._session_line_estimates[path] = 0
             return 0
-        count = 0
-        for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
-            raw = line.strip()
-            if not raw:
-                continue
-            try:
-                json.loads(raw)
-            except json.JSONDecodeError:
-                continue
-            count += 1
+        # Counted from the offset index; blank or corrupt lines count too, so
+        # compaction can only run early, never late.
+        with self._index_lock:
+            count = line_count(path)
         self._session_line_estimates[path] = count
         return count
 
@@ -441,23 +601,27 @@ class SessionStore:
             self._session_line_estimates[path] = new_count
 
     def _atomic_rewrite(self, path: Path, content: str) -> None:
+        data = content.encode("utf-8")
+        self._atomic_replace(path, lambda handle: handle.write(data), line_ends(data))
+
+    def _atomic_replace(self, path: Path, fill: Callable[[BinaryIO], Any], ends: list[int]) -> None:
+        """Swap in a file written by ``fill`` whose line ends are ``ends``."""
         path.parent.mkdir(parents=True, exist_ok=True)
         tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{time.time_ns()}.tmp")
         try:
-            with tmp_path.open("w", encoding="utf-8") as handle:
-                handle.write(content)
+            with tmp_path.open("wb") as handle:
+                fill(handle)
                 handle.flush()
                 os.fsync(handle.fileno())
-            os.replace(tmp_path, path)
-            dir_fd = -1
-            try:
-                dir_fd = os.open(str(path.parent), os.O_RDONLY)
-                os.fsync(dir_fd)
-            except OSError:
-                pass
-            finally:
-                if dir_fd >= 0:
-                    os.close(dir_fd)
+            with self._write_lock:
+                self._checkpoint_wal()
+                with self._index_lock:
+                    os.replace(tmp_path, path)
+                    try:
+                        write_line_ends(path, ends)
+                    except OSError:
+                        remove_offset_index(path)
+            self._fsync_dir(path.parent)
         finally:
             if tmp_path.exists():
                 try:
@@ -471,23 +635,46 @@ class SessionStore:
             return None
         self._diagnostics["compaction_runs"] = int(self._diagnostics["compaction_runs"]) + 1
         try:
-            valid_lines: list[str] = []
-            for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
-                raw = line.strip()
-                if not raw:
-                    continue
+            with self._index_lock:
                 try:
-                    json.loads(raw)
-                except json.JSONDecodeError:
-                    continue
-                valid_lines.append(raw)
-
-            keep = valid_lines[-limit:]
-            trimmed = max(0, len(valid_lines) - len(keep))
-            rewritten = "\n".join(keep)
-            if rewritten:
-                rewritten = f"{rewritten}\n"
-            self._atomic_rewrite(path, rewritten)
+                    inode = path.stat().st_ino
+                except FileNotFoundError:
+                    inode = None
+                plan = head_cut(path, limit)
+            if plan is not None:
+                total, cut, kept_ends = plan
+                trimmed = total - len(kept_ends) if cut else 0
+                if trimmed:
+                    appended = self._replace_with_tail(path, inode, cut, kept_ends)
+                    if appended is None:
+                        # Deleted or rewritten meanwhile; the next append re-plans.
+                        return None
+                    self._diagnostics["compaction_trimmed_lines"] = (
+                        int(self._diagnostics["compaction_trimmed_lines"]) + trimmed
+                    )
+                    total += appended
+                self._diagnostics["last_error"] = ""
+                return total - trimmed
+
+            with self._write_lock:
+                # A partial last line leaves the index short of the file; fall back to a full rewrite.
+                valid_lines: list[str] = []
+                for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+                    raw = line.strip()
+                    if not raw:
+                        continue
+                    try:
+                        json.loads(raw)
+                    except json.JSONDecodeError:
+                        continue
+                    valid_lines.append(raw)
+
+                keep = valid_lines[-limit:]
+                trimmed = max(0, len(valid_lines) - len(keep))
+                rewritten = "\n".join(keep)
+                if rewritten:
+                    rewritten = f"{rewritten}\n"
+                self._atomic_rewrite(path, rewritten)
             if trimmed:
                 self._diagnostics["compaction_trimmed_lines"] = int(self._diagnostics["compaction_trimmed_lines"]) + trimmed
             self._diagnostics["last_error"] = ""
@@ -497,8 +684,91 @@ class SessionStore:
             self._diagnostics["last_error"] = str(exc)
             return None
 
+    def _replace_with_tail(self, path: Path, inode: int | None, cut: int, ends: list[int]) -> int | None:
+        """Replace ``path`` with its bytes from ``cut`` on, copying them outside ``_write_lock``.
+
+        ``ends`` are the kept line ends relative to ``cut``; the copy stops at
+        the last of them. Lines appended while it ran are copied after it, so
+        appends only wait for the final size check, the rename and the index
+        swap. Returns how many appended lines were carried over, or ``None``
+        when the file was deleted, replaced or shrank in the meantime.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{time.time_ns()}.tmp")
+        copied = cut + (ends[-1] if ends else 0)
+        kept = list(ends)
+        try:
+            with tmp_path.open("wb") as handle:
+                self._copy_range(path, cut, copied, handle)
+                attempts = 0
+                while True:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                    with self._write_lock:
+                        try:
+                            current = path.stat()
+                        except FileNotFoundError:
+                            return None
+                        if current.st_ino != inode or current.st_size < copied:
+                            return None
+                        if current.st_size > copied and attempts >= COMPACTION_CATCH_UP_ATTEMPTS:
+                            # Appends keep outpacing the copy: take the rest under the lock.
+                            copied = self._copy_delta(path, cut, copied, current.st_size, handle, kept)
+                            handle.flush()
+                            os.fsync(handle.fileno())
+                        if current.st_size == copied:
+                            self._checkpoint_wal()
+                            with self._index_lock:
+                                os.replace(tmp_path, path)
+                                try:
+                                    write_line_ends(path, kept)
+                                except OSError:
+                                    remove_offset_index(path)
+                            break
+                    attempts += 1
+                    copied = self._copy_delta(path, cut, copied, current.st_size, handle, kept)
+            self._fsync_dir(path.parent)
+            return len(kept) - len(ends)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _copy_delta(path: Path, cut: int, start: int, end: int, handle: BinaryIO, ends: list[int]) -> int:
+        """Append ``path[start:end]`` to ``handle`` and its line ends (relative to ``cut``) to ``ends``."""
+        with path.open("rb") as source:
+            source.seek(start)
+            data = source.read(end - start)
+        handle.write(data)
+        ends.extend(line_ends(data, start - cut))
+        return start + len(data)
+
+    @staticmethod
+    def _copy_range(path: Path, start: int, end: int, handle: BinaryIO) -> None:
+        with path.open("rb") as source:
+            source.seek(start)
+            remaining = end - start
+            while remaining > 0 and (chunk := source.read(min(remaining, TAIL_CHUNK_BYTES * 16))):
+                handle.write(chunk)
+                remaining -= len(chunk)
+
+    @staticmethod
+    def _fsync_dir(directory: Path) -> None:
+        dir_fd = -1
+        try:
+            dir_fd = os.open(str(directory), os.O_RDONLY)
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            if dir_fd >= 0:
+                os.close(dir_fd)
+
     def diagnostics(self) -> dict[str, int | str]:
+        wal = self._wal
+        wal_stats = wal.snapshot() if wal is not None else {}
         return {
+            "backend": "jsonl",
+            "durability": self.durability,
             "append_attempts": int(self._diagnostics["append_attempts"]),
             "append_retries": int(self._diagnostics["append_retries"]),
             "append_failures": int(self._diagnostics["append_failures"]),
@@ -508,6 +778,8 @@ class SessionStore:
             "compaction_failures": int(self._diagnostics["compaction_failures"]),
             "read_corrupt_lines": int(self._diagnostics["read_corrupt_lines"]),
             "read_repaired_files": int(self._diagnostics["read_repaired_files"]),
+            "read_tail": int(self._diagnostics["read_tail"]),
+            "read_full": int(self._diagnostics["read_full"]),
             "session_retention_ttl_s": (
                 None if self.session_retention_ttl_s is None else float(self.session_retention_ttl_s)
             ),
@@ -515,6 +787,12 @@ class SessionStore:
             "ttl_prune_deleted_sessions": int(self._diagnostics["ttl_prune_deleted_sessions"]),
             "ttl_prune_failures": int(self._diagnostics["ttl_prune_failures"]),
             "ttl_last_prune_iso": str(self._diagnostics["ttl_last_prune_iso"]),
+            "group_commits": int(wal_stats.get("group_commits", 0)),
+            "group_commit_records": int(wal_stats.get("group_commit_records", 0)),
+            "group_commit_max_batch": int(wal_stats.get("group_commit_max_batch", 0)),
+            "wal_pending": int(wal_stats.get("wal_pending", 0)),
+            "wal_checkpoints": int(wal_stats.get("wal_checkpoints", 0)),
+            "wal_recovered_records": int(self._diagnostics["wal_recovered_records"]),
             "last_error": str(self._diagnostics["last_error"]),
         }
 
@@ -533,7 +811,12 @@ class SessionStore:
         path = self._path(session_id)
         if not path.exists():
             return False
-        path.unlink()
+        with self._write_lock:
+            self._checkpoint_wal()
+            path.unlink()
+            with self._index_lock:
+                remove_offset_index(path)
+        self._session_line_estimates.pop(path, None)
         return True
 
     def prune_expired(self, *, now: float | None = None, max_age_seconds: float | None = None) -> int:
@@ -555,11 +838,15 @@ class SessionStore:
             if age_seconds <= ttl_s:
                 continue
             try:
-                path.unlink(missing_ok=True)
+                with self._write_lock:
+                    self._checkpoint_wal()
+                    path.unlink(missing_ok=True)
             except OSError as exc:
                 self._diagnostics["ttl_prune_failures"] = int(self._diagnostics["ttl_prune_failures"]) + 1
                 self._diagnostics["last_error"] = str(exc)
                 continue
+            with self._index_lock:
+                remove_offset_index(path)
             self._session_line_estimates.pop(path, None)
             deleted += 1
         if deleted:
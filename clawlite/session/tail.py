@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import os
+import struct
+from pathlib import Path
+
+OFFSET_INDEX_SUFFIX = ".idx"
+TAIL_CHUNK_BYTES = 64 * 1024
+
+_END = struct.Struct("<Q")
+
+
+def offset_index_path(path: Path) -> Path:
+    """Sidecar of ``<session>.jsonl``: the byte offset just past each line, as little-endian uint64s."""
+    return path.with_name(f"{path.name}{OFFSET_INDEX_SUFFIX}")
+
+
+def line_ends(data: bytes, start: int = 0) -> list[int]:
+    ends: list[int] = []
+    position = data.find(b"\n")
+    while position >= 0:
+        ends.append(start + position + 1)
+        position = data.find(b"\n", position + 1)
+    return ends
+
+
+def _pack(ends: list[int]) -> bytes:
+    return b"".join(_END.pack(end) for end in ends)
+
+
+def _index_entries(index_path: Path) -> int | None:
+    try:
+        size = index_path.stat().st_size
+    except OSError:
+        return None
+    return size // _END.size if size % _END.size == 0 else None
+
+
+def _read_entries(index_path: Path, first: int, count: int) -> list[int]:
+    with index_path.open("rb") as handle:
+        handle.seek(first * _END.size)
+        data = handle.read(count * _END.size)
+    return [value for (value,) in _END.iter_unpack(data[: len(data) - len(data) % _END.size])]
+
+
+def _last_end(index_path: Path, entries: int) -> int:
+    return _read_entries(index_path, entries - 1, 1)[0] if entries else 0
+
+
+def write_line_ends(path: Path, ends: list[int]) -> None:
+    """Replace the index of ``path`` with ``ends``."""
+    index_path = offset_index_path(path)
+    tmp_path = index_path.with_name(f".{index_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(_pack(ends))
+        os.replace(tmp_path, index_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def append_offset_index(path: Path, payload: bytes, *, file_size: int) -> bool:
+    """Record ``payload``'s lines after an append that left ``path`` at ``file_size`` bytes.
+
+    The index is only extended when it ended exactly where the payload
+    starts; otherwise (a writer in another process, a crash between the two
+    writes) it is dropped and rebuilt by the next :func:`read_tail_lines`.
+    """
+    index_path = offset_index_path(path)
+    start = file_size - len(payload)
+    if start == 0:
+        index_path.write_bytes(_pack(line_ends(payload)))
+        return True
+    entries = _index_entries(index_path)
+    last = _last_end(index_path, entries) if entries else -1
+    if last == file_size:
+        # A read already caught the index up with this append.
+        return True
+    if last != start:
+        index_path.unlink(missing_ok=True)
+        return False
+    with index_path.open("ab") as handle:
+        handle.write(_pack(line_ends(payload, start)))
+    return True
+
+
+def _scan_ends(path: Path, start: int, size: int) -> list[int]:
+    ends: list[int] = []
+    with path.open("rb") as handle:
+        handle.seek(start)
+        position = start
+        while position < size:
+            chunk = handle.read(min(TAIL_CHUNK_BYTES * 16, size - position))
+            if not chunk:
+                break
+            ends.extend(line_ends(chunk, position))
+            position += len(chunk)
+    return ends
+
+
+def _current_index(path: Path, size: int) -> int | None:
+    """Entries of an index brought up to date with ``path``, or ``None`` if it cannot cover the file."""
+    index_path = offset_index_path(path)
+    entries = _index_entries(index_path)
+    last = _last_end(index_path, entries) if entries else 0
+    if entries is None or last > size:
+        entries, last = 0, 0
+        index_path.unlink(missing_ok=True)
+    if last < size:
+        # Lines appended without the index (another process, a crash) or no index yet.
+        missing = _scan_ends(path, last, size)
+        with index_path.open("ab") as handle:
+            handle.write(_pack(missing))
+        entries += len(missing)
+        last = missing[-1] if missing else last
+    return entries if last == size else None
+
+
+def line_count(path: Path) -> int:
+    """Lines in ``path``, counting a partial last line, from its index (caught up on the way)."""
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return 0
+    if size <= 0:
+        return 0
+    entries = _current_index(path, size)
+    if entries is not None:
+        return entries
+    # The index stops at the last newline; what follows is one partial line.
+    return (_index_entries(offset_index_path(path)) or 0) + 1
+
+
+def head_cut(path: Path, keep: int) -> tuple[int, int, list[int]] | None:
+    """Where to cut ``path`` so only its last ``keep`` lines remain.
+
+    Returns the file's line count, the byte offset the kept lines start at
+    and their line ends relative to it (empty when nothing needs cutting);
+    ``None`` when the index cannot describe the file.
+    """
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return 0, 0, []
+    if size <= 0:
+        return 0, 0, []
+    entries = _current_index(path, size)
+    if entries is None:
+        return None
+    bounded = max(1, int(keep))
+    if entries <= bounded:
+        return entries, 0, []
+    ends = _read_entries(offset_index_path(path), entries - bounded - 1, bounded + 1)
+    cut = ends[0]
+    return entries, cut, [end - cut for end in ends[1:]]
+
+
+def _reverse_tail(path: Path, count: int, size: int) -> tuple[bytes, bool]:
+    """Bytes of the last ``count`` lines, read backwards in chunks."""
+    data = b""
+    position = size
+    with path.open("rb") as handle:
+        # The byte at the very end is ignored: a final newline ends the last line.
+        while position > 0 and data.count(b"\n", 0, len(data) - 1) < count:
+            step = min(TAIL_CHUNK_BYTES, position)
+            position -= step
+            handle.seek(position)
+            data = handle.read(step) + data
+    cut = len(data) - 1
+    for _ in range(count):
+        cut = data.rfind(b"\n", 0, cut)
+        if cut < 0:
+            break
+    cut = cut + 1 if cut >= 0 else 0
+    return data[cut:], position == 0 and cut == 0
+
+
+def read_tail_lines(path: Path, count: int) -> tuple[list[str], bool]:
+    """The last ``count`` lines of ``path`` and whether they reach the start of the file.
+
+    Uses the offset index (created or caught up on the way) to read only the
+    tail bytes; a file the index cannot describe, such as one ending in a
+    partial line, is read backwards in chunks instead.
+    """
+    bounded = max(1, int(count))
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return [], True
+    if size <= 0:
+        return [], True
+    entries = _current_index(path, size)
+    if entries is not None:
+        first = max(0, entries - bounded - 1)
+        boundaries = _read_entries(offset_index_path(path), first, entries - first)
+        start = boundaries[0] if entries > bounded else 0
+        with path.open("rb") as handle:
+            handle.seek(start)
+            data = handle.read(size - start)
+        complete = entries <= bounded
+    else:
+        data, complete = _reverse_tail(path, bounded, size)
+    chunks = data.split(b"\n")
+    if chunks and not chunks[-1]:
+        chunks.pop()
+    lines = [chunk.decode("utf-8", errors="ignore") for chunk in chunks[-bounded:]]
+    return lines, complete and len(chunks) <= bounded
+
+
+def remove_offset_index(path: Path) -> None:
+    offset_index_path(path).unlink(missing_ok=True)
+
+
+__all__ = [
+    "OFFSET_INDEX_SUFFIX",
+    "TAIL_CHUNK_BYTES",
+    "append_offset_index",
+    "head_cut",
+    "line_count",
+    "line_ends",
+    "offset_index_path",
+    "read_tail_lines",
+    "remove_offset_index",
+    "write_line_ends",
+]
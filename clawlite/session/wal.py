@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+SESSION_DURABILITY_MODES = ("fsync", "group", "buffered")
+GROUP_COMMIT_WINDOW_S = 0.005
+WAL_CHECKPOINT_BYTES = 4 * 1024 * 1024
+WAL_PREFIX = ".wal-"
+WAL_SUFFIX = ".log"
+# Recovery tells a crashed store's log from a live one by its ``flock``.
+WAL_SUPPORTED = fcntl is not None
+
+
+def normalize_durability(value: Any) -> str:
+    mode = str(value or "").strip().lower()
+    return mode if mode in SESSION_DURABILITY_MODES else "fsync"
+
+
+def fsync_path(path: Path) -> None:
+    """Flush ``path`` to disk; a file deleted meanwhile needs nothing."""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class CommitTicket:
+    """Resolved once an append is durable, or with the error that kept it from being."""
+
+    __slots__ = ("_done", "error")
+
+    def __init__(self) -> None:
+        self._done = threading.Event()
+        self.error: BaseException | None = None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def resolve(self, error: BaseException | None = None) -> None:
+        self.error = error
+        self._done.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until resolved (``False`` on timeout); re-raises a commit failure."""
+        if not self._done.wait(timeout):
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
+
+def _resolved() -> CommitTicket:
+    ticket = CommitTicket()
+    ticket.resolve()
+    return ticket
+
+
+class GroupCommitLog:
+    """Write-ahead log that makes session appends durable in groups.
+
+    The store appends each payload to its session file without fsync and
+    hands a copy to :meth:`submit`. A background thread collects what was
+    submitted during one commit window (``window_s`` after the first
+    record), writes the batch to this instance's log file and fsyncs that
+    one file, then resolves every ticket of the batch: concurrent appends
+    to any number of sessions cost one fsync per window instead of one
+    each.
+
+    Session files written since the last checkpoint are tracked as dirty.
+    :meth:`checkpoint` fsyncs them and truncates the log; it runs when the
+    log grows past ``checkpoint_bytes`` and must run before a session file
+    is rewritten or deleted, since log records address files by byte
+    offset. Logs left by a crashed process are replayed by
+    :func:`recover_session_wal`. The log file is held under an exclusive
+    ``flock`` so recovery never touches the log of a live store.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        window_s: float = GROUP_COMMIT_WINDOW_S,
+        checkpoint_bytes: int = WAL_CHECKPOINT_BYTES,
+    ) -> None:
+        self.root = Path(root)
+        self.path = self.root / f"{WAL_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:8]}{WAL_SUFFIX}"
+        self._window_s = max(0.0, float(window_s))
+        self._checkpoint_bytes = max(1, int(checkpoint_bytes))
+        self._cond = threading.Condition()
+        self._commit_lock = threading.Lock()
+        self._queue: list[tuple[bytes, Path, CommitTicket]] = []
+        self._last_ticket = _resolved()
+        self._dirty: set[Path] = set()
+        self._handle: BinaryIO | None = None
+        self._log_bytes = 0
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self.commits = 0
+        self.records = 0
+        self.max_batch = 0
+        self.checkpoints = 0
+        self.fallback_syncs = 0
+        self.last_error = ""
+
+    def submit(self, path: Path, offset: int, payload: str) -> CommitTicket:
+        """Log ``payload``, already appended to ``path`` at byte ``offset``, for the next commit."""
+        record = json.dumps({"p": path.name, "o": int(offset), "d": payload}, ensure_ascii=False) + "\n"
+        ticket = CommitTicket()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("session write-ahead log is closed")
+            self._queue.append((record.encode("utf-8"), path, ticket))
+            self._last_ticket = ticket
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="clawlite-session-wal", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return ticket
+
+    def barrier(self) -> CommitTicket:
+        """Ticket resolved once everything submitted so far has been committed."""
+        with self._cond:
+            return self._last_ticket
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+            if self._window_s > 0:
+                time.sleep(self._window_s)
+            with self._cond:
+                batch, self._queue = self._queue, []
+            self._commit(batch)
+
+    def _open(self) -> BinaryIO:
+        while self._handle is None:
+            handle = self.path.open("ab")
+            if fcntl is None:
+                self._handle = handle
+                break
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            try:
+                current = self.path.stat().st_ino == os.fstat(handle.fileno()).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                self._handle = handle
+            else:
+                # Recovery took the empty log for a dead one between open and lock.
+                handle.close()
+        return self._handle
+
+    def _commit(self, batch: list[tuple[bytes, Path, CommitTicket]]) -> None:
+        paths = {path for _record, path, _ticket in batch}
+        error: BaseException | None = None
+        with self._commit_lock:
+            data = b"".join(record for record, _path, _ticket in batch)
+            try:
+                handle = self._open()
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+                self._log_bytes += len(data)
+                self._dirty.update(paths)
+            except OSError as exc:
+                # Without the log, the batch is made durable file by file.
+                self.last_error = str(exc)
+                if self._handle is not None:
+                    with contextlib.suppress(OSError, ValueError):
+                        self._handle.truncate(self._log_bytes)
+                try:
+                    for path in paths:
+                        fsync_path(path)
+                    self.fallback_syncs += 1
+                except OSError as sync_exc:
+                    error = sync_exc
+            self.commits += 1
+            self.records += len(batch)
+            self.max_batch = max(self.max_batch, len(batch))
+            checkpoint_due = self._log_bytes >= self._checkpoint_bytes
+        for _record, _path, ticket in batch:
+            ticket.resolve(error)
+        if checkpoint_due:
+            try:
+                self.checkpoint()
+            except OSError as exc:
+                self.last_error = str(exc)
+
+    def checkpoint(self) -> None:
+        """Fsync the session files written since the last checkpoint and empty the log."""
+        with self._commit_lock:
+            for path in sorted(self._dirty):
+                fsync_path(path)
+            self._dirty.clear()
+            if self._handle is not None and self._log_bytes:
+                self._handle.truncate(0)
+                os.fsync(self._handle.fileno())
+                self.checkpoints += 1
+            self._log_bytes = 0
+
+    def close(self) -> None:
+        """Commit what is queued, checkpoint, and remove the log file."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.checkpoint()
+        with self._commit_lock:
+            if self._handle is not None:
+                self.path.unlink(missing_ok=True)
+                self._handle.close()
+                self._handle = None
+
+    def snapshot(self) -> dict[str, int | str]:
+        with self._cond:
+            depth = len(self._queue)
+        return {
+            "wal_pending": depth,
+            "wal_bytes": self._log_bytes,
+            "group_commits": self.commits,
+            "group_commit_records": self.records,
+            "group_commit_max_batch": self.max_batch,
+            "wal_checkpoints": self.checkpoints,
+            "wal_fallback_syncs": self.fallback_syncs,
+            "wal_last_error": self.last_error,
+        }
+
+
+def _wal_records(handle: BinaryIO) -> Iterable[dict[str, Any]]:
+    for raw in handle:
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            # A torn final record was never acknowledged.
+            return
+        if isinstance(record, dict):
+            yield record
+
+
+def _replay_record(root: Path, record: dict[str, Any], touched: set[Path]) -> bool:
+    name = str(record.get("p", "") or "")
+    if not name or Path(name).name != name:
+        return False
+    try:
+        offset = max(0, int(record.get("o", 0)))
+    except (TypeError, ValueError):
+        return False
+    data = str(record.get("d", "") or "").encode("utf-8")
+    path = root / name
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        size = 0
+    if size >= offset + len(data):
+        return False
+    if size < offset:
+        # Bytes before the record are missing: the file was rewritten or lost
+        # data the log cannot restore, so appending here would misplace it.
+        return False
+    with path.open("ab") as handle:
+        if size > offset:
+            # Part of the append reached the disk; rewrite it whole.
+            handle.truncate(offset)
+        handle.write(data)
+    touched.add(path)
+    return True
+
+
+def recover_session_wal(root: Path) -> tuple[int, list[Path]]:
+    """Replay the logs of stores that did not close cleanly.
+
+    Returns the number of records re-applied and the session files they
+    touched. Logs still locked by a live store are left alone; without
+    ``fcntl`` liveness cannot be told, so nothing is replayed.
+    """
+    if fcntl is None:
+        return 0, []
+    replayed = 0
+    touched: set[Path] = set()
+    for log_path in sorted(Path(root).glob(f"{WAL_PREFIX}*{WAL_SUFFIX}")):
+        try:
+            handle = log_path.open("rb")
+        except OSError:
+            continue
+        with handle:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                continue
+            for record in _wal_records(handle):
+                if _replay_record(Path(root), record, touched):
+                    replayed += 1
+            for path in touched:
+                fsync_path(path)
+            log_path.unlink(missing_ok=True)
+    return replayed, sorted(touched)
+
+
+__all__ = [
+    "GROUP_COMMIT_WINDOW_S",
+    "SESSION_DURABILITY_MODES",
+    "WAL_CHECKPOINT_BYTES",
+    "WAL_SUPPORTED",
+    "CommitTicket",
+    "GroupCommitLog",
+    "fsync_path",
+    "normalize_durability",
+    "recover_session_wal",
+]
@@ -235,7 +235,10 @@ def _session_file_path(sessions: SessionStore, session_id: str) -> Path:
 
 
 def _count_session_messages(sessions: SessionStore, session_id: str) -> int:
+    count_messages = getattr(sessions, "count_messages", None)
     try:
+        if callable(count_messages):
+            return int(count_messages(session_id))
         path = _session_file_path(sessions, session_id)
         if not path.exists():
             return 0
@@ -264,6 +267,9 @@ def _read_session_messages(
     limit: int,
     include_tools: bool = True,
 ) -> list[dict[str, Any]]:
+    history_messages = getattr(sessions, "history_messages", None)
+    if callable(history_messages):
+        return history_messages(session_id, limit=limit, include_tools=include_tools)
     path = _session_file_path(sessions, session_id)
     if not path.exists():
         return []
@@ -1149,8 +1155,8 @@ class SessionStatusTool(Tool):
 
     async def run(self, arguments: dict[str, Any], ctx: ToolContext) -> str:
         session_id = _resolve_session_id(arguments, required=False) or ctx.session_id
-        path = _session_file_path(self.sessions, session_id)
-        exists = path.exists()
+        has_session = getattr(self.sessions, "has_session", None)
+        exists = bool(has_session(session_id)) if callable(has_session) else _session_file_path(self.sessions, session_id).exists()
         message_count = _count_session_messages(self.sessions, session_id) if exists else 0
         last_message = _last_message_preview(self.sessions, session_id)
         maintenance = await self.manager.sweep_async()
@@ -615,7 +615,9 @@ class SkillTool(Tool):
 
     async def _run_session_logs(self, arguments: dict[str, Any]) -> str:
         from clawlite.config.loader import load_config
+        from clawlite.session.sqlite_store import SQLiteSessionStore
         from clawlite.session.store import SessionStore
+        from clawlite.tools.sessions import _count_session_messages, _read_session_messages
 
         payload = self._skill_payload(arguments)
         config_path = self._skill_config_path(arguments)
@@ -629,41 +631,35 @@ class SkillTool(Tool):
         limit_raw = payload.get("limit", arguments.get("limit", 20))
         limit = max(1, min(200, int(limit_raw or 20)))
 
-        def _iter_rows(path: Path) -> list[dict[str, Any]]:
-            rows: list[dict[str, Any]] = []
-            for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
-                raw = line.strip()
-                if not raw:
-                    continue
-                try:
-                    decoded = json.loads(raw)
-                except Exception:
-                    continue
-                if not isinstance(decoded, dict):
-                    continue
-                rows.append(decoded)
-            return rows
-
-        def _resolve_session_path(raw_session_id: str) -> Path | None:
+        store: SessionStore | SQLiteSessionStore
+        if str(getattr(cfg.agents.defaults, "session_backend", "jsonl") or "jsonl") == "sqlite":
+            store = SQLiteSessionStore(root=sessions_root)
+        else:
             store = SessionStore(root=sessions_root)
-            candidate_names = [
-                store._safe_session_id(raw_session_id),
-                raw_session_id.replace(":", "_"),
-                raw_session_id.replace(":", "-"),
-            ]
-            seen: set[str] = set()
-            for candidate in candidate_names:
+
+        def _session_rows(resolved_session_id: str) -> list[dict[str, Any]]:
+            count = _count_session_messages(store, resolved_session_id)
+            if count <= 0:
+                return []
+            return _read_session_messages(store, resolved_session_id, limit=count)
+
+        def _resolve_session_id(raw_session_id: str) -> str | None:
+            has_session = getattr(store, "has_session", None)
+            if callable(has_session):
+                return raw_session_id if has_session(raw_session_id) else None
+            # JSONL logs written by older releases may use another file-name spelling.
+            for candidate in (raw_session_id, raw_session_id.replace(":", "_"), raw_session_id.replace(":", "-")):
                 clean = str(candidate or "").strip()
-                if not clean or clean in seen:
-                    continue
-                seen.add(clean)
-                path = sessions_root / f"{clean}.jsonl"
-                if path.exists():
-                    return path
+                if clean and (sessions_root / f"{store._safe_session_id(clean)}.jsonl").exists():
+                    return clean
             for path in sessions_root.glob("*.jsonl"):
-                rows = _iter_rows(path)
-                if any(str(row.get("session_id", "") or "").strip() == raw_session_id for row in rows):
-                    return path
+                for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+                    try:
+                        decoded = json.loads(line)
+                    except Exception:
+                        continue
+                    if isinstance(decoded, dict) and str(decoded.get("session_id", "") or "").strip() == raw_session_id:
+                        return store._restore_session_id(path.stem)
             return None
 
         def _matches(row: dict[str, Any]) -> bool:
@@ -679,66 +675,64 @@ class SkillTool(Tool):
                 return False
             return True
 
-        if session_id:
-            path = _resolve_session_path(session_id)
-            if path is None:
-                return json.dumps({"status": "failed", "error": "session_not_found", "session_id": session_id}, ensure_ascii=False)
-            rows = [row for row in _iter_rows(path) if _matches(row)]
-            rows = rows[-limit:]
-            role_counts: dict[str, int] = {}
-            for row in rows:
-                role = str(row.get("role", "")).strip().lower()
-                if role:
-                    role_counts[role] = role_counts.get(role, 0) + 1
-            return json.dumps(
-                {
-                    "status": "ok",
-                    "session_id": session_id,
-                    "count": len(rows),
-                    "role_counts": role_counts,
-                    "messages": rows,
-                },
-                ensure_ascii=False,
-            )
+        try:
+            if session_id:
+                resolved = _resolve_session_id(session_id)
+                if resolved is None:
+                    return json.dumps({"status": "failed", "error": "session_not_found", "session_id": session_id}, ensure_ascii=False)
+                rows = [row for row in _session_rows(resolved) if _matches(row)]
+                rows = rows[-limit:]
+                role_counts: dict[str, int] = {}
+                for row in rows:
+                    role = str(row.get("role", "")).strip().lower()
+                    if role:
+                        role_counts[role] = role_counts.get(role, 0) + 1
+                return json.dumps(
+                    {
+                        "status": "ok",
+                        "session_id": session_id,
+                        "count": len(rows),
+                        "role_counts": role_counts,
+                        "messages": rows,
+                    },
+                    ensure_ascii=False,
+                )
 
-        session_rows: list[dict[str, Any]] = []
-        for path in sorted(sessions_root.glob("*.jsonl"), key=lambda item: item.stat().st_mtime_ns, reverse=True):
-            rows = _iter_rows(path)
-            resolved_session_id = str(path.stem)
-            if rows:
-                first_session_id = str(rows[0].get("session_id", "") or "").strip()
-                if first_session_id:
-                    resolved_session_id = first_session_id
-            if query or role_filter or channel_filter:
-                matched = [row for row in rows if _matches(row)]
-                if not matched:
-                    continue
-                for row in matched[:limit]:
+            session_rows: list[dict[str, Any]] = []
+            for listed_session_id in store.list_sessions():
+                if query or role_filter or channel_filter:
+                    matched = [row for row in _session_rows(listed_session_id) if _matches(row)]
+                    if not matched:
+                        continue
+                    for row in matched[:limit]:
+                        session_rows.append(
+                            {
+                                "session_id": listed_session_id,
+                                "ts": str(row.get("ts", "") or ""),
+                                "role": str(row.get("role", "") or ""),
+                                "content": str(row.get("content", "") or ""),
+                                "metadata": row.get("metadata", {}) if isinstance(row.get("metadata", {}), dict) else {},
+                            }
+                        )
+                        if len(session_rows) >= limit:
+                            break
+                else:
+                    latest = _read_session_messages(store, listed_session_id, limit=1)
+                    preview = latest[-1] if latest else {}
                     session_rows.append(
                         {
-                            "session_id": resolved_session_id,
-                            "ts": str(row.get("ts", "") or ""),
-                            "role": str(row.get("role", "") or ""),
-                            "content": str(row.get("content", "") or ""),
-                            "metadata": row.get("metadata", {}) if isinstance(row.get("metadata", {}), dict) else {},
+                            "session_id": listed_session_id,
+                            "message_count": _count_session_messages(store, listed_session_id),
+                            "last_ts": str(preview.get("ts", "") or ""),
+                            "last_role": str(preview.get("role", "") or ""),
+                            "last_content": str(preview.get("content", "") or "")[:160],
                         }
                     )
-                    if len(session_rows) >= limit:
-                        break
-            else:
-                preview = rows[-1] if rows else {}
-                session_rows.append(
-                    {
-                        "session_id": resolved_session_id,
-                        "message_count": len(rows),
-                        "last_ts": str(preview.get("ts", "") or ""),
-                        "last_role": str(preview.get("role", "") or ""),
-                        "last_content": str(preview.get("content", "") or "")[:160],
-                    }
-                )
-            if len(session_rows) >= limit:
-                break
-        return json.dumps({"status": "ok", "count": len(session_rows), "sessions": session_rows[:limit]}, ensure_ascii=False)
+                if len(session_rows) >= limit:
+                    break
+            return json.dumps({"status": "ok", "count": len(session_rows), "sessions": session_rows[:limit]}, ensure_ascii=False)
+        finally:
+            store.close()
 
     async def _run_coding_agent(self, arguments: dict[str, Any], ctx: ToolContext) -> str:
         payload = self._skill_payload(arguments)
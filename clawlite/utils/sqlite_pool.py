@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+SQLITE_POOL_READERS = 4
+SQLITE_POOL_CACHED_STATEMENTS = 256
+SQLITE_POOL_CACHE_SIZE_KIB = 16384
+SQLITE_POOL_MMAP_SIZE = 256 * 1024 * 1024
+SQLITE_POOL_BUSY_TIMEOUT_MS = 5000
+
+
+class SQLiteConnectionPool:
+    """Long-lived SQLite connections: one serialized writer, several readers.
+
+    Every connection is opened once with ``synchronous=NORMAL``, a page cache,
+    memory-mapped I/O and a busy timeout, and keeps its own prepared-statement
+    cache (``cached_statements``), so repeated queries skip both connection
+    setup and SQL compilation. The database runs in WAL mode, which lets the
+    readers proceed while the writer commits.
+
+    :meth:`writer` hands out the single writer connection under a lock;
+    :meth:`reader` borrows one of up to ``readers`` reader connections,
+    opening them lazily and blocking when all are busy. Borrowed connections
+    are returned with no transaction left open: anything uncommitted is
+    rolled back, matching what closing a short-lived connection used to do.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        readers: int = SQLITE_POOL_READERS,
+        cached_statements: int = SQLITE_POOL_CACHED_STATEMENTS,
+        cache_size_kib: int = SQLITE_POOL_CACHE_SIZE_KIB,
+        mmap_size: int = SQLITE_POOL_MMAP_SIZE,
+        busy_timeout_ms: int = SQLITE_POOL_BUSY_TIMEOUT_MS,
+        on_connect: Callable[[sqlite3.Connection], None] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.max_readers = max(1, int(readers))
+        self.cached_statements = max(0, int(cached_statements))
+        self.cache_size_kib = max(0, int(cache_size_kib))
+        self.mmap_size = max(0, int(mmap_size))
+        self.busy_timeout_ms = max(0, int(busy_timeout_ms))
+        self._on_connect = on_connect
+        self._write_lock = threading.RLock()
+        self._writer: sqlite3.Connection | None = None
+        self._readers_cond = threading.Condition()
+        self._idle: list[sqlite3.Connection] = []
+        self._open_readers = 0
+        self._closed = False
+        self.stats: dict[str, int] = {
+            "connections_opened": 0,
+            "reader_acquires": 0,
+            "reader_waits": 0,
+            "writer_acquires": 0,
+            "writer_wait_ms": 0,
+            "batched_rows": 0,
+        }
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(self.path),
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kib}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if self._on_connect is not None:
+            self._on_connect(conn)
+        self.stats["connections_opened"] += 1
+        return conn
+
+    @staticmethod
+    def _reset(conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        started = time.perf_counter()
+        with self._write_lock:
+            if self._closed:
+                raise RuntimeError("sqlite connection pool is closed")
+            self.stats["writer_acquires"] += 1
+            self.stats["writer_wait_ms"] += int((time.perf_counter() - started) * 1000)
+            if self._writer is None:
+                self._writer = self._open()
+            conn = self._writer
+            try:
+                yield conn
+            finally:
+                self._reset(conn)
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn: sqlite3.Connection | None = None
+        with self._readers_cond:
+            if self._closed:
+                raise RuntimeError("sqlite connection pool is closed")
+            self.stats["reader_acquires"] += 1
+            if not self._idle and self._open_readers >= self.max_readers:
+                self.stats["reader_waits"] += 1
+                while not self._idle and not self._closed:
+                    self._readers_cond.wait()
+                if self._closed:
+                    raise RuntimeError("sqlite connection pool is closed")
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                self._open_readers += 1
+        if conn is None:
+            try:
+                conn = self._open()
+            except Exception:
+                with self._readers_cond:
+                    self._open_readers -= 1
+                    self._readers_cond.notify()
+                raise
+        try:
+            yield conn
+        finally:
+            self._reset(conn)
+            with self._readers_cond:
+                if self._closed:
+                    conn.close()
+                else:
+                    self._idle.append(conn)
+                self._readers_cond.notify()
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> int:
+        """Run one statement over ``rows`` in a single writer transaction."""
+        batch = list(rows)
+        if not batch:
+            return 0
+        with self.writer() as conn:
+            cursor = conn.executemany(sql, batch)
+            conn.commit()
+            self.stats["batched_rows"] += len(batch)
+            return int(cursor.rowcount or 0)
+
+    def close(self) -> None:
+        with self._write_lock:
+            with self._readers_cond:
+                self._closed = True
+                idle, self._idle = self._idle, []
+                self._open_readers -= len(idle)
+                self._readers_cond.notify_all()
+            for conn in idle:
+                conn.close()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def snapshot(self) -> dict[str, int]:
+        with self._readers_cond:
+            return {
+                **self.stats,
+                "readers_open": self._open_readers,
+                "readers_idle": len(self._idle),
+                "readers_max": self.max_readers,
+                "writer_open": int(self._writer is not None),
+            }
+
+
+__all__ = [
+    "SQLITE_POOL_BUSY_TIMEOUT_MS",
+    "SQLITE_POOL_CACHED_STATEMENTS",
+    "SQLITE_POOL_CACHE_SIZE_KIB",
+    "SQLITE_POOL_MMAP_SIZE",
+    "SQLITE_POOL_READERS",
+    "SQLiteConnectionPool",
+]
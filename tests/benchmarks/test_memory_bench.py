@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import math
+
+from benchmarks.corpus import corpus_record, fake_embedding, write_corpus_stream
+from benchmarks.memory_bench import SCOPED_USERS, _import_scoped_slices, compare_results, main, percentile, run_suite
+from clawlite.core.memory import MemoryStore
+
+
+def test_corpus_is_deterministic_per_seed() -> None:
+    assert corpus_record(42, seed=7) == corpus_record(42, seed=7)
+    assert corpus_record(42, seed=7) != corpus_record(42, seed=8)
+    assert corpus_record(3, seed=1)["id"] == "bench-0000003"
+    assert corpus_record(3, seed=1, scope="user-01")["id"] == "bench-user-01-0000003"
+    assert corpus_record(3, seed=1, scope="user-01")["text"] != corpus_record(3, seed=1)["text"]
+
+
+def test_fake_embedding_is_unit_length_and_stable() -> None:
+    vector = fake_embedding("deploy the atlas roadmap")
+    assert vector == fake_embedding("deploy the atlas roadmap")
+    assert math.isclose(sum(value * value for value in vector), 1.0, rel_tol=1e-9)
+    assert fake_embedding("") != [0.0] * len(vector)
+
+
+def test_write_corpus_stream_matches_import_format(tmp_path) -> None:
+    path = tmp_path / "corpus.ndjson"
+    assert write_corpus_stream(path, 5, seed=7) == 5
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["kind"] for line in lines] == ["header"] + ["history"] * 5 + ["end"]
+    assert lines[-1]["counts"] == {"history": 5, "curated": 0}
+
+
+def test_scoped_slices_fill_every_user_and_the_shared_scope(tmp_path) -> None:
+    store = MemoryStore(tmp_path / "memory" / "memory.jsonl")
+
+    imported = _import_scoped_slices(store, tmp_path / "slice.ndjson", 20, seed=7)
+
+    assert imported == 20 * (SCOPED_USERS + 1)
+    assert store.shared_opt_in("user-03")
+    for scope in (store._scope_paths(user_id="user-03"), store._scope_paths(shared=True)):
+        assert len(store._read_history_records_from(scope["history"])) == 20
+    assert store.all() == []
+
+
+def test_percentile_interpolates() -> None:
+    assert percentile([], 95) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+    assert percentile([0.0, 10.0], 95) == 9.5
+
+
+def test_compare_results_flags_regressions_and_ignores_noise() -> None:
+    def _result(search_p95: float, add_p95: float, rss: int) -> dict:
+        return {
+            "cases": [
+                {
+                    "backend": "sqlite",
+                    "size": 1000,
+                    "peak_rss_kib": rss,
+                    "ops": {"search": {"p95_ms": search_p95}, "add": {"p95_ms": add_p95}},
+                }
+            ]
+        }
+
+    baseline = _result(10.0, 0.2, 100_000)
+    assert compare_results(_result(11.0, 0.6, 110_000), baseline) == []
+    regressions = compare_results(_result(20.0, 0.6, 200_000), baseline, threshold=0.25)
+    assert {row["metric"] for row in regressions} == {"search.p95_ms", "peak_rss_kib"}
+    assert compare_results(_result(20.0, 0.2, 100_000), {"cases": []}) == []
+
+
+def test_run_suite_in_process_reports_every_op(tmp_path) -> None:
+    result = run_suite([60], ["sqlite"], seed=3, samples=3, isolate=False)
+    assert result["schema"] == 1
+    (case,) = result["cases"]
+    assert case["backend"] == "sqlite" and case["size"] == 60
+    assert set(case["ops"]) == {"add", "add_scoped", "search", "search_scoped", "retrieve", "consolidate", "prune", "snapshot"}
+    assert case["ops"]["search"]["count"] == 3
+    assert case["ops"]["search"]["p95_ms"] >= case["ops"]["search"]["p50_ms"] > 0.0
+
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text(json.dumps(result), encoding="utf-8")
+    out_path = tmp_path / "current.json"
+    status = main(
+        ["--sizes", "60", "--backends", "sqlite", "--samples", "3", "--seed", "3", "--in-process",
+         "--out", str(out_path), "--baseline", str(baseline_path), "--threshold", "1000"]
+    )
+    assert status == 0
+    assert json.loads(out_path.read_text(encoding="utf-8"))["baseline"]["regressions"] == []
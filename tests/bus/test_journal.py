@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import pytest
@@ -94,6 +96,79 @@ def test_journal_closed_does_not_crash():
     assert journal.unacked_inbound() == []
 
 
+def test_journal_batches_writes_into_one_transaction(tmp_path):
+    db = tmp_path / "bus.db"
+    journal = BusJournal(db, flush_interval_s=10.0)
+    journal.open()
+
+    row_ids = [
+        journal.append_inbound(InboundEvent(channel="c", session_id="s", user_id="u", text=f"m{idx}"))
+        for idx in range(20)
+    ]
+    for row_id in row_ids[:15]:
+        journal.ack_inbound(row_id)
+    assert row_ids == list(range(row_ids[0], row_ids[0] + 20))
+    assert journal.snapshot()["batches"] == 0
+
+    unacked = journal.unacked_inbound()
+    assert [row_id for row_id, _event in unacked] == row_ids[15:]
+    snapshot = journal.snapshot()
+    assert snapshot["batches"] == 1
+    assert snapshot["acks_folded"] == 15
+    journal.close()
+
+    with sqlite3.connect(str(db)) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_journal_prunes_acked_rows_and_keeps_ids_unique(tmp_path):
+    db = tmp_path / "bus.db"
+    journal = BusJournal(db, acked_retention_s=60.0)
+    journal.open()
+    first = journal.append_outbound(OutboundEvent(channel="c", session_id="s", target="t", text="old"))
+    journal.ack_outbound(first)
+    pending = journal.append_outbound(OutboundEvent(channel="c", session_id="s", target="t", text="pending"))
+    journal.flush()
+
+    assert journal.prune_acked() == 0
+    assert journal.prune_acked(now=datetime.now(timezone.utc) + timedelta(minutes=5)) == 1
+    assert [row_id for row_id, _event in journal.unacked_outbound()] == [pending]
+    journal.close()
+
+    reopened = BusJournal(db)
+    reopened.open()
+    assert reopened.append_outbound(OutboundEvent(channel="c", session_id="s", target="t", text="new")) == pending + 1
+    reopened.close()
+
+
+def test_journal_retries_failed_batches_and_reports_dropped_writes(tmp_path):
+    journal = BusJournal(tmp_path / "bus.db", max_write_attempts=3)
+    journal.open()
+    write_batch = journal._write_batch
+    failures = {"left": 2}
+
+    def _flaky_write(inserts, acks):
+        if failures["left"]:
+            failures["left"] -= 1
+            journal.failures += 1
+            return False
+        return write_batch(inserts, acks)
+
+    journal._write_batch = _flaky_write
+    kept = journal.append_inbound(InboundEvent(channel="c", session_id="s", user_id="u", text="kept"))
+    assert journal.flush(timeout=5.0) is True
+    assert [row_id for row_id, _event in journal.unacked_inbound()] == [kept]
+    assert journal.snapshot()["failures"] == 2
+    assert journal.snapshot()["dropped"] == 0
+
+    failures["left"] = 3
+    journal.append_inbound(InboundEvent(channel="c", session_id="s", user_id="u", text="lost"))
+    assert journal.flush(timeout=5.0) is False
+    assert journal.snapshot()["dropped"] == 1
+    assert [row_id for row_id, _event in journal.unacked_inbound()] == [kept]
+    journal.close()
+
+
 # ---------------------------------------------------------------------------
 # MessageQueue integration with journal
 # ---------------------------------------------------------------------------
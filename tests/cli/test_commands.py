@@ -31,6 +31,8 @@ from clawlite.channels.telegram_pairing import TelegramPairingStore
 from clawlite.config.loader import load_config
 from clawlite.core.skills import SkillsLoader
 from clawlite.providers.probe_cache import save_provider_probe_snapshot
+from clawlite.session.sqlite_store import SQLiteSessionStore
+from clawlite.session.store import SessionStore
 from clawlite.workspace.loader import TEMPLATE_FILES
 from clawlite.workspace.loader import WorkspaceLoader
 
@@ -3617,6 +3619,53 @@ def test_cli_memory_export_and_import_roundtrip(tmp_path: Path, capsys) -> None:
     assert ids == {"exp-a"}
 
 
+def test_cli_memory_export_and_import_ndjson_stream(tmp_path: Path, capsys) -> None:
+    state_path = tmp_path / "state"
+    state_path.mkdir(parents=True, exist_ok=True)
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "workspace_path": str(tmp_path / "workspace"),
+                "state_path": str(state_path),
+                "provider": {"model": "openai/gpt-4o-mini"},
+            }
+        ),
+        encoding="utf-8",
+    )
+    history_path = state_path / "memory.jsonl"
+    history_path.write_text(
+        json.dumps(
+            {
+                "id": "ndjson-a",
+                "text": "streamed baseline",
+                "source": "session:export",
+                "created_at": "2026-03-04T00:00:00+00:00",
+            }
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+
+    export_path = tmp_path / "memory-export.ndjson.gz"
+    rc_export = main(
+        ["--config", str(config_path), "memory", "export", "--format", "ndjson", "--out", str(export_path)]
+    )
+    assert rc_export == 0
+    export_payload = json.loads(capsys.readouterr().out)
+    assert export_payload["format"] == "ndjson"
+    assert export_payload["counts"]["history"] == 1
+
+    history_path.write_text("", encoding="utf-8")
+    rc_import = main(["--config", str(config_path), "memory", "import", str(export_path)])
+    assert rc_import == 0
+    import_payload = json.loads(capsys.readouterr().out)
+    assert import_payload["ok"] is True
+    assert import_payload["format"] == "ndjson"
+    ids = {json.loads(line)["id"] for line in history_path.read_text(encoding="utf-8").splitlines() if line.strip()}
+    assert ids == {"ndjson-a"}
+
+
 def test_cli_memory_branching_commands_return_expected_shapes(
     tmp_path: Path, capsys
 ) -> None:
@@ -3920,6 +3969,131 @@ def test_cli_memory_share_optin_enable_returns_enabled_true(
     assert payload == {"ok": True, "user_id": "42", "enabled": True}
 
 
+def test_cli_memory_vector_index_rebuild_trains_sqlite_index(tmp_path: Path, capsys) -> None:
+    from clawlite.cli.ops import _build_memory_store
+    from clawlite.config.loader import load_config
+
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "workspace_path": str(tmp_path / "workspace"),
+                "state_path": str(tmp_path / "state"),
+                "provider": {"model": "openai/gpt-4o-mini"},
+            }
+        ),
+        encoding="utf-8",
+    )
+    store = _build_memory_store(load_config(str(config_path)))
+    for idx in range(12):
+        vector = [0.0, 0.0, 0.0]
+        vector[idx % 3] = 1.0 + idx / 100.0
+        store.backend.upsert_embedding(f"row-{idx}", vector, "2026-03-01T00:00:00+00:00", "seed")
+
+    rc = main(["--config", str(config_path), "memory", "vector-index"])
+    assert rc == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["backend"] == "sqlite"
+    assert payload["rebuilt"] is False
+    assert payload["dimensions"]["3"]["trained"] is False
+
+    rc = main(["--config", str(config_path), "memory", "vector-index", "--rebuild", "--lists", "3"])
+    assert rc == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["ok"] is True
+    assert payload["rebuilt"] is True
+    assert payload["dimensions"]["3"]["trained"] is True
+    assert payload["dimensions"]["3"]["lists"] == 3
+    assert payload["dimensions"]["3"]["rows"] == 12
+
+
+def test_cli_memory_migrate_embeddings_rewrites_json_rows_into_sidecar(tmp_path: Path, capsys) -> None:
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "workspace_path": str(tmp_path / "workspace"),
+                "state_path": str(tmp_path / "state"),
+                "provider": {"model": "openai/gpt-4o-mini"},
+            }
+        ),
+        encoding="utf-8",
+    )
+    embeddings_path = tmp_path / "memory" / "embeddings" / "embeddings.jsonl"
+    embeddings_path.parent.mkdir(parents=True, exist_ok=True)
+    embeddings_path.write_text(
+        "\n".join(
+            json.dumps({"id": f"e{idx}", "embedding": [0.125 * idx] * 64, "created_at": "", "source": "seed"})
+            for idx in range(1, 4)
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+
+    rc = main(["--config", str(config_path), "memory", "migrate-embeddings"])
+    assert rc == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["ok"] is True
+    assert payload["format"] == "float32"
+    assert payload["file"]["rows"] == 3
+    assert payload["file"]["bytes_after"] < payload["file"]["bytes_before"]
+    assert (embeddings_path.parent / "embeddings.f32").stat().st_size == 3 * 64 * 4
+
+
+def test_cli_memory_compact_drops_blank_history_lines(tmp_path: Path, capsys) -> None:
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "workspace_path": str(tmp_path / "workspace"),
+                "state_path": str(tmp_path / "state"),
+                "provider": {"model": "openai/gpt-4o-mini"},
+            }
+        ),
+        encoding="utf-8",
+    )
+    history_path = tmp_path / "state" / "memory.jsonl"
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    row = json.dumps({"id": "m1", "text": "keep me", "source": "seed", "created_at": "2026-03-17T00:00:00+00:00"})
+    history_path.write_text(" " * 40 + "\n" + row + "   \n", encoding="utf-8")
+
+    rc = main(["--config", str(config_path), "memory", "compact"])
+    assert rc == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["ok"] is True
+    assert payload["reclaimed_bytes"] == 44
+    assert history_path.read_text(encoding="utf-8") == row + "\n"
+
+
+def test_cli_sessions_migrate_imports_jsonl_logs(tmp_path: Path, capsys) -> None:
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "workspace_path": str(tmp_path / "workspace"),
+                "state_path": str(tmp_path / "state"),
+                "provider": {"model": "openai/gpt-4o-mini"},
+                "agents": {"defaults": {"session_backend": "sqlite"}},
+            }
+        ),
+        encoding="utf-8",
+    )
+    legacy = SessionStore(root=tmp_path / "state" / "sessions")
+    legacy.append("telegram:7", "user", "hello")
+    legacy.append("telegram:7", "assistant", "hi there")
+
+    rc = main(["--config", str(config_path), "sessions", "migrate"])
+    assert rc == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["ok"] is True
+    assert payload["migrated_sessions"] == 1
+    assert payload["migrated_messages"] == 2
+    assert SQLiteSessionStore(root=tmp_path / "state" / "sessions").read("telegram:7") == [
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "hi there"},
+    ]
+
+
 def test_cli_new_memory_commands_do_not_import_gateway_runtime(
     tmp_path: Path, capsys
 ) -> None:
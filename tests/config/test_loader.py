@@ -870,6 +870,28 @@ def test_load_config_agent_defaults_session_retention_ttl_camel_case(tmp_path: P
     assert cfg.agents.defaults.session_retention_ttl_s == 3600
 
 
+def test_load_config_agent_defaults_session_durability(tmp_path: Path) -> None:
+    path = tmp_path / "config.json"
+    path.write_text(
+        json.dumps(
+            {
+                "agents": {
+                    "defaults": {
+                        "sessionDurability": "Buffered",
+                        "sessionCommitWindowS": 5,
+                    }
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    cfg = load_config(path)
+    assert cfg.agents.defaults.session_durability == "buffered"
+    assert cfg.agents.defaults.session_commit_window_s == 1.0
+    assert load_config(tmp_path / "missing.json").agents.defaults.session_durability == "group"
+
+
 def test_load_config_gateway_diagnostics_include_provider_telemetry_snake_and_camel(tmp_path: Path) -> None:
     path_snake = tmp_path / "snake.json"
     path_snake.write_text(
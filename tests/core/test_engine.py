@@ -2851,14 +2851,16 @@ def test_engine_run_defers_memory_persistence_until_after_transcript_write() ->
                 return await super().complete(messages=messages, tools=tools)
 
         engine.provider = _SecondProvider("second")
-        second_task = asyncio.create_task(engine.run(session_id="cli:deferred", user_text="again"))
-        await asyncio.sleep(0.05)
-        assert second_started.is_set() is False
-
-        memory.allow_memorize.set()
-        second = await asyncio.wait_for(second_task, timeout=1.0)
+        second = await asyncio.wait_for(
+            engine.run(session_id="cli:deferred", user_text="again"),
+            timeout=1.0,
+        )
         assert second.text == "second"
         assert second_started.is_set() is True
+        assert memory.memorize_calls == []
+
+        memory.allow_memorize.set()
+        await asyncio.wait_for(engine.drain_turn_persistence(), timeout=2.0)
         assert memory.memorize_calls[0] == {
             "messages": [
                 {"role": "user", "content": "ping"},
@@ -2873,7 +2875,10 @@ def test_engine_run_defers_memory_persistence_until_after_transcript_write() ->
             "memory_type": None,
             "happened_at": None,
         }
-        assert len(memory.memorize_calls) >= 1
+        assert memory.memorize_calls[1]["messages"] == [
+            {"role": "user", "content": "again"},
+            {"role": "assistant", "content": "second"},
+        ]
         assert memory.working_set_writes[:2] == [
             {
                 "session_id": "cli:deferred",
@@ -4221,7 +4226,8 @@ def test_engine_memory_planner_expands_same_query_after_probe_when_no_rewrite_ap
         out = await engine.run(session_id="cli:memory-probe-expand", user_text=query)
         assert out.text == "ok"
         assert memory.search_calls == [query, query, query]
-        assert memory.search_call_details == [
+        # The expanded and subagent-digest probes run concurrently.
+        assert memory.search_call_details[:1] + sorted(memory.search_call_details[1:], key=lambda item: item["limit"]) == [
             {
                 "query": query,
                 "limit": 4,
@@ -4278,7 +4284,7 @@ def test_engine_memory_planner_next_query_rewrites_after_insufficient_first_hit(
         out = await engine.run(session_id="cli:next-query", user_text=original_query)
         assert out.text == "ok"
         assert memory.search_calls == [original_query, rewritten_query, rewritten_query]
-        assert memory.search_call_details == [
+        assert memory.search_call_details[:1] + sorted(memory.search_call_details[1:], key=lambda item: item["limit"]) == [
             {
                 "query": original_query,
                 "limit": 4,
@@ -4334,7 +4340,9 @@ def test_engine_memory_planner_next_query_rewrites_when_temporal_intent_lacks_te
 
         out = await engine.run(session_id="cli:temporal-next-query", user_text=original_query)
         assert out.text == "ok"
-        assert memory.search_calls == [original_query, rewritten_query]
+        # The digest probe is issued alongside the rewrite and dropped once the rewrite is sufficient.
+        assert memory.search_calls == [original_query, rewritten_query, rewritten_query]
+        assert engine.retrieval_metrics_snapshot()["retrieval_attempts"] == 2
 
     asyncio.run(_scenario())
 
@@ -4546,7 +4554,7 @@ def test_engine_retrieval_metrics_latency_buckets_accounting(monkeypatch) -> Non
 
     run_log = bind_event("tests.engine.latency")
     for query in queries:
-        snippets = engine._plan_memory_snippets(user_text=query, run_log=run_log)
+        snippets = asyncio.run(engine._plan_memory_snippets_async(user_text=query, run_log=run_log))
         assert snippets
 
     snapshot = engine.retrieval_metrics_snapshot()
@@ -4588,11 +4596,13 @@ def test_engine_planner_merges_parent_subagent_digest_when_primary_memory_is_wea
     engine = AgentEngine(provider=provider, tools=FakeTools(), memory=memory)
     run_log = bind_event("tests.engine.subagent-digest-planner")
 
-    snippets = engine._plan_memory_snippets(
-        session_id="cli:owner",
-        user_id="u-1",
-        user_text=query,
-        run_log=run_log,
+    snippets = asyncio.run(
+        engine._plan_memory_snippets_async(
+            session_id="cli:owner",
+            user_id="u-1",
+            user_text=query,
+            run_log=run_log,
+        )
     )
 
     assert len(snippets) == 2
@@ -4655,17 +4665,58 @@ def test_engine_planner_filters_foreign_subagent_digests_by_parent_session() ->
     engine = AgentEngine(provider=provider, tools=FakeTools(), memory=memory)
     run_log = bind_event("tests.engine.subagent-digest-scope")
 
-    snippets = engine._plan_memory_snippets(
-        session_id="cli:owner",
-        user_id="u-1",
-        user_text=query,
-        run_log=run_log,
+    snippets = asyncio.run(
+        engine._plan_memory_snippets_async(
+            session_id="cli:owner",
+            user_id="u-1",
+            user_text=query,
+            run_log=run_log,
+        )
     )
 
     assert any("[src:subagent-digest:cli:owner]" in item for item in snippets)
     assert all("[src:subagent-digest:cli:other]" not in item for item in snippets)
 
 
+def test_engine_async_planner_stops_before_follow_up_probes() -> None:
+    async def _scenario() -> None:
+        query = "what did we decide about deployment schedule yesterday"
+        memory = FakePlannerMemory(
+            {
+                query: [
+                    MemoryRecord(
+                        id="weak-hit",
+                        text="Random reminder unrelated to request.",
+                        source="session:cli:x",
+                        created_at="2026-03-04T12:00:00+00:00",
+                    )
+                ]
+            }
+        )
+        engine = AgentEngine(provider=FakePromptCaptureProvider(), tools=FakeTools(), memory=memory)
+        stop_event = asyncio.Event()
+        original_search = memory.search
+
+        def _search_then_stop(*args, **kwargs):
+            rows = original_search(*args, **kwargs)
+            stop_event.set()
+            return rows
+
+        memory.search = _search_then_stop  # type: ignore[method-assign]
+
+        snippets = await engine._plan_memory_snippets_async(
+            session_id="cli:stop-planner",
+            user_text=query,
+            run_log=bind_event("tests.engine.async-planner-stop"),
+            stop_event=stop_event,
+        )
+
+        assert snippets == []
+        assert memory.search_calls == [query]
+
+    asyncio.run(_scenario())
+
+
 def test_engine_respects_stop_event_before_provider_call() -> None:
     async def _scenario() -> None:
         provider = FakeNeverCalledProvider()
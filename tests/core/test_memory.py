@@ -94,21 +94,51 @@ def test_memory_semantic_add_writes_embedding_file_when_enabled(tmp_path: Path,
     assert len(lines) == 1
     payload = json.loads(lines[0])
     assert payload["id"] == row.id
-    assert payload["embedding"] == [0.25, 0.75]
+    assert "embedding" not in payload
+    assert payload["offset"] == 0
+    assert payload["dim"] == 2
     assert payload["source"] == "user"
     assert payload["created_at"] == row.created_at
+    assert store.embedding_vectors_path.stat().st_size == 8
+    assert store._read_embeddings_map()[row.id] == [0.25, 0.75]
 
 
-def test_memory_semantic_backfill_populates_missing_embeddings_without_duplicates(tmp_path: Path, monkeypatch) -> None:
-    def _fake_embedding(self: MemoryStore, text: str) -> list[float] | None:
-        lowered = text.lower()
-        if "history" in lowered:
-            return [1.0, 0.0]
-        if "curated" in lowered:
-            return [0.0, 1.0]
-        return [0.5, 0.5]
+def test_memory_embedding_migration_compacts_json_and_sidecar_rows(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl", memory_embedding_format="json")
+    store._append_embedding(record_id="e1", embedding=[0.5, 0.25], created_at="2026-03-01T00:00:00+00:00", source="seed")
+    store._append_embedding(record_id="e2", embedding=[1.0, 0.0], created_at="2026-03-01T00:00:01+00:00", source="seed")
+    store.embedding_format = "float32"
+    store._append_embedding(record_id="e1", embedding=[0.0, 1.0], created_at="2026-03-01T00:00:02+00:00", source="seed")
 
-    monkeypatch.setattr(MemoryStore, "_generate_embedding", _fake_embedding)
+    payload = store.migrate_embedding_storage()
+
+    assert payload["format"] == "float32"
+    assert payload["file"]["rows"] == 2
+    lines = [json.loads(line) for line in store.embeddings_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    assert [(row["id"], row["offset"], row["dim"]) for row in lines] == [("e1", 0, 2), ("e2", 8, 2)]
+    assert store.embedding_vectors_path.stat().st_size == 16
+    assert store._read_embeddings_map() == {"e1": [0.0, 1.0], "e2": [1.0, 0.0]}
+
+    store.migrate_embedding_storage(embedding_format="json")
+    lines = [json.loads(line) for line in store.embeddings_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    assert lines[0]["embedding"] == [0.0, 1.0]
+    assert not store.embedding_vectors_path.exists()
+
+
+def test_memory_semantic_backfill_populates_missing_embeddings_without_duplicates(tmp_path: Path, monkeypatch) -> None:
+    def _fake_embed_texts(self: MemoryStore, texts: list[str]) -> list[list[float] | None]:
+        out: list[list[float] | None] = []
+        for text in texts:
+            lowered = text.lower()
+            if "history" in lowered:
+                out.append([1.0, 0.0])
+            elif "curated" in lowered:
+                out.append([0.0, 1.0])
+            else:
+                out.append([0.5, 0.5])
+        return out
+
+    monkeypatch.setattr(MemoryStore, "_embed_texts", _fake_embed_texts)
 
     store = MemoryStore(tmp_path / "memory.jsonl", semantic_enabled=True)
     store.history_path.write_text(
@@ -158,6 +188,74 @@ def test_memory_semantic_backfill_populates_missing_embeddings_without_duplicate
     assert sorted(ids) == ["cur001", "hist001"]
 
 
+def test_memory_backfill_batches_provider_calls_and_reuses_cached_text(tmp_path: Path, monkeypatch) -> None:
+    calls: list[list[str]] = []
+
+    def _fake_embed_texts(self: MemoryStore, texts: list[str]) -> list[list[float] | None]:
+        calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    monkeypatch.setattr(MemoryStore, "_embed_texts", _fake_embed_texts)
+    store = MemoryStore(tmp_path / "memory.jsonl", semantic_enabled=True, memory_embedding_batch_size=4)
+    rows = [
+        json.dumps({"id": f"row{idx}", "text": f"backfill row {idx}", "source": "seed", "created_at": "2026-03-01T00:00:00+00:00"})
+        for idx in range(10)
+    ]
+    store.history_path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+    result = store.backfill_embeddings(concurrency=2)
+
+    assert result["created"] == 10
+    assert sorted(len(batch) for batch in calls) == [2, 4, 4]
+    assert store._read_embeddings_map()["row3"] == [float(len("backfill row 3")), 1.0]
+
+    calls.clear()
+    fresh = MemoryStore(tmp_path / "memory.jsonl", semantic_enabled=True)
+    assert fresh._generate_embedding("backfill row 3") == [float(len("backfill row 3")), 1.0]
+    assert fresh._generate_embedding("never seen before") == [float(len("never seen before")), 1.0]
+    assert calls == [["never seen before"]]
+
+
+def test_memory_embedding_provider_replaces_the_litellm_models(tmp_path: Path) -> None:
+    calls: list[list[str]] = []
+
+    def _provider(texts: list[str]) -> list[list[float] | None]:
+        calls.append(list(texts))
+        return [[1.0, float(len(text))] for text in texts]
+
+    store = MemoryStore(tmp_path / "memory.jsonl", semantic_enabled=True, embedding_provider=_provider)
+    assert store._generate_embedding("provider text") == [1.0, float(len("provider text"))]
+    assert store._generate_embedding("provider text") == [1.0, float(len("provider text"))]
+    assert calls == [["provider text"]]
+
+
+def test_memory_embedding_service_coalesces_concurrent_requests(tmp_path: Path) -> None:
+    from clawlite.core.memory_embedding_service import EmbeddingCache, EmbeddingService
+
+    batches: list[list[str]] = []
+
+    def _embed_batch(texts: list[str]) -> list[list[float] | None]:
+        batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    service = EmbeddingService(
+        _embed_batch,
+        cache=EmbeddingCache(tmp_path / "cache.sqlite3"),
+        batch_size=16,
+        concurrency=1,
+        coalesce_window_s=0.05,
+    )
+    texts = [f"text {idx}" for idx in range(8)] + ["text 0"]
+    with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+        results = list(pool.map(service.embed, texts))
+
+    assert results == [[float(len(text))] for text in texts]
+    assert sum(len(batch) for batch in batches) == 8
+    assert len(batches) < 8
+    assert service.embed("text 3") == [6.0]
+    assert service.snapshot()["cache_hits"] >= 1
+
+
 def test_memory_search_hybrid_semantic_and_bm25_ranks_by_combined_score(tmp_path: Path, monkeypatch) -> None:
     class _FakeBM25:
         def __init__(self, _corpus: object) -> None:
@@ -542,6 +640,132 @@ def test_memory_search_is_deterministic_for_repeated_queries(tmp_path: Path) ->
     assert first == second
 
 
+def test_memory_search_ranks_full_text_candidates_without_scanning_history(tmp_path: Path, monkeypatch) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl")
+    store.add("The deploy window for project alpha is Tuesday", source="user")
+    for idx in range(30):
+        store.add(f"gardening journal entry {idx} about tomatoes", source="user")
+
+    def _no_full_scan(history_path):
+        raise AssertionError("search read the whole history")
+
+    monkeypatch.setattr(store, "_read_history_records_from", _no_full_scan)
+    found = store.search("alpha deploy", limit=3)
+    assert [row.text for row in found] == ["The deploy window for project alpha is Tuesday"]
+    assert store.diagnostics()["search_candidate_queries"] == 1
+
+    monkeypatch.undo()
+    store.search_candidates = 0
+    assert store.search("alpha deploy", limit=1)[0].text.startswith("The deploy window")
+    assert store.diagnostics()["search_full_queries"] == 1
+
+
+def test_memory_search_candidates_fill_the_fanout_with_distinct_ids(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl", memory_auto_categorize=False)
+    store.semantic_enabled = False
+    store.search_candidates = 20
+    for idx in range(60):
+        store.add(f"project w{idx % 9} note {idx}", source="user")
+
+    ids = store._search_candidate_ids("project w5", user_id="default", include_shared=False)
+    assert ids is not None
+    assert len(ids) == len(set(ids)) == 20
+
+
+def test_memory_search_updates_lexical_indexes_from_writes(tmp_path: Path, monkeypatch) -> None:
+    from clawlite.core.memory_lexical import LexicalIndex
+
+    store = MemoryStore(tmp_path / "memory.jsonl", memory_auto_categorize=False)
+    store.search_candidates = 0
+    first = store.add("alpha release checklist", source="user")
+    store.add("beta kickoff agenda", source="user")
+    assert store.search("alpha", limit=1)[0].id == first.id
+
+    synced: list[list[str]] = []
+    original_sync = LexicalIndex.sync
+
+    def _tracking_sync(self, records):
+        synced.append([row.id for row in records])
+        return original_sync(self, records)
+
+    monkeypatch.setattr(LexicalIndex, "sync", _tracking_sync)
+    added = store.add("gamma rollout plan for alpha", source="user")
+    store.add("alpha release checklist", source="user")
+    store.delete_by_prefixes([first.id[:8]])
+
+    found = store.search("gamma rollout", limit=2)
+    assert found[0].id == added.id
+    assert all(row.id != first.id for row in store.search("alpha checklist", limit=3))
+    # The history index was never resynced; only the empty curated file may be.
+    assert not any(synced)
+
+
+def test_memory_search_scores_candidates_against_the_whole_scope(tmp_path: Path) -> None:
+    from rank_bm25 import BM25Okapi
+
+    store = MemoryStore(tmp_path / "memory.jsonl", memory_auto_categorize=False)
+    for idx in range(12):
+        store.add(f"deploy note {idx} for team {idx % 3}", source="user")
+    store.add("alpha deploy moved to friday", source="user")
+
+    corpus = store._search_lexical_corpus("default", include_shared=False, candidates=True)
+    assert corpus is not None
+    rows = store._read_history_records_from(store.history_path)
+    query = store._tokens("alpha deploy")
+    _docs, scores = corpus.analyze(rows[-1:], query)
+    expected = BM25Okapi([store._tokens(row.text) for row in rows]).get_scores(query)
+    assert scores == pytest.approx([float(expected[-1])])
+
+
+def test_memory_search_ranks_with_features_stored_at_write_time(tmp_path: Path, monkeypatch) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl")
+    first = store.add("Send the alpha invoice to billing@example.com", source="user")
+    for idx in range(8):
+        store.add(f"alpha planning note {idx}", source="user")
+    assert first.metadata["rank_features"]["v"] == 1
+    assert first.metadata["rank_features"]["ent"] == {"emails": ["billing@example.com"]}
+
+    reloaded = MemoryStore(tmp_path / "memory.jsonl")
+    extracted: list[str] = []
+    original = MemoryStore._extract_entities.__func__
+
+    def _counting(cls, text):
+        extracted.append(text)
+        return original(cls, text)
+
+    monkeypatch.setattr(MemoryStore, "_extract_entities", classmethod(_counting))
+    found = reloaded.search("alpha invoice billing@example.com", limit=2)
+    assert found[0].id == first.id
+    assert extracted == ["alpha invoice billing@example.com"]
+    diagnostics = reloaded.diagnostics()
+    assert diagnostics["rank_features_stored_hits"] >= 9
+    assert diagnostics["rank_features_computed"] == 0
+
+
+def test_memory_search_reuses_cached_results_until_scope_write(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl")
+    store.add("alpha release checklist", source="user")
+    store.add("alpha beta notes", source="user", user_id="ana")
+
+    first = store.search("alpha   release", limit=3)
+    again = store.search("alpha release", limit=3)
+    assert [row.id for row in again] == [row.id for row in first]
+    again[0].text = "mutated by caller"
+    assert store.search("alpha release", limit=3)[0].text == "alpha release checklist"
+    assert store.search_cache_snapshot()["hits"] == 2
+
+    store.search("alpha", limit=3, user_id="ana")
+    store.add("alpha release retro", source="user", user_id="bob")
+    store.search("alpha", limit=3, user_id="ana")
+    assert store.search_cache_snapshot()["hits"] == 3
+
+    added = store.add("alpha release date moved", source="user")
+    assert added.id in {row.id for row in store.search("alpha release", limit=3)}
+    diagnostics = store.diagnostics()
+    assert diagnostics["search_cache_hits"] == 3
+    assert diagnostics["search_cache_misses"] == 3
+
+
 def test_memory_search_prefers_promoted_curated_fact(tmp_path: Path) -> None:
     store = MemoryStore(tmp_path / "memory.jsonl")
     for source in ("session:a", "session:b", "session:c"):
@@ -1228,6 +1452,108 @@ def test_memory_list_recent_candidates_falls_back_to_bounded_recent_history_scan
     assert old.id not in ids
 
 
+def test_memory_delete_tombstones_history_lines_and_compacts(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl")
+    keep = store.add("keep history row", source="session:keep")
+    drop = store.add("drop history row", source="session:drop")
+    size = store.history_path.stat().st_size
+
+    result = store.delete_by_prefixes([drop.id])
+
+    assert result["deleted_count"] == 1
+    assert store.history_path.stat().st_size == size
+    assert [row.id for row in store.all()] == [keep.id]
+    assert store.diagnostics()["history_tombstones"] == 1
+
+    compacted = store.compact_history()
+
+    assert compacted["ok"] is True
+    assert compacted["reclaimed_bytes"] > 0
+    lines = store.history_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [keep.id]
+    assert store.diagnostics()["history_compactions"] >= 1
+    again = store.add("keep history row", source="session:keep")
+    assert again.id == keep.id
+
+
+def test_memory_history_compaction_runs_in_background_past_threshold(tmp_path: Path, monkeypatch) -> None:
+    from clawlite.core.memory_history_index import HistoryHashIndex
+
+    monkeypatch.setattr(HistoryHashIndex, "needs_compaction", lambda self, **_kwargs: self.dead_bytes > 0)
+    store = MemoryStore(tmp_path / "memory.jsonl")
+    rows = [store.add(f"background compaction row {idx}", source="session:bg") for idx in range(4)]
+
+    store.delete_by_prefixes([row.id for row in rows[:3]])
+    workers = list(store._history_compactions.values())
+    assert workers
+    for worker in workers:
+        worker.join(timeout=5)
+
+    lines = store.history_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [rows[3].id]
+
+
+def test_memory_record_cache_serves_repeat_reads_until_history_changes(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl")
+    first = store.add("cached history row", source="session:cache")
+    store.all()
+    misses = store.diagnostics()["record_cache_misses"]
+
+    rows = store.all()
+    rows[0].text = "mutated by caller"
+    rows[0].metadata["scratch"] = True
+
+    again = store.all()
+    diagnostics = store.diagnostics()
+    assert diagnostics["record_cache_misses"] == misses
+    assert diagnostics["record_cache_hits"] >= 2
+    assert [(row.id, row.text) for row in again] == [(first.id, "cached history row")]
+    assert "scratch" not in again[0].metadata
+
+    second = store.add("another cached row", source="session:cache")
+    assert {row.id for row in store.all()} == {first.id, second.id}
+
+    with store.history_path.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps({"id": "external", "text": "written elsewhere", "source": "s", "created_at": "2026-03-17T00:00:00+00:00"}) + "\n")
+    assert "external" in {row.id for row in store.all()}
+
+
+def test_memory_search_async_matches_search_and_honours_stop_event(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl")
+    store.add("deploy window is friday evening", source="session:async")
+    store.add("grocery list has apples", source="session:async")
+
+    async def _scenario() -> None:
+        expected = [row.id for row in store.search("deploy friday", limit=2)]
+        rows = await store.search_async("deploy friday", limit=2)
+        assert [row.id for row in rows] == expected
+
+        stop_event = asyncio.Event()
+        stop_event.set()
+        assert await store.search_async("deploy friday", limit=2, stop_event=stop_event) == []
+
+    asyncio.run(_scenario())
+
+    pool = store._search_executor
+    assert pool is not None
+    store.close()
+    assert store._search_executor is None
+    assert pool._shutdown
+
+
+def test_memory_record_cache_sees_same_size_in_place_rewrites(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl")
+    keep = store.add("stay put row", source="session:cache")
+    drop = store.add("blank me row", source="session:cache")
+    size = store.history_path.stat().st_size
+    assert {row.id for row in store.all()} == {keep.id, drop.id}
+
+    store.delete_by_prefixes([drop.id])
+
+    assert store.history_path.stat().st_size == size
+    assert [row.id for row in store.all()] == [keep.id]
+
+
 def test_memory_delete_by_prefixes_prunes_embedding_rows_for_deleted_ids(tmp_path: Path) -> None:
     store = MemoryStore(tmp_path / "memory.jsonl", semantic_enabled=True)
     keep = store.add("keep history row", source="session:keep")
@@ -2123,7 +2449,7 @@ def test_memory_encrypted_category_roundtrip_preserves_plain_reads(tmp_path: Pat
     raw_lines = [line for line in store.history_path.read_text(encoding="utf-8").splitlines() if line.strip()]
     assert raw_lines
     stored = json.loads(raw_lines[0])
-    assert stored["text"].startswith("enc:v2:")
+    assert stored["text"].startswith(store._encrypted_prefix())
     assert store.privacy_key_path.exists()
 
     read_back = store.all()
@@ -2131,6 +2457,28 @@ def test_memory_encrypted_category_roundtrip_preserves_plain_reads(tmp_path: Pat
     assert store.search("sensitive", limit=1)[0].text == "sensitive context text"
 
 
+def test_memory_encrypted_rows_store_no_plaintext_rank_features(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl", memory_auto_categorize=False)
+    settings = json.loads(store.privacy_path.read_text(encoding="utf-8"))
+    settings["encrypted_categories"] = ["context"]
+    store.privacy_path.write_text(json.dumps(settings) + "\n", encoding="utf-8")
+
+    store.add(
+        "account at https://mybank.example/acct/123, mail alice.secret@example.com",
+        source="session:enc",
+    )
+    raw = store.history_path.read_text(encoding="utf-8")
+    assert "mybank.example" not in raw
+    assert "alice.secret" not in raw
+    stored = json.loads(next(line for line in raw.splitlines() if line.strip()))
+    assert stored["text"].startswith(store._encrypted_prefix())
+    assert "rank_features" not in stored["metadata"]
+
+    hits = store.search("mybank account", limit=1)
+    assert hits and "alice.secret@example.com" in hits[0].text
+    assert store.diagnostics()["rank_features_computed"] >= 1
+
+
 def test_memory_decrypt_supports_legacy_enc_v1_rows(tmp_path: Path) -> None:
     store = MemoryStore(tmp_path / "memory.jsonl")
     legacy_text = base64.urlsafe_b64encode("legacy encrypted text".encode("utf-8")).decode("ascii")
@@ -2153,6 +2501,32 @@ def test_memory_decrypt_supports_legacy_enc_v1_rows(tmp_path: Path) -> None:
     assert rows[0].text == "legacy encrypted text"
 
 
+def test_memory_reencrypts_older_rows_of_encrypted_categories_lazily(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl", memory_auto_categorize=False)
+    settings = json.loads(store.privacy_path.read_text(encoding="utf-8"))
+    settings["encrypted_categories"] = ["context"]
+    store.privacy_path.write_text(json.dumps(settings) + "\n", encoding="utf-8")
+    legacy_text = base64.urlsafe_b64encode("legacy encrypted text".encode("utf-8")).decode("ascii")
+    rows = [
+        {"id": "legacy-v1", "text": f"enc:v1:{legacy_text}", "source": "s", "created_at": "2026-03-01T00:00:00+00:00", "category": "context"},
+        {"id": "plain-ctx", "text": "plain context text", "source": "s", "created_at": "2026-03-01T00:00:01+00:00", "category": "context"},
+        {"id": "plain-pref", "text": "plain preference text", "source": "s", "created_at": "2026-03-01T00:00:02+00:00", "category": "preferences"},
+    ]
+    store.history_path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+    assert [row.text for row in store.all()] == ["legacy encrypted text", "plain context text", "plain preference text"]
+    store.close()
+
+    stored = {row["id"]: row["text"] for row in map(json.loads, filter(str.strip, store.history_path.read_text(encoding="utf-8").splitlines()))}
+    assert stored["legacy-v1"].startswith(store._encrypted_prefix())
+    assert stored["plain-ctx"].startswith(store._encrypted_prefix())
+    assert stored["plain-pref"] == "plain preference text"
+    assert store.diagnostics()["privacy_reencrypted"] == 2
+    assert sorted(row.text for row in store.all()) == ["legacy encrypted text", "plain context text", "plain preference text"]
+    store._wait_for_privacy_migrations()
+    assert store.diagnostics()["privacy_reencrypted"] == 2
+
+
 def test_memory_profile_auto_update_from_preferences_timezone_and_topics(tmp_path: Path) -> None:
     async def _scenario() -> None:
         store = MemoryStore(tmp_path / "memory.jsonl")
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import clawlite.core.memory_vectors as memory_vectors_module
+from clawlite.core.memory_ann import VectorIndex, default_list_count, train_ivf_centroids
+from clawlite.core.memory_vectors import EmbeddingMatrix
+
+
+@pytest.fixture(params=["numpy", "python"])
+def vector_mode(request, monkeypatch):
+    if request.param == "numpy":
+        if memory_vectors_module.np is None:
+            pytest.skip("numpy not installed")
+    else:
+        monkeypatch.setattr(memory_vectors_module, "np", None)
+        monkeypatch.setattr("clawlite.core.memory_ann.np", None)
+    return request.param
+
+
+def _clustered(count: int, dim: int = 6, seed: int = 3) -> dict[str, list[float]]:
+    rng = random.Random(seed)
+    out: dict[str, list[float]] = {}
+    for idx in range(count):
+        axis = idx % dim
+        out[f"r{idx:03d}"] = [(1.0 if pos == axis else 0.0) + rng.uniform(-0.1, 0.1) for pos in range(dim)]
+    return out
+
+
+def test_default_list_count_is_bounded() -> None:
+    assert default_list_count(0) == 1
+    assert default_list_count(64) == 8
+    assert default_list_count(10_000) == 100
+    assert default_list_count(100_000_000) == 4096
+
+
+def test_train_ivf_centroids_separates_clusters(vector_mode) -> None:
+    matrix = EmbeddingMatrix.from_mapping(_clustered(120))
+    centroids = train_ivf_centroids(matrix, 6, seed=1)
+    assert len(centroids) == 6
+    assert centroids.ids == [str(idx) for idx in range(6)]
+
+    index = VectorIndex(matrix, centroids=centroids)
+    index.assign_missing()
+    lists_by_axis: dict[int, set[int]] = {}
+    for idx, row_id in enumerate(matrix.ids):
+        lists_by_axis.setdefault(idx % 6, set()).add(index.assignments[row_id])
+    assert all(len(lists) == 1 for lists in lists_by_axis.values())
+
+
+def test_ivf_search_matches_exact_scan_for_clustered_data(vector_mode) -> None:
+    vectors = _clustered(120)
+    index = VectorIndex(EmbeddingMatrix.from_mapping(vectors))
+    index.train(6)
+    query = vectors["r007"]
+
+    exact = index.search(query, 5, probes=0)
+    approx = index.search(query, 5, probes=2)
+    assert [hit["record_id"] for hit in approx] == [hit["record_id"] for hit in exact]
+    assert approx[0]["record_id"] == "r007"
+
+
+def test_vector_index_applies_upserts_and_deletes_before_compaction(vector_mode) -> None:
+    vectors = _clustered(60)
+    index = VectorIndex(EmbeddingMatrix.from_mapping(vectors))
+    index.train(6)
+    query = vectors["r001"]
+
+    index.upsert("new", query, list_id=index.nearest_list(query))
+    index.delete(["r001"])
+    assert index.pending_changes() == 2
+    assert len(index) == 60
+
+    ids = [hit["record_id"] for hit in index.search(query, 3, probes=1)]
+    assert ids[0] == "new"
+    assert "r001" not in ids
+
+    index.compact()
+    assert index.pending_changes() == 0
+    assert [hit["record_id"] for hit in index.search(query, 3, probes=1)] == ids
+
+
+def test_vector_index_record_filter_uses_exact_scan(vector_mode) -> None:
+    vectors = _clustered(60)
+    index = VectorIndex(EmbeddingMatrix.from_mapping(vectors))
+    index.train(6)
+
+    hits = index.search(vectors["r000"], 5, record_ids=["r001", "r002"], probes=1)
+    assert sorted(hit["record_id"] for hit in hits) == ["r001", "r002"]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+
+from clawlite.core.memory_consolidation_queue import ConsolidationQueue
+
+
+def _turn(text: str) -> list[dict[str, str]]:
+    return [{"role": "user", "content": text}, {"role": "assistant", "content": f"ok {text}"}]
+
+
+def test_consolidation_queue_coalesces_turns_of_a_session_into_one_pass() -> None:
+    async def _scenario() -> None:
+        passes: list[tuple[str, list[str]]] = []
+
+        async def _run(messages, options) -> None:
+            passes.append((options["session_id"], [row["content"] for row in messages if row["role"] == "user"]))
+
+        queue = ConsolidationQueue(_run, workers=2, coalesce_s=0.05)
+        for idx in range(5):
+            await queue.submit("s1", _turn(f"a{idx}"), session_id="s1")
+        await queue.submit("s2", _turn("b0"), session_id="s2")
+        await queue.drain()
+
+        assert sorted(passes) == [("s1", ["a0", "a1", "a2", "a3", "a4"]), ("s2", ["b0"])]
+        snapshot = queue.snapshot()
+        assert snapshot["submitted"] == 6
+        assert snapshot["coalesced"] == 4
+        assert snapshot["passes"] == 2
+        assert snapshot["depth"] == 0
+        assert snapshot["last_lag_ms"] >= 40
+
+    asyncio.run(_scenario())
+
+
+def test_consolidation_queue_serializes_a_key_and_applies_backpressure() -> None:
+    async def _scenario() -> None:
+        release = asyncio.Event()
+        active: set[str] = set()
+        overlaps: list[str] = []
+        passes: list[list[str]] = []
+
+        async def _run(messages, options) -> None:
+            key = options["session_id"]
+            if key in active:
+                overlaps.append(key)
+            active.add(key)
+            await release.wait()
+            active.discard(key)
+            passes.append([row["content"] for row in messages if row["role"] == "user"])
+            if key == "s3":
+                raise RuntimeError("boom")
+
+        queue = ConsolidationQueue(_run, workers=1, max_pending=2, coalesce_s=0.0)
+        await queue.submit("s1", _turn("first"), session_id="s1")
+        await asyncio.sleep(0.01)
+        await queue.submit("s1", _turn("second"), session_id="s1")
+        await queue.submit("s3", _turn("third"), session_id="s3")
+
+        blocked = asyncio.create_task(queue.submit("s4", _turn("fourth"), session_id="s4"))
+        await asyncio.sleep(0.02)
+        assert not blocked.done()
+        assert queue.snapshot()["backpressure_waits"] == 1
+
+        release.set()
+        await asyncio.wait_for(blocked, timeout=1.0)
+        await asyncio.wait_for(queue.drain(), timeout=1.0)
+
+        assert overlaps == []
+        assert passes == [["first"], ["third"], ["second"], ["fourth"]]
+        snapshot = queue.snapshot()
+        assert snapshot["failures"] == 1
+        assert snapshot["last_error"] == "boom"
+
+    asyncio.run(_scenario())
+
+
+def test_consolidation_queue_drain_keys_waits_only_for_matching_passes() -> None:
+    async def _scenario() -> None:
+        release = asyncio.Event()
+        passes: list[str] = []
+
+        async def _run(messages, options) -> None:
+            if options["session_id"] == "slow":
+                await release.wait()
+            passes.append(options["session_id"])
+
+        queue = ConsolidationQueue(_run, workers=2, coalesce_s=0.01)
+        await queue.submit(("slow", "c1"), _turn("a"), session_id="slow")
+        await queue.submit(("fast", "c2"), _turn("b"), session_id="fast")
+
+        await asyncio.wait_for(queue.drain_keys(lambda key: key[0] == "fast"), timeout=1.0)
+        assert passes == ["fast"]
+        assert queue.snapshot()["running"] == 1
+
+        release.set()
+        await asyncio.wait_for(queue.drain(), timeout=1.0)
+        assert passes == ["fast", "slow"]
+
+    asyncio.run(_scenario())
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import clawlite.core.memory_embedding_store as store_module
+import clawlite.core.memory_vectors as memory_vectors_module
+from clawlite.core.memory_embedding_store import (
+    SidecarReader,
+    append_sidecar_vector,
+    decode_embedding,
+    encode_embedding,
+    normalize_embedding_format,
+    vector_to_list,
+)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def vector_mode(request, monkeypatch):
+    if request.param == "numpy":
+        if memory_vectors_module.np is None:
+            pytest.skip("numpy not installed")
+    else:
+        monkeypatch.setattr(memory_vectors_module, "np", None)
+        monkeypatch.setattr(store_module, "np", None)
+    return request.param
+
+
+def test_normalize_embedding_format_accepts_aliases() -> None:
+    assert normalize_embedding_format("FP16") == "float16"
+    assert normalize_embedding_format("f32") == "float32"
+    assert normalize_embedding_format("json") == "json"
+    assert normalize_embedding_format("bogus") == "float32"
+    assert normalize_embedding_format(None) == "float32"
+
+
+def test_encode_decode_roundtrip_for_every_format(vector_mode) -> None:
+    vector = [0.5, -0.25, 1.5, 0.0]
+
+    blob = encode_embedding(vector, "float32")
+    assert isinstance(blob, bytes) and len(blob) == 16
+    assert decode_embedding(blob) == vector
+
+    half = encode_embedding(vector, "float16")
+    assert len(half) == 5 + 8
+    assert decode_embedding(half) == vector
+
+    quantized = encode_embedding(vector, "int8")
+    assert len(quantized) == 5 + 4 + 4
+    assert decode_embedding(quantized) == pytest.approx(vector, abs=1.5 / 127)
+
+    assert json.loads(encode_embedding(vector, "json")) == vector
+
+
+def test_non_finite_vectors_fall_back_to_json_text() -> None:
+    encoded = encode_embedding([float("nan"), 1.0], "float32")
+    assert isinstance(encoded, str)
+    assert decode_embedding(b"\x00\x00\x80") is None
+
+
+def test_sidecar_append_and_read(tmp_path, vector_mode) -> None:
+    path = tmp_path / "embeddings.f32"
+    assert append_sidecar_vector(path, [1.0, 2.0]) == (0, 2)
+    assert append_sidecar_vector(path, [3.0, 4.0, 5.0]) == (8, 3)
+    assert append_sidecar_vector(path, [float("inf")]) is None
+
+    reader = SidecarReader(path)
+    assert vector_to_list(reader.vector(0, 2)) == [1.0, 2.0]
+    assert vector_to_list(reader.vector(8, 3)) == [3.0, 4.0, 5.0]
+    assert reader.vector(16, 3) is None
+    assert SidecarReader(tmp_path / "missing.f32").vector(0, 1) is None
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from clawlite.core.memory import MemoryRecord, MemoryStore
+from clawlite.core.memory_features import (
+    RANK_FEATURES_KEY,
+    RANK_FEATURES_VERSION,
+    RankFeatureMemo,
+    rank_features_fingerprint,
+)
+
+
+def _event_row() -> MemoryRecord:
+    now = datetime.now(timezone.utc)
+    return MemoryRecord(
+        id="evt-1",
+        text="Launch review at https://example.com/launch on 2026-05-10",
+        source="session:a",
+        created_at=(now - timedelta(days=3)).isoformat(),
+        updated_at=(now - timedelta(days=2)).isoformat(),
+        decay_rate=0.08,
+        memory_type="event",
+        happened_at=(now + timedelta(days=12)).isoformat(),
+        metadata={"reinforcement_count": 3, "last_reinforced_at": (now - timedelta(days=1)).isoformat()},
+    )
+
+
+def test_cached_rank_terms_match_per_row_scoring(tmp_path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl")
+    row = _event_row()
+    features = MemoryStore._compute_rank_features(row)
+    assert features["v"] == RANK_FEATURES_VERSION
+    assert features["ent"]["urls"] == ["https://example.com/launch"]
+    assert "emails" not in features["ent"]
+
+    terms = store._row_rank_terms(store._attach_rank_features(row), time.time())
+    assert terms.entities == {key: values for key, values in MemoryStore._extract_entities(row.text).items() if values}
+    assert terms.temporal_markers == MemoryStore._memory_has_temporal_markers(row.text)
+    assert abs(terms.temporal_score - MemoryStore._recency_score(MemoryStore._record_temporal_anchor(row))) < 1e-5
+    assert abs(terms.decay_penalty - MemoryStore._decay_penalty(row)) < 1e-5
+    assert abs(terms.upcoming_boost - MemoryStore._upcoming_event_boost(row)) < 1e-5
+    assert abs(terms.salience_boost - MemoryStore._salience_boost(row.metadata)) < 1e-5
+    assert terms.upcoming_boost > 0.0 and terms.decay_penalty > 0.0
+
+
+def test_rank_feature_memo_prefers_stored_and_recomputes_stale_features(tmp_path) -> None:
+    store = MemoryStore(tmp_path / "memory.jsonl")
+    memo = RankFeatureMemo()
+    computed: list[str] = []
+
+    def compute(row: MemoryRecord) -> dict:
+        computed.append(row.id)
+        return MemoryStore._compute_rank_features(row)
+
+    row = store._attach_rank_features(_event_row())
+    assert memo.resolve(row, compute) is row.metadata[RANK_FEATURES_KEY]
+    assert computed == []
+
+    row.text = "Launch review moved"
+    assert rank_features_fingerprint(row) != row.metadata[RANK_FEATURES_KEY]["fp"]
+    memo.resolve(row, compute)
+    memo.resolve(row, compute)
+    assert computed == ["evt-1"]
+    assert memo.snapshot() == {"entries": 1, "stored_hits": 1, "hits": 1, "misses": 1}
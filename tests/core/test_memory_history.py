@@ -5,12 +5,19 @@ import json
 from dataclasses import dataclass, field
 from pathlib import Path
 
+import pytest
+
 from clawlite.core.memory_history import (
     append_or_reinforce_history_record,
+    compact_history_file,
     read_history_records,
+    read_history_records_by_ids,
     stored_history_payload,
+    sync_history_index,
+    tombstone_history_records,
     upsert_history_record_by_id,
 )
+from clawlite.core.memory_history_index import HistoryHashIndex
 
 
 @dataclass
@@ -111,3 +118,226 @@ def test_append_or_reinforce_and_upsert_history_record_by_id(tmp_path: Path) ->
     lines = [json.loads(line) for line in history_path.read_text(encoding="utf-8").splitlines() if line.strip()]
     assert [row["id"] for row in lines] == ["r1"]
     assert lines[0]["text"] == "final"
+
+
+def _indexed_kwargs(decoded: list[str]) -> dict[str, object]:
+    def record_from_payload(payload):
+        decoded.append(str(payload.get("id", "")))
+        return _Record(**payload)
+
+    return {
+        "ensure_file": lambda path: path.exists() or path.touch(),
+        "locked_file": _locked_file,
+        "flush_and_fsync": _flush_and_fsync,
+        "record_from_payload": record_from_payload,
+        "decrypt_text_for_category": lambda text, category: text,
+        "record_content_hash": lambda record: f"hash:{record.text.split()[0]}",
+        "record_scope_key": lambda record: record.source,
+        "reinforce_record": lambda existing, incoming, source, scope_key, reinforced_at: _Record(
+            id=existing.id,
+            text=incoming.text,
+            source=source,
+            created_at=existing.created_at,
+            metadata={"reinforced_at": reinforced_at},
+        ),
+        "stored_history_payload_fn": lambda record: stored_history_payload(record=record, encrypt_text_for_category=lambda text, category: text),
+    }
+
+
+def _history_index(path: Path) -> HistoryHashIndex:
+    return HistoryHashIndex(
+        path,
+        key_for_payload=lambda payload: (str(payload.get("source", "")), f"hash:{str(payload.get('text', '')).split()[0]}"),
+    )
+
+
+def test_indexed_append_or_reinforce_reads_only_the_matching_line(tmp_path: Path) -> None:
+    history_path = tmp_path / "memory.jsonl"
+    decoded: list[str] = []
+    kwargs = _indexed_kwargs(decoded)
+    index = _history_index(history_path)
+
+    for idx in range(20):
+        row = _Record(id=f"r{idx}", text=f"topic{idx} note", source="session:a", created_at="2026-03-17T00:00:00+00:00")
+        _row, created = append_or_reinforce_history_record(
+            history_path=history_path,
+            record=row,
+            content_hash=f"hash:topic{idx}",
+            scope_key="session:a",
+            source="session:a",
+            reinforced_at="2026-03-17T00:00:00+00:00",
+            history_index=index,
+            **kwargs,
+        )
+        assert created is True
+    assert index.rebuilds == 1
+
+    decoded.clear()
+    incoming = _Record(id="new", text="topic7 x", source="session:a", created_at="2026-03-17T01:00:00+00:00")
+    shorter, created = append_or_reinforce_history_record(
+        history_path=history_path,
+        record=incoming,
+        content_hash="hash:topic7",
+        scope_key="session:a",
+        source="session:a",
+        reinforced_at="2026-03-17T01:00:00+00:00",
+        history_index=index,
+        **kwargs,
+    )
+    assert created is False and shorter.id == "r7"
+    assert decoded == ["r7"]
+
+    longer_text = "topic3 " + "much longer reinforced text " * 4
+    longer, created = append_or_reinforce_history_record(
+        history_path=history_path,
+        record=_Record(id="new2", text=longer_text, source="session:a", created_at="2026-03-17T02:00:00+00:00"),
+        content_hash="hash:topic3",
+        scope_key="session:a",
+        source="session:a",
+        reinforced_at="2026-03-17T02:00:00+00:00",
+        history_index=index,
+        **kwargs,
+    )
+    assert created is False and longer.id == "r3"
+
+    rows = [json.loads(line) for line in history_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    assert sorted(row["id"] for row in rows) == sorted(f"r{idx}" for idx in range(20))
+    by_id = {row["id"]: row for row in rows}
+    assert by_id["r7"]["text"] == "topic7 x"
+    assert by_id["r3"]["text"] == longer_text
+    assert index.rebuilds == 1
+
+    reloaded = _history_index(history_path)
+    with history_path.open("rb") as fh:
+        reloaded.ensure(fh)
+    assert reloaded.rebuilds == 0
+    assert reloaded.lookup("session:a", "hash:topic3")[0] == "r3"
+
+
+def test_indexed_upsert_rebuilds_after_external_rewrite(tmp_path: Path) -> None:
+    history_path = tmp_path / "memory.jsonl"
+    index = _history_index(history_path)
+    payload_fn = lambda record: stored_history_payload(record=record, encrypt_text_for_category=lambda text, category: text)  # noqa: E731
+    upsert_kwargs = {
+        "ensure_file": lambda path: path.exists() or path.touch(),
+        "locked_file": _locked_file,
+        "flush_and_fsync": _flush_and_fsync,
+        "stored_history_payload_fn": payload_fn,
+        "history_index": index,
+    }
+    for record_id in ("a", "b", "c"):
+        row = _Record(id=record_id, text=f"{record_id} text", source="s", created_at="2026-03-17T00:00:00+00:00")
+        assert upsert_history_record_by_id(history_path=history_path, record=row, append_if_missing=True, **upsert_kwargs)
+
+    lines = history_path.read_text(encoding="utf-8").splitlines()
+    history_path.write_text("\n".join(lines[1:]) + "\n", encoding="utf-8")
+
+    missing = _Record(id="a", text="a again", source="s", created_at="2026-03-17T00:00:00+00:00")
+    assert upsert_history_record_by_id(history_path=history_path, record=missing, append_if_missing=False, **upsert_kwargs) is False
+    updated = _Record(id="c", text="c updated", source="s", created_at="2026-03-17T00:00:00+00:00")
+    assert upsert_history_record_by_id(history_path=history_path, record=updated, append_if_missing=False, **upsert_kwargs) is True
+
+    rows = [json.loads(line) for line in history_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    assert [(row["id"], row["text"]) for row in rows] == [("b", "b text"), ("c", "c updated")]
+    assert index.rebuilds == 2
+
+
+def test_read_history_records_by_ids_uses_positioned_reads(tmp_path: Path) -> None:
+    history_path = tmp_path / "memory.jsonl"
+    index = _history_index(history_path)
+    payload_fn = lambda record: stored_history_payload(record=record, encrypt_text_for_category=lambda text, category: text)  # noqa: E731
+    for record_id in ("a", "b", "c"):
+        row = _Record(id=record_id, text=f"{record_id} text", source="s", created_at="2026-03-17T00:00:00+00:00")
+        upsert_history_record_by_id(
+            history_path=history_path,
+            record=row,
+            append_if_missing=True,
+            ensure_file=lambda path: path.exists() or path.touch(),
+            locked_file=_locked_file,
+            flush_and_fsync=_flush_and_fsync,
+            stored_history_payload_fn=payload_fn,
+            history_index=index,
+        )
+    read_kwargs = {
+        "history_path": history_path,
+        "locked_file": _locked_file,
+        "history_index": index,
+        "record_from_payload": lambda payload: _Record(**payload),
+        "decrypt_text_for_category": lambda text, category: text.upper(),
+    }
+
+    rows = read_history_records_by_ids(record_ids=["c", "missing", "a", "c"], **read_kwargs)
+    assert [(row.id, row.text) for row in rows] == [("c", "C TEXT"), ("a", "A TEXT")]
+
+    history_path.write_text(history_path.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    assert read_history_records_by_ids(record_ids=["a"], **read_kwargs) is None
+    rebuilds = index.rebuilds
+    sync_history_index(history_path=history_path, locked_file=_locked_file, history_index=index)
+    assert index.rebuilds == rebuilds + 1
+    assert [row.id for row in read_history_records_by_ids(record_ids=["b"], **read_kwargs)] == ["b"]
+
+
+def test_tombstones_blank_lines_in_place_until_compaction(tmp_path: Path) -> None:
+    history_path = tmp_path / "memory.jsonl"
+    rows = [
+        json.dumps({"id": f"r{idx}", "text": f"topic{idx} note", "source": "s", "created_at": "2026-03-17T00:00:00+00:00"})
+        for idx in range(6)
+    ]
+    history_path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    size = history_path.stat().st_size
+    index = _history_index(history_path)
+
+    deleted = tombstone_history_records(
+        history_path=history_path,
+        record_ids={"r1", "r4", "missing"},
+        locked_file=_locked_file,
+        flush_and_fsync=_flush_and_fsync,
+        history_index=index,
+    )
+
+    assert deleted == 2
+    assert history_path.stat().st_size == size
+    assert index.dead_bytes == len(rows[1]) + len(rows[4]) + 2
+    decoded: list[str] = []
+    remaining = read_history_records(
+        history_path=history_path,
+        locked_file=_locked_file,
+        record_from_payload=lambda payload: decoded.append(payload["id"]) or _Record(**payload),
+        decrypt_text_for_category=lambda text, category: text,
+        repair_history_file_fn=lambda valid_lines: None,
+        diagnostics={},
+    )
+    assert [row.id for row in remaining] == ["r0", "r2", "r3", "r5"]
+    assert index.lookup("s", "hash:topic1") is None
+
+    stats = compact_history_file(
+        history_path=history_path,
+        locked_file=_locked_file,
+        flush_and_fsync=_flush_and_fsync,
+        history_index=index,
+    )
+
+    assert stats["dropped_lines"] == 2
+    assert history_path.read_text(encoding="utf-8").splitlines() == [rows[0], rows[2], rows[3], rows[5]]
+    assert index.dead_bytes == 0
+    assert index.locate("r5") == (sum(len(rows[idx]) + 1 for idx in (0, 2, 3)), len(rows[5]))
+
+
+def test_compaction_failure_leaves_history_intact(tmp_path: Path) -> None:
+    history_path = tmp_path / "memory.jsonl"
+    rows = [json.dumps({"id": f"r{idx}", "text": f"note {idx}", "source": "s", "created_at": ""}) for idx in range(3)]
+    original = rows[0] + "\n" + " " * len(rows[1]) + "\n" + rows[2] + "\n"
+    history_path.write_text(original, encoding="utf-8")
+
+    def _failing_fsync(fh) -> None:
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        compact_history_file(history_path=history_path, locked_file=_locked_file, flush_and_fsync=_failing_fsync)
+
+    assert history_path.read_text(encoding="utf-8") == original
+    assert [path.name for path in tmp_path.iterdir()] == ["memory.jsonl"]
+
+    stats = compact_history_file(history_path=history_path, locked_file=_locked_file, flush_and_fsync=_flush_and_fsync)
+    assert stats["dropped_lines"] == 1
+    assert history_path.read_text(encoding="utf-8").splitlines() == [rows[0], rows[2]]
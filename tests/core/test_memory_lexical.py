@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import random
+from types import SimpleNamespace
+
+import pytest
+from rank_bm25 import BM25Okapi
+
+from clawlite.core.memory_lexical import LexicalIndex, LexicalIndexCache
+
+
+def _tokens(text: str) -> list[str]:
+    return [part.lower() for part in str(text or "").split()]
+
+
+def _rows(texts: list[str]) -> list[SimpleNamespace]:
+    return [SimpleNamespace(id=f"r{idx}", text=text) for idx, text in enumerate(texts)]
+
+
+def _okapi_scores(texts: list[str], query: list[str]) -> list[float]:
+    return [float(score) for score in BM25Okapi([_tokens(text) for text in texts]).get_scores(query)]
+
+
+def test_lexical_index_matches_bm25okapi_including_negative_idf_floor() -> None:
+    rng = random.Random(11)
+    vocabulary = ["alpha", "beta", "gamma", "delta", "common", "rare"]
+    texts = [
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 8))) + " common"
+        for _ in range(40)
+    ]
+    index = LexicalIndex(_tokens)
+    rows = _rows(texts)
+    query = ["common", "rare", "alpha", "alpha", "missing"]
+
+    docs, scores = index.analyze(rows, query)
+
+    assert len(docs) == len(rows)
+    assert scores == pytest.approx(_okapi_scores(texts, query))
+
+
+def test_lexical_index_sync_applies_adds_edits_and_removals_incrementally() -> None:
+    calls: list[str] = []
+
+    def counting_tokens(text: str) -> list[str]:
+        calls.append(text)
+        return _tokens(text)
+
+    index = LexicalIndex(counting_tokens)
+    rows = _rows(["project alpha notes", "beta release plan", "alpha beta sync"])
+    index.analyze(rows, ["alpha"])
+    assert len(calls) == 3
+
+    rows[1] = SimpleNamespace(id="r1", text="beta release retro")
+    rows.append(SimpleNamespace(id="r3", text="gamma alpha"))
+    del rows[0]
+    calls.clear()
+    _docs, scores = index.analyze(rows, ["alpha", "retro"])
+
+    assert calls == ["beta release retro", "gamma alpha"]
+    assert len(index) == 3
+    assert "r0" not in index
+    assert scores == pytest.approx(_okapi_scores([row.text for row in rows], ["alpha", "retro"]))
+
+
+def test_lexical_index_treats_repeated_ids_as_separate_documents() -> None:
+    index = LexicalIndex(_tokens)
+    rows = [SimpleNamespace(id="dup", text="alpha beta"), SimpleNamespace(id="dup", text="alpha beta")]
+
+    _docs, scores = index.analyze(rows, ["alpha"])
+
+    assert len(index) == 2
+    assert scores == pytest.approx(_okapi_scores(["alpha beta", "alpha beta"], ["alpha"]))
+
+
+def test_lexical_index_advance_applies_writes_only_from_its_own_stamp() -> None:
+    index = LexicalIndex(_tokens)
+    index.refresh("s1", lambda: _rows(["alpha", "beta"]))
+
+    assert index.advance("s1", "s2", upserts=[SimpleNamespace(id="r2", text="alpha gamma")], discards=["r1"])
+    assert not index.advance("s1", "s3", upserts=[SimpleNamespace(id="r9", text="late")])
+    assert index.stamp == "s2"
+    assert sorted(index._docs) == ["r0", "r2"]
+
+    index.refresh("s2", lambda: pytest.fail("current index must not resync"))
+
+
+def test_lexical_corpus_matches_bm25okapi_over_all_files_for_a_subset() -> None:
+    rng = random.Random(5)
+    vocabulary = ["alpha", "beta", "gamma", "common", "rare"]
+    texts = [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 6))) + " common" for _ in range(30)]
+    rows = _rows(texts)
+    left, right = LexicalIndex(_tokens), LexicalIndex(_tokens)
+    left.sync(rows[:12])
+    right.sync(rows[12:])
+    cache = LexicalIndexCache(_tokens)
+    query = ["common", "rare", "beta"]
+    subset = [rows[3], rows[20], SimpleNamespace(id="new", text="rare beta")]
+
+    _docs, scores = cache.corpus([left, right]).analyze(subset, query)
+
+    expected = _okapi_scores(texts, query)
+    assert scores[:2] == pytest.approx([expected[3], expected[20]])
+    assert scores[2] > 0
+
+
+def test_lexical_index_cache_evicts_least_recent_files() -> None:
+    cache = LexicalIndexCache(_tokens, max_files=2)
+    first = cache.get("a")
+    first.analyze(_rows(["alpha", "beta"]), ["alpha"])
+    cache.get("b")
+    cache.get("c")
+
+    assert cache.peek("a") is None
+    assert cache.get("a") is not first
+    cache.get("c").analyze(_rows(["alpha", "beta"]), ["alpha"])
+    assert cache.snapshot() == {"files": 2, "documents": 2}
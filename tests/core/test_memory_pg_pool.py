@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from clawlite.core.memory_pg_pool import PgConnectionPool
+
+
+class _Cursor:
+    def __init__(self, conn: "_Conn") -> None:
+        self.conn = conn
+
+    def execute(self, query: str, params: tuple[object, ...] = ()) -> None:
+        if self.conn.dead:
+            raise RuntimeError("server closed the connection")
+        self.conn.queries.append(query)
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self) -> None:
+        return None
+
+
+class _Conn:
+    def __init__(self) -> None:
+        self.closed = False
+        self.dead = False
+        self.queries: list[str] = []
+        self.rollbacks = 0
+
+    def cursor(self) -> _Cursor:
+        return _Cursor(self)
+
+    def commit(self) -> None:
+        return None
+
+    def rollback(self) -> None:
+        if self.dead:
+            raise RuntimeError("server closed the connection")
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_pg_pool_reuses_connections_and_rolls_back_on_release() -> None:
+    dialed: list[_Conn] = []
+
+    def _dial() -> _Conn:
+        dialed.append(_Conn())
+        return dialed[-1]
+
+    pool = PgConnectionPool(_dial, max_size=2)
+    for _ in range(5):
+        conn = pool.acquire()
+        assert conn is not None
+        conn.cursor().execute("SELECT 1")
+        conn.close()
+
+    assert len(dialed) == 1
+    assert dialed[0].rollbacks == 5
+    stats = pool.snapshot()
+    assert stats["connections_opened"] == 1
+    assert stats["reuses"] == 4
+    assert stats["idle"] == 1
+
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first is not None and second is not None
+    pool.acquire_timeout_s = 0.0
+    assert pool.acquire() is None
+    assert pool.snapshot()["timeouts"] == 1
+    first.close()
+    second.close()
+    pool.close()
+    assert all(conn.closed for conn in dialed)
+
+
+def test_pg_pool_health_checks_and_recycles_idle_connections() -> None:
+    clock = _Clock()
+    dialed: list[_Conn] = []
+
+    def _dial() -> _Conn:
+        dialed.append(_Conn())
+        return dialed[-1]
+
+    pool = PgConnectionPool(_dial, health_check_after_s=30, max_idle_s=300, max_lifetime_s=0, clock=clock)
+
+    pool.acquire().close()
+    clock.now = 60
+    conn = pool.acquire()
+    assert conn is not None and conn.raw is dialed[0]
+    assert "SELECT 1" in dialed[0].queries
+    conn.close()
+
+    clock.now = 120
+    dialed[0].dead = True
+    conn = pool.acquire()
+    assert conn is not None and conn.raw is dialed[1]
+    assert dialed[0].closed
+    conn.close()
+
+    clock.now = 1000
+    conn = pool.acquire()
+    assert conn is not None and conn.raw is dialed[2]
+    conn.raw.closed = True
+    conn.close()
+
+    stats = pool.snapshot()
+    assert stats["health_check_failures"] == 1
+    assert stats["recycled"] == 1
+    assert stats["discarded"] == 1
+    assert stats["size"] == 0
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import base64
+import hashlib
+import hmac
 from pathlib import Path
 
 from clawlite.core.memory_privacy import (
+    DecryptionMemo,
     decrypt_text_for_category,
     encrypt_text_for_category,
+    encrypted_prefix,
     load_or_create_privacy_key,
+    needs_reencryption,
     privacy_block_reason,
     xor_with_keystream,
 )
@@ -42,7 +48,6 @@ def test_encrypt_and_decrypt_text_for_category_roundtrip() -> None:
         settings=settings,
         privacy_settings_loader=lambda: settings,
         load_or_create_privacy_key_fn=lambda: key,
-        xor_with_keystream_fn=xor_with_keystream,
         diagnostics=diagnostics,
     )
     decrypted = decrypt_text_for_category(
@@ -54,10 +59,75 @@ def test_encrypt_and_decrypt_text_for_category_roundtrip() -> None:
         diagnostics=diagnostics,
     )
 
-    assert encrypted.startswith("enc:v2:")
+    assert encrypted.startswith(encrypted_prefix())
     assert decrypted == "secret context text"
 
 
+def _decrypt(text: str, key: bytes, diagnostics: dict[str, object], memo: DecryptionMemo | None = None) -> str:
+    return decrypt_text_for_category(
+        text,
+        "context",
+        settings=None,
+        load_or_create_privacy_key_fn=lambda: key,
+        xor_with_keystream_fn=xor_with_keystream,
+        diagnostics=diagnostics,
+        memo=memo,
+    )
+
+
+def test_decrypt_reads_enc_v2_rows_written_by_the_per_byte_keystream() -> None:
+    key = b"k" * 32
+    nonce = b"n" * 16
+    plain = ("legacy secret " * 7).encode("utf-8")
+    stream = b"".join(hashlib.sha256(key + nonce + counter.to_bytes(4, "big")).digest() for counter in range(4))
+    ciphertext = bytes(byte ^ stream[idx] for idx, byte in enumerate(plain))
+    tag = hmac.new(key, nonce + ciphertext, hashlib.sha256).digest()
+    stored = "enc:v2:" + base64.urlsafe_b64encode(nonce + ciphertext + tag).decode("ascii")
+
+    assert xor_with_keystream(plain, key=key, nonce=nonce) == ciphertext
+    assert _decrypt(stored, key, {}) == plain.decode("utf-8")
+
+
+def test_decrypt_rejects_tampered_ciphertext_and_memoizes_by_generation() -> None:
+    key = b"k" * 32
+    settings = {"encrypted_categories": ["context"]}
+    diagnostics: dict[str, object] = {}
+    encrypted = encrypt_text_for_category(
+        "memo me",
+        "context",
+        settings=settings,
+        privacy_settings_loader=lambda: settings,
+        load_or_create_privacy_key_fn=lambda: key,
+        diagnostics=diagnostics,
+    )
+    payload = bytearray(base64.urlsafe_b64decode(encrypted[len(encrypted_prefix()) :]))
+    payload[-1] ^= 1
+    tampered = encrypted_prefix() + base64.urlsafe_b64encode(bytes(payload)).decode("ascii")
+
+    assert _decrypt(tampered, key, diagnostics) == tampered
+    assert diagnostics["privacy_decrypt_errors"] == 1
+
+    memo = DecryptionMemo()
+    assert _decrypt(encrypted, key, diagnostics, memo) == "memo me"
+    assert _decrypt(encrypted, key, diagnostics, memo) == "memo me"
+    assert memo.snapshot() == {"entries": 1, "hits": 1, "misses": 1}
+    assert diagnostics["privacy_decrypt_events"] == 1
+
+    # A different key must not be served the plaintext memoized under the first one.
+    assert _decrypt(encrypted, b"x" * 32, diagnostics, memo) == encrypted
+    assert memo.snapshot()["hits"] == 1
+    assert diagnostics["privacy_decrypt_errors"] == 2
+
+
+def test_needs_reencryption_only_flags_encrypted_categories_behind_the_current_scheme() -> None:
+    categories = {"context"}
+
+    assert needs_reencryption("enc:v1:c2VjcmV0", "context", categories=categories)
+    assert needs_reencryption("plain text", "context", categories=categories)
+    assert not needs_reencryption(f"{encrypted_prefix()}abc", "context", categories=categories)
+    assert not needs_reencryption("enc:v1:c2VjcmV0", "preference", categories=categories)
+
+
 def test_privacy_block_reason_matches_configured_pattern() -> None:
     reason = privacy_block_reason(
         "meu token secreto e abc123",
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from clawlite.core.memory_query_cache import SearchResultCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_search_result_cache_hits_until_scope_generation_moves() -> None:
+    cache = SearchResultCache(max_entries=4, ttl_s=60.0, clock=_Clock())
+    stamp = cache.generations(["default", "user:ana"])
+    cache.put(("alpha", 5), stamp, ["row-1", "row-2"])
+
+    assert cache.get(("alpha", 5), cache.generations(["default", "user:ana"])) == ("row-1", "row-2")
+    cache.bump("user:bob")
+    assert cache.get(("alpha", 5), cache.generations(["default", "user:ana"])) == ("row-1", "row-2")
+    cache.bump("user:ana")
+    assert cache.get(("alpha", 5), cache.generations(["default", "user:ana"])) is None
+    assert cache.snapshot() == {
+        "entries": 0,
+        "max_entries": 4,
+        "hits": 2,
+        "misses": 1,
+        "stale": 1,
+        "hit_rate_pct": 67,
+    }
+
+
+def test_search_result_cache_expires_entries_and_evicts_least_recent() -> None:
+    clock = _Clock()
+    cache = SearchResultCache(max_entries=2, ttl_s=10.0, clock=clock)
+    stamp = cache.generations(["default"])
+    cache.put("a", stamp, [1])
+    cache.put("b", stamp, [2])
+    assert cache.get("a", stamp) == (1,)
+    cache.put("c", stamp, [3])
+    assert cache.get("b", stamp) is None
+    assert cache.get("a", stamp) == (1,)
+
+    clock.now += 10.0
+    assert cache.get("a", stamp) is None
+    assert cache.snapshot()["stale"] == 1
+
+    disabled = SearchResultCache(max_entries=0)
+    disabled.put("a", stamp, [1])
+    assert not disabled.enabled
+    assert disabled.get("a", stamp) is None
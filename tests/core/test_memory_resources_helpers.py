@@ -5,6 +5,7 @@ from dataclasses import dataclass, field
 from clawlite.core.memory_resources import (
     create_resource,
     fetch_record_by_id,
+    fetch_records_by_ids,
     get_resource,
     get_resource_records,
     purge_expired_records,
@@ -105,3 +106,37 @@ def test_purge_expired_records_deletes_layers_and_ttl_entries() -> None:
     deleted = purge_expired_records(backend=backend)
     assert deleted == 2
     assert backend.ttl_deleted == ["r1", "r2"]
+
+
+def test_record_lookups_use_keyed_backend_multi_get() -> None:
+    class _KeyedBackend(_Backend):
+        def __init__(self) -> None:
+            super().__init__()
+            self.lookups: list[tuple[list[str], str | None]] = []
+
+        def fetch_layer_records(self, **kwargs):
+            raise AssertionError("keyed lookups must not scan the layer")
+
+        def fetch_layer_records_by_ids(self, record_ids, *, layer=None):
+            self.lookups.append((list(record_ids), layer))
+            wanted = set(record_ids)
+            return [row for row in self.layer_rows if row["record_id"] in wanted and row["layer"] == layer]
+
+    backend = _KeyedBackend()
+    for rid in ("r1", "r2", "r3"):
+        backend.layer_rows.append({"layer": "item", "record_id": rid, "payload": {"id": rid, "text": f"text {rid}"}})
+    backend.resource_links["res"] = ["r3", "missing", "r1"]
+
+    records = fetch_records_by_ids(backend=backend, record_ids=["r3", "missing", "r1"], item_layer_value="item", memory_record_cls=_Record)
+    assert [row.id for row in records] == ["r3", "r1"]
+
+    record = fetch_record_by_id(backend=backend, record_id="r2", item_layer_value="item", memory_record_cls=_Record)
+    assert record is not None and record.text == "text r2"
+
+    expanded = get_resource_records(
+        backend=backend,
+        resource_id="res",
+        fetch_records_by_ids_fn=lambda ids: fetch_records_by_ids(backend=backend, record_ids=ids, item_layer_value="item", memory_record_cls=_Record),
+    )
+    assert [row.id for row in expanded] == ["r3", "r1"]
+    assert backend.lookups[-1] == (["r3", "missing", "r1"], "item")
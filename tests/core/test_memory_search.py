@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from types import SimpleNamespace
 
-from clawlite.core.memory_search import rank_records, search_records
+from clawlite.core.memory_search import rank_records, search_candidate_ids, search_records
 
 
 def test_search_records_uses_collect_and_rank_with_normalized_user() -> None:
@@ -53,6 +53,62 @@ def test_search_records_uses_collect_and_rank_with_normalized_user() -> None:
     }
 
 
+def test_search_records_ranks_only_pushed_down_candidates() -> None:
+    captured: dict[str, object] = {}
+    row = SimpleNamespace(id="r2", text="beta", source="session:a")
+
+    search_records(
+        "beta",
+        limit=2,
+        user_id="",
+        session_id="",
+        include_shared=False,
+        reasoning_layers=None,
+        min_confidence=None,
+        filters=None,
+        normalize_user_id=lambda value: str(value or "").strip().lower() or "default",
+        collect_retrieval_records=lambda **kwargs: (
+            captured.setdefault("collect_kwargs", kwargs) and [row],
+            {},
+            {},
+            [],
+            False,
+        ),
+        rank_records_fn=lambda query, records, **kwargs: captured.setdefault("rank_kwargs", kwargs) and list(records),
+        lexical_index_fn=lambda user_id, **kwargs: captured.setdefault("index_kwargs", kwargs) and "corpus",
+        candidate_ids_fn=lambda query, **kwargs: ["r2", "r9"],
+    )
+
+    assert captured["collect_kwargs"]["candidate_ids"] == ["r2", "r9"]
+    assert captured["index_kwargs"] == {"include_shared": False, "candidates": True}
+    assert captured["rank_kwargs"]["lexical_index"] == "corpus"
+
+
+def test_search_candidate_ids_merges_text_and_vector_hits() -> None:
+    calls: list[tuple[str, int, bool]] = []
+
+    def _search_text(text: str, *, limit: int, match_any: bool) -> list[dict[str, object]]:
+        calls.append((text, limit, match_any))
+        return [{"record_id": "a", "score": -2.0}, {"record_id": "b", "score": -1.0}]
+
+    kwargs = {
+        "fanout": 50,
+        "tokens": lambda text: [token for token in text.lower().split() if token != "the"],
+        "query_has_temporal_intent": lambda text: "yesterday" in text,
+        "search_text": _search_text,
+        "semantic_enabled": True,
+        "generate_embedding": lambda text: [1.0, 0.0],
+        "query_similar_embeddings": lambda embedding, limit: [{"record_id": "b"}, {"record_id": "c"}],
+    }
+
+    assert search_candidate_ids("the Deploy plan", **kwargs) == ["a", "b", "c"]
+    assert calls == [("deploy plan", 50, True)]
+    assert search_candidate_ids("what happened yesterday", **kwargs) is None
+    assert search_candidate_ids("the", **kwargs) is None
+    assert search_candidate_ids("deploy", **{**kwargs, "fanout": 0}) is None
+    assert search_candidate_ids("deploy", **{**kwargs, "search_text": lambda text, **_: [], "semantic_enabled": False}) is None
+
+
 def test_rank_records_prefers_curated_row_on_nonsemantic_tie(monkeypatch) -> None:
     class _FakeBM25:
         def __init__(self, _corpus: object) -> None:
@@ -116,3 +172,59 @@ def test_rank_records_prefers_curated_row_on_nonsemantic_tie(monkeypatch) -> Non
     )
 
     assert ranked[0] is curated
+
+
+def test_rank_records_lexical_index_matches_per_query_bm25_ranking() -> None:
+    from clawlite.core.memory_lexical import LexicalIndex
+
+    def _tokens(text: str) -> list[str]:
+        return [part.lower() for part in str(text or "").split()]
+
+    rows = [
+        SimpleNamespace(id=f"r{idx}", text=text, source="session:a", confidence=1.0, reasoning_layer="fact", metadata={}, happened_at="")
+        for idx, text in enumerate(
+            [
+                "deploy checklist for project alpha",
+                "alpha alpha retro notes",
+                "grocery list",
+                "project beta kickoff",
+                "alpha deploy window moved",
+            ]
+        )
+    ]
+    kwargs = dict(
+        curated_importance={},
+        curated_mentions={},
+        limit=5,
+        semantic_enabled=False,
+        session_id="",
+        tokens=_tokens,
+        extract_entities=lambda text: {},
+        reasoning_intent_boosts=lambda query: {},
+        query_has_temporal_intent=lambda query: False,
+        generate_embedding=lambda query: None,
+        query_similar_embeddings=lambda query_embedding, records: [],
+        read_embeddings_map=lambda: {},
+        cosine_similarity=lambda left, right: 0.0,
+        entity_match_score=lambda query_entities, memory_entities: 0.0,
+        recency_score=lambda created_at: 0.0,
+        record_temporal_anchor=lambda row: "",
+        memory_has_temporal_markers=lambda text: False,
+        bounded_confidence_score=lambda value: 0.0,
+        normalize_reasoning_layer=lambda value: str(value or "fact"),
+        decay_penalty=lambda row: 0.0,
+        upcoming_event_boost=lambda row: 0.0,
+        salience_boost=lambda metadata: 0.0,
+        episodic_session_boost=lambda row: 0.0,
+        semantic_bm25_weight=0.4,
+        semantic_vector_weight=0.6,
+        ranking_confidence_boost_max=0.18,
+        temporal_intent_match_boost=0.25,
+        temporal_intent_miss_penalty=0.35,
+    )
+
+    expected = rank_records("alpha deploy", rows, **kwargs)
+    ranked = rank_records("alpha deploy", rows, lexical_index=LexicalIndex(_tokens), **kwargs)
+
+    assert [row.id for row in ranked] == [row.id for row in expected]
+    assert ranked[0].id in {"r0", "r4"}
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from clawlite.core.memory import MemoryStore
+from clawlite.core.memory_stream import import_memory_stream, is_memory_stream
+
+
+def _seed(store: MemoryStore, count: int) -> None:
+    rows = [
+        {
+            "id": f"row-{idx:04d}",
+            "text": f"streamed memory {idx}",
+            "source": "session:stream",
+            "created_at": f"2026-03-01T00:{idx // 60:02d}:{idx % 60:02d}+00:00",
+        }
+        for idx in range(count)
+    ]
+    store.history_path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+
+def test_export_stream_roundtrips_through_import_stream_with_gzip(tmp_path: Path) -> None:
+    source = MemoryStore(tmp_path / "a" / "memory.jsonl")
+    _seed(source, 25)
+    out_path = tmp_path / "export.ndjson.gz"
+    events: list[dict[str, object]] = []
+
+    exported = source.export_stream(out_path, progress=events.append)
+
+    assert exported["counts"] == {"history": 25, "curated": len(source.curated())}
+    with gzip.open(out_path, "rt", encoding="utf-8") as fh:
+        kinds = [json.loads(line)["kind"] for line in fh]
+    assert kinds[0] == "header" and kinds[-1] == "end"
+    assert is_memory_stream(out_path)
+    assert events[-1] == {"phase": "export", "history": 25, "done": True}
+
+    target = MemoryStore(tmp_path / "b" / "memory.jsonl")
+    target.add("to be replaced", source="session:old")
+    imported = target.import_stream(out_path)
+
+    assert imported["counts"]["history"] == 25
+    assert imported["resumed_from"] == 0
+    assert [row.id for row in target.all()] == [row.id for row in source.all()]
+    assert not (target.history_path.parent / ".memory.jsonl.import.json").exists()
+
+
+def test_import_stream_resumes_from_last_checkpoint_after_interruption(tmp_path: Path) -> None:
+    source = MemoryStore(tmp_path / "a" / "memory.jsonl")
+    _seed(source, 12)
+    out_path = tmp_path / "export.ndjson"
+    source.export_stream(out_path)
+
+    target = MemoryStore(tmp_path / "b" / "memory.jsonl")
+    target.add("kept until the import completes", source="session:old")
+    parsed: list[str] = []
+
+    def _interrupting_record_from_payload(payload: dict[str, object]):
+        if len(parsed) == 10:
+            raise KeyboardInterrupt
+        parsed.append(str(payload.get("id")))
+        return target._record_from_payload(payload)
+
+    with pytest.raises(KeyboardInterrupt):
+        import_memory_stream(**_import_kwargs(target, out_path, record_from_payload=_interrupting_record_from_payload))
+    assert [row.text for row in target.all()] == ["kept until the import completes"]
+
+    result = import_memory_stream(**_import_kwargs(target, out_path))
+
+    assert result["resumed_from"] == 8
+    assert result["counts"]["history"] == 12
+    assert sorted(row.id for row in target.all()) == sorted(row.id for row in source.all())
+
+
+def test_import_stream_rejects_truncated_stream_without_touching_history(tmp_path: Path) -> None:
+    source = MemoryStore(tmp_path / "a" / "memory.jsonl")
+    _seed(source, 3)
+    out_path = tmp_path / "export.ndjson"
+    source.export_stream(out_path)
+    lines = out_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    out_path.write_text("".join(lines[:-1]), encoding="utf-8")
+
+    target = MemoryStore(tmp_path / "b" / "memory.jsonl")
+    target.add("still here", source="session:old")
+
+    with pytest.raises(ValueError, match="truncated"):
+        target.import_stream(out_path)
+    assert [row.text for row in target.all()] == ["still here"]
+
+
+def _import_kwargs(store: MemoryStore, path: Path, **overrides: object) -> dict[str, object]:
+    kwargs: dict[str, object] = {
+        "in_path": path,
+        "history_path": store.history_path,
+        "record_from_payload": store._record_from_payload,
+        "encrypt_text_for_category": store._encrypt_text_for_category,
+        "replace_history": lambda staged: store._replace_file_locked(store.history_path, staged),
+        "flush_and_fsync": store._flush_and_fsync,
+        "curated_enabled": store.curated_path is not None,
+        "write_curated_facts": store._write_curated_facts,
+        "atomic_write_text_locked": store._atomic_write_text_locked,
+        "checkpoints_path": store.checkpoints_path,
+        "format_checkpoints": store._format_checkpoints,
+        "profile_path": store.profile_path,
+        "privacy_path": store.privacy_path,
+        "write_json_dict": store._write_json_dict,
+        "default_profile": store._default_profile,
+        "default_privacy": store._default_privacy,
+        "checkpoint_every": 4,
+    }
+    kwargs.update(overrides)
+    return kwargs
+
+
+def test_import_stream_into_a_user_scope_and_index_history(tmp_path: Path) -> None:
+    source = MemoryStore(tmp_path / "a" / "memory.jsonl")
+    _seed(source, 12)
+    out_path = tmp_path / "export.ndjson"
+    source.export_stream(out_path)
+
+    target = MemoryStore(tmp_path / "b" / "memory.jsonl")
+    target.add("default scope survives", source="session:old")
+    imported = target.import_stream(out_path, user_id="alice")
+
+    assert imported["counts"]["history"] == 12
+    assert [row.text for row in target.all()] == ["default scope survives"]
+    assert target.search("streamed memory 7", limit=1, user_id="alice")[0].id == "row-0007"
+
+    target.import_stream(out_path)
+    assert target.index_history(batch_size=5) == 12
+    hits = target.backend.search_text("streamed", limit=20, match_any=True)
+    assert {hit["record_id"] for hit in hits} == {f"row-{idx:04d}" for idx in range(12)}
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+import clawlite.core.memory_vectors as memory_vectors_module
+from clawlite.core.memory_vectors import EmbeddingMatrix
+
+
+def _cosine(left: list[float], right: list[float]) -> float:
+    dot = sum(a * b for a, b in zip(left, right))
+    return dot / math.sqrt(sum(a * a for a in left) * sum(b * b for b in right))
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend_mode(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(memory_vectors_module, "np", None)
+    elif memory_vectors_module.np is None:
+        pytest.skip("numpy not installed")
+    return request.param
+
+
+def test_embedding_matrix_scores_match_scalar_cosine(backend_mode) -> None:
+    vectors = {
+        "alpha": [1.0, 0.0, 0.5],
+        "beta": [0.2, 0.9, 0.1],
+        "gamma": [-0.4, 0.3, 0.8],
+    }
+    matrix = EmbeddingMatrix.from_mapping(vectors)
+    query = [0.7, 0.2, 0.1]
+
+    scores = matrix.scores(query)
+
+    assert set(scores) == set(vectors)
+    for row_id, vector in vectors.items():
+        assert scores[row_id] == pytest.approx(_cosine(query, vector), abs=1e-5)
+
+
+def test_embedding_matrix_top_k_orders_by_score_then_id(backend_mode) -> None:
+    matrix = EmbeddingMatrix.from_mapping(
+        {
+            "a": [1.0, 0.0],
+            "b": [1.0, 0.0],
+            "c": [0.0, 1.0],
+            "d": [0.6, 0.4],
+        }
+    )
+
+    hits = matrix.top_k([1.0, 0.0], 2)
+
+    assert [hit["record_id"] for hit in hits] == ["b", "a"]
+    assert hits[0]["score"] == pytest.approx(1.0)
+
+
+def test_embedding_matrix_top_k_respects_record_filter(backend_mode) -> None:
+    matrix = EmbeddingMatrix.from_mapping({"a": [1.0, 0.0], "b": [0.0, 1.0], "c": [0.5, 0.5]})
+
+    hits = matrix.top_k([1.0, 0.0], 5, record_ids=["c", "b", "missing"])
+
+    assert [hit["record_id"] for hit in hits] == ["c", "b"]
+    assert matrix.top_k([1.0, 0.0], 5, record_ids=["missing"]) == []
+
+
+def test_embedding_matrix_skips_zero_and_mismatched_vectors(backend_mode) -> None:
+    matrix = EmbeddingMatrix.from_mapping({"a": [1.0, 0.0], "zero": [0.0, 0.0], "wide": [1.0, 0.0, 0.0]})
+
+    assert len(matrix) == 1
+    assert "zero" not in matrix
+    assert matrix.scores([1.0, 0.0, 0.0]) == {}
+
+
+def test_group_by_dimension_builds_one_matrix_per_model(backend_mode) -> None:
+    matrices = EmbeddingMatrix.group_by_dimension(
+        [("small", [1.0, 0.0]), ("large", [0.0, 1.0, 0.0]), ("bad", "not-a-vector")]
+    )
+
+    assert sorted(matrices) == [2, 3]
+    assert matrices[3].top_k([0.0, 1.0, 0.0], 1)[0]["record_id"] == "large"
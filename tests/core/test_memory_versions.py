@@ -5,19 +5,52 @@ import json
 from pathlib import Path
 
 from clawlite.core.memory_versions import (
+    build_snapshot_manifest,
     create_memory_branch,
     diff_memory_versions,
+    get_version_object,
+    history_bucket,
     list_memory_branches,
+    list_memory_versions,
+    load_version_payload,
+    materialize_snapshot_manifest,
+    merge_version_manifests,
+    put_version_object,
     rollback_memory_version,
+    version_path_for,
     write_snapshot_payload,
 )
 
 
-def test_write_snapshot_payload_persists_gzip_and_advances_branch_head(tmp_path: Path) -> None:
+def _snapshot(tmp_path: Path, payload: dict[str, object], *, tag: str = "") -> str:
+    return write_snapshot_payload(
+        payload=payload,
+        versions_path=tmp_path,
+        tag=tag,
+        advance_branch=False,
+        current_branch_name=lambda: "main",
+        advance_branch_head=lambda branch_name, version_id: None,
+    )
+
+
+def _object_files(tmp_path: Path) -> set[Path]:
+    return set((tmp_path / "objects").rglob("*.json.gz"))
+
+
+def test_write_snapshot_payload_persists_manifest_and_advances_branch_head(tmp_path: Path) -> None:
     advanced: list[tuple[str, str]] = []
+    payload = {
+        "version": 1,
+        "exported_at": "2026-03-17T00:00:00+00:00",
+        "history": [{"id": "b", "text": "two", "created_at": "2"}, {"id": "a", "text": "one", "created_at": "1"}],
+        "curated": [],
+        "checkpoints": {},
+        "profile": {"name": "x"},
+        "privacy": {},
+    }
 
     version_id = write_snapshot_payload(
-        payload={"version": 1, "history": []},
+        payload=payload,
         versions_path=tmp_path,
         tag="before sync",
         advance_branch=True,
@@ -27,10 +60,57 @@ def test_write_snapshot_payload_persists_gzip_and_advances_branch_head(tmp_path:
     )
 
     assert advanced == [("main", version_id)]
-    version_path = tmp_path / f"{version_id}.json.gz"
-    assert version_path.exists()
-    with gzip.open(version_path, "rt", encoding="utf-8") as fh:
-        assert json.load(fh) == {"version": 1, "history": []}
+    manifest_path = tmp_path / f"{version_id}.manifest.json"
+    assert version_path_for(tmp_path, version_id) == manifest_path
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    assert set(manifest["history"]) == {history_bucket("a"), history_bucket("b")}
+    assert list_memory_versions(tmp_path) == [version_id]
+    restored = load_version_payload(versions_path=tmp_path, version_id=version_id)
+    assert [row["id"] for row in restored["history"]] == ["a", "b"]
+    assert restored["profile"] == {"name": "x"}
+
+
+def test_snapshots_only_write_chunks_for_changed_records(tmp_path: Path) -> None:
+    rows = [{"id": f"r{idx}", "text": f"row {idx}", "created_at": f"{idx:04d}"} for idx in range(400)]
+    first = _snapshot(tmp_path, {"history": rows}, tag="a")
+    before = _object_files(tmp_path)
+
+    rows[7] = {**rows[7], "text": "row 7 edited"}
+    second = _snapshot(tmp_path, {"history": rows}, tag="b")
+    added = _object_files(tmp_path) - before
+
+    assert len(added) == 1
+    diff = diff_memory_versions(versions_path=tmp_path, version_a=first, version_b=second)
+    assert diff["changed"] == {"r7": {"from": "row 7", "to": "row 7 edited"}}
+    assert diff["counts"] == {"added": 0, "removed": 0, "changed": 1}
+
+
+def test_merge_version_manifests_reads_only_chunks_that_differ(tmp_path: Path) -> None:
+    put = lambda value: put_version_object(tmp_path, value)  # noqa: E731
+    shared = [{"id": f"s{idx}", "text": "same", "created_at": "1"} for idx in range(50)]
+    base = build_snapshot_manifest({"history": shared}, put_object=put)
+    source = build_snapshot_manifest({"history": shared + [{"id": "new", "text": "source", "created_at": "2"}]}, put_object=put)
+    reads: list[str] = []
+
+    def _read(digest: str):
+        reads.append(digest)
+        return get_version_object(tmp_path, digest)
+
+    merged = merge_version_manifests(
+        source,
+        base,
+        read_source=_read,
+        read_target=_read,
+        put_object=put,
+        exported_at="2026-03-17T00:00:00+00:00",
+    )
+
+    bucket = history_bucket("new")
+    assert merged["history"][bucket] == source["history"][bucket]
+    history_reads = [digest for digest in reads if digest in set(source["history"].values()) | set(base["history"].values())]
+    assert len(history_reads) <= 2
+    payload = materialize_snapshot_manifest(merged, get_object=lambda digest: get_version_object(tmp_path, digest))
+    assert len(payload["history"]) == 51
 
 
 def test_diff_memory_versions_reports_added_removed_and_changed(tmp_path: Path) -> None:
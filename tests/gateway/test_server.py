@@ -2265,6 +2265,20 @@ def test_build_runtime_passes_session_retention_ttl(tmp_path: Path) -> None:
     assert getattr(runtime.engine.sessions, "session_retention_ttl_s", None) == 7200
 
 
+def test_build_runtime_uses_sqlite_session_backend_when_configured(tmp_path: Path) -> None:
+    cfg = AppConfig(
+        workspace_path=str(tmp_path / "workspace"),
+        state_path=str(tmp_path / "state"),
+        agents={"defaults": {"sessionBackend": "sqlite", "session_retention_ttl_s": 7200}},
+        channels={},
+    )
+    runtime = build_runtime(cfg)
+
+    assert runtime.engine.sessions.diagnostics()["backend"] == "sqlite"
+    assert runtime.engine.sessions.session_retention_ttl_s == 7200
+    assert (tmp_path / "state" / "sessions" / "sessions.sqlite3").exists()
+
+
 def test_build_runtime_uses_redis_bus_when_configured(tmp_path: Path) -> None:
     cfg = AppConfig(
         workspace_path=str(tmp_path / "workspace"),
@@ -7625,7 +7639,9 @@ def test_gateway_diagnostics_schema_and_toggle(tmp_path: Path) -> None:
             "latency_buckets",
             "last_route",
             "last_query",
+            "search_cache",
         }
+        assert set(retrieval["search_cache"].keys()) == {"hits", "misses", "stale", "entries", "hit_rate_pct"}
         turn_metrics = payload["engine"]["turn_metrics"]
         assert set(turn_metrics.keys()) == {
             "turns_total",
@@ -7637,7 +7653,11 @@ def test_gateway_diagnostics_schema_and_toggle(tmp_path: Path) -> None:
             "last_outcome",
             "last_model",
             "diagnostic_switches",
+            "consolidation",
         }
+        assert {"depth", "passes", "coalesced", "last_lag_ms", "avg_pass_ms", "backpressure_waits"} <= set(
+            turn_metrics["consolidation"].keys()
+        )
         assert set(turn_metrics["latency_buckets"].keys()) == {
             "lt_1s",
             "1_3s",
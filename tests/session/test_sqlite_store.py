@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from clawlite.session.sqlite_store import SQLiteSessionStore, migrate_jsonl_sessions
+from clawlite.session.store import SessionStore
+from clawlite.tools.sessions import _read_session_messages
+
+
+def _tool_turn(store: SessionStore | SQLiteSessionStore, session_id: str, idx: int) -> None:
+    store.append(session_id, "user", f"question {idx}")
+    if idx % 3 == 0:
+        store.append(
+            session_id,
+            "assistant",
+            "",
+            metadata={
+                "tool_calls": [
+                    {"id": f"call_{idx}", "type": "function", "function": {"name": "exec", "arguments": "{}"}},
+                    {"id": f"call_{idx}_lost", "type": "function", "function": {"name": "exec", "arguments": "{}"}},
+                ]
+            },
+        )
+        store.append(session_id, "tool", f"result {idx}", metadata={"tool_call_id": f"call_{idx}", "name": "exec"})
+    store.append_many(session_id, [{"role": "assistant", "content": f"answer {idx}", "metadata": {"turn": idx}}])
+
+
+def test_sqlite_session_store_matches_jsonl_store(tmp_path: Path) -> None:
+    jsonl = SessionStore(root=tmp_path / "jsonl", max_messages_per_session=50)
+    sqlite = SQLiteSessionStore(root=tmp_path / "sqlite", max_messages_per_session=50)
+    for store in (jsonl, sqlite):
+        for idx in range(30):
+            _tool_turn(store, "telegram:1", idx)
+        store.append("cli:other", "user", "elsewhere")
+        with pytest.raises(ValueError):
+            store.append("cli:other", "robot", "nope")
+
+    # JSONL compaction trims with an overflow budget; compare the windows both still hold.
+    for limit in (1, 2, 5, 20, 40):
+        assert sqlite.read_messages("telegram:1", limit=limit) == jsonl.read_messages("telegram:1", limit=limit)
+        assert sqlite.read("telegram:1", limit=limit) == jsonl.read("telegram:1", limit=limit)
+    assert sqlite.list_sessions() == ["cli:other", "telegram:1"]
+    # 50 kept rows, six of them content-less tool-call requests.
+    assert sqlite.count_messages("telegram:1") == 44
+    assert len(sqlite.history_messages("telegram:1", limit=100)) == 44
+    assert sqlite.history_messages("telegram:1", limit=2, include_tools=False) == [
+        {"role": "user", "content": "question 29", "ts": sqlite.history_messages("telegram:1", limit=2)[0]["ts"]},
+        {
+            "role": "assistant",
+            "content": "answer 29",
+            "ts": sqlite.history_messages("telegram:1", limit=1)[0]["ts"],
+            "metadata": {"turn": 29},
+        },
+    ]
+    diag = sqlite.diagnostics()
+    assert diag["backend"] == "sqlite"
+    assert diag["append_success"] == 30 * 2 + 10 * 2 + 1
+    assert diag["compaction_trimmed_lines"] == 30 * 2 + 10 * 2 - 50
+
+    assert sqlite.delete("cli:other") is True
+    assert sqlite.delete("cli:other") is False
+    assert sqlite.has_session("cli:other") is False
+    assert sqlite.read("cli:other") == []
+
+
+def test_sqlite_session_store_prunes_by_last_write(tmp_path: Path) -> None:
+    store = SQLiteSessionStore(root=tmp_path / "sessions", session_retention_ttl_s=60)
+    store.append("cli:old", "user", "stale")
+    store.append("cli:new", "user", "fresh")
+
+    assert store.prune_expired(now=time.time() + 30) == 0
+    store.append("cli:new", "assistant", "still here")
+    total, recent = store.session_activity(5)
+    assert total == 2
+    assert [session_id for session_id, _updated in recent] == ["cli:new", "cli:old"]
+
+    with store._pool.writer() as conn:
+        conn.execute("UPDATE sessions SET updated_at = updated_at - 120 WHERE session_id = 'cli:old'")
+        conn.commit()
+    assert store.prune_expired() == 1
+    assert store.list_sessions() == ["cli:new"]
+    assert store.count_messages("cli:old") == 0
+    assert store.diagnostics()["ttl_prune_deleted_sessions"] == 1
+
+
+def test_migrate_jsonl_sessions_imports_logs_once(tmp_path: Path) -> None:
+    root = tmp_path / "sessions"
+    legacy = SessionStore(root=root, max_messages_per_session=None)
+    for idx in range(12):
+        _tool_turn(legacy, "discord:guild/42", idx)
+    legacy.append("cli:quiet", "user", "only message")
+    quiet_path = legacy._path("cli:quiet")
+    os.utime(quiet_path, (1_000_000, 1_000_000))
+
+    store = SQLiteSessionStore(root=root, max_messages_per_session=None)
+    report = migrate_jsonl_sessions(root, store)
+    assert report["ok"] is True
+    assert report["migrated_sessions"] == 2
+    assert report["migrated_messages"] == 12 * 2 + 4 * 2 + 1
+    assert store.list_sessions() == ["discord:guild/42", "cli:quiet"]
+    assert store.session_activity(5)[1][1] == ("cli:quiet", 1_000_000.0)
+    assert store.read_messages("discord:guild/42", limit=15) == legacy.read_messages("discord:guild/42", limit=15)
+    assert store.history_messages("cli:quiet", limit=5) == _read_session_messages(legacy, "cli:quiet", limit=5)
+
+    again = migrate_jsonl_sessions(root, store)
+    assert again["migrated_sessions"] == 0
+    assert again["skipped_sessions"] == 2
+    assert store.count_messages("cli:quiet") == 1
+
+
+
+def test_import_session_is_all_or_nothing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("clawlite.session.sqlite_store.SESSION_IMPORT_BATCH", 2)
+    store = SQLiteSessionStore(root=tmp_path / "db")
+
+    def _interrupted():
+        for idx in range(5):
+            yield {"role": "user", "content": f"m{idx}"}
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        store.import_session("cli:partial", _interrupted())
+    assert not store.has_session("cli:partial")
+    assert store.read_messages("cli:partial", limit=10) == []
+
+    assert store.import_session("cli:partial", [{"role": "user", "content": f"m{idx}"} for idx in range(5)]) == 5
+    assert [row["content"] for row in store.read_messages("cli:partial", limit=10)] == [f"m{idx}" for idx in range(5)]
+    store.close()
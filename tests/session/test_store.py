@@ -2,12 +2,15 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 import time
 from pathlib import Path
 
 import pytest
 
+from clawlite.session import store as store_module
 from clawlite.session.store import SessionStore
+from clawlite.session.tail import offset_index_path
 
 
 def test_session_store_persists_jsonl(tmp_path: Path) -> None:
@@ -144,14 +147,10 @@ def test_session_store_compaction_updates_diagnostics_counters(tmp_path: Path, m
 
     target = store._path("telegram:6")
 
-    original_read_text = Path.read_text
+    def _boom(path: Path, keep: int):
+        raise OSError("compaction exploded")
 
-    def _boom(self: Path, *args, **kwargs) -> str:
-        if self == target:
-            raise OSError("compaction exploded")
-        return original_read_text(self, *args, **kwargs)
-
-    monkeypatch.setattr(Path, "read_text", _boom)
+    monkeypatch.setattr(store_module, "head_cut", _boom)
     store.append("telegram:6", "user", "four")
     diag_after = store.diagnostics()
     assert diag_after["append_success"] == 4
@@ -176,6 +175,61 @@ def test_session_store_batches_compaction_for_larger_limits(tmp_path: Path) -> N
     assert rows[-1]["content"] == "m129"
 
 
+def test_session_store_compaction_cuts_head_without_decoding(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    store = SessionStore(root=tmp_path / "sessions", max_messages_per_session=100)
+    target = store._path("telegram:cut")
+    lines = [json.dumps({"role": "user", "content": f"m{idx}", "ts": "", "metadata": {}}) for idx in range(150)]
+    target.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def _no_decode(*args, **kwargs):
+        raise AssertionError("compaction decoded the session file")
+
+    monkeypatch.setattr(store_module.json, "loads", _no_decode)
+    store.append("telegram:cut", "user", "m150")
+    monkeypatch.undo()
+
+    diag = store.diagnostics()
+    assert diag["compaction_runs"] == 1
+    assert diag["compaction_trimmed_lines"] == 51
+    data = target.read_bytes()
+    assert data.splitlines()[0] == lines[51].encode("utf-8")
+    ends = [int.from_bytes(offset_index_path(target).read_bytes()[i : i + 8], "little") for i in range(0, 800, 8)]
+    assert ends[-1] == len(data)
+    assert all(data[end - 1 : end] == b"\n" for end in ends)
+    rows = store.read("telegram:cut", limit=200)
+    assert [row["content"] for row in rows] == [f"m{idx}" for idx in range(51, 151)]
+
+
+def test_session_store_compaction_copies_outside_the_write_lock(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    store = SessionStore(root=tmp_path / "sessions", max_messages_per_session=100)
+    target = store._path("telegram:busy")
+    lines = [json.dumps({"role": "user", "content": f"m{idx}", "ts": "", "metadata": {}}) for idx in range(150)]
+    target.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    original_copy = SessionStore._copy_range
+    late: list[threading.Thread] = []
+
+    def _copy_with_concurrent_append(path, start, end, handle):
+        original_copy(path, start, end, handle)
+        if not late:
+            writer = threading.Thread(target=store.append, args=("telegram:busy", "user", "late"))
+            late.append(writer)
+            writer.start()
+            writer.join(timeout=5)
+            assert not writer.is_alive(), "append blocked behind the compaction copy"
+
+    monkeypatch.setattr(SessionStore, "_copy_range", staticmethod(_copy_with_concurrent_append))
+    store.append("telegram:busy", "user", "m150")
+    assert late
+
+    rows = store.read("telegram:busy", limit=200)
+    assert [row["content"] for row in rows][-2:] == ["m150", "late"]
+    assert len(rows) >= 100
+    data = target.read_bytes()
+    index = offset_index_path(target).read_bytes()
+    assert int.from_bytes(index[-8:], "little") == len(data)
+    assert len(index) // 8 == len(data.splitlines())
+
+
 def test_session_store_reuses_cached_line_estimate_between_writes(
     tmp_path: Path,
     monkeypatch: pytest.MonkeyPatch,
@@ -349,3 +403,141 @@ def test_session_store_read_messages_drops_orphan_tool_results_and_incomplete_to
         {"role": "user", "content": "hello"},
         {"role": "assistant", "content": "fallback answer"},
     ]
+
+
+def test_session_store_tail_read_matches_full_read_across_tool_groups(tmp_path: Path) -> None:
+    store = SessionStore(root=tmp_path / "sessions", max_messages_per_session=None)
+    for idx in range(60):
+        store.append("cli:tail", "user", f"question {idx}")
+        if idx % 3 == 0:
+            store.append(
+                "cli:tail",
+                "assistant",
+                "",
+                metadata={
+                    "tool_calls": [
+                        {"id": f"call_{idx}_a", "type": "function", "function": {"name": "exec", "arguments": "{}"}},
+                        {"id": f"call_{idx}_b", "type": "function", "function": {"name": "exec", "arguments": "{}"}},
+                    ]
+                },
+            )
+            store.append("cli:tail", "tool", f"result {idx} a", metadata={"tool_call_id": f"call_{idx}_a", "name": "exec"})
+            store.append("cli:tail", "tool", f"result {idx} b", metadata={"tool_call_id": f"call_{idx}_b", "name": "exec"})
+        store.append("cli:tail", "assistant", f"answer {idx}")
+
+    path = store._path("cli:tail")
+    assert path.with_name(f"{path.name}.idx").exists()
+    for limit in (1, 2, 3, 4, 5, 20, 37, 500):
+        assert store.read_messages("cli:tail", limit=limit) == store._read_all_messages(path, limit)
+    assert store.diagnostics()["read_tail"] == 8
+
+
+def test_session_store_reads_only_the_tail_of_long_sessions(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    store = SessionStore(root=tmp_path / "sessions", max_messages_per_session=None)
+    store.append_many(
+        "cli:long",
+        [{"role": "user" if idx % 2 == 0 else "assistant", "content": f"m{idx}", "metadata": {}} for idx in range(2000)],
+    )
+    target = store._path("cli:long")
+    with target.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"session_id": "cli:long", "role": "user", "content": "external", "metadata": {}}) + "\n")
+
+    decoded = {"count": 0}
+    original_loads = json.loads
+
+    def _counting_loads(raw, *args, **kwargs):
+        decoded["count"] += 1
+        return original_loads(raw, *args, **kwargs)
+
+    monkeypatch.setattr("clawlite.session.store.json.loads", _counting_loads)
+    rows = store.read("cli:long", limit=20)
+    assert [row["content"] for row in rows][-3:] == ["m1998", "m1999", "external"]
+    assert len(rows) == 20
+    assert decoded["count"] <= 20 + 32
+
+    store.append("cli:long", "assistant", "after")
+    assert store.read("cli:long", limit=2) == [
+        {"role": "user", "content": "external"},
+        {"role": "assistant", "content": "after"},
+    ]
+
+
+def test_session_store_group_commit_shares_fsyncs_across_sessions(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    store = SessionStore(root=tmp_path / "sessions", durability="group", group_commit_window_s=0.02)
+    fsyncs = {"count": 0}
+    original_fsync = os.fsync
+
+    def _counting_fsync(fd: int) -> None:
+        fsyncs["count"] += 1
+        original_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", _counting_fsync)
+
+    def _writer(idx: int) -> None:
+        for turn in range(10):
+            store.append(f"telegram:{idx}", "user", f"message {turn}")
+
+    threads = [threading.Thread(target=_writer, args=(idx,)) for idx in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for idx in range(8):
+        assert [row["content"] for row in store.read(f"telegram:{idx}", limit=20)] == [f"message {turn}" for turn in range(10)]
+    diag = store.diagnostics()
+    assert diag["durability"] == "group"
+    assert diag["group_commit_records"] == 80
+    assert diag["group_commits"] < 80
+    assert diag["group_commit_max_batch"] > 1
+    assert fsyncs["count"] == diag["group_commits"]
+
+    store.close()
+    assert not list((tmp_path / "sessions").glob(".wal-*"))
+    store.append("telegram:0", "assistant", "after close")
+    assert store.diagnostics()["durability"] == "fsync"
+
+
+def test_session_store_replays_group_commit_log_after_crash(tmp_path: Path) -> None:
+    root = tmp_path / "sessions"
+    store = SessionStore(root=root, durability="group", group_commit_window_s=0)
+    store.append("cli:crash", "user", "first")
+    store.append("cli:crash", "assistant", "second")
+    store.append("cli:other", "user", "third", durable=False)
+    store.flush()
+
+    # Crash: the unsynced appends never reach the disk and the log is left behind.
+    store._wal._handle.close()
+    target = store._path("cli:crash")
+    content = target.read_bytes()
+    target.write_bytes(content[: content.index(b"\n") + 5])
+    store._path("cli:other").unlink()
+
+    recovered = SessionStore(root=root)
+    assert recovered.read("cli:crash", limit=10) == [
+        {"role": "user", "content": "first"},
+        {"role": "assistant", "content": "second"},
+    ]
+    assert recovered.read("cli:other", limit=10) == [{"role": "user", "content": "third"}]
+    assert recovered.diagnostics()["wal_recovered_records"] == 2
+    assert recovered.diagnostics()["read_corrupt_lines"] == 0
+    assert not list(root.glob(".wal-*"))
+
+
+def test_session_store_recovery_skips_records_past_end_of_file(tmp_path: Path) -> None:
+    root = tmp_path / "sessions"
+    store = SessionStore(root=root, durability="group", group_commit_window_s=0)
+    store.append("cli:gap", "user", "first")
+    store.flush()
+    store._wal.checkpoint()
+    store.append("cli:gap", "assistant", "second")
+    store.flush()
+
+    # The log only holds the second record, and the file no longer reaches its offset.
+    store._wal._handle.close()
+    store._path("cli:gap").write_bytes(b"")
+
+    recovered = SessionStore(root=root)
+    assert recovered.read("cli:gap", limit=10) == []
+    assert recovered.diagnostics()["wal_recovered_records"] == 0
+    assert not list(root.glob(".wal-*"))
@@ -5,6 +5,7 @@ import json
 from types import SimpleNamespace
 
 from clawlite.core.subagent import SubagentManager, SubagentRun
+from clawlite.session.sqlite_store import SQLiteSessionStore
 from clawlite.session.store import SessionStore
 from clawlite.tools.base import ToolContext
 from clawlite.tools.sessions import (
@@ -1207,3 +1208,27 @@ def test_session_status_surfaces_recent_subagents(tmp_path) -> None:
         assert payload["latest_subagent"]["target_session_id"] == "cli:status:subagent:2"
 
     asyncio.run(_scenario())
+
+
+def test_session_tools_use_sqlite_store_queries(tmp_path) -> None:
+    async def _scenario() -> None:
+        sessions = SQLiteSessionStore(root=tmp_path / "sessions")
+        sessions.append("cli:a", "user", "hello from alpha")
+        sessions.append("cli:a", "assistant", "done alpha")
+        sessions.append("cli:b", "user", "hello from beta")
+        manager = SubagentManager(state_path=tmp_path / "subagents")
+
+        listed = json.loads(await SessionsListTool(sessions).run({"limit": 10}, ToolContext(session_id="cli:a")))
+        assert [row["session_id"] for row in listed["sessions"]] == ["cli:b", "cli:a"]
+        assert listed["sessions"][1]["message_count"] == 2
+        assert listed["sessions"][1]["last_message"]["content"] == "done alpha"
+
+        history = json.loads(await SessionsHistoryTool(sessions).run({"session_id": "cli:a"}, ToolContext(session_id="cli:a")))
+        assert [row["content"] for row in history["messages"]] == ["hello from alpha", "done alpha"]
+
+        status = json.loads(await SessionStatusTool(sessions, manager).run({}, ToolContext(session_id="cli:b")))
+        assert status["exists"] is True
+        assert status["message_count"] == 1
+        assert not list((tmp_path / "sessions").glob("*.jsonl"))
+
+    asyncio.run(_scenario())
@@ -7,6 +7,7 @@ from pathlib import Path
 from clawlite.providers.base import LLMResult
 from clawlite.config.schema import ToolSafetyPolicyConfig
 from clawlite.core.skills import SkillsLoader
+from clawlite.session.sqlite_store import SQLiteSessionStore
 from clawlite.tools.base import Tool, ToolContext
 from clawlite.tools.registry import ToolRegistry
 from clawlite.tools.skill import SkillTool
@@ -1094,3 +1095,60 @@ def test_run_skill_session_logs_reads_jsonl_without_jq_or_rg(tmp_path: Path) ->
         assert payload["messages"][0]["content"] == "deployment healthy"
 
     asyncio.run(_scenario())
+
+
+def test_run_skill_session_logs_reads_sqlite_session_store(tmp_path: Path) -> None:
+    _write_skill(
+        tmp_path,
+        "session-logs",
+        "name: session-logs\ndescription: logs\nscript: session_logs",
+    )
+    state_path = tmp_path / "state"
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "workspace_path": str(tmp_path / "workspace"),
+                "state_path": str(state_path),
+                "agents": {"defaults": {"session_backend": "sqlite"}},
+            }
+        ),
+        encoding="utf-8",
+    )
+    store = SQLiteSessionStore(root=state_path / "sessions")
+    store.append("cli:sqlite", "user", "deploy status", metadata={"channel": "telegram"})
+    store.append("cli:sqlite", "assistant", "deployment healthy", metadata={"channel": "telegram"})
+    store.close()
+
+    async def _scenario() -> None:
+        reg = ToolRegistry()
+        tool = SkillTool(loader=SkillsLoader(builtin_root=tmp_path), registry=reg)
+        listed = json.loads(
+            await tool.run(
+                {"name": "session-logs", "tool_arguments": {"config": str(config_path)}},
+                ToolContext(session_id="cli:logs"),
+            )
+        )
+        assert listed["sessions"] == [
+            {
+                "session_id": "cli:sqlite",
+                "message_count": 2,
+                "last_ts": listed["sessions"][0]["last_ts"],
+                "last_role": "assistant",
+                "last_content": "deployment healthy",
+            }
+        ]
+        found = json.loads(
+            await tool.run(
+                {
+                    "name": "session-logs",
+                    "tool_arguments": {"config": str(config_path), "session_id": "cli:sqlite", "query": "deploy"},
+                },
+                ToolContext(session_id="cli:logs"),
+            )
+        )
+        assert found["count"] == 2
+        assert found["role_counts"] == {"user": 1, "assistant": 1}
+        assert found["messages"][0]["metadata"] == {"channel": "telegram"}
+
+    asyncio.run(_scenario())
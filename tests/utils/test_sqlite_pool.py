@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from clawlite.utils.sqlite_pool import SQLiteConnectionPool
+
+
+def test_pool_reuses_connections_and_applies_pragmas(tmp_path: Path) -> None:
+    pool = SQLiteConnectionPool(tmp_path / "pool.sqlite3", readers=2)
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.commit()
+
+    inserted = pool.executemany("INSERT INTO items (name) VALUES (?)", [("a",), ("b",), ("c",)])
+    assert inserted == 3
+
+    for _ in range(20):
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 3
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+    stats = pool.snapshot()
+    assert stats["connections_opened"] == 2
+    assert stats["readers_open"] == 1
+    assert stats["batched_rows"] == 3
+    pool.close()
+
+
+def test_pool_rolls_back_abandoned_writes_and_bounds_readers(tmp_path: Path) -> None:
+    pool = SQLiteConnectionPool(tmp_path / "pool.sqlite3", readers=1)
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+        conn.commit()
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO items (id) VALUES (1)")
+    with pool.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+    release = threading.Event()
+    held = threading.Event()
+
+    def _hold_reader() -> None:
+        with pool.reader():
+            held.set()
+            release.wait(5)
+
+    def _borrow_reader() -> None:
+        with pool.reader():
+            pass
+
+    holder = threading.Thread(target=_hold_reader)
+    holder.start()
+    held.wait(5)
+    waiter = threading.Thread(target=_borrow_reader)
+    waiter.start()
+    waiter.join(0.05)
+    assert waiter.is_alive()
+    release.set()
+    holder.join(5)
+    waiter.join(5)
+    assert not waiter.is_alive()
+    assert pool.snapshot()["reader_waits"] == 1
+    assert pool.snapshot()["readers_open"] == 1